@@ -0,0 +1,104 @@
+"""
+Fachada asíncrona para PostgresManager
+Ejecuta las consultas a Supabase en el ejecutor de tareas compartido y
+entrega los resultados al hilo de la interfaz mediante señales Qt, para
+que una respuesta lenta no congele el punto de venta.
+"""
+
+import functools
+from typing import Callable, Dict, Optional, Union
+
+from PySide6.QtCore import QObject, Signal
+
+from services.ejecutor_tareas import Prioridad, Tarea, obtener_ejecutor
+
+
+class AsyncPostgresManager(QObject):
+    """
+    Ejecuta métodos de PostgresManager fuera del hilo de la interfaz.
+
+    Uso:
+        db = obtener_async(pg_manager)
+        db.ejecutar('get_all_products', clave='productos_venta',
+                    al_terminar=self.mostrar_productos)
+        db.ejecutar(lambda: pg_manager.client.table('lockers').select('*').execute(),
+                    al_terminar=...)
+
+    Las consultas cuentan como trabajos de red del ejecutor (cupo limitado).
+    Una solicitud con la misma clave que otra en curso la reemplaza: la
+    anterior se cancela y su resultado se descarta.
+
+    Signals:
+        ocupado_cambiado(bool): Hay (True) o ya no hay (False) consultas en curso
+    """
+
+    ocupado_cambiado = Signal(bool)
+
+    def __init__(self, pg_manager, parent=None):
+        super().__init__(parent)
+        self.pg_manager = pg_manager
+        self.ejecutor = obtener_ejecutor()
+        self._pendientes = set()
+
+    def ejecutar(self, metodo: Union[str, Callable], *args, clave=None,
+                 al_terminar: Optional[Callable] = None,
+                 al_fallar: Optional[Callable] = None,
+                 prioridad: int = Prioridad.LISTA, **kwargs) -> Tarea:
+        """
+        Ejecutar un método del gestor (por nombre) o una función en el pool.
+
+        Args:
+            metodo: Nombre de un método de PostgresManager o una función
+            clave: Identifica solicitudes que se reemplazan entre sí
+            al_terminar: Callback con el resultado (hilo de la interfaz)
+            al_fallar: Callback con el mensaje de error (hilo de la interfaz)
+            prioridad: Prioridad en el ejecutor (default: carga de listas)
+
+        Returns:
+            Tarea para conectar señales o cancelar
+        """
+        funcion = getattr(self.pg_manager, metodo) if isinstance(metodo, str) else metodo
+        nombre = metodo if isinstance(metodo, str) else getattr(funcion, '__name__', 'consulta')
+        llamada = functools.partial(funcion, *args, **kwargs) if (args or kwargs) else funcion
+
+        tarea = self.ejecutor.enviar(
+            llamada,
+            nombre=nombre,
+            prioridad=prioridad,
+            red=True,
+            clave=clave,
+            al_terminar=al_terminar,
+            al_fallar=al_fallar
+        )
+
+        self._pendientes.add(tarea)
+        tarea.finalizada.connect(lambda t=tarea: self._finalizar(t))
+        if len(self._pendientes) == 1:
+            self.ocupado_cambiado.emit(True)
+        return tarea
+
+    def cancelar(self, clave):
+        """Cancelar la solicitud en curso con esa clave"""
+        self.ejecutor.cancelar(clave)
+
+    def ocupado(self) -> bool:
+        """Hay consultas en curso"""
+        return bool(self._pendientes)
+
+    def _finalizar(self, tarea: Tarea):
+        self._pendientes.discard(tarea)
+        if not self._pendientes:
+            self.ocupado_cambiado.emit(False)
+
+
+# Una fachada por gestor, compartida por todas las ventanas
+_fachadas: Dict[int, AsyncPostgresManager] = {}
+
+
+def obtener_async(pg_manager) -> AsyncPostgresManager:
+    """Obtener (o crear) la fachada asíncrona del gestor"""
+    fachada = _fachadas.get(id(pg_manager))
+    if fachada is None or fachada.pg_manager is not pg_manager:
+        fachada = AsyncPostgresManager(pg_manager)
+        _fachadas[id(pg_manager)] = fachada
+    return fachada
@@ -0,0 +1,148 @@
+"""
+Consultas compartidas (single-flight) para Supabase
+Cuando varias ventanas piden la misma lectura al mismo tiempo (misma tabla,
+filtros y columnas), solo la primera sale a la red; las demás esperan su
+respuesta y reciben una copia.
+"""
+
+import copy
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class _Vuelo:
+    """Consulta en curso compartida por varios solicitantes"""
+
+    __slots__ = ('evento', 'resultado', 'error', 'esperando')
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error: Optional[BaseException] = None
+        self.esperando = 0
+
+
+class ConsultasCompartidas:
+    """
+    Agrupa lecturas idénticas que están en curso al mismo tiempo.
+
+    No es una caché: en cuanto la consulta termina se olvida, y la siguiente
+    solicitud vuelve a ir al servidor.
+
+    Uso:
+        query = client.table('lockers').select('*').eq('activo', True)
+        response = ejecutar_compartida(query)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vuelos: Dict[Any, _Vuelo] = {}
+        self.ejecutadas = 0
+        self.compartidas = 0
+
+    def ejecutar(self, clave, funcion: Callable[[], Any]):
+        """
+        Ejecutar `funcion` una sola vez por clave mientras esté en curso.
+
+        Los que llegan con la misma clave esperan el resultado (o la misma
+        excepción) del primero y reciben una copia propia.
+        """
+        with self._lock:
+            vuelo = self._vuelos.get(clave)
+            es_lider = vuelo is None
+            if es_lider:
+                vuelo = _Vuelo()
+                self._vuelos[clave] = vuelo
+                self.ejecutadas += 1
+            else:
+                vuelo.esperando += 1
+                self.compartidas += 1
+
+        if not es_lider:
+            vuelo.evento.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            # Copia para que quien modifique las filas no afecte a los demás
+            return copy.deepcopy(vuelo.resultado)
+
+        try:
+            vuelo.resultado = funcion()
+        except BaseException as e:
+            vuelo.error = e
+            raise
+        finally:
+            # Desde aquí ya no se suman solicitantes a este vuelo
+            with self._lock:
+                self._vuelos.pop(clave, None)
+                esperando = vuelo.esperando
+            vuelo.evento.set()
+
+        if not esperando:
+            return vuelo.resultado
+        logging.debug(f"[CONSULTA] {esperando} solicitud(es) compartieron la misma consulta")
+        # El original solo lo leen los que esperaban; el primero también recibe copia
+        return copy.deepcopy(vuelo.resultado)
+
+    def estadisticas(self) -> Dict[str, int]:
+        """Consultas que salieron a la red y solicitudes que se ahorraron"""
+        with self._lock:
+            return {
+                'ejecutadas': self.ejecutadas,
+                'compartidas': self.compartidas,
+                'en_curso': len(self._vuelos)
+            }
+
+
+def clave_consulta(query) -> Optional[tuple]:
+    """
+    Clave de una consulta de PostgREST: servidor y credencial, método, tabla,
+    filtros/columnas (parámetros de la URL) y encabezados que cambian la
+    respuesta (count, single). None si no es una lectura.
+
+    En postgrest-py 2.x los datos de la petición están en query.request
+    (RequestConfig); en versiones anteriores estaban en el propio builder.
+    """
+    peticion = getattr(query, 'request', query)
+    metodo = getattr(peticion, 'http_method', None)
+    path = getattr(peticion, 'path', None)
+    params = getattr(peticion, 'params', None)
+    if metodo not in ('GET', 'HEAD') or path is None or params is None:
+        return None
+
+    sesion = getattr(peticion, 'session', None)
+    sesion_headers = getattr(sesion, 'headers', None) or {}
+    headers = getattr(peticion, 'headers', None) or {}
+
+    return (
+        type(query).__name__,
+        str(getattr(sesion, 'base_url', '')),
+        sesion_headers.get('authorization', ''),
+        metodo,
+        str(path),
+        tuple(sorted(params.multi_items())) if hasattr(params, 'multi_items') else str(params),
+        headers.get('prefer', ''),
+        headers.get('accept', '')
+    )
+
+
+# Una instancia para toda la aplicación: PostgresManager, SupabaseService
+# y las ventanas que consultan directo al cliente comparten los vuelos
+_consultas = ConsultasCompartidas()
+
+
+def obtener_consultas_compartidas() -> ConsultasCompartidas:
+    """Registro compartido de consultas en curso"""
+    return _consultas
+
+
+def ejecutar_compartida(query):
+    """
+    Ejecutar una consulta de PostgREST compartiendo la respuesta con
+    cualquier consulta idéntica que ya esté en curso. Las escrituras y
+    las consultas sin clave se ejecutan normalmente.
+    """
+    clave = clave_consulta(query)
+    if clave is None:
+        return query.execute()
+    return _consultas.ejecutar(clave, query.execute)
@@ -8,12 +8,18 @@ ACTUALIZADO: Usa Supabase como backend único
 import logging
 import bcrypt
 import os
+import threading
+import time
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from decimal import Decimal
 import sys
 import io
 
+from database.consultas_compartidas import ejecutar_compartida
+from database.reference_cache import ReferenceDataCache
+from services.ocupacion import obtener_ocupacion
+
 try:
     from supabase import create_client, Client
     SUPABASE_AVAILABLE = True
@@ -31,6 +37,24 @@ logging.basicConfig(
 class PostgresManager:
     """Gestor de conexión y operaciones con Supabase"""
     
+    # Máximo de códigos por consulta in_() (mantiene la URL de PostgREST acotada)
+    TAMANO_LOTE_IN = 150
+    # Máximo de resultados por tabla de productos en search_products
+    LIMITE_BUSQUEDA_PRODUCTOS = 100
+    # Segundos que el índice local del catálogo se considera vigente
+    TTL_INDICE_CATALOGO = 300
+    # Filas por página en los historiales paginados por cursor
+    TAMANO_PAGINA_HISTORIAL = 100
+    # Filas por página en la búsqueda de miembros
+    TAMANO_PAGINA_MIEMBROS = 100
+    # Segundos de vigencia de los datos de referencia en memoria, por tabla
+    TTL_DATOS_REFERENCIA = {
+        'usuarios': 600,
+        'ca_ubicaciones': 900,
+        'lockers': 300,
+        'ca_productos_digitales': 900,
+    }
+    
     def __init__(self, db_config: Dict[str, str]):
         """
         Inicializar conexión a Supabase
@@ -51,6 +75,19 @@ class PostgresManager:
         self.db_config = db_config
         self.client: Optional[Client] = None
         self.is_connected = False
+        
+        # Índice local del catálogo (código de barras / código interno -> producto con stock)
+        self._indice_lock = threading.Lock()
+        self._indice_por_barras: Dict[str, Dict] = {}
+        self._indice_por_codigo: Dict[tuple, Dict] = {}
+        self._indice_cargado_en: Optional[float] = None
+        
+        # Datos de referencia (usuarios, ubicaciones, lockers, productos digitales)
+        self.cache_referencia = ReferenceDataCache(self.TTL_DATOS_REFERENCIA)
+        
+        # Registrar ventas con la función crear_venta_pos (VENTAS_USAR_RPC=false para desactivar)
+        self.usar_rpc_venta = os.getenv('VENTAS_USAR_RPC', 'true').strip().lower() not in ('0', 'false', 'no')
+        
         self.connect()
     
     def connect(self):
@@ -208,6 +245,7 @@ class PostgresManager:
             
             if response.data:
                 user_id = response.data[0]['id_usuario']
+                self.invalidar_datos_referencia('usuarios')
                 logging.info(f"[OK] Usuario '{username}' creado exitosamente con ID: {user_id}")
                 return user_id
             else:
@@ -260,10 +298,144 @@ class PostgresManager:
             logging.error(f"Error al actualizar contraseña: {e}")
             return False
     
+    def obtener_usuarios(self, solo_activos: bool = True) -> List[Dict]:
+        """
+        Obtener id y nombre de los usuarios del sistema (para filtros)
+        
+        Args:
+            solo_activos: Si True, solo usuarios activos
+            
+        Returns:
+            Lista de dicts con id_usuario y nombre_completo, ordenada por nombre
+        """
+        def cargar():
+            if not self.is_connected:
+                self.connect()
+            
+            query = self.client.table('usuarios').select('id_usuario, nombre_completo')
+            if solo_activos:
+                query = query.eq('activo', True)
+            
+            response = ejecutar_compartida(query.order('nombre_completo'))
+            return response.data or []
+        
+        try:
+            return self.cache_referencia.obtener('usuarios', ('lista', solo_activos), cargar)
+        except Exception as e:
+            logging.error(f"Error obteniendo usuarios: {e}")
+            return []
+    
+    def obtener_nombres_usuarios(self) -> Dict[int, str]:
+        """Mapa id_usuario -> nombre_completo de todos los usuarios (desde la caché)"""
+        return {u['id_usuario']: u['nombre_completo'] for u in self.obtener_usuarios(solo_activos=False)}
+    
+    # ========== DATOS DE REFERENCIA ==========
+    
+    def invalidar_datos_referencia(self, tabla: Optional[str] = None):
+        """
+        Descartar los datos de referencia en memoria de una tabla.
+        Lo llaman las ventanas de catálogo después de crear, editar o eliminar.
+        
+        Args:
+            tabla: 'usuarios', 'ca_ubicaciones', 'lockers', 'ca_productos_digitales'
+                   o None para descartar todo
+        """
+        self.cache_referencia.invalidar(tabla)
+    
     # ========== PRODUCTOS ==========
     
+    # ========== ÍNDICE LOCAL DEL CATÁLOGO ==========
+    
+    def _indexar_producto(self, producto: Dict):
+        """Agregar un producto al índice local (debe llamarse con _indice_lock tomado)"""
+        self._indice_por_codigo[(producto.get('codigo_interno'), producto.get('tipo_producto'))] = producto
+        if producto.get('codigo_barras'):
+            self._indice_por_barras[producto['codigo_barras']] = producto
+    
+    def _reconstruir_indice_catalogo(self, productos: List[Dict]):
+        """Reemplazar el índice local con un catálogo completo recién consultado"""
+        with self._indice_lock:
+            self._indice_por_barras = {}
+            self._indice_por_codigo = {}
+            for producto in productos:
+                self._indexar_producto(dict(producto))
+            self._indice_cargado_en = time.monotonic()
+    
+    def _indice_vigente(self) -> bool:
+        """Indica si el índice local está cargado y dentro de su TTL"""
+        return (
+            self._indice_cargado_en is not None
+            and time.monotonic() - self._indice_cargado_en < self.TTL_INDICE_CATALOGO
+        )
+    
+    def cargar_indice_catalogo(self) -> int:
+        """Precargar el índice local del catálogo (se llama al iniciar sesión)
+        
+        Returns:
+            Número de productos indexados
+        """
+        productos = self.get_all_products()
+        logging.info(f"Índice de catálogo precargado: {len(productos)} productos")
+        return len(productos)
+    
+    def invalidar_indice_catalogo(self, codigo_interno: str = None, tipo_producto: str = None):
+        """Invalidar el índice local del catálogo
+        
+        Args:
+            codigo_interno: Producto a descartar; si es None se descarta todo el índice
+            tipo_producto: 'varios' o 'suplemento'; si es None se descartan ambos tipos
+        """
+        with self._indice_lock:
+            if codigo_interno is None:
+                self._indice_por_barras = {}
+                self._indice_por_codigo = {}
+                self._indice_cargado_en = None
+                return
+            
+            tipos = [tipo_producto] if tipo_producto else ['varios', 'suplemento']
+            for tipo in tipos:
+                producto = self._indice_por_codigo.pop((codigo_interno, tipo), None)
+                if producto and producto.get('codigo_barras'):
+                    self._indice_por_barras.pop(producto['codigo_barras'], None)
+    
+    def _armar_producto(self, producto: Dict, tipo_producto: str, inv: Optional[Dict]) -> Dict:
+        """Construir el diccionario de producto con stock que consumen las ventanas de venta
+        
+        Args:
+            producto: Fila de ca_productos_varios o ca_suplementos
+            tipo_producto: 'varios' o 'suplemento'
+            inv: Fila de inventario del producto (o None si no tiene)
+        """
+        inv = inv or {}
+        
+        if tipo_producto == 'varios':
+            id_producto = producto.get('id_producto')
+            categoria = producto.get('categoria', 'General')
+        else:
+            id_producto = producto.get('id_suplemento')  # Usar id_suplemento como id_producto
+            categoria = producto.get('tipo', 'Suplemento')
+        
+        return {
+            'id_producto': id_producto,
+            'codigo_interno': producto.get('codigo_interno'),
+            'nombre': producto.get('nombre'),
+            'precio_venta': float(producto.get('precio_venta', 0.0)),
+            'categoria': categoria,
+            'codigo_barras': producto.get('codigo_barras'),
+            'stock_actual': inv.get('stock_actual', 0),
+            'stock_minimo': inv.get('stock_minimo', 0),
+            'tipo_producto': tipo_producto,
+            'id_ubicacion': inv.get('id_ubicacion')
+        }
+    
     def get_all_products(self) -> List[Dict]:
-        """Obtener todos los productos activos con stock"""
+        """Obtener todos los productos activos con stock
+        
+        Hace una consulta por catálogo (varios y suplementos) y pide el stock de
+        sus códigos con _obtener_inventario_por_codigos, en lotes de
+        TAMANO_LOTE_IN; el stock se combina en memoria por codigo_interno. Así
+        ninguna consulta de inventario pasa del límite de filas de Supabase.
+        """
         try:
             if not self.is_connected:
                 self.connect()
@@ -280,67 +452,28 @@ class PostgresManager:
                 'id_suplemento, codigo_interno, nombre, precio_venta, tipo, codigo_barras'
             ).eq('activo', True).execute()
             
+            varios = response_varios.data or []
+            suplementos = response_suplementos.data or []
+            
+            # Stock de los códigos de cada catálogo, por lotes (primer registro de cada código)
+            inventario_varios = self._obtener_inventario_por_codigos(
+                'varios', [p.get('codigo_interno') for p in varios]
+            )
+            inventario_suplementos = self._obtener_inventario_por_codigos(
+                'suplemento', [p.get('codigo_interno') for p in suplementos]
+            )
+            
             # Procesar productos varios
-            for prod_varios in (response_varios.data or []):
-                codigo_interno = prod_varios.get('codigo_interno')
-                
-                # Obtener stock del inventario
-                inv_response = self.client.table('inventario').select(
-                    'stock_actual, stock_minimo, id_ubicacion'
-                ).eq('codigo_interno', codigo_interno).eq('tipo_producto', 'varios').execute()
-                
-                stock_actual = 0
-                stock_minimo = 0
-                id_ubicacion = None
-                if inv_response.data:
-                    inv = inv_response.data[0]
-                    stock_actual = inv.get('stock_actual', 0)
-                    stock_minimo = inv.get('stock_minimo', 0)
-                    id_ubicacion = inv.get('id_ubicacion')
-                
-                productos_resultado.append({
-                    'id_producto': prod_varios.get('id_producto'),
-                    'codigo_interno': codigo_interno,
-                    'nombre': prod_varios.get('nombre'),
-                    'precio_venta': float(prod_varios.get('precio_venta', 0.0)),
-                    'categoria': prod_varios.get('categoria', 'General'),
-                    'codigo_barras': prod_varios.get('codigo_barras'),
-                    'stock_actual': stock_actual,
-                    'stock_minimo': stock_minimo,
-                    'tipo_producto': 'varios',
-                    'id_ubicacion': id_ubicacion
-                })
+            for prod_varios in varios:
+                inv = inventario_varios.get(prod_varios.get('codigo_interno'))
+                productos_resultado.append(self._armar_producto(prod_varios, 'varios', inv))
             
             # Procesar suplementos
-            for prod_suplemento in (response_suplementos.data or []):
-                codigo_interno = prod_suplemento.get('codigo_interno')
-                
-                # Obtener stock del inventario
-                inv_response = self.client.table('inventario').select(
-                    'stock_actual, stock_minimo, id_ubicacion'
-                ).eq('codigo_interno', codigo_interno).eq('tipo_producto', 'suplemento').execute()
-                
-                stock_actual = 0
-                stock_minimo = 0
-                id_ubicacion = None
-                if inv_response.data:
-                    inv = inv_response.data[0]
-                    stock_actual = inv.get('stock_actual', 0)
-                    stock_minimo = inv.get('stock_minimo', 0)
-                    id_ubicacion = inv.get('id_ubicacion')
-                
-                productos_resultado.append({
-                    'id_producto': prod_suplemento.get('id_suplemento'),  # Usar id_suplemento como id_producto
-                    'codigo_interno': codigo_interno,
-                    'nombre': prod_suplemento.get('nombre'),
-                    'precio_venta': float(prod_suplemento.get('precio_venta', 0.0)),
-                    'categoria': prod_suplemento.get('tipo', 'Suplemento'),
-                    'codigo_barras': prod_suplemento.get('codigo_barras'),
-                    'stock_actual': stock_actual,
-                    'stock_minimo': stock_minimo,
-                    'tipo_producto': 'suplemento',
-                    'id_ubicacion': id_ubicacion
-                })
+            for prod_suplemento in suplementos:
+                inv = inventario_suplementos.get(prod_suplemento.get('codigo_interno'))
+                productos_resultado.append(self._armar_producto(prod_suplemento, 'suplemento', inv))
+            
+            self._reconstruir_indice_catalogo(productos_resultado)
             
             logging.info(f"Obtenidos {len(productos_resultado)} productos activos (con stock)")
             return productos_resultado
@@ -349,12 +482,67 @@ class PostgresManager:
             logging.error(f"Error obteniendo productos: {e}")
             return []
     
-    def search_products(self, search_text: str) -> List[Dict]:
-        """Buscar productos por código o nombre (CON STOCK INCLUIDO)"""
+    def _seleccionar_por_lotes(self, tabla: str, columnas: str, campo: str, valores: List[Any]) -> List[Dict]:
+        """Consultar filas cuyo campo esté en valores, con consultas in_() de TAMANO_LOTE_IN elementos
+        
+        Args:
+            tabla: Nombre de la tabla
+            columnas: Columnas a seleccionar
+            campo: Columna sobre la que se aplica in_()
+            valores: Valores a buscar (se descartan vacíos y duplicados)
+        """
+        filas = []
+        valores_unicos = list(dict.fromkeys(v for v in valores if v is not None and v != ''))
+        
+        for inicio in range(0, len(valores_unicos), self.TAMANO_LOTE_IN):
+            lote = valores_unicos[inicio:inicio + self.TAMANO_LOTE_IN]
+            response = self.client.table(tabla).select(columnas).in_(campo, lote).execute()
+            filas.extend(response.data or [])
+        
+        return filas
+    
+    def _obtener_inventario_por_codigos(self, tipo_producto: str, codigos: List[str]) -> Dict[str, Dict]:
+        """Obtener filas de inventario de varios productos con consultas in_() por lotes
+        
+        Args:
+            tipo_producto: 'varios' o 'suplemento'
+            codigos: Lista de codigo_interno a consultar
+        
+        Returns:
+            Dict codigo_interno -> fila de inventario (primer registro encontrado)
+        """
+        inventario_map = {}
+        codigos_unicos = list(dict.fromkeys(c for c in codigos if c))
+        
+        for inicio in range(0, len(codigos_unicos), self.TAMANO_LOTE_IN):
+            lote = codigos_unicos[inicio:inicio + self.TAMANO_LOTE_IN]
+            response = self.client.table('inventario').select(
+                'id_inventario, codigo_interno, stock_actual, stock_minimo, id_ubicacion'
+            ).eq('tipo_producto', tipo_producto).in_('codigo_interno', lote).execute()
+            
+            for inv in (response.data or []):
+                inventario_map.setdefault(inv.get('codigo_interno'), inv)
+        
+        return inventario_map
+    
+    def search_products(self, search_text: str, limite: Optional[int] = None) -> List[Dict]:
+        """Buscar productos por código o nombre (CON STOCK INCLUIDO)
+        
+        El stock se obtiene con una consulta in_() por tipo de producto (en lotes
+        de TAMANO_LOTE_IN códigos), así que el número de peticiones no crece con
+        la cantidad de coincidencias.
+        
+        Args:
+            search_text: Texto a buscar en nombre, código de barras o código interno
+            limite: Máximo de resultados por tabla de productos (default LIMITE_BUSQUEDA_PRODUCTOS)
+        """
         try:
             if not self.is_connected:
                 self.connect()
             
+            if limite is None:
+                limite = self.LIMITE_BUSQUEDA_PRODUCTOS
+            
             search_pattern = f"%{search_text}%"
             productos_resultado = []
             
@@ -363,76 +551,35 @@ class PostgresManager:
                 'id_producto, codigo_interno, nombre, precio_venta, categoria, codigo_barras'
             ).or_(
                 f"nombre.ilike.{search_pattern},codigo_barras.ilike.{search_pattern},codigo_interno.ilike.{search_pattern}"
-            ).eq('activo', True).execute()
+            ).eq('activo', True).order('nombre').limit(limite).execute()
             
             # Buscar en suplementos
             response_suplementos = self.client.table('ca_suplementos').select(
                 'id_suplemento, codigo_interno, nombre, precio_venta, tipo, codigo_barras'
             ).or_(
                 f"nombre.ilike.{search_pattern},codigo_barras.ilike.{search_pattern},codigo_interno.ilike.{search_pattern}"
-            ).eq('activo', True).execute()
+            ).eq('activo', True).order('nombre').limit(limite).execute()
+            
+            varios = response_varios.data or []
+            suplementos = response_suplementos.data or []
+            
+            # Obtener stock en lote por tipo de producto
+            inventario_varios = self._obtener_inventario_por_codigos(
+                'varios', [p.get('codigo_interno') for p in varios]
+            )
+            inventario_suplementos = self._obtener_inventario_por_codigos(
+                'suplemento', [p.get('codigo_interno') for p in suplementos]
+            )
             
             # Procesar productos varios
-            for prod_varios in (response_varios.data or []):
-                codigo_interno = prod_varios.get('codigo_interno')
-                
-                # Obtener stock del inventario
-                inv_response = self.client.table('inventario').select(
-                    'stock_actual, stock_minimo, id_ubicacion'
-                ).eq('codigo_interno', codigo_interno).eq('tipo_producto', 'varios').execute()
-                
-                stock_actual = 0
-                stock_minimo = 0
-                id_ubicacion = None
-                if inv_response.data:
-                    inv = inv_response.data[0]
-                    stock_actual = inv.get('stock_actual', 0)
-                    stock_minimo = inv.get('stock_minimo', 0)
-                    id_ubicacion = inv.get('id_ubicacion')
-                
-                productos_resultado.append({
-                    'id_producto': prod_varios.get('id_producto'),
-                    'codigo_interno': codigo_interno,
-                    'nombre': prod_varios.get('nombre'),
-                    'precio_venta': float(prod_varios.get('precio_venta', 0.0)),
-                    'categoria': prod_varios.get('categoria', 'General'),
-                    'codigo_barras': prod_varios.get('codigo_barras'),
-                    'stock_actual': stock_actual,
-                    'stock_minimo': stock_minimo,
-                    'tipo_producto': 'varios',
-                    'id_ubicacion': id_ubicacion
-                })
+            for prod_varios in varios:
+                inv = inventario_varios.get(prod_varios.get('codigo_interno'))
+                productos_resultado.append(self._armar_producto(prod_varios, 'varios', inv))
             
             # Procesar suplementos
-            for prod_suplemento in (response_suplementos.data or []):
-                codigo_interno = prod_suplemento.get('codigo_interno')
-                
-                # Obtener stock del inventario
-                inv_response = self.client.table('inventario').select(
-                    'stock_actual, stock_minimo, id_ubicacion'
-                ).eq('codigo_interno', codigo_interno).eq('tipo_producto', 'suplemento').execute()
-                
-                stock_actual = 0
-                stock_minimo = 0
-                id_ubicacion = None
-                if inv_response.data:
-                    inv = inv_response.data[0]
-                    stock_actual = inv.get('stock_actual', 0)
-                    stock_minimo = inv.get('stock_minimo', 0)
-                    id_ubicacion = inv.get('id_ubicacion')
-                
-                productos_resultado.append({
-                    'id_producto': prod_suplemento.get('id_suplemento'),  # Usar id_suplemento como id_producto
-                    'codigo_interno': codigo_interno,
-                    'nombre': prod_suplemento.get('nombre'),
-                    'precio_venta': float(prod_suplemento.get('precio_venta', 0.0)),
-                    'categoria': prod_suplemento.get('tipo', 'Suplemento'),
-                    'codigo_barras': prod_suplemento.get('codigo_barras'),
-                    'stock_actual': stock_actual,
-                    'stock_minimo': stock_minimo,
-                    'tipo_producto': 'suplemento',
-                    'id_ubicacion': id_ubicacion
-                })
+            for prod_suplemento in suplementos:
+                inv = inventario_suplementos.get(prod_suplemento.get('codigo_interno'))
+                productos_resultado.append(self._armar_producto(prod_suplemento, 'suplemento', inv))
             
             logging.info(f"Encontrados {len(productos_resultado)} productos para '{search_text}'")
             return productos_resultado
@@ -442,10 +589,23 @@ class PostgresManager:
             return []
     
     def get_product_by_barcode(self, barcode: str) -> Optional[Dict]:
-        """Buscar producto por código de barras (RÁPIDO - búsqueda exacta con stock incluido)"""
-        import time
+        """Buscar producto por código de barras (RÁPIDO - búsqueda exacta con stock incluido)
+        
+        Primero consulta el índice local del catálogo; solo si no está vigente o el
+        código no aparece se consulta Supabase, y el resultado se agrega al índice.
+        """
         tiempo_inicio = time.perf_counter()
         
+        with self._indice_lock:
+            producto_indexado = self._indice_por_barras.get(barcode) if self._indice_vigente() else None
+            if producto_indexado:
+                producto_indexado = dict(producto_indexado)
+        
+        if producto_indexado:
+            tiempo_total_ms = (time.perf_counter() - tiempo_inicio) * 1000
+            logging.info(f"✓ Encontrado en índice local: {tiempo_total_ms:.3f}ms")
+            return producto_indexado
+        
         try:
             if not self.is_connected:
                 self.connect()
@@ -457,88 +617,44 @@ class PostgresManager:
             ).eq('codigo_barras', barcode).eq('activo', True).execute()
             tiempo_varios_ms = (time.perf_counter() - tiempo_varios) * 1000
             
+            tiempo_suplementos_ms = 0.0
             if response_varios.data:
-                prod_varios = response_varios.data[0]
-                codigo_interno = prod_varios.get('codigo_interno')
-                
-                # Obtener stock del inventario
-                tiempo_stock = time.perf_counter()
-                inv_response = self.client.table('inventario').select(
-                    'stock_actual, stock_minimo, id_ubicacion'
-                ).eq('codigo_interno', codigo_interno).eq('tipo_producto', 'varios').execute()
-                tiempo_stock_ms = (time.perf_counter() - tiempo_stock) * 1000
-                
-                stock_actual = 0
-                stock_minimo = 0
-                id_ubicacion = None
-                if inv_response.data:
-                    inv = inv_response.data[0]
-                    stock_actual = inv.get('stock_actual', 0)
-                    stock_minimo = inv.get('stock_minimo', 0)
-                    id_ubicacion = inv.get('id_ubicacion')
+                producto = response_varios.data[0]
+                tipo_producto = 'varios'
+            else:
+                # Buscar en suplementos
+                tiempo_suplementos = time.perf_counter()
+                response_suplementos = self.client.table('ca_suplementos').select(
+                    'id_suplemento, codigo_interno, nombre, precio_venta, tipo, codigo_barras'
+                ).eq('codigo_barras', barcode).eq('activo', True).execute()
+                tiempo_suplementos_ms = (time.perf_counter() - tiempo_suplementos) * 1000
                 
-                tiempo_total_ms = (time.perf_counter() - tiempo_inicio) * 1000
-                logging.info(f"✓ Encontrado en ca_productos_varios: {tiempo_varios_ms:.1f}ms + stock: {tiempo_stock_ms:.1f}ms = {tiempo_total_ms:.1f}ms total")
+                if not response_suplementos.data:
+                    tiempo_total_ms = (time.perf_counter() - tiempo_inicio) * 1000
+                    logging.warning(f"✗ Código de barras {barcode} no encontrado: {tiempo_varios_ms:.1f}ms + {tiempo_suplementos_ms:.1f}ms = {tiempo_total_ms:.1f}ms")
+                    return None
                 
-                return {
-                    'id_producto': prod_varios.get('id_producto'),
-                    'codigo_interno': codigo_interno,
-                    'nombre': prod_varios.get('nombre'),
-                    'precio_venta': float(prod_varios.get('precio_venta', 0.0)),
-                    'categoria': prod_varios.get('categoria', 'General'),
-                    'codigo_barras': prod_varios.get('codigo_barras'),
-                    'stock_actual': stock_actual,
-                    'stock_minimo': stock_minimo,
-                    'tipo_producto': 'varios',
-                    'id_ubicacion': id_ubicacion
-                }
+                producto = response_suplementos.data[0]
+                tipo_producto = 'suplemento'
             
-            # Buscar en suplementos
-            tiempo_suplementos = time.perf_counter()
-            response_suplementos = self.client.table('ca_suplementos').select(
-                'id_suplemento, codigo_interno, nombre, precio_venta, tipo, codigo_barras'
-            ).eq('codigo_barras', barcode).eq('activo', True).execute()
-            tiempo_suplementos_ms = (time.perf_counter() - tiempo_suplementos) * 1000
+            # Obtener stock del inventario
+            tiempo_stock = time.perf_counter()
+            inv_response = self.client.table('inventario').select(
+                'stock_actual, stock_minimo, id_ubicacion'
+            ).eq('codigo_interno', producto.get('codigo_interno')).eq('tipo_producto', tipo_producto).execute()
+            tiempo_stock_ms = (time.perf_counter() - tiempo_stock) * 1000
             
-            if response_suplementos.data:
-                prod_suplemento = response_suplementos.data[0]
-                codigo_interno = prod_suplemento.get('codigo_interno')
-                
-                # Obtener stock del inventario
-                tiempo_stock = time.perf_counter()
-                inv_response = self.client.table('inventario').select(
-                    'stock_actual, stock_minimo, id_ubicacion'
-                ).eq('codigo_interno', codigo_interno).eq('tipo_producto', 'suplemento').execute()
-                tiempo_stock_ms = (time.perf_counter() - tiempo_stock) * 1000
-                
-                stock_actual = 0
-                stock_minimo = 0
-                id_ubicacion = None
-                if inv_response.data:
-                    inv = inv_response.data[0]
-                    stock_actual = inv.get('stock_actual', 0)
-                    stock_minimo = inv.get('stock_minimo', 0)
-                    id_ubicacion = inv.get('id_ubicacion')
-                
-                tiempo_total_ms = (time.perf_counter() - tiempo_inicio) * 1000
-                logging.info(f"✓ Encontrado en ca_suplementos: {tiempo_varios_ms:.1f}ms + {tiempo_suplementos_ms:.1f}ms + stock: {tiempo_stock_ms:.1f}ms = {tiempo_total_ms:.1f}ms total")
-                
-                return {
-                    'id_producto': prod_suplemento.get('id_suplemento'),
-                    'codigo_interno': codigo_interno,
-                    'nombre': prod_suplemento.get('nombre'),
-                    'precio_venta': float(prod_suplemento.get('precio_venta', 0.0)),
-                    'categoria': prod_suplemento.get('tipo', 'Suplemento'),
-                    'codigo_barras': prod_suplemento.get('codigo_barras'),
-                    'stock_actual': stock_actual,
-                    'stock_minimo': stock_minimo,
-                    'tipo_producto': 'suplemento',
-                    'id_ubicacion': id_ubicacion
-                }
+            inv = inv_response.data[0] if inv_response.data else None
+            resultado = self._armar_producto(producto, tipo_producto, inv)
+            
+            with self._indice_lock:
+                self._indexar_producto(dict(resultado))
             
             tiempo_total_ms = (time.perf_counter() - tiempo_inicio) * 1000
-            logging.warning(f"✗ Código de barras {barcode} no encontrado: {tiempo_varios_ms:.1f}ms + {tiempo_suplementos_ms:.1f}ms = {tiempo_total_ms:.1f}ms")
-            return None
+            tabla = 'ca_productos_varios' if tipo_producto == 'varios' else 'ca_suplementos'
+            logging.info(f"✓ Encontrado en {tabla}: {tiempo_varios_ms:.1f}ms + {tiempo_suplementos_ms:.1f}ms + stock: {tiempo_stock_ms:.1f}ms = {tiempo_total_ms:.1f}ms total")
+            
+            return resultado
         
         except Exception as e:
             tiempo_total_ms = (time.perf_counter() - tiempo_inicio) * 1000
@@ -647,7 +763,13 @@ class PostgresManager:
     # ========== VENTAS ==========
     
     def create_sale(self, venta_data: Dict) -> Optional[int]:
-        """Crear nueva venta"""
+        """Crear nueva venta
+        
+        Por defecto usa la función crear_venta_pos (database/sql/crear_venta_pos.sql)
+        para registrar encabezado, detalles, descuento de stock y movimientos en una
+        sola petición y de forma atómica. Si VENTAS_USAR_RPC=false se usa el registro
+        desde el cliente.
+        """
         try:
             if not self.is_connected:
                 self.connect()
@@ -672,67 +794,16 @@ class PostgresManager:
                 'estado': 'completada'
             }
             
-            # Insertar venta
-            response = self.client.table('ventas').insert(venta_insert).execute()
+            if self.usar_rpc_venta:
+                venta_id = self._create_sale_rpc(venta_insert, venta_data.get('productos', []))
+            else:
+                venta_id = self._create_sale_cliente(venta_insert, venta_data)
             
-            if not response.data:
-                logging.error("Error insertando venta")
+            if not venta_id:
                 return None
             
-            venta_id = response.data[0]['id_venta']
-            
-            # Insertar detalles y actualizar stock
             for item in venta_data.get('productos', []):
-                # Obtener información del producto
-                producto_response = self.client.table('ca_productos_varios').select('codigo_interno, nombre, descripcion').eq('id_producto', item['id_producto']).execute()
-                
-                if not producto_response.data:
-                    logging.error(f"Producto {item['id_producto']} no encontrado")
-                    continue
-                
-                producto_info = producto_response.data[0]
-                codigo_interno = producto_info['codigo_interno']
-                
-                # Verificar stock
-                stock_response = self.client.table('inventario').select('stock_actual').eq('codigo_interno', codigo_interno).eq('tipo_producto', 'varios').execute()
-                
-                if not stock_response.data or stock_response.data[0]['stock_actual'] < item['cantidad']:
-                    logging.error(f"Stock insuficiente para {producto_info['nombre']}")
-                    continue
-                
-                # Insertar detalle
-                detalle_data = {
-                    'id_venta': venta_id,
-                    'codigo_interno': codigo_interno,
-                    'tipo_producto': 'varios',
-                    'cantidad': item['cantidad'],
-                    'precio_unitario': float(item['precio']),
-                    'subtotal_linea': float(item['subtotal']),
-                    'nombre_producto': producto_info['nombre'],
-                    'descripcion_producto': producto_info.get('descripcion')
-                }
-                
-                self.client.table('detalles_venta').insert(detalle_data).execute()
-                
-                # Actualizar stock
-                stock_anterior = stock_response.data[0]['stock_actual']
-                stock_nuevo = stock_anterior - item['cantidad']
-                
-                self.client.table('inventario').update({'stock_actual': stock_nuevo}).eq('codigo_interno', codigo_interno).eq('tipo_producto', 'varios').execute()
-                
-                # Registrar movimiento
-                movimiento_data = {
-                    'codigo_interno': codigo_interno,
-                    'tipo_producto': 'varios',
-                    'tipo_movimiento': 'venta',
-                    'cantidad': -item['cantidad'],
-                    'stock_anterior': stock_anterior,
-                    'stock_nuevo': stock_nuevo,
-                    'id_usuario': venta_data['id_usuario'],
-                    'id_venta': venta_id
-                }
-                
-                self.client.table('movimientos_inventario').insert(movimiento_data).execute()
+                self.invalidar_indice_catalogo(item.get('codigo_interno'), item.get('tipo_producto'))
             
             logging.info(f"✅ Venta creada: ID {venta_id}, Total: ${venta_data['total']:.2f}")
             return venta_id
@@ -741,6 +812,142 @@ class PostgresManager:
             logging.error(f"Error creando venta: {e}")
             raise
     
+    def _create_sale_rpc(self, venta_insert: Dict, productos: List[Dict]) -> Optional[int]:
+        """Registrar la venta completa con una sola llamada RPC a crear_venta_pos"""
+        payload = dict(venta_insert)
+        payload.pop('estado', None)
+        payload['productos'] = [
+            {
+                'codigo_interno': item['codigo_interno'],
+                'tipo_producto': item.get('tipo_producto', 'varios'),
+                'cantidad': int(item['cantidad']),
+                'precio_unitario': float(item['precio']),
+                'subtotal_linea': float(item['subtotal'])
+            }
+            for item in productos
+        ]
+        
+        response = self.client.rpc('crear_venta_pos', {'p_venta': payload}).execute()
+        
+        if response.data is None:
+            logging.error("Error registrando venta con crear_venta_pos")
+            return None
+        
+        return int(response.data)
+    
+    def _create_sale_cliente(self, venta_insert: Dict, venta_data: Dict) -> Optional[int]:
+        """Registrar la venta desde el cliente (instalaciones sin crear_venta_pos)
+        
+        Resuelve productos y stock con consultas in_() por tipo de producto e inserta
+        detalles y movimientos como listas. El stock se descuenta con un update por
+        producto distinto (no por línea del carrito).
+        """
+        productos = venta_data.get('productos', [])
+        
+        # Agrupar líneas del carrito por tipo de producto
+        codigos_por_tipo = {'varios': [], 'suplemento': []}
+        for item in productos:
+            codigos_por_tipo.setdefault(item.get('tipo_producto', 'varios'), []).append(item['codigo_interno'])
+        
+        # Resolver nombres y descripciones de los productos
+        tablas_catalogo = {'varios': 'ca_productos_varios', 'suplemento': 'ca_suplementos'}
+        catalogo = {}
+        inventario = {}
+        for tipo_producto, codigos in codigos_por_tipo.items():
+            if not codigos:
+                continue
+            
+            response = self.client.table(tablas_catalogo[tipo_producto]).select(
+                'codigo_interno, nombre, descripcion'
+            ).in_('codigo_interno', list(dict.fromkeys(codigos))).execute()
+            for prod in (response.data or []):
+                catalogo[(prod['codigo_interno'], tipo_producto)] = prod
+            
+            for codigo, inv in self._obtener_inventario_por_codigos(tipo_producto, codigos).items():
+                inventario[(codigo, tipo_producto)] = inv
+        
+        # Validar productos y stock antes de registrar nada
+        lineas_validas = []
+        cantidades = {}
+        for item in productos:
+            clave = (item['codigo_interno'], item.get('tipo_producto', 'varios'))
+            producto_info = catalogo.get(clave)
+            
+            if not producto_info:
+                logging.error(f"Producto {clave[0]} ({clave[1]}) no encontrado")
+                continue
+            
+            inv = inventario.get(clave)
+            cantidad_total = cantidades.get(clave, 0) + item['cantidad']
+            if not inv or inv.get('stock_actual', 0) < cantidad_total:
+                logging.error(f"Stock insuficiente para {producto_info['nombre']}")
+                continue
+            
+            cantidades[clave] = cantidad_total
+            lineas_validas.append((clave, producto_info, item))
+        
+        # Insertar venta
+        response = self.client.table('ventas').insert(venta_insert).execute()
+        
+        if not response.data:
+            logging.error("Error insertando venta")
+            return None
+        
+        venta_id = response.data[0]['id_venta']
+        
+        if not lineas_validas:
+            return venta_id
+        
+        # Insertar todos los detalles
+        detalles = [
+            {
+                'id_venta': venta_id,
+                'codigo_interno': clave[0],
+                'tipo_producto': clave[1],
+                'cantidad': item['cantidad'],
+                'precio_unitario': float(item['precio']),
+                'subtotal_linea': float(item['subtotal']),
+                'nombre_producto': producto_info['nombre'],
+                'descripcion_producto': producto_info.get('descripcion')
+            }
+            for clave, producto_info, item in lineas_validas
+        ]
+        self.client.table('detalles_venta').insert(detalles).execute()
+        
+        # Actualizar el stock fila por fila: un update por id_inventario solo
+        # necesita permiso de UPDATE y no toca las demás columnas (un upsert
+        # pediría INSERT y fallaría por columnas NOT NULL)
+        fecha_salida = datetime.now().isoformat()
+        actualizaciones_stock = []
+        movimientos = []
+        for clave, cantidad in cantidades.items():
+            inv = inventario[clave]
+            stock_anterior = inv['stock_actual']
+            stock_nuevo = stock_anterior - cantidad
+            
+            actualizaciones_stock.append((inv['id_inventario'], {
+                'stock_actual': stock_nuevo,
+                'fecha_ultima_salida': fecha_salida
+            }))
+            movimientos.append({
+                'codigo_interno': clave[0],
+                'tipo_producto': clave[1],
+                'tipo_movimiento': 'venta',
+                'cantidad': -cantidad,
+                'stock_anterior': stock_anterior,
+                'stock_nuevo': stock_nuevo,
+                'id_usuario': venta_data['id_usuario'],
+                'id_venta': venta_id
+            })
+        
+        for id_inventario, cambios in actualizaciones_stock:
+            self.client.table('inventario').update(cambios).eq('id_inventario', id_inventario).execute()
+        
+        # Registrar todos los movimientos
+        self.client.table('movimientos_inventario').insert(movimientos).execute()
+        
+        return venta_id
+    
     # ========== MIEMBROS Y ACCESO ==========
     
     def obtener_miembro_por_codigo_qr(self, codigo_qr: str) -> Optional[Dict]:
@@ -749,7 +956,7 @@ class PostgresManager:
             if not self.is_connected:
                 self.connect()
             
-            response = self.client.table('miembros').select('*').eq('codigo_qr', codigo_qr).execute()
+            response = ejecutar_compartida(self.client.table('miembros').select('*').eq('codigo_qr', codigo_qr))
             
             if response.data:
                 return response.data[0]
@@ -767,12 +974,90 @@ class PostgresManager:
             if not self.is_connected:
                 self.connect()
             
-            response = self.client.table('miembros').select('id_miembro', count='exact').eq('activo', True).execute()
+            response = ejecutar_compartida(self.client.table('miembros').select('id_miembro', count='exact').eq('activo', True))
             return response.count or 0
         except Exception as e:
             logging.error(f"Error obteniendo total de miembros: {e}")
             return 0
     
+    def _filtrar_busqueda_miembros(self, query, texto: Optional[str], solo_activos: bool,
+                                   con_membresia: bool):
+        """Aplicar los filtros de la búsqueda de miembros sobre v_miembros_busqueda"""
+        if texto:
+            # La columna busqueda ya está en minúsculas y tiene índice trigram
+            patron = texto.strip().lower().replace('%', '').replace(',', ' ')
+            query = query.ilike('busqueda', f'%{patron}%')
+        if solo_activos:
+            query = query.eq('activo', True)
+        if con_membresia:
+            query = query.in_('estado_vigencia', ['vigente', 'por_vencer'])
+        return query
+    
+    def _contar_miembros(self, texto: Optional[str], solo_activos: bool, con_membresia: bool) -> int:
+        """Contar en el servidor los miembros que cumplen los filtros"""
+        query = self.client.table('v_miembros_busqueda').select('id_miembro', count='exact')
+        query = self._filtrar_busqueda_miembros(query, texto, solo_activos, con_membresia)
+        return ejecutar_compartida(query.limit(1)).count or 0
+    
+    def buscar_miembros_pagina(self, texto: Optional[str] = None, solo_activos: bool = True,
+                               con_membresia: bool = False, offset: int = 0,
+                               tamano_pagina: Optional[int] = None) -> Dict:
+        """
+        Obtener una página de miembros de v_miembros_busqueda (ver
+        database/sql/vista_miembros_busqueda.sql) filtrada en el servidor.
+        
+        Args:
+            texto: Subcadena de nombre, teléfono, email o código M-00000
+            solo_activos: Solo miembros activos
+            con_membresia: Solo con membresía vigente o por vencer
+            offset: Filas ya mostradas
+            tamano_pagina: Filas por página (default TAMANO_PAGINA_MIEMBROS)
+        
+        Returns:
+            Dict con 'filas', 'offset' (para la página siguiente), 'hay_mas' y,
+            solo en la primera página, 'resumen' con los contadores
+            (total_general, total, activos, con_membresia)
+        """
+        if not self.is_connected:
+            self.connect()
+        
+        if tamano_pagina is None:
+            tamano_pagina = self.TAMANO_PAGINA_MIEMBROS
+        
+        primera = offset == 0
+        query = self.client.table('v_miembros_busqueda').select(
+            'id_miembro, nombres, apellido_paterno, apellido_materno, telefono, email, '
+            'contacto_emergencia, telefono_emergencia, codigo_qr, activo, fecha_registro, '
+            'fecha_nacimiento, membresia, fecha_fin_membresia, numero_locker, estado_vigencia',
+            count='exact' if primera else None
+        )
+        query = self._filtrar_busqueda_miembros(query, texto, solo_activos, con_membresia)
+        
+        # Pedir una fila extra para saber si hay otra página
+        response = query.order('nombres').order('id_miembro')\
+            .range(offset, offset + tamano_pagina).execute()
+        
+        filas = response.data or []
+        hay_mas = len(filas) > tamano_pagina
+        filas = filas[:tamano_pagina]
+        
+        pagina = {
+            'filas': filas,
+            'offset': offset + len(filas),
+            'hay_mas': hay_mas
+        }
+        
+        if primera:
+            total = response.count if response.count is not None else len(filas)
+            pagina['resumen'] = {
+                'total_general': self._contar_miembros(None, False, False),
+                'total': total,
+                'activos': total if solo_activos else self._contar_miembros(texto, True, con_membresia),
+                'con_membresia': total if con_membresia else self._contar_miembros(texto, solo_activos, True)
+            }
+        
+        return pagina
+    
     # ========== GESTIÓN DE PRODUCTOS E INVENTARIO ==========
     
     def producto_existe(self, codigo_interno: str) -> bool:
@@ -913,18 +1198,8 @@ class PostgresManager:
             
             productos_suplementos = response_suplementos.data or []
             
-            # Obtener todas las ubicaciones para mapeo
-            ubicaciones_map = {}
-            try:
-                response_ubicaciones = self.client.table('ca_ubicaciones').select(
-                    'id_ubicacion, nombre'
-                ).execute()
-                ubicaciones_map = {
-                    u['id_ubicacion']: u['nombre'] 
-                    for u in (response_ubicaciones.data or [])
-                }
-            except Exception as e:
-                logging.warning(f"No se pudieron obtener ubicaciones: {e}")
+            # Nombres de ubicaciones para mapeo (caché de referencia)
+            ubicaciones_map = self.obtener_mapa_ubicaciones()
             
             # Obtener detalles de productos varios
             productos_varios_data = {}
@@ -1032,6 +1307,8 @@ class PostgresManager:
                 'codigo_interno', codigo_interno
             ).eq('tipo_producto', tipo_producto).execute()
             
+            self.invalidar_indice_catalogo(codigo_interno, tipo_producto)
+            
             logging.info(f"✅ Stock actualizado: {codigo_interno} → {nuevo_stock} unidades")
             return True
             
@@ -1111,62 +1388,7 @@ class PostgresManager:
                 'cantidad, stock_anterior, stock_nuevo, motivo, id_usuario, id_venta'
             ).neq('tipo_movimiento', 'venta').order('fecha', desc=True).limit(limite).execute()
             
-            movimientos = response.data or []
-            movimientos_completos = []
-            
-            # Para cada movimiento, obtener el nombre del producto
-            for mov in movimientos:
-                codigo_interno = mov.get('codigo_interno')
-                tipo_producto = mov.get('tipo_producto', 'varios')
-                id_usuario = mov.get('id_usuario')
-                
-                nombre_producto = 'Producto desconocido'
-                nombre_usuario = 'Usuario desconocido'
-                
-                # Obtener nombre del producto según tipo
-                try:
-                    if tipo_producto == 'varios':
-                        response_prod = self.client.table('ca_productos_varios').select('nombre').eq(
-                            'codigo_interno', codigo_interno
-                        ).execute()
-                        if response_prod.data:
-                            nombre_producto = response_prod.data[0].get('nombre', 'Producto desconocido')
-                    else:
-                        response_prod = self.client.table('ca_suplementos').select('nombre').eq(
-                            'codigo_interno', codigo_interno
-                        ).execute()
-                        if response_prod.data:
-                            nombre_producto = response_prod.data[0].get('nombre', 'Producto desconocido')
-                except Exception as e:
-                    logging.warning(f"No se pudo obtener nombre del producto {codigo_interno}: {e}")
-                
-                # Obtener nombre del usuario
-                try:
-                    if id_usuario:
-                        response_user = self.client.table('usuarios').select('nombre_completo').eq(
-                            'id_usuario', id_usuario
-                        ).execute()
-                        if response_user.data:
-                            nombre_usuario = response_user.data[0].get('nombre_completo', 'Usuario desconocido')
-                except Exception as e:
-                    logging.warning(f"No se pudo obtener nombre del usuario {id_usuario}: {e}")
-                
-                # Agregar movimiento completo
-                movimientos_completos.append({
-                    'id_movimiento': mov.get('id_movimiento'),
-                    'fecha': mov.get('fecha'),
-                    'tipo_movimiento': mov.get('tipo_movimiento'),
-                    'codigo_interno': mov.get('codigo_interno'),
-                    'tipo_producto': mov.get('tipo_producto'),
-                    'cantidad': mov.get('cantidad'),
-                    'stock_anterior': mov.get('stock_anterior'),
-                    'stock_nuevo': mov.get('stock_nuevo'),
-                    'motivo': mov.get('motivo') or '',
-                    'id_usuario': mov.get('id_usuario'),
-                    'id_venta': mov.get('id_venta'),
-                    'nombre_producto': nombre_producto,
-                    'nombre_usuario': nombre_usuario
-                })
+            movimientos_completos = self._completar_movimientos(response.data or [])
             
             logging.info(f"✅ Obtuvieron {len(movimientos_completos)} movimientos completos")
             return movimientos_completos
@@ -1175,42 +1397,122 @@ class PostgresManager:
             logging.error(f"Error obteniendo movimientos completos: {e}")
             return []
     
+    def _completar_movimientos(self, movimientos: List[Dict]) -> List[Dict]:
+        """Agregar nombre_producto y nombre_usuario a filas de movimientos_inventario
+        
+        Los nombres se resuelven con consultas in_() sobre los códigos y usuarios
+        distintos, así que el costo no crece con el número de movimientos.
+        """
+        movimientos_completos = []
+        
+        # Reunir códigos distintos por tipo de producto y usuarios distintos
+        codigos_varios = [m.get('codigo_interno') for m in movimientos if m.get('tipo_producto', 'varios') == 'varios']
+        codigos_suplementos = [m.get('codigo_interno') for m in movimientos if m.get('tipo_producto', 'varios') != 'varios']
+        ids_usuarios = [m.get('id_usuario') for m in movimientos if m.get('id_usuario')]
+        
+        # Resolver nombres con una consulta in_() por tabla
+        nombres_varios = {}
+        nombres_suplementos = {}
+        nombres_usuarios = {}
+        try:
+            nombres_varios = {
+                p['codigo_interno']: p.get('nombre')
+                for p in self._seleccionar_por_lotes('ca_productos_varios', 'codigo_interno, nombre', 'codigo_interno', codigos_varios)
+            }
+            nombres_suplementos = {
+                p['codigo_interno']: p.get('nombre')
+                for p in self._seleccionar_por_lotes('ca_suplementos', 'codigo_interno, nombre', 'codigo_interno', codigos_suplementos)
+            }
+        except Exception as e:
+            logging.warning(f"No se pudieron obtener nombres de productos: {e}")
+        
+        try:
+            nombres_usuarios = {
+                u['id_usuario']: u.get('nombre_completo')
+                for u in self._seleccionar_por_lotes('usuarios', 'id_usuario, nombre_completo', 'id_usuario', ids_usuarios)
+            }
+        except Exception as e:
+            logging.warning(f"No se pudieron obtener nombres de usuarios: {e}")
+        
+        # Combinar en memoria
+        for mov in movimientos:
+            codigo_interno = mov.get('codigo_interno')
+            tipo_producto = mov.get('tipo_producto', 'varios')
+            
+            nombres_productos = nombres_varios if tipo_producto == 'varios' else nombres_suplementos
+            nombre_producto = nombres_productos.get(codigo_interno) or 'Producto desconocido'
+            nombre_usuario = nombres_usuarios.get(mov.get('id_usuario')) or 'Usuario desconocido'
+            
+            # Agregar movimiento completo
+            movimientos_completos.append({
+                'id_movimiento': mov.get('id_movimiento'),
+                'fecha': mov.get('fecha'),
+                'tipo_movimiento': mov.get('tipo_movimiento'),
+                'codigo_interno': mov.get('codigo_interno'),
+                'tipo_producto': mov.get('tipo_producto'),
+                'cantidad': mov.get('cantidad'),
+                'stock_anterior': mov.get('stock_anterior'),
+                'stock_nuevo': mov.get('stock_nuevo'),
+                'motivo': mov.get('motivo') or '',
+                'id_usuario': mov.get('id_usuario'),
+                'id_venta': mov.get('id_venta'),
+                'nombre_producto': nombre_producto,
+                'nombre_usuario': nombre_usuario
+            })
+        
+        return movimientos_completos
+    
     # ========== UBICACIONES ==========
     
     def get_ubicaciones(self) -> List[Dict]:
-        """Obtener todas las ubicaciones activas"""
+        """Obtener todas las ubicaciones activas (desde la caché de referencia)"""
         try:
-            if not self.is_connected:
-                self.connect()
-            
-            response = self.client.table('ca_ubicaciones').select('*').eq('activa', True).order('nombre').execute()
-            return response.data or []
+            return [u for u in self._ubicaciones_todas() if u.get('activa')]
         except Exception as e:
             logging.error(f"Error obteniendo ubicaciones: {e}")
             return []
     
+    def obtener_mapa_ubicaciones(self) -> Dict[int, str]:
+        """Mapa id_ubicacion -> nombre de todas las ubicaciones (desde la caché)"""
+        try:
+            return {u['id_ubicacion']: u['nombre'] for u in self._ubicaciones_todas()}
+        except Exception as e:
+            logging.warning(f"No se pudieron obtener ubicaciones: {e}")
+            return {}
+    
     def get_ubicacion_by_id(self, id_ubicacion: int) -> Optional[Dict]:
         """Obtener una ubicación por ID"""
         try:
-            if not self.is_connected:
-                self.connect()
-            
-            response = self.client.table('ca_ubicaciones').select('*').eq('id_ubicacion', id_ubicacion).execute()
-            return response.data[0] if response.data else None
+            for ubicacion in self._ubicaciones_todas():
+                if ubicacion['id_ubicacion'] == id_ubicacion:
+                    return ubicacion
+            return None
         except Exception as e:
             logging.error(f"Error obteniendo ubicación: {e}")
             return None
     
+    def _ubicaciones_todas(self) -> List[Dict]:
+        """Catálogo completo de ubicaciones, activas e inactivas, ordenado por nombre"""
+        def cargar():
+            if not self.is_connected:
+                self.connect()
+            response = ejecutar_compartida(self.client.table('ca_ubicaciones').select('*').order('nombre'))
+            return response.data or []
+        
+        return self.cache_referencia.obtener('ca_ubicaciones', 'todas', cargar)
+    
     # ========== PRODUCTOS DIGITALES ==========
     
     def get_productos_digitales(self) -> List[Dict]:
-        """Obtener todos los productos digitales activos"""
-        try:
+        """Obtener todos los productos digitales activos (desde la caché de referencia)"""
+        def cargar():
             if not self.is_connected:
                 self.connect()
-            
-            response = self.client.table('ca_productos_digitales').select('*').eq('activo', True).order('nombre').execute()
+            response = ejecutar_compartida(self.client.table('ca_productos_digitales').select('*').eq('activo', True).order('nombre'))
             return response.data or []
+        
+        try:
+            return self.cache_referencia.obtener('ca_productos_digitales', 'activos', cargar)
         except Exception as e:
             logging.error(f"Error obteniendo productos digitales: {e}")
             return []
@@ -1218,6 +1520,11 @@ class PostgresManager:
     def get_producto_digital_by_id(self, id_producto_digital: int) -> Optional[Dict]:
         """Obtener producto digital por ID"""
         try:
+            # Los activos salen de la caché; los inactivos se consultan
+            for producto in self.get_productos_digitales():
+                if producto['id_producto_digital'] == id_producto_digital:
+                    return producto
+            
             if not self.is_connected:
                 self.connect()
             
@@ -1251,6 +1558,7 @@ class PostgresManager:
             
             if response.data:
                 id_producto = response.data[0]['id_producto_digital']
+                self.invalidar_datos_referencia('ca_productos_digitales')
                 logging.info(f"✅ Producto digital '{producto_data['nombre']}' creado con ID: {id_producto}")
                 return id_producto
             else:
@@ -1263,13 +1571,15 @@ class PostgresManager:
     # ========== LOCKERS ==========
     
     def get_lockers(self) -> List[Dict]:
-        """Obtener todos los lockers activos"""
-        try:
+        """Obtener todos los lockers activos (desde la caché de referencia)"""
+        def cargar():
             if not self.is_connected:
                 self.connect()
-            
-            response = self.client.table('lockers').select('*').eq('activo', True).order('numero').execute()
+            response = ejecutar_compartida(self.client.table('lockers').select('*').eq('activo', True).order('numero'))
             return response.data or []
+        
+        try:
+            return self.cache_referencia.obtener('lockers', 'activos', cargar)
         except Exception as e:
             logging.error(f"Error obteniendo lockers: {e}")
             return []
@@ -1277,6 +1587,11 @@ class PostgresManager:
     def get_locker_by_id(self, id_locker: int) -> Optional[Dict]:
         """Obtener locker por ID"""
         try:
+            # Los activos salen de la caché; los inactivos se consultan
+            for locker in self.get_lockers():
+                if locker['id_locker'] == id_locker:
+                    return locker
+            
             if not self.is_connected:
                 self.connect()
             
@@ -1304,6 +1619,7 @@ class PostgresManager:
             
             if response.data:
                 id_locker = response.data[0]['id_locker']
+                self.invalidar_datos_referencia('lockers')
                 logging.info(f"✅ Locker '{locker_data['numero']}' creado con ID: {id_locker}")
                 return id_locker
             else:
@@ -1407,6 +1723,7 @@ class PostgresManager:
             if response.data:
                 id_entrada = response.data[0]['id_entrada']
                 logging.info(f"✅ Entrada registrada con ID: {id_entrada}")
+                obtener_ocupacion().registrar_entrada(id_entrada, entrada_insert['fecha_entrada'])
                 return id_entrada
             else:
                 logging.error("No se pudo registrar la entrada")
@@ -1433,6 +1750,31 @@ class PostgresManager:
             logging.error(f"Error registrando salida: {e}")
             return False
     
+    def obtener_entradas_abiertas(self, desde: datetime) -> List[Dict]:
+        """
+        Entradas sin salida registrada a partir de `desde` (carga inicial de
+        la ocupación). Lanza la excepción si falla para que quien llama lo sepa.
+        """
+        if not self.is_connected:
+            self.connect()
+        
+        filas = []
+        ultimo_id = 0
+        while True:
+            response = self.client.table('registro_entradas')\
+                .select('id_entrada, fecha_entrada')\
+                .is_('fecha_salida', 'null')\
+                .gte('fecha_entrada', desde.isoformat())\
+                .gt('id_entrada', ultimo_id)\
+                .order('id_entrada')\
+                .limit(1000)\
+                .execute()
+            pagina = response.data or []
+            filas.extend(pagina)
+            if len(pagina) < 1000:
+                return filas
+            ultimo_id = pagina[-1]['id_entrada']
+    
     def get_historial_entradas(self, id_miembro: int, limite: int = 50) -> List[Dict]:
         """Obtener historial de entradas de un miembro"""
         try:
@@ -1557,12 +1899,34 @@ class PostgresManager:
             if para_recepcion:
                 query = query.eq('para_recepcion', True)
             
-            response = query.order('creada_en', desc=True).execute()
+            response = ejecutar_compartida(query.order('creada_en', desc=True))
             return response.data or []
         except Exception as e:
             logging.error(f"Error obteniendo notificaciones pendientes: {e}")
             return []
     
+    def obtener_pagos_efectivo_pendientes(self) -> List[Dict]:
+        """
+        Obtener los pagos en efectivo pendientes para recepción con el miembro
+        embebido (una sola consulta, sin buscar cada miembro por separado)
+        
+        Returns:
+            Lista de notificaciones con 'miembros': {nombres, apellido_paterno}
+        """
+        if not self.is_connected:
+            self.connect()
+        
+        response = ejecutar_compartida(
+            self.client.table('notificaciones_pos')
+            .select('*, miembros(nombres, apellido_paterno)')
+            .eq('tipo_notificacion', 'pago_efectivo_pendiente')
+            .eq('para_recepcion', True)
+            .eq('leida', False)
+            .eq('respondida', False)
+            .order('creada_en', desc=True)
+        )
+        return response.data or []
+    
     def marcar_notificacion_como_leida(self, id_notificacion: int) -> bool:
         """Marcar una notificación como leída"""
         try:
@@ -1688,7 +2052,7 @@ class PostgresManager:
             if not self.is_connected:
                 self.connect()
             
-            response = self.client.table('notificaciones_pos').select('*, miembros(*)').eq('para_recepcion', True).eq('respondida', False).in_('tipo_notificacion', ['membresia_pendiente', 'visita_pendiente', 'pago_pendiente']).order('creada_en', desc=True).execute()
+            response = ejecutar_compartida(self.client.table('notificaciones_pos').select('*, miembros(*)').eq('para_recepcion', True).eq('respondida', False).in_('tipo_notificacion', ['membresia_pendiente', 'visita_pendiente', 'pago_pendiente']).order('creada_en', desc=True))
             return response.data or []
         except Exception as e:
             logging.error(f"Error obteniendo notificaciones pendientes: {e}")
@@ -1795,6 +2159,173 @@ class PostgresManager:
             return False
 
 
+    # ========== HISTORIALES PAGINADOS (CURSOR / KEYSET) ==========
+    
+    def obtener_pagina_keyset(self, tabla: str, columnas: str, campo_fecha: str, campo_id: str,
+                              cursor: Optional[tuple] = None, filtros: Optional[List[tuple]] = None,
+                              tamano_pagina: Optional[int] = None) -> Dict:
+        """Obtener una página de una tabla ordenada por (fecha, id) descendente
+        
+        La página siguiente se pide con el cursor de la anterior; la consulta usa
+        (fecha, id) < cursor en lugar de offset, así que cuesta lo mismo sin
+        importar cuántas filas hay antes.
+        
+        Args:
+            tabla: Nombre de la tabla
+            columnas: Columnas a seleccionar (acepta selects embebidos)
+            campo_fecha: Columna de fecha usada para ordenar
+            campo_id: Columna de id que desempata filas con la misma fecha
+            cursor: Tupla (fecha, id) de la última fila de la página anterior, o None
+            filtros: Lista de (operador, columna, valor) aplicados en el servidor,
+                p. ej. [('gte', 'fecha', '2025-01-01T00:00:00'), ('eq', 'id_usuario', 3)]
+            tamano_pagina: Filas por página (default TAMANO_PAGINA_HISTORIAL)
+        
+        Returns:
+            Dict con 'filas', 'cursor' (para la página siguiente o None) y 'hay_mas'
+        """
+        if not self.is_connected:
+            self.connect()
+        
+        if tamano_pagina is None:
+            tamano_pagina = self.TAMANO_PAGINA_HISTORIAL
+        
+        query = self.client.table(tabla).select(columnas)
+        
+        for operador, columna, valor in (filtros or []):
+            # Operadores compuestos como 'not_.is_' se resuelven por partes
+            metodo = query
+            for parte in operador.split('.'):
+                metodo = getattr(metodo, parte)
+            query = metodo(columna, valor)
+        
+        if cursor:
+            fecha_cursor, id_cursor = cursor
+            query = query.or_(
+                f'{campo_fecha}.lt."{fecha_cursor}",'
+                f'and({campo_fecha}.eq."{fecha_cursor}",{campo_id}.lt.{id_cursor})'
+            )
+        
+        # Pedir una fila extra para saber si hay otra página
+        response = query.order(campo_fecha, desc=True).order(campo_id, desc=True).limit(tamano_pagina + 1).execute()
+        
+        filas = response.data or []
+        hay_mas = len(filas) > tamano_pagina
+        filas = filas[:tamano_pagina]
+        
+        siguiente_cursor = None
+        if hay_mas and filas:
+            siguiente_cursor = (filas[-1][campo_fecha], filas[-1][campo_id])
+        
+        return {
+            'filas': filas,
+            'cursor': siguiente_cursor,
+            'hay_mas': hay_mas
+        }
+    
+    def _filtros_rango_fechas(self, campo_fecha: str, fecha_desde=None, fecha_hasta=None) -> List[tuple]:
+        """Construir filtros gte/lte de día completo para obtener_pagina_keyset"""
+        filtros = []
+        if fecha_desde:
+            filtros.append(('gte', campo_fecha, f'{fecha_desde}T00:00:00'))
+        if fecha_hasta:
+            filtros.append(('lte', campo_fecha, f'{fecha_hasta}T23:59:59'))
+        return filtros
+    
+    def obtener_pagina_accesos(self, cursor: Optional[tuple] = None, fecha_desde=None, fecha_hasta=None,
+                               tipo_acceso: Optional[str] = None, dentro: Optional[bool] = None,
+                               tamano_pagina: Optional[int] = None) -> Dict:
+        """Obtener una página de registro_entradas con datos de miembro/personal
+        
+        Args:
+            cursor: Cursor devuelto por la página anterior
+            fecha_desde, fecha_hasta: Rango de fecha_entrada (date)
+            tipo_acceso: 'miembro', 'personal' o 'visitante' (None = todos)
+            dentro: True solo quienes no han salido, False solo quienes salieron
+        """
+        filtros = self._filtros_rango_fechas('fecha_entrada', fecha_desde, fecha_hasta)
+        if tipo_acceso:
+            filtros.append(('eq', 'tipo_acceso', tipo_acceso))
+        if dentro is True:
+            filtros.append(('is_', 'fecha_salida', 'null'))
+        elif dentro is False:
+            filtros.append(('not_.is_', 'fecha_salida', 'null'))
+        
+        return self.obtener_pagina_keyset(
+            'registro_entradas',
+            '*, miembros(nombres, apellido_paterno, apellido_materno, codigo_qr), '
+            'personal(nombres, apellido_paterno, apellido_materno, id_personal, numero_empleado)',
+            'fecha_entrada', 'id_entrada',
+            cursor=cursor, filtros=filtros, tamano_pagina=tamano_pagina
+        )
+    
+    def obtener_pagina_ventas(self, cursor: Optional[tuple] = None, fecha_desde=None, fecha_hasta=None,
+                              id_usuario: Optional[int] = None, id_venta: Optional[int] = None,
+                              total_min: Optional[float] = None, total_max: Optional[float] = None,
+                              id_turno: Optional[int] = None, tamano_pagina: Optional[int] = None) -> Dict:
+        """Obtener una página de ventas con el nombre del usuario que las registró
+        
+        Todos los filtros se resuelven en la consulta; el rango de fechas y el
+        cajero usan los índices de database/sql/indices_historiales.sql.
+        
+        Args:
+            cursor: Cursor devuelto por la página anterior
+            fecha_desde, fecha_hasta: Rango de fecha (date)
+            id_usuario: Solo ventas de este cajero
+            id_venta: Solo la venta con este ID (búsqueda por ticket)
+            total_min, total_max: Rango del total de la venta
+            id_turno: Solo ventas de este turno de caja
+        """
+        filtros = self._filtros_rango_fechas('fecha', fecha_desde, fecha_hasta)
+        if id_usuario is not None:
+            filtros.append(('eq', 'id_usuario', id_usuario))
+        if id_venta is not None:
+            filtros.append(('eq', 'id_venta', id_venta))
+        if total_min is not None:
+            filtros.append(('gte', 'total', total_min))
+        if total_max is not None:
+            filtros.append(('lte', 'total', total_max))
+        if id_turno is not None:
+            filtros.append(('eq', 'id_turno', id_turno))
+        
+        return self.obtener_pagina_keyset(
+            'ventas', 'id_venta, fecha, total, id_usuario, usuarios(nombre_completo)',
+            'fecha', 'id_venta',
+            cursor=cursor, filtros=filtros, tamano_pagina=tamano_pagina
+        )
+    
+    def obtener_pagina_turnos(self, cursor: Optional[tuple] = None, fecha_desde=None, fecha_hasta=None,
+                              cerrado: Optional[bool] = None, tamano_pagina: Optional[int] = None) -> Dict:
+        """Obtener una página de turnos_caja con el nombre del usuario"""
+        filtros = self._filtros_rango_fechas('fecha_apertura', fecha_desde, fecha_hasta)
+        if cerrado is not None:
+            filtros.append(('eq', 'cerrado', cerrado))
+        
+        return self.obtener_pagina_keyset(
+            'turnos_caja', '*, usuarios(nombre_completo)',
+            'fecha_apertura', 'id_turno',
+            cursor=cursor, filtros=filtros, tamano_pagina=tamano_pagina
+        )
+    
+    def obtener_pagina_movimientos(self, cursor: Optional[tuple] = None, fecha_desde=None, fecha_hasta=None,
+                                   tipo_movimiento: Optional[str] = None,
+                                   tamano_pagina: Optional[int] = None) -> Dict:
+        """Obtener una página de movimientos de inventario (sin ventas) con nombres resueltos"""
+        filtros = [('neq', 'tipo_movimiento', 'venta')]
+        filtros.extend(self._filtros_rango_fechas('fecha', fecha_desde, fecha_hasta))
+        if tipo_movimiento:
+            filtros.append(('eq', 'tipo_movimiento', tipo_movimiento))
+        
+        pagina = self.obtener_pagina_keyset(
+            'movimientos_inventario',
+            'id_movimiento, fecha, tipo_movimiento, codigo_interno, tipo_producto, '
+            'cantidad, stock_anterior, stock_nuevo, motivo, id_usuario, id_venta',
+            'fecha', 'id_movimiento',
+            cursor=cursor, filtros=filtros, tamano_pagina=tamano_pagina
+        )
+        pagina['filas'] = self._completar_movimientos(pagina['filas'])
+        return pagina
+
+
 # Ejemplo de uso
 if __name__ == "__main__":
     # Configuración de conexión (solo necesita URL y KEY de Supabase)
@@ -0,0 +1,94 @@
+"""
+Caché de datos de referencia para PostgresManager
+Tablas pequeñas que cambian poco (usuarios, ubicaciones, lockers, productos
+digitales) se guardan en memoria con un TTL por tabla y un límite LRU, para
+que las ventanas resuelvan nombres e IDs sin volver a la red.
+"""
+
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class ReferenceDataCache:
+    """
+    Caché en memoria por (tabla, clave) con vencimiento por tabla y desalojo LRU.
+
+    Uso:
+        cache = ReferenceDataCache({'lockers': 300})
+        lockers = cache.obtener('lockers', 'activos', cargar_lockers)
+        cache.invalidar('lockers')   # después de crear/editar/eliminar
+
+    Los valores se devuelven como copia para que quien los modifique no
+    altere lo guardado. Si la carga falla, la excepción se propaga y no se
+    guarda nada.
+    """
+
+    # Segundos de vigencia si la tabla no tiene TTL propio
+    TTL_DEFAULT = 300
+    # Entradas máximas entre todas las tablas
+    MAX_ENTRADAS = 256
+
+    def __init__(self, ttl_por_tabla: Optional[Dict[str, float]] = None,
+                 max_entradas: Optional[int] = None):
+        self._ttl = dict(ttl_por_tabla or {})
+        self._max_entradas = max_entradas or self.MAX_ENTRADAS
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[tuple, tuple]" = OrderedDict()  # (tabla, clave) -> (vence_en, valor)
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, tabla: str, clave, cargar: Callable[[], Any]):
+        """
+        Devolver el valor guardado para (tabla, clave) o cargarlo con `cargar`.
+
+        Args:
+            tabla: Tabla de origen (define el TTL y la invalidación)
+            clave: Identifica la consulta dentro de la tabla
+            cargar: Función que consulta la base de datos si no hay valor vigente
+        """
+        llave = (tabla, clave)
+        ahora = time.monotonic()
+
+        with self._lock:
+            entrada = self._entradas.get(llave)
+            if entrada is not None and entrada[0] > ahora:
+                self._entradas.move_to_end(llave)
+                self.aciertos += 1
+                return copy.deepcopy(entrada[1])
+            self.fallos += 1
+
+        valor = cargar()
+        self.guardar(tabla, clave, valor)
+        return copy.deepcopy(valor)
+
+    def guardar(self, tabla: str, clave, valor):
+        """Guardar un valor ya consultado"""
+        vence_en = time.monotonic() + self._ttl.get(tabla, self.TTL_DEFAULT)
+        with self._lock:
+            self._entradas[(tabla, clave)] = (vence_en, valor)
+            self._entradas.move_to_end((tabla, clave))
+            while len(self._entradas) > self._max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, tabla: Optional[str] = None):
+        """Descartar todo lo guardado de una tabla (o de todas si tabla es None)"""
+        with self._lock:
+            if tabla is None:
+                self._entradas.clear()
+            else:
+                for llave in [ll for ll in self._entradas if ll[0] == tabla]:
+                    del self._entradas[llave]
+        logging.debug(f"[CACHE] Datos de referencia invalidados: {tabla or 'todas'}")
+
+    def estadisticas(self) -> Dict[str, int]:
+        """Aciertos, fallos y entradas guardadas"""
+        with self._lock:
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'entradas': len(self._entradas)
+            }
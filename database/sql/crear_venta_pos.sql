@@ -0,0 +1,141 @@
+-- Función para registrar una venta completa en una sola llamada RPC
+-- Ejecutar este script en el SQL Editor de Supabase
+--
+-- Uso desde Python (PostgresManager.create_sale):
+--   client.rpc('crear_venta_pos', {'p_venta': {...}}).execute()
+--
+-- Formato de p_venta:
+--   {
+--     "id_usuario": 1, "id_miembro": null, "id_turno": 10,
+--     "fecha": "2025-01-01T10:00:00", "subtotal": 50.0, "descuento": 0,
+--     "impuestos": 0, "total": 50.0, "metodo_pago": "efectivo",
+--     "tipo_venta": "producto",
+--     "productos": [
+--       {"codigo_interno": "AGUA500", "tipo_producto": "varios",
+--        "cantidad": 2, "precio_unitario": 15.0, "subtotal_linea": 30.0}
+--     ]
+--   }
+--
+-- Toda la venta ocurre en una transacción: si algún producto no tiene stock
+-- suficiente se lanza una excepción y no se guarda nada.
+
+CREATE OR REPLACE FUNCTION crear_venta_pos(p_venta JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_id_venta INTEGER;
+    v_linea RECORD;
+    v_stock_nuevo INTEGER;
+    v_movimientos JSONB := '[]'::jsonb;
+BEGIN
+    IF jsonb_array_length(COALESCE(p_venta->'productos', '[]'::jsonb)) = 0 THEN
+        RAISE EXCEPTION 'La venta no contiene productos';
+    END IF;
+
+    -- 1. Encabezado de la venta
+    INSERT INTO ventas (
+        id_usuario, id_miembro, id_turno, fecha, subtotal, descuento,
+        impuestos, total, metodo_pago, tipo_venta, estado
+    )
+    VALUES (
+        (p_venta->>'id_usuario')::INTEGER,
+        (p_venta->>'id_miembro')::INTEGER,
+        (p_venta->>'id_turno')::INTEGER,
+        COALESCE((p_venta->>'fecha')::TIMESTAMP, NOW()),
+        COALESCE((p_venta->>'subtotal')::NUMERIC, (p_venta->>'total')::NUMERIC),
+        COALESCE((p_venta->>'descuento')::NUMERIC, 0),
+        COALESCE((p_venta->>'impuestos')::NUMERIC, 0),
+        (p_venta->>'total')::NUMERIC,
+        COALESCE(p_venta->>'metodo_pago', 'efectivo'),
+        COALESCE(p_venta->>'tipo_venta', 'producto'),
+        'completada'
+    )
+    RETURNING id_venta INTO v_id_venta;
+
+    -- 2. Bloquear las filas de inventario en orden fijo para evitar
+    --    interbloqueos entre terminales que venden los mismos productos
+    PERFORM 1
+    FROM inventario i
+    JOIN (
+        SELECT DISTINCT l.codigo_interno, l.tipo_producto
+        FROM jsonb_to_recordset(p_venta->'productos')
+             AS l(codigo_interno TEXT, tipo_producto TEXT)
+    ) p ON p.codigo_interno = i.codigo_interno AND p.tipo_producto = i.tipo_producto
+    ORDER BY i.codigo_interno, i.tipo_producto
+    FOR UPDATE OF i;
+
+    -- 3. Descontar stock de forma atómica (stock_actual = stock_actual - n)
+    FOR v_linea IN
+        SELECT l.codigo_interno, l.tipo_producto, SUM(l.cantidad)::INTEGER AS cantidad
+        FROM jsonb_to_recordset(p_venta->'productos')
+             AS l(codigo_interno TEXT, tipo_producto TEXT, cantidad INTEGER)
+        GROUP BY l.codigo_interno, l.tipo_producto
+        ORDER BY l.codigo_interno, l.tipo_producto
+    LOOP
+        UPDATE inventario
+        SET stock_actual = stock_actual - v_linea.cantidad,
+            fecha_ultima_salida = NOW()
+        WHERE codigo_interno = v_linea.codigo_interno
+          AND tipo_producto = v_linea.tipo_producto
+          AND stock_actual >= v_linea.cantidad
+        RETURNING stock_actual INTO v_stock_nuevo;
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'Stock insuficiente para % (%)',
+                v_linea.codigo_interno, v_linea.tipo_producto;
+        END IF;
+
+        v_movimientos := v_movimientos || jsonb_build_object(
+            'codigo_interno', v_linea.codigo_interno,
+            'tipo_producto', v_linea.tipo_producto,
+            'cantidad', -v_linea.cantidad,
+            'stock_anterior', v_stock_nuevo + v_linea.cantidad,
+            'stock_nuevo', v_stock_nuevo
+        );
+    END LOOP;
+
+    -- 4. Detalles de la venta (inserción en bloque)
+    INSERT INTO detalles_venta (
+        id_venta, codigo_interno, tipo_producto, cantidad, precio_unitario,
+        subtotal_linea, nombre_producto, descripcion_producto
+    )
+    SELECT
+        v_id_venta,
+        l.codigo_interno,
+        l.tipo_producto,
+        l.cantidad,
+        l.precio_unitario,
+        l.subtotal_linea,
+        COALESCE(pv.nombre, s.nombre),
+        COALESCE(pv.descripcion, s.descripcion)
+    FROM jsonb_to_recordset(p_venta->'productos')
+         AS l(codigo_interno TEXT, tipo_producto TEXT, cantidad INTEGER,
+              precio_unitario NUMERIC, subtotal_linea NUMERIC)
+    LEFT JOIN ca_productos_varios pv
+           ON l.tipo_producto = 'varios' AND pv.codigo_interno = l.codigo_interno
+    LEFT JOIN ca_suplementos s
+           ON l.tipo_producto = 'suplemento' AND s.codigo_interno = l.codigo_interno;
+
+    -- 5. Movimientos de inventario (inserción en bloque)
+    INSERT INTO movimientos_inventario (
+        codigo_interno, tipo_producto, tipo_movimiento, cantidad,
+        stock_anterior, stock_nuevo, id_usuario, id_venta
+    )
+    SELECT
+        m.codigo_interno,
+        m.tipo_producto,
+        'venta',
+        m.cantidad,
+        m.stock_anterior,
+        m.stock_nuevo,
+        (p_venta->>'id_usuario')::INTEGER,
+        v_id_venta
+    FROM jsonb_to_recordset(v_movimientos)
+         AS m(codigo_interno TEXT, tipo_producto TEXT, cantidad INTEGER,
+              stock_anterior INTEGER, stock_nuevo INTEGER);
+
+    RETURN v_id_venta;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Verificación
+SELECT 'Función crear_venta_pos configurada correctamente' AS status;
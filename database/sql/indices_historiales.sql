@@ -0,0 +1,29 @@
+-- Índices para los historiales paginados por cursor (fecha, id)
+-- Ejecutar este script en el SQL Editor de Supabase
+--
+-- PostgresManager.obtener_pagina_keyset ordena por (fecha DESC, id DESC) y
+-- continúa con (fecha, id) < cursor; con estos índices cada página se lee
+-- directamente del índice sin ordenar la tabla completa.
+
+-- Historial de ventas: rango de fechas
+CREATE INDEX IF NOT EXISTS idx_ventas_fecha_id
+    ON ventas (fecha DESC, id_venta DESC);
+
+-- Historial de ventas filtrado por cajero: igualdad en id_usuario + rango de fechas
+CREATE INDEX IF NOT EXISTS idx_ventas_usuario_fecha_id
+    ON ventas (id_usuario, fecha DESC, id_venta DESC);
+
+-- Historial de accesos
+CREATE INDEX IF NOT EXISTS idx_registro_entradas_fecha_id
+    ON registro_entradas (fecha_entrada DESC, id_entrada DESC);
+
+-- Historial de turnos
+CREATE INDEX IF NOT EXISTS idx_turnos_caja_apertura_id
+    ON turnos_caja (fecha_apertura DESC, id_turno DESC);
+
+-- Historial de movimientos de inventario
+CREATE INDEX IF NOT EXISTS idx_movimientos_inventario_fecha_id
+    ON movimientos_inventario (fecha DESC, id_movimiento DESC);
+
+-- Verificación
+SELECT 'Índices de historiales configurados correctamente' AS status;
@@ -0,0 +1,48 @@
+-- Script para configurar PostgreSQL LISTEN/NOTIFY en notificaciones_pos
+-- Ejecutar este script en la base de datos de Supabase
+-- La ventana de pagos en efectivo escucha este canal en lugar de consultar
+-- cada 5 segundos; si no puede conectarse, vuelve a consultar periódicamente.
+
+-- 1. Crear función que notifica cuando cambia una notificación
+CREATE OR REPLACE FUNCTION notificar_cambio_notificacion_pos()
+RETURNS TRIGGER AS $$
+DECLARE
+    fila RECORD;
+    payload_json TEXT;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        fila := OLD;
+    ELSE
+        fila := NEW;
+    END IF;
+
+    -- Payload mínimo: el cliente vuelve a leer las pendientes con el miembro embebido
+    payload_json := json_build_object(
+        'operacion', TG_OP,
+        'id_notificacion', fila.id_notificacion,
+        'tipo_notificacion', COALESCE(fila.tipo_notificacion, ''),
+        'para_recepcion', fila.para_recepcion,
+        'respondida', fila.respondida
+    )::text;
+
+    -- Enviar notificación
+    PERFORM pg_notify('notificaciones_pos_canal', payload_json);
+
+    RETURN fila;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. Crear trigger que dispara la notificación
+DROP TRIGGER IF EXISTS trigger_notificar_cambio_notificacion_pos ON notificaciones_pos;
+
+CREATE TRIGGER trigger_notificar_cambio_notificacion_pos
+AFTER INSERT OR UPDATE OR DELETE ON notificaciones_pos
+FOR EACH ROW
+EXECUTE FUNCTION notificar_cambio_notificacion_pos();
+
+-- 3. Verificación
+SELECT 'Trigger de notificaciones_pos configurado correctamente' AS status;
+
+-- Para probar manualmente:
+-- LISTEN notificaciones_pos_canal;
+-- Luego insertar o actualizar una notificación y ver el aviso
@@ -0,0 +1,83 @@
+-- Vista e índices para la búsqueda paginada de miembros
+-- Ejecutar este script en el SQL Editor de Supabase
+--
+-- BuscarMiembroWindow ya no descarga la tabla completa: pide páginas de
+-- v_miembros_busqueda filtradas en el servidor (ILIKE sobre la columna
+-- busqueda) y los contadores del resumen con consultas count. El estado de
+-- la membresía se calcula aquí en lugar de en Python.
+
+-- 1. Búsqueda por subcadena con índice trigram
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Misma expresión que la columna busqueda de la vista, para que el ILIKE use el índice
+CREATE INDEX IF NOT EXISTS idx_miembros_busqueda_trgm
+    ON miembros USING gin ((
+        lower(
+            coalesce(nombres, '') || ' ' ||
+            coalesce(apellido_paterno, '') || ' ' ||
+            coalesce(apellido_materno, '') || ' ' ||
+            coalesce(telefono, '') || ' ' ||
+            coalesce(email, '') || ' ' ||
+            'm-' || lpad(id_miembro::text, 5, '0')
+        )
+    ) gin_trgm_ops);
+
+-- Orden de la lista (nombres, id) para paginar sin ordenar la tabla completa
+CREATE INDEX IF NOT EXISTS idx_miembros_nombres_id
+    ON miembros (nombres, id_miembro);
+
+-- Asignación vigente de cada miembro
+CREATE INDEX IF NOT EXISTS idx_asignaciones_activas_miembro_vigentes
+    ON asignaciones_activas (id_miembro, fecha_fin DESC)
+    WHERE activa AND NOT cancelada;
+
+-- 2. Vista con una fila por miembro y su asignación activa más reciente
+CREATE OR REPLACE VIEW v_miembros_busqueda AS
+SELECT
+    m.id_miembro,
+    m.nombres,
+    m.apellido_paterno,
+    m.apellido_materno,
+    m.telefono,
+    m.email,
+    m.contacto_emergencia,
+    m.telefono_emergencia,
+    m.codigo_qr,
+    m.activo,
+    to_char(m.fecha_registro, 'DD/MM/YYYY') AS fecha_registro,
+    to_char(m.fecha_nacimiento, 'DD/MM/YYYY') AS fecha_nacimiento,
+    a.membresia,
+    to_char(a.fecha_fin, 'DD/MM/YYYY') AS fecha_fin_membresia,
+    a.numero_locker,
+    CASE
+        WHEN a.fecha_fin IS NULL THEN NULL
+        WHEN a.fecha_fin < CURRENT_DATE THEN 'vencida'
+        WHEN a.fecha_fin <= CURRENT_DATE + 7 THEN 'por_vencer'
+        ELSE 'vigente'
+    END AS estado_vigencia,
+    lower(
+        coalesce(m.nombres, '') || ' ' ||
+        coalesce(m.apellido_paterno, '') || ' ' ||
+        coalesce(m.apellido_materno, '') || ' ' ||
+        coalesce(m.telefono, '') || ' ' ||
+        coalesce(m.email, '') || ' ' ||
+        'm-' || lpad(m.id_miembro::text, 5, '0')
+    ) AS busqueda
+FROM miembros m
+LEFT JOIN LATERAL (
+    SELECT
+        pd.nombre AS membresia,
+        aa.fecha_fin,
+        l.numero AS numero_locker
+    FROM asignaciones_activas aa
+    LEFT JOIN ca_productos_digitales pd ON pd.id_producto_digital = aa.id_producto_digital
+    LEFT JOIN lockers l ON l.id_locker = aa.id_locker
+    WHERE aa.id_miembro = m.id_miembro
+      AND aa.activa
+      AND NOT aa.cancelada
+    ORDER BY aa.fecha_fin DESC NULLS LAST
+    LIMIT 1
+) a ON TRUE;
+
+-- 3. Verificación
+SELECT 'Vista de búsqueda de miembros configurada correctamente' AS status;
@@ -136,6 +136,10 @@ class POSApplication:
                 self.turno_id = turno_abierto['id_turno']
                 logging.info(f"Usuario tiene turno {self.turno_id} ya abierto")
             
+            # Precargar índice del catálogo para que los escaneos no vayan a la red
+            if self.postgres_manager:
+                self.postgres_manager.cargar_indice_catalogo()
+            
             # Mostrar ventana principal
             self.show_main_window()
             
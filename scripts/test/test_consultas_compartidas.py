@@ -0,0 +1,128 @@
+"""
+Prueba de las consultas compartidas (single-flight)
+Dos lecturas idénticas que están en curso al mismo tiempo deben salir una
+sola vez a la red y recibir ambas la respuesta. Las consultas imitan a los
+builders de postgrest-py 2.x, que guardan la petición en query.request.
+
+Ejecutar con pytest o directamente.
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from database.consultas_compartidas import (
+    clave_consulta,
+    ejecutar_compartida,
+    obtener_consultas_compartidas
+)
+
+
+class SesionFalsa:
+    """Cliente HTTP con la URL base y la credencial"""
+
+    def __init__(self):
+        self.base_url = 'https://proyecto.supabase.co/rest/v1/'
+        self.headers = {'authorization': 'Bearer prueba'}
+
+
+class ParametrosFalsos:
+    """Parámetros de la URL (como httpx.QueryParams)"""
+
+    def __init__(self, **params):
+        self._params = params
+
+    def multi_items(self):
+        return list(self._params.items())
+
+
+class PeticionFalsa:
+    """Equivalente a postgrest.base_request_builder.RequestConfig"""
+
+    def __init__(self, sesion, tabla, **params):
+        self.session = sesion
+        self.path = f'{sesion.base_url}{tabla}'
+        self.http_method = 'GET'
+        self.headers = {}
+        self.params = ParametrosFalsos(**params)
+
+
+class ConsultaFalsa:
+    """Builder de consulta: execute espera a que se libere `salida` y cuenta las llamadas"""
+
+    ejecuciones = 0
+    lock = threading.Lock()
+
+    def __init__(self, peticion, salida):
+        self.request = peticion
+        self.salida = salida
+
+    def execute(self):
+        with ConsultaFalsa.lock:
+            ConsultaFalsa.ejecuciones += 1
+        self.salida.wait(5)
+        return {'data': [{'id_locker': 1, 'activo': True}]}
+
+
+def test_clave_se_lee_de_request():
+    sesion = SesionFalsa()
+    salida = threading.Event()
+    activos = ConsultaFalsa(PeticionFalsa(sesion, 'lockers', select='*', activo='eq.true'), salida)
+    otra = ConsultaFalsa(PeticionFalsa(sesion, 'lockers', select='*', activo='eq.false'), salida)
+
+    assert clave_consulta(activos) is not None
+    assert clave_consulta(activos) == clave_consulta(
+        ConsultaFalsa(PeticionFalsa(sesion, 'lockers', select='*', activo='eq.true'), salida)
+    )
+    assert clave_consulta(activos) != clave_consulta(otra)
+
+
+def test_lecturas_identicas_comparten_una_ejecucion():
+    sesion = SesionFalsa()
+    salida = threading.Event()
+    consultas = [
+        ConsultaFalsa(PeticionFalsa(sesion, 'lockers', select='*', activo='eq.true'), salida)
+        for _ in range(2)
+    ]
+    registro = obtener_consultas_compartidas()
+    compartidas_antes = registro.estadisticas()['compartidas']
+    ConsultaFalsa.ejecuciones = 0
+
+    resultados = [None, None]
+
+    def leer(indice):
+        resultados[indice] = ejecutar_compartida(consultas[indice])
+
+    hilos = [threading.Thread(target=leer, args=(i,)) for i in range(2)]
+    for hilo in hilos:
+        hilo.start()
+
+    # Liberar la consulta cuando la segunda ya está esperando a la primera
+    limite = time.monotonic() + 5
+    while registro.estadisticas()['compartidas'] == compartidas_antes and time.monotonic() < limite:
+        time.sleep(0.01)
+    salida.set()
+
+    for hilo in hilos:
+        hilo.join(5)
+
+    assert ConsultaFalsa.ejecuciones == 1
+    assert registro.estadisticas()['compartidas'] == compartidas_antes + 1
+    assert resultados[0] == resultados[1] == {'data': [{'id_locker': 1, 'activo': True}]}
+    # Cada solicitante recibe su propia copia
+    assert resultados[0] is not resultados[1]
+
+
+def main():
+    """Función principal"""
+    test_clave_se_lee_de_request()
+    test_lecturas_identicas_comparten_una_ejecucion()
+    print("\n✓ Dos lecturas idénticas compartieron una sola ejecución")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
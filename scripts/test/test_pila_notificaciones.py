@@ -0,0 +1,72 @@
+"""
+Prueba de la pila de notificaciones de entrada
+Con las MAX_VISIBLES notificaciones abiertas y una entrada en espera, al
+cerrar una notificación la entrada en espera debe quedar visible (el widget
+cerrado se reutiliza sin perder el lugar).
+
+Ejecutar con pytest o directamente.
+"""
+
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from PySide6.QtWidgets import QApplication, QWidget
+from PySide6.QtTest import QTest
+
+from ui.notificacion_entrada_widget import PilaNotificacionesEntrada
+
+
+def crear_entrada(numero):
+    """Entrada de prueba sin foto"""
+    return {
+        'id_entrada': numero,
+        'id_miembro': 100 + numero,
+        'nombres': f'Miembro{numero}',
+        'apellido_paterno': 'Prueba',
+        'apellido_materno': '',
+        'telefono': '5550000000',
+        'fecha_registro': '01/01/2025'
+    }
+
+
+def test_cerrar_notificacion_muestra_la_siguiente_en_espera():
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    ventana = QWidget()
+    ventana.resize(1280, 800)
+    ventana.show()
+
+    pila = PilaNotificacionesEntrada(ventana)
+    total = PilaNotificacionesEntrada.MAX_VISIBLES + 1
+    pila.agregar([crear_entrada(n) for n in range(1, total + 1)])
+
+    assert len(pila.visibles) == PilaNotificacionesEntrada.MAX_VISIBLES
+    assert len(pila.pendientes) == 1
+
+    # Cerrar la primera notificación como lo hace la recepción
+    pila.visibles[0].close()
+    QTest.qWait(50)
+    app.processEvents()
+
+    visibles = [n for n in pila.visibles if n.isVisible()]
+    assert len(visibles) == PilaNotificacionesEntrada.MAX_VISIBLES
+    assert len(pila.visibles) == PilaNotificacionesEntrada.MAX_VISIBLES
+    assert total in [n.miembro_data['id_entrada'] for n in visibles]
+    assert not pila.pendientes
+
+    pila.cerrar_todas()
+    ventana.close()
+
+
+def main():
+    """Función principal"""
+    test_cerrar_notificacion_muestra_la_siguiente_en_espera()
+    print("\n✓ La entrada en espera se mostró al cerrar una notificación")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
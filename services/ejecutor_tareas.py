@@ -0,0 +1,326 @@
+"""
+Ejecutor de tareas en segundo plano para HTF POS
+Un solo QThreadPool para toda la aplicación con prioridades, cancelación
+cooperativa, límite de trabajos de red simultáneos y tiempos por tarea.
+Reemplaza los QThread creados a mano por cada ventana.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Qt, Signal, Slot
+
+
+class Prioridad:
+    """Prioridad de una tarea: las de mayor valor se ejecutan primero"""
+
+    ESCANEO = 30       # Búsquedas por escaneo/QR y datos del acceso en curso
+    LISTA = 20         # Carga de listas, páginas y catálogos
+    EXPORTACION = 10   # Exportaciones a Excel/CSV
+    FONDO = 0          # Tareas de larga duración (listener de entradas)
+
+
+class TokenCancelacion:
+    """Marca de cancelación cooperativa, segura entre hilos"""
+
+    def __init__(self):
+        self._evento = threading.Event()
+
+    @property
+    def cancelado(self) -> bool:
+        return self._evento.is_set()
+
+    def cancelar(self):
+        self._evento.set()
+
+    def esperar(self, segundos: float) -> bool:
+        """Dormir hasta `segundos` o hasta que se cancele. True si se canceló."""
+        return self._evento.wait(segundos)
+
+
+class Tarea(QObject):
+    """
+    Trabajo enviado al ejecutor (resultado futuro).
+
+    Signals:
+        terminada(object): Valor devuelto por la función
+        fallida(str): Mensaje de la excepción lanzada
+        progreso(object): Resultados parciales enviados con reportar()
+        finalizada(): Se emite siempre al terminar, también si se canceló
+
+    Las señales llegan al hilo de la interfaz. Si la tarea se cancela,
+    terminada/fallida/progreso ya no se emiten.
+    """
+
+    terminada = Signal(object)
+    fallida = Signal(str)
+    progreso = Signal(object)
+    finalizada = Signal()
+
+    # Señales internas: se emiten desde el hilo del pool y se entregan en cola
+    _resultado_listo = Signal(bool, object)
+    _progreso_listo = Signal(object)
+
+    def __init__(self, funcion: Callable, nombre: str, prioridad: int, red: bool,
+                 clave=None, con_tarea: bool = False, parent=None):
+        super().__init__(parent)
+        self.funcion = funcion
+        self.nombre = nombre
+        self.prioridad = prioridad
+        self.red = red
+        self.clave = clave
+        self.con_tarea = con_tarea
+        self.token = TokenCancelacion()
+
+        # Tiempos (time.perf_counter)
+        self.encolada_en = time.perf_counter()
+        self.iniciada_en: Optional[float] = None
+        self.terminada_en: Optional[float] = None
+
+        self._finalizada = False
+        self._ocupa_red = False
+        self._resultado_listo.connect(self._entregar, Qt.QueuedConnection)
+        self._progreso_listo.connect(self._entregar_progreso, Qt.QueuedConnection)
+
+    @property
+    def cancelada(self) -> bool:
+        return self.token.cancelado
+
+    @property
+    def en_curso(self) -> bool:
+        return not self._finalizada
+
+    def cancelar(self):
+        """Cancelar: si no empezó no se ejecuta; si está corriendo se descarta su resultado"""
+        self.token.cancelar()
+
+    def reportar(self, valor):
+        """Enviar un resultado parcial a la interfaz (se llama desde la tarea)"""
+        if not self.cancelada:
+            self._progreso_listo.emit(valor)
+
+    def tiempos(self):
+        """(espera_ms, ejecucion_ms) o None si la tarea no llegó a ejecutarse"""
+        if self.iniciada_en is None or self.terminada_en is None:
+            return None
+        return (
+            (self.iniciada_en - self.encolada_en) * 1000,
+            (self.terminada_en - self.iniciada_en) * 1000
+        )
+
+    @Slot(object)
+    def _entregar_progreso(self, valor):
+        if not self.cancelada:
+            self.progreso.emit(valor)
+
+    @Slot(bool, object)
+    def _entregar(self, ok, valor):
+        if self._finalizada:
+            return
+        self._finalizada = True
+        try:
+            if not self.cancelada:
+                if ok:
+                    self.terminada.emit(valor)
+                else:
+                    self.fallida.emit(valor)
+        finally:
+            self.finalizada.emit()
+
+
+class _Ejecucion(QRunnable):
+    """Corre una Tarea en un hilo del pool"""
+
+    def __init__(self, tarea: Tarea):
+        super().__init__()
+        self.tarea = tarea
+
+    def run(self):
+        tarea = self.tarea
+        if tarea.cancelada:
+            # Reemplazada antes de empezar: no se ejecuta
+            tarea._resultado_listo.emit(True, None)
+            return
+
+        tarea.iniciada_en = time.perf_counter()
+        try:
+            if tarea.con_tarea:
+                ok, valor = True, tarea.funcion(tarea=tarea)
+            else:
+                ok, valor = True, tarea.funcion()
+        except Exception as e:
+            logging.error(f"[TAREA] Error en {tarea.nombre}: {e}")
+            ok, valor = False, str(e)
+        tarea.terminada_en = time.perf_counter()
+        tarea._resultado_listo.emit(ok, valor)
+
+
+class EjecutorTareas(QObject):
+    """
+    Ejecutor compartido sobre QThreadPool.
+
+    - Prioridades: escaneos antes que listas, listas antes que exportaciones.
+    - Las tareas de red se limitan a MAX_RED simultáneas; el resto espera en
+      una cola por prioridad sin ocupar hilos.
+    - Una tarea con la misma clave que otra pendiente la reemplaza (la
+      anterior se cancela), así cambiar rápido de ventana no apila cargas.
+    - Se registra el tiempo de espera y de ejecución de cada tarea.
+
+    Uso:
+        ejecutor = obtener_ejecutor()
+        ejecutor.enviar(funcion, arg, prioridad=Prioridad.LISTA,
+                        clave='miembros.lista', al_terminar=self.mostrar)
+    """
+
+    # Trabajos de red simultáneos hacia Supabase
+    MAX_RED = 4
+    # Hilos adicionales para tareas locales (disco, imágenes) y de larga duración
+    HILOS_LOCALES = 4
+    # Tareas que tardan más que esto se registran como lentas
+    UMBRAL_LENTA_MS = 2000
+
+    def __init__(self, max_red: Optional[int] = None, parent=None):
+        super().__init__(parent)
+        self._max_red = max_red or self.MAX_RED
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(self._max_red + self.HILOS_LOCALES)
+
+        self._cola_red = []  # heap de (-prioridad, secuencia, tarea)
+        self._secuencia = itertools.count()
+        self._red_activas = 0
+        self._por_clave: Dict[Any, Tarea] = {}
+        self._activas = set()
+        self._estadisticas: Dict[str, Dict[str, float]] = {}
+
+    def enviar(self, funcion: Callable, *args, nombre: Optional[str] = None,
+               prioridad: int = Prioridad.LISTA, red: bool = True, clave=None,
+               con_tarea: bool = False, al_terminar: Optional[Callable] = None,
+               al_fallar: Optional[Callable] = None, al_progresar: Optional[Callable] = None,
+               **kwargs) -> Tarea:
+        """
+        Enviar una función al pool.
+
+        Args:
+            funcion: Función a ejecutar con *args y **kwargs
+            nombre: Nombre para logs y estadísticas (default: nombre de la función)
+            prioridad: Valor de Prioridad
+            red: Cuenta para el límite de trabajos de red simultáneos
+            clave: Las tareas con la misma clave se reemplazan entre sí
+            con_tarea: Pasar la Tarea como argumento `tarea` (para revisar
+                tarea.token y llamar tarea.reportar)
+            al_terminar / al_fallar / al_progresar: Callbacks (hilo de la interfaz)
+
+        Returns:
+            Tarea para conectar señales o cancelar
+        """
+        if clave is not None:
+            anterior = self._por_clave.get(clave)
+            if anterior is not None:
+                anterior.cancelar()
+
+        if args or kwargs:
+            base = funcion
+            if con_tarea:
+                funcion = lambda tarea: base(*args, tarea=tarea, **kwargs)
+            else:
+                funcion = lambda: base(*args, **kwargs)
+            nombre = nombre or getattr(base, '__name__', 'tarea')
+        nombre = nombre or getattr(funcion, '__name__', 'tarea')
+
+        tarea = Tarea(funcion, nombre, prioridad, red, clave, con_tarea, self)
+        if al_terminar:
+            tarea.terminada.connect(al_terminar)
+        if al_fallar:
+            tarea.fallida.connect(al_fallar)
+        if al_progresar:
+            tarea.progreso.connect(al_progresar)
+        tarea.finalizada.connect(lambda t=tarea: self._finalizar(t))
+
+        self._activas.add(tarea)
+        if clave is not None:
+            self._por_clave[clave] = tarea
+
+        if red:
+            heapq.heappush(self._cola_red, (-prioridad, next(self._secuencia), tarea))
+            self._despachar()
+        else:
+            self._pool.start(_Ejecucion(tarea), prioridad)
+        return tarea
+
+    def cancelar(self, clave):
+        """Cancelar la tarea pendiente con esa clave"""
+        tarea = self._por_clave.get(clave)
+        if tarea is not None:
+            tarea.cancelar()
+
+    def pendientes(self) -> int:
+        """Tareas enviadas que aún no terminan"""
+        return len(self._activas)
+
+    def estadisticas(self) -> Dict[str, Dict[str, float]]:
+        """Tiempos por nombre de tarea: ejecuciones, ms_total, ms_max, espera_ms_max"""
+        return {nombre: dict(datos) for nombre, datos in self._estadisticas.items()}
+
+    def detener(self, timeout_ms: int = 3000) -> bool:
+        """Cancelar todo y esperar a los hilos (al cerrar la aplicación)"""
+        for tarea in list(self._activas):
+            tarea.cancelar()
+        return self._pool.waitForDone(timeout_ms)
+
+    def _despachar(self):
+        """Pasar al pool las tareas de red en espera mientras haya cupo"""
+        while self._cola_red and self._red_activas < self._max_red:
+            _, _, tarea = heapq.heappop(self._cola_red)
+            if tarea.cancelada:
+                # Reemplazada mientras esperaba: termina sin ocupar un hilo
+                tarea._resultado_listo.emit(True, None)
+                continue
+            tarea._ocupa_red = True
+            self._red_activas += 1
+            self._pool.start(_Ejecucion(tarea), tarea.prioridad)
+
+    def _finalizar(self, tarea: Tarea):
+        self._activas.discard(tarea)
+        if tarea.clave is not None and self._por_clave.get(tarea.clave) is tarea:
+            del self._por_clave[tarea.clave]
+        if tarea._ocupa_red:
+            tarea._ocupa_red = False
+            self._red_activas -= 1
+
+        self._registrar_tiempos(tarea)
+        tarea.deleteLater()
+        self._despachar()
+
+    def _registrar_tiempos(self, tarea: Tarea):
+        tiempos = tarea.tiempos()
+        if tiempos is None:
+            return
+        espera_ms, ejecucion_ms = tiempos
+
+        datos = self._estadisticas.setdefault(
+            tarea.nombre, {'ejecuciones': 0, 'ms_total': 0.0, 'ms_max': 0.0, 'espera_ms_max': 0.0}
+        )
+        datos['ejecuciones'] += 1
+        datos['ms_total'] += ejecucion_ms
+        datos['ms_max'] = max(datos['ms_max'], ejecucion_ms)
+        datos['espera_ms_max'] = max(datos['espera_ms_max'], espera_ms)
+
+        if ejecucion_ms > self.UMBRAL_LENTA_MS and tarea.prioridad != Prioridad.FONDO:
+            logging.warning(f"[TAREA] {tarea.nombre} lenta: {ejecucion_ms:.0f} ms (espera {espera_ms:.0f} ms)")
+        else:
+            logging.debug(f"[TAREA] {tarea.nombre}: {ejecucion_ms:.0f} ms (espera {espera_ms:.0f} ms)")
+
+
+_ejecutor: Optional[EjecutorTareas] = None
+
+
+def obtener_ejecutor() -> EjecutorTareas:
+    """Ejecutor compartido de la aplicación (se crea en el hilo de la interfaz)"""
+    global _ejecutor
+    if _ejecutor is None:
+        _ejecutor = EjecutorTareas()
+    return _ejecutor
@@ -0,0 +1,267 @@
+"""
+Exportación de tablas a Excel/CSV en segundo plano
+Las filas se consumen de un iterable (normalmente las páginas de una
+consulta por cursor) y se escriben conforme llegan en un libro write-only de
+openpyxl, o en CSV si openpyxl no está instalado. La memoria no crece con la
+cantidad de filas y el trabajo corre en el pool, fuera del hilo de la
+interfaz.
+"""
+
+import csv
+import logging
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+    logging.warning("openpyxl no disponible, las exportaciones se generarán en CSV")
+
+
+# Extensión de los archivos generados según lo instalado
+EXTENSION = 'xlsx' if OPENPYXL_AVAILABLE else 'csv'
+# Carpeta del escritorio del usuario (destino de los reportes de ventas e inventario)
+CARPETA_ESCRITORIO = os.path.join(os.path.expanduser("~"), "Desktop")
+# Filas por página al recorrer una consulta para exportar. obtener_pagina_keyset
+# pide una fila extra para saber si hay más y Supabase devuelve a lo sumo 1000
+# por consulta: con 1000 la fila extra nunca llega y la exportación se corta
+# en la primera página
+TAMANO_PAGINA_EXPORTACION = 500
+# Cada cuántas filas se informa el avance a la interfaz
+FILAS_POR_AVISO = 500
+
+
+def fecha_a_texto(valor, formato="%d/%m/%Y %H:%M", vacio="") -> str:
+    """Texto de una fecha (datetime, date o texto ISO de Supabase)"""
+    if valor is None or valor == '':
+        return vacio
+    if isinstance(valor, str):
+        try:
+            valor = datetime.fromisoformat(valor.replace('Z', '+00:00'))
+        except ValueError:
+            return valor
+    if hasattr(valor, 'strftime'):
+        return valor.strftime(formato)
+    return str(valor)
+
+
+def ruta_exportacion(prefijo, carpeta='') -> str:
+    """Ruta `<carpeta>/<prefijo>_<fecha>.<xlsx|csv>` para un archivo nuevo"""
+    fecha_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(carpeta, f"{prefijo}_{fecha_str}.{EXTENSION}")
+
+
+class ColumnaExportacion:
+    """
+    Definición de una columna del archivo exportado.
+
+    Args:
+        titulo: Texto del encabezado
+        campo: Llave del dict de la fila (se usa si no hay función valor)
+        valor: Función fila -> valor de la celda
+        ancho: Ancho de la columna en Excel (caracteres)
+        formato_numero: number_format de Excel, p. ej. '$#,##0.00'
+        centrar: Centrar el valor en la celda
+        resaltar: Función fila -> bool; si es True la celda va en rojo y negritas
+    """
+
+    def __init__(self, titulo, campo=None, valor=None, ancho=15, formato_numero=None,
+                 centrar=False, resaltar=None):
+        self.titulo = titulo
+        self.campo = campo
+        self._valor = valor
+        self.ancho = ancho
+        self.formato_numero = formato_numero
+        self.centrar = centrar
+        self.resaltar = resaltar
+
+    def valor(self, fila):
+        """Valor de la celda para la fila"""
+        if self._valor:
+            return self._valor(fila)
+        return fila.get(self.campo) if self.campo else None
+
+
+def filas_paginadas(obtener_pagina: Callable[..., Dict], filtros: Optional[Dict] = None,
+                    cursor=None, hay_mas: bool = True, cargadas: Iterable[dict] = (),
+                    convertir: Optional[Callable[[dict], dict]] = None,
+                    filtro: Optional[Callable[[dict], bool]] = None,
+                    tamano_pagina: int = TAMANO_PAGINA_EXPORTACION) -> Iterator[dict]:
+    """
+    Recorrer una consulta por cursor sin juntar sus filas.
+
+    Primero entrega las filas que la ventana ya tenía cargadas y luego pide
+    las páginas siguientes a partir de `cursor` (una a la vez, conforme se
+    escriben). Se consume en el pool: `obtener_pagina` hace red.
+
+    Args:
+        obtener_pagina: Método obtener_pagina_* de PostgresManager
+        filtros: Filtros de la consulta (los mismos de la pantalla)
+        cursor, hay_mas: Estado de la paginación de la pantalla
+        cargadas: Filas ya cargadas (ya convertidas)
+        convertir: Función fila del servidor -> fila de la pantalla
+        filtro: Función fila -> bool (filtro de texto que no va al servidor)
+    """
+    for fila in cargadas:
+        if filtro is None or filtro(fila):
+            yield fila
+
+    while hay_mas:
+        pagina = obtener_pagina(cursor=cursor, tamano_pagina=tamano_pagina, **(filtros or {}))
+        for fila in pagina['filas']:
+            if convertir:
+                fila = convertir(fila)
+            if filtro is None or filtro(fila):
+                yield fila
+        cursor, hay_mas = pagina['cursor'], pagina['hay_mas']
+
+
+def exportar_filas(filas: Iterable[dict], columnas: List[ColumnaExportacion], ruta: str,
+                   titulo_hoja: str = "Datos", color_encabezado: str = "1E3A8A",
+                   bordes: bool = False, tarea=None) -> Optional[Dict]:
+    """
+    Escribir las filas en `ruta` (.xlsx, o .csv si openpyxl no está instalado).
+
+    Se ejecuta en el pool con con_tarea=True: revisa la cancelación en cada
+    fila e informa el avance con tarea.reportar(filas_escritas). El archivo
+    se escribe primero como parcial y solo se renombra a `ruta` al terminar,
+    así una exportación cancelada o fallida no deja archivos a medias.
+
+    Returns:
+        Dict con 'ruta' y 'filas', o None si se canceló
+    """
+    base, extension = os.path.splitext(ruta)
+    parcial = f"{base}.parcial{extension}"
+
+    try:
+        if extension.lower() == '.csv':
+            total = _escribir_csv(filas, columnas, parcial, tarea)
+        else:
+            total = _escribir_xlsx(filas, columnas, parcial, titulo_hoja, color_encabezado, bordes, tarea)
+
+        if total is None:
+            _eliminar(parcial)
+            logging.info(f"Exportación cancelada: {ruta}")
+            return None
+
+        os.replace(parcial, ruta)
+
+    except Exception:
+        _eliminar(parcial)
+        raise
+
+    logging.info(f"Exportación completada: {ruta} ({total} filas)")
+    return {'ruta': ruta, 'filas': total}
+
+
+# ========== ESCRITURA ==========
+
+def _cancelada(tarea) -> bool:
+    return tarea is not None and tarea.token.cancelado
+
+
+def _avisar(tarea, total):
+    if tarea is not None and total % FILAS_POR_AVISO == 0:
+        tarea.reportar(total)
+
+
+def _escribir_xlsx(filas, columnas, ruta, titulo_hoja, color_encabezado, bordes, tarea) -> Optional[int]:
+    """Libro write-only: cada fila se vuelca al archivo temporal de openpyxl al agregarla"""
+    if not OPENPYXL_AVAILABLE:
+        raise RuntimeError("openpyxl no está instalado")
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(titulo_hoja[:31])
+
+    # En modo write-only los anchos se fijan antes de la primera fila
+    for indice, columna in enumerate(columnas, start=1):
+        ws.column_dimensions[get_column_letter(indice)].width = columna.ancho
+
+    # Estilos compartidos por todas las celdas
+    borde = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    ) if bordes else None
+    centrado = Alignment(horizontal="center", vertical="center")
+    fuente_resaltada = Font(color="FF0000", bold=True)
+    relleno_encabezado = PatternFill(start_color=color_encabezado, end_color=color_encabezado, fill_type="solid")
+    fuente_encabezado = Font(bold=True, color="FFFFFF", size=12)
+
+    encabezado = []
+    for columna in columnas:
+        celda = WriteOnlyCell(ws, value=columna.titulo)
+        celda.fill = relleno_encabezado
+        celda.font = fuente_encabezado
+        celda.alignment = centrado
+        if borde:
+            celda.border = borde
+        encabezado.append(celda)
+    ws.append(encabezado)
+
+    total = 0
+    for fila in filas:
+        if _cancelada(tarea):
+            return None
+
+        valores = []
+        for columna in columnas:
+            valor = columna.valor(fila)
+            resaltada = columna.resaltar is not None and columna.resaltar(fila)
+            if not (borde or columna.formato_numero or columna.centrar or resaltada):
+                valores.append(valor)
+                continue
+
+            celda = WriteOnlyCell(ws, value=valor)
+            if borde:
+                celda.border = borde
+            if columna.formato_numero:
+                celda.number_format = columna.formato_numero
+            if columna.centrar:
+                celda.alignment = centrado
+            if resaltada:
+                celda.font = fuente_resaltada
+            valores.append(celda)
+
+        ws.append(valores)
+        total += 1
+        _avisar(tarea, total)
+
+    wb.save(ruta)
+    return total
+
+
+def _escribir_csv(filas, columnas, ruta, tarea) -> Optional[int]:
+    """CSV con BOM para que Excel lo abra con acentos"""
+    with open(ruta, 'w', newline='', encoding='utf-8-sig') as archivo:
+        writer = csv.writer(archivo)
+        writer.writerow([columna.titulo for columna in columnas])
+
+        total = 0
+        for fila in filas:
+            if _cancelada(tarea):
+                return None
+
+            writer.writerow([
+                '' if valor is None else valor
+                for valor in (columna.valor(fila) for columna in columnas)
+            ])
+            total += 1
+            _avisar(tarea, total)
+
+    return total
+
+
+def _eliminar(ruta):
+    try:
+        if os.path.exists(ruta):
+            os.remove(ruta)
+    except OSError as e:
+        logging.error(f"No se pudo eliminar el archivo parcial {ruta}: {e}")
@@ -0,0 +1,201 @@
+"""
+Ocupación del gimnasio en tiempo real
+Lleva el conjunto de entradas abiertas (sin salida) con su hora de entrada.
+Las entradas llegan al momento desde MonitorEntradas y
+PostgresManager.registrar_entrada; las salidas y las entradas vencidas se
+recogen releyendo periódicamente las abiertas del servidor. Así "dentro
+ahora" se lee sin recorrer ni recargar el historial.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from database.async_manager import obtener_async
+
+
+def _a_datetime(valor) -> Optional[datetime]:
+    """Convertir la fecha de una entrada (datetime o texto ISO) a datetime"""
+    if isinstance(valor, datetime):
+        return valor
+    if isinstance(valor, str) and valor:
+        try:
+            return datetime.fromisoformat(valor.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return None
+
+
+class ServicioOcupacion(QObject):
+    """
+    Entradas abiertas: id_entrada -> fecha_entrada.
+
+    Uso:
+        ocupacion = obtener_ocupacion()
+        ocupacion.iniciar(pg_manager)            # carga las abiertas y programa la recarga
+        monitor.nueva_entrada_detectada.connect(ocupacion.registrar_entrada_monitor)
+        ocupacion.total()
+
+    Solo cuentan las entradas de las últimas VENTANA_HORAS: las más viejas
+    se descartan al consultar el total y cada INTERVALO_PODA_MS, así una
+    salida que nunca se registró no infla el conteo. Como el torniquete solo
+    avisa entradas, las abiertas se vuelven a leer cada INTERVALO_RECARGA_MS
+    (y con recargar(), p. ej. al actualizar el historial) para recoger las
+    salidas. Los métodos se pueden llamar desde el pool
+    (PostgresManager.registrar_entrada corre allí); las señales llegan al
+    hilo de la interfaz.
+
+    Signals:
+        ocupacion_cambiada(int): Nuevo total de personas dentro
+    """
+
+    ocupacion_cambiada = Signal(int)
+
+    # Antigüedad máxima de una entrada abierta para contarla como "dentro"
+    VENTANA_HORAS = 24
+    # Descarte de entradas fuera de la ventana
+    INTERVALO_PODA_MS = 60 * 1000
+    # Relectura de las entradas abiertas (así se recogen las salidas)
+    INTERVALO_RECARGA_MS = 5 * 60 * 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._abiertas: Dict[int, datetime] = {}
+        self._cargando = False
+        self._cambios_durante_carga = []  # (id_entrada, fecha_entrada)
+        self.iniciado = False
+        self.pg_manager = None
+
+        self.timer_poda = QTimer(self)
+        self.timer_poda.setInterval(self.INTERVALO_PODA_MS)
+        self.timer_poda.timeout.connect(self.podar)
+
+        self.timer_recarga = QTimer(self)
+        self.timer_recarga.setInterval(self.INTERVALO_RECARGA_MS)
+        self.timer_recarga.timeout.connect(self.recargar)
+
+    # ========== CARGA ==========
+
+    def iniciar(self, pg_manager):
+        """Cargar en segundo plano las entradas abiertas y programar poda y recarga"""
+        if self.iniciado:
+            return
+        self.iniciado = True
+        self.pg_manager = pg_manager
+
+        self.recargar()
+        self.timer_poda.start()
+        self.timer_recarga.start()
+
+    def recargar(self):
+        """Volver a leer las entradas abiertas en segundo plano"""
+        if self.pg_manager is None:
+            return
+
+        with self._lock:
+            self._cargando = True
+            self._cambios_durante_carga = []
+
+        desde = datetime.now() - timedelta(hours=self.VENTANA_HORAS)
+        obtener_async(self.pg_manager).ejecutar(
+            'obtener_entradas_abiertas',
+            desde,
+            clave='ocupacion.carga',
+            al_terminar=self.cargar,
+            al_fallar=self._on_error_carga
+        )
+
+    def cargar(self, filas):
+        """Reemplazar las entradas abiertas con las del servidor"""
+        abiertas = {}
+        for fila in filas or []:
+            fecha = _a_datetime(fila.get('fecha_entrada'))
+            if fila.get('id_entrada') is not None and fecha is not None:
+                abiertas[fila['id_entrada']] = fecha
+
+        with self._lock:
+            # Lo que llegó mientras se consultaba tiene prioridad sobre la carga
+            for id_entrada, fecha in self._cambios_durante_carga:
+                abiertas[id_entrada] = fecha
+            self._abiertas = abiertas
+            self._cargando = False
+            self._cambios_durante_carga = []
+            total = len(abiertas)
+
+        logging.info(f"[OCUPACION] Personas dentro (carga desde el servidor): {total}")
+        self.ocupacion_cambiada.emit(total)
+
+    def _on_error_carga(self, error):
+        """Sin carga inicial se sigue contando con los eventos que lleguen"""
+        logging.error(f"[OCUPACION] Error cargando entradas abiertas: {error}")
+        with self._lock:
+            self._cargando = False
+            self._cambios_durante_carga = []
+
+    # ========== EVENTOS ==========
+
+    def registrar_entrada(self, id_entrada, fecha_entrada=None):
+        """Sumar una entrada abierta"""
+        if id_entrada is None:
+            return
+        fecha = _a_datetime(fecha_entrada) or datetime.now()
+
+        with self._lock:
+            if self._cargando:
+                self._cambios_durante_carga.append((id_entrada, fecha))
+            if id_entrada in self._abiertas:
+                return
+            self._abiertas[id_entrada] = fecha
+            total = len(self._abiertas)
+
+        self.ocupacion_cambiada.emit(total)
+
+    def registrar_entrada_monitor(self, entrada_data):
+        """Slot para MonitorEntradas.nueva_entrada_detectada"""
+        if entrada_data:
+            self.registrar_entrada(entrada_data.get('id_entrada'), entrada_data.get('fecha_entrada'))
+
+    # ========== CONSULTA ==========
+
+    def total(self) -> int:
+        """Personas dentro ahora (sin las entradas fuera de la ventana)"""
+        with self._lock:
+            self._quitar_vencidas()
+            return len(self._abiertas)
+
+    # ========== VENTANA ==========
+
+    def podar(self):
+        """Descartar las entradas abiertas de hace más de VENTANA_HORAS"""
+        with self._lock:
+            quitadas = self._quitar_vencidas()
+            total = len(self._abiertas)
+
+        if quitadas:
+            logging.info(f"[OCUPACION] {quitadas} entrada(s) sin salida fuera de la ventana")
+            self.ocupacion_cambiada.emit(total)
+
+    def _quitar_vencidas(self) -> int:
+        """Quitar las entradas vencidas (con el lock tomado). Devuelve cuántas"""
+        # Las fechas de Supabase traen zona; se comparan como hora local
+        limite = datetime.now() - timedelta(hours=self.VENTANA_HORAS)
+        vencidas = [
+            id_entrada for id_entrada, fecha in self._abiertas.items()
+            if fecha.replace(tzinfo=None) < limite
+        ]
+        for id_entrada in vencidas:
+            del self._abiertas[id_entrada]
+        return len(vencidas)
+
+
+# Una instancia para toda la aplicación (se crea al importar, en el hilo de la interfaz)
+_ocupacion = ServicioOcupacion()
+
+
+def obtener_ocupacion() -> ServicioOcupacion:
+    """Servicio de ocupación compartido"""
+    return _ocupacion
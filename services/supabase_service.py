@@ -6,6 +6,8 @@ import logging
 from datetime import datetime
 import os
 
+from database.consultas_compartidas import ejecutar_compartida
+
 # Nota: Se requiere instalar supabase: pip install supabase
 try:
     from supabase import create_client, Client
@@ -240,7 +242,7 @@ class SupabaseService:
             return 0
         
         try:
-            response = self.client.table('miembros').select('id_miembro', count='exact').eq('activo', True).execute()
+            response = ejecutar_compartida(self.client.table('miembros').select('id_miembro', count='exact').eq('activo', True))
             return response.count if response.count is not None else 0
         except Exception as e:
             logging.error(f"Error obteniendo total de miembros: {e}")
@@ -253,12 +255,13 @@ class SupabaseService:
         
         try:
             today = datetime.now().date().isoformat()
-            response = self.client.table('registro_entradas')\
-                .select('id_miembro', count='exact')\
-                .eq('tipo_acceso', 'miembro')\
-                .gte('fecha_entrada', f"{today}T00:00:00")\
-                .lte('fecha_entrada', f"{today}T23:59:59")\
-                .execute()
+            response = ejecutar_compartida(
+                self.client.table('registro_entradas')
+                .select('id_miembro', count='exact')
+                .eq('tipo_acceso', 'miembro')
+                .gte('fecha_entrada', f"{today}T00:00:00")
+                .lte('fecha_entrada', f"{today}T23:59:59")
+            )
             
             # Contar miembros únicos
             if response.data:
@@ -312,12 +315,13 @@ class SupabaseService:
             return None
         
         try:
-            response = self.client.table('miembros')\
-                .select('*')\
-                .eq('codigo_qr', codigo_qr)\
-                .eq('activo', True)\
-                .single()\
-                .execute()
+            response = ejecutar_compartida(
+                self.client.table('miembros')
+                .select('*')
+                .eq('codigo_qr', codigo_qr)
+                .eq('activo', True)
+                .single()
+            )
             
             return response.data if response.data else None
         except Exception as e:
@@ -369,20 +373,22 @@ class SupabaseService:
         
         try:
             # Total de lockers
-            total_response = self.client.table('lockers')\
-                .select('id_locker', count='exact')\
-                .eq('activo', True)\
-                .execute()
+            total_response = ejecutar_compartida(
+                self.client.table('lockers')
+                .select('id_locker', count='exact')
+                .eq('activo', True)
+            )
             
             total = total_response.count if total_response.count is not None else 0
             
             # Lockers ocupados (asignaciones activas con locker)
-            occupied_response = self.client.table('asignaciones_activas')\
-                .select('id_locker', count='exact')\
-                .eq('activa', True)\
-                .eq('cancelada', False)\
-                .not_.is_('id_locker', 'null')\
-                .execute()
+            occupied_response = ejecutar_compartida(
+                self.client.table('asignaciones_activas')
+                .select('id_locker', count='exact')
+                .eq('activa', True)
+                .eq('cancelada', False)
+                .not_.is_('id_locker', 'null')
+            )
             
             occupied = occupied_response.count if occupied_response.count is not None else 0
             
@@ -7,11 +7,12 @@ from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QFrame, QWidget, QGraphicsOpacityEffect, QGridLayout
 )
-from PySide6.QtCore import Qt, Signal, QSize, QPropertyAnimation, QEasingCurve, QThread, pyqtSignal
-from PySide6.QtGui import QFont, QPixmap, QPainter, QPainterPath, QColor, QCursor
+from PySide6.QtCore import Qt, Signal, QSize, QPropertyAnimation, QEasingCurve, QTimer
+from PySide6.QtGui import QFont, QCursor
 import logging
 from datetime import datetime
-import os
+
+from ui.avatar_cache import obtener_cache_avatares, obtener_iniciales
 
 from ui.components import (
     WindowsPhoneTheme,
@@ -19,26 +20,6 @@ from ui.components import (
 )
 
 
-class FotoLoaderThread(QThread):
-    """Hilo para cargar la foto del miembro de forma asíncrona"""
-    foto_loaded = pyqtSignal(QPixmap)
-    
-    def __init__(self, foto_path):
-        super().__init__()
-        self.foto_path = foto_path
-    
-    def run(self):
-        """Cargar la foto en un hilo separado"""
-        if self.foto_path and os.path.exists(self.foto_path):
-            pixmap = QPixmap(self.foto_path)
-            if not pixmap.isNull():
-                self.foto_loaded.emit(pixmap)
-                return
-        
-        # Si no hay foto o hay error, emitir None
-        self.foto_loaded.emit(None)
-
-
 class AccesoMiembroDialog(QDialog):
     """Diálogo para mostrar información del miembro al registrar acceso"""
     
@@ -47,7 +28,7 @@ class AccesoMiembroDialog(QDialog):
     def __init__(self, miembro_data, parent=None):
         super().__init__(parent)
         self.miembro_data = miembro_data
-        self.foto_thread = None
+        self.tarea_foto = None
         
         # Configuración de ventana
         self.setWindowTitle("Acceso al Gimnasio")
@@ -261,86 +242,31 @@ class AccesoMiembroDialog(QDialog):
     
     def cargar_foto_async(self):
         """Cargar foto del miembro de forma asíncrona"""
+        # Avatar ya decodificado (miembro que entró hace poco): mostrar directo
+        foto_path = self.miembro_data.get('foto')
+        cache = obtener_cache_avatares()
+        pixmap = cache.obtener(foto_path, 200)
+        if pixmap is not None:
+            self.foto_label.setPixmap(pixmap)
+            return
+        
         # Primero mostrar placeholder
         self.mostrar_placeholder()
         
-        # Crear un hilo para cargar la foto
-        foto_path = self.miembro_data.get('foto')
-        self.foto_thread = FotoLoaderThread(foto_path)
-        self.foto_thread.foto_loaded.connect(self.on_foto_loaded)
-        self.foto_thread.start()
+        # Decodificar la foto en el pool compartido
+        self.tarea_foto = cache.cargar(foto_path, 200, al_terminar=self.on_foto_loaded)
     
     def on_foto_loaded(self, pixmap):
-        """Manejar la carga de la foto cuando el hilo termina"""
-        if pixmap and not pixmap.isNull():
-            # Escalar manteniendo proporción
-            pixmap = pixmap.scaled(
-                200, 200,
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
-            # Crear imagen circular
-            pixmap = self.crear_imagen_circular(pixmap)
-            self.foto_label.setPixmap(pixmap)
-    
-    def crear_imagen_circular(self, pixmap):
-        """Crear una imagen circular a partir de un pixmap"""
-        # Crear un pixmap cuadrado del tamaño de la imagen
-        size = min(pixmap.width(), pixmap.height())
-        rounded = QPixmap(size, size)
-        rounded.fill(Qt.transparent)
-        
-        painter = QPainter(rounded)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        # Crear path circular
-        path = QPainterPath()
-        path.addEllipse(0, 0, size, size)
-        painter.setClipPath(path)
-        
-        # Dibujar imagen centrada
-        x = (size - pixmap.width()) // 2
-        y = (size - pixmap.height()) // 2
-        painter.drawPixmap(x, y, pixmap)
-        painter.end()
-        
-        return rounded
+        """Manejar la carga de la foto cuando la tarea termina"""
+        self.foto_label.setPixmap(pixmap)
     
     def mostrar_placeholder(self):
         """Mostrar placeholder cuando no hay foto"""
-        # Crear placeholder con iniciales
-        iniciales = self.obtener_iniciales()
-        
-        placeholder = QPixmap(200, 200)
-        placeholder.fill(Qt.transparent)
-        
-        painter = QPainter(placeholder)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        # Círculo de fondo
-        painter.setBrush(QColor(WindowsPhoneTheme.TILE_BLUE))
-        painter.setPen(Qt.NoPen)
-        painter.drawEllipse(0, 0, 200, 200)
-        
-        # Iniciales
-        painter.setPen(Qt.white)
-        painter.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, 60, QFont.Bold))
-        painter.drawText(0, 0, 200, 200, Qt.AlignCenter, iniciales)
-        
-        painter.end()
-        
+        placeholder = obtener_cache_avatares().placeholder(
+            obtener_iniciales(self.miembro_data), 200, WindowsPhoneTheme.TILE_BLUE, 60
+        )
         self.foto_label.setPixmap(placeholder)
     
-    def obtener_iniciales(self):
-        """Obtener iniciales del nombre del miembro"""
-        nombres = self.miembro_data.get('nombres', 'X').strip()
-        apellido = self.miembro_data.get('apellido_paterno', 'X').strip()
-        
-        inicial_nombre = nombres[0].upper() if nombres else 'X'
-        inicial_apellido = apellido[0].upper() if apellido else 'X'
-        
-        return f"{inicial_nombre}{inicial_apellido}"
-    
     def confirmar_acceso(self):
         """Confirmar y registrar el acceso"""
         logging.info(f"Acceso confirmado para miembro ID: {self.miembro_data.get('id_miembro')}")
@@ -400,10 +326,9 @@ class AccesoMiembroDialog(QDialog):
     
     def closeEvent(self, event):
         """Evento al cerrar el diálogo"""
-        # Detener hilo de carga de foto si está activo
-        if self.foto_thread and self.foto_thread.isRunning():
-            self.foto_thread.terminate()
-            self.foto_thread.wait()
+        # Descartar la carga de foto si sigue pendiente
+        if self.tarea_foto:
+            self.tarea_foto.cancelar()
             
         # Detener timer de actualización de hora
         if hasattr(self, 'update_timer'):
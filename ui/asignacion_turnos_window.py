@@ -369,16 +369,16 @@ class AsignacionTurnosWindow(QWidget):
             turnos_raw = response.data if response.data else []
             self.turnos_asignados = []
             
+            # Nombres de usuarios desde la caché de referencia (sin consulta por turno)
+            nombres_usuarios = self.pg_manager.obtener_nombres_usuarios()
+            
             for turno in turnos_raw:
-                # Obtener datos del usuario
-                response_usuario = self.pg_manager.client.table('usuarios').select('nombre_completo').eq('id_usuario', turno['id_usuario']).single().execute()
-                usuario = response_usuario.data if response_usuario.data else {}
-                
                 # Construir registro completo
                 turno_completo = turno.copy()
-                turno_completo['nombre_completo'] = usuario.get('nombre_completo', 'Desconocido')
+                turno_completo['nombre_completo'] = nombres_usuarios.get(turno['id_usuario'], 'Desconocido')
                 self.turnos_asignados.append(turno_completo)
-                self.actualizar_tabla()
+            
+            self.actualizar_tabla()
                 
         except Exception as e:
             logging.error(f"Error cargando turnos asignados: {e}")
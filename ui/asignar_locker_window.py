@@ -14,6 +14,8 @@ from PySide6.QtGui import QFont
 import logging
 from datetime import datetime, timedelta
 
+from database.consultas_compartidas import ejecutar_compartida
+
 from ui.components import (
     WindowsPhoneTheme,
     TileButton,
@@ -37,6 +39,12 @@ from ui.components import (
 class AsignarLockerDialog(QDialog):
     """Diálogo para asignar locker a miembro"""
     
+    # Columnas del miembro con sus asignaciones activas y el número de locker embebidos
+    SELECT_MIEMBRO_LOCKER = (
+        'id_miembro, nombres, apellido_paterno, apellido_materno, codigo_qr, telefono, activo, '
+        'asignaciones_activas(id_locker, activa, lockers(numero))'
+    )
+    
     def __init__(self, pg_manager, user_data, parent=None):
         super().__init__(parent)
         self.pg_manager = pg_manager
@@ -169,12 +177,11 @@ class AsignarLockerDialog(QDialog):
     def cargar_lockers_disponibles(self):
         """Cargar lockers disponibles (no asignados)"""
         try:
-            # Obtener todos los lockers activos
-            response = self.pg_manager.client.table('lockers').select('id_locker, numero, ubicacion, tipo').eq('activo', True).execute()
-            all_lockers = response.data if response.data else []
+            # Lockers activos desde la caché de referencia
+            all_lockers = self.pg_manager.get_lockers()
             
             # Obtener lockers ya asignados
-            response_asignados = self.pg_manager.client.table('asignaciones_activas').select('id_locker').eq('activa', True).execute()
+            response_asignados = ejecutar_compartida(self.pg_manager.client.table('asignaciones_activas').select('id_locker').eq('activa', True))
             locker_ids_asignados = {item['id_locker'] for item in (response_asignados.data or [])}
             
             # Filtrar lockers disponibles
@@ -192,6 +199,12 @@ class AsignarLockerDialog(QDialog):
             logging.error(f"Error cargando lockers disponibles: {e}")
             show_error_dialog(self, "Error", f"No se pudieron cargar los lockers:\n{str(e)}")
     
+    def consultar_miembros_con_locker(self):
+        """Consulta de miembros con solo sus asignaciones activas embebidas"""
+        return self.pg_manager.client.table('miembros')\
+            .select(self.SELECT_MIEMBRO_LOCKER)\
+            .eq('asignaciones_activas.activa', True)
+    
     def buscar_miembro(self):
         """Buscar miembro por código o nombre"""
         texto = self.input_miembro.text().strip()
@@ -201,57 +214,56 @@ class AsignarLockerDialog(QDialog):
             return
         
         try:
-            # Buscar por código QR
-            response = self.pg_manager.client.table('miembros').select('id_miembro, nombres, apellido_paterno, apellido_materno, codigo_qr, telefono, activo').eq('codigo_qr', texto).execute()
+            # Buscar por código QR (miembro, asignaciones y locker en una sola consulta)
+            response = self.consultar_miembros_con_locker().eq('codigo_qr', texto).execute()
             miembro = response.data[0] if response.data else None
             
             # Si no encuentra por código QR, buscar por nombre
             if not miembro:
-                response_nombres = self.pg_manager.client.table('miembros').select('id_miembro, nombres, apellido_paterno, apellido_materno, codigo_qr, telefono, activo').execute()
+                response_nombres = self.consultar_miembros_con_locker().execute()
                 for m in (response_nombres.data or []):
                     nombre_completo = f"{m.get('nombres', '')} {m.get('apellido_paterno', '')} {m.get('apellido_materno', '')}".lower()
                     if texto.lower() in nombre_completo:
                         miembro = m
                         break
-                
-                if not miembro:
-                    show_warning_dialog(self, "No encontrado", f"No se encontró ningún miembro con: {texto}")
-                    self.label_info_miembro.setText("")
-                    self.miembro_seleccionado = None
-                    return
-                
-                if not miembro['activo']:
-                    show_warning_dialog(
-                        self,
-                        "Miembro inactivo",
-                        f"El miembro '{miembro['nombre_completo']}' no está activo"
-                    )
-                    self.label_info_miembro.setText("")
-                    self.miembro_seleccionado = None
-                    return
-                
-                # Verificar si ya tiene locker
-                response_locker = self.pg_manager.client.table('asignaciones_activas').select('id_locker').eq('id_miembro', miembro['id_miembro']).eq('activa', True).execute()
-                locker_actual = None
-                if response_locker.data:
-                    # Obtener número del locker
-                    locker_id = response_locker.data[0]['id_locker']
-                    response_locker_num = self.pg_manager.client.table('lockers').select('numero').eq('id_locker', locker_id).single().execute()
-                    locker_actual = response_locker_num.data if response_locker_num.data else None
-                if locker_actual:
-                    show_warning_dialog(
-                        self,
-                        "Ya tiene locker",
-                        f"El miembro ya tiene asignado el locker: {locker_actual['numero']}"
-                    )
-                    self.label_info_miembro.setText("")
-                    self.miembro_seleccionado = None
-                    return
-                
-                self.miembro_seleccionado = miembro
-                self.label_info_miembro.setText(
-                    f"✓ Miembro: {miembro['nombre_completo']} | Tel: {miembro['telefono'] or 'N/A'}"
+            
+            if not miembro:
+                show_warning_dialog(self, "No encontrado", f"No se encontró ningún miembro con: {texto}")
+                self.label_info_miembro.setText("")
+                self.miembro_seleccionado = None
+                return
+            
+            miembro['nombre_completo'] = f"{miembro.get('nombres', '')} {miembro.get('apellido_paterno', '')} {miembro.get('apellido_materno', '') or ''}".strip()
+            
+            if not miembro['activo']:
+                show_warning_dialog(
+                    self,
+                    "Miembro inactivo",
+                    f"El miembro '{miembro['nombre_completo']}' no está activo"
                 )
+                self.label_info_miembro.setText("")
+                self.miembro_seleccionado = None
+                return
+            
+            # Verificar si ya tiene locker (viene embebido en la asignación activa)
+            locker_actual = next(
+                (a['lockers'] for a in (miembro.pop('asignaciones_activas', None) or []) if a.get('lockers')),
+                None
+            )
+            if locker_actual:
+                show_warning_dialog(
+                    self,
+                    "Ya tiene locker",
+                    f"El miembro ya tiene asignado el locker: {locker_actual['numero']}"
+                )
+                self.label_info_miembro.setText("")
+                self.miembro_seleccionado = None
+                return
+            
+            self.miembro_seleccionado = miembro
+            self.label_info_miembro.setText(
+                f"✓ Miembro: {miembro['nombre_completo']} | Tel: {miembro['telefono'] or 'N/A'}"
+            )
                 
         except Exception as e:
             logging.error(f"Error buscando miembro: {e}")
@@ -288,9 +300,11 @@ class AsignarLockerDialog(QDialog):
             fecha_fin = self.date_fin.date().toPython()
             id_usuario = self.user_data['id_usuario']
             
-            # Buscar producto digital de tipo locker
-            response = self.pg_manager.client.table('ca_productos_digitales').select('id_producto_digital').eq('tipo', 'locker').eq('activo', True).limit(1).execute()
-            producto = response.data[0] if response.data else None
+            # Buscar producto digital de tipo locker (caché de referencia)
+            producto = next(
+                (p for p in self.pg_manager.get_productos_digitales() if p.get('tipo') == 'locker'),
+                None
+            )
             
             if not producto:
                 show_warning_dialog(
@@ -465,21 +479,21 @@ class AsignacionesLockersWindow(QWidget):
     def cargar_asignaciones(self):
         """Cargar asignaciones activas de lockers"""
         try:
-            # Obtener asignaciones de lockers
-            response = self.pg_manager.client.table('asignaciones_activas').select('id_asignacion, id_miembro, id_locker, fecha_inicio, fecha_fin, activa').order('activa', desc=True).order('fecha_inicio', desc=True).execute()
+            # Asignaciones con locker, con miembro y locker embebidos (una sola consulta)
+            response = self.pg_manager.client.table('asignaciones_activas').select(
+                'id_asignacion, id_miembro, id_locker, fecha_inicio, fecha_fin, activa, '
+                'miembros(nombres, apellido_paterno, apellido_materno, codigo_qr), '
+                'lockers(numero, ubicacion)'
+            ).not_.is_('id_locker', 'null')\
+                .order('activa', desc=True)\
+                .order('fecha_inicio', desc=True)\
+                .execute()
             
-            # Filtrar solo aquellas con locker asignado (id_locker no nulo)
-            asignaciones_raw = [a for a in (response.data if response.data else []) if a.get('id_locker') is not None]
             self.asignaciones_data = []
             
-            for asig in asignaciones_raw:
-                # Obtener datos del miembro
-                response_miembro = self.pg_manager.client.table('miembros').select('nombres, apellido_paterno, apellido_materno, codigo_qr').eq('id_miembro', asig['id_miembro']).single().execute()
-                miembro = response_miembro.data if response_miembro.data else {}
-                
-                # Obtener datos del locker
-                response_locker = self.pg_manager.client.table('lockers').select('numero, ubicacion').eq('id_locker', asig['id_locker']).single().execute()
-                locker = response_locker.data if response_locker.data else {}
+            for asig in (response.data if response.data else []):
+                miembro = asig.get('miembros') or {}
+                locker = asig.get('lockers') or {}
                 
                 # Construir registro completo
                 asig_completa = {
@@ -495,7 +509,8 @@ class AsignacionesLockersWindow(QWidget):
                     'locker_ubicacion': locker.get('ubicacion')
                 }
                 self.asignaciones_data.append(asig_completa)
-                self.mostrar_asignaciones(self.asignaciones_data)
+            
+            self.mostrar_asignaciones(self.asignaciones_data)
                 
         except Exception as e:
             logging.error(f"Error cargando asignaciones: {e}")
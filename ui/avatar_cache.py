@@ -0,0 +1,214 @@
+"""
+Caché de avatares de miembros
+Las fotos se decodifican en el pool ya reducidas al tamaño del avatar
+(QImageReader) y recortadas en círculo; el resultado y los placeholders con
+iniciales se guardan como QPixmap en un LRU acotado por bytes, de modo que
+un miembro que entra varias veces al día se muestra sin volver a disco.
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QFont, QImage, QImageReader, QPainter, QPainterPath, QPixmap
+
+from services.ejecutor_tareas import Prioridad, Tarea, obtener_ejecutor
+from ui.components import WindowsPhoneTheme
+
+
+def decodificar_avatar(foto_path, tamano):
+    """
+    Leer la foto del miembro y devolver el avatar circular de `tamano` px
+    (se ejecuta en el pool). Devuelve un QImage porque QPixmap solo puede
+    crearse en el hilo de la interfaz; None si no hay foto o no se pudo leer.
+    """
+    if not foto_path or not os.path.exists(foto_path):
+        return None
+
+    reader = QImageReader(foto_path)
+    reader.setAutoTransform(True)
+
+    # Decodificar directo al tamaño necesario (cubriendo el círculo)
+    original = reader.size()
+    if original.isValid() and original.width() > tamano and original.height() > tamano:
+        reader.setScaledSize(original.scaled(tamano, tamano, Qt.KeepAspectRatioByExpanding))
+
+    imagen = reader.read()
+    if imagen.isNull():
+        logging.warning(f"No se pudo leer la foto {foto_path}: {reader.errorString()}")
+        return None
+
+    if imagen.width() != tamano and imagen.height() != tamano:
+        imagen = imagen.scaled(tamano, tamano, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+
+    # Recortar en círculo centrado
+    circular = QImage(tamano, tamano, QImage.Format_ARGB32_Premultiplied)
+    circular.fill(Qt.transparent)
+
+    painter = QPainter(circular)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+    path = QPainterPath()
+    path.addEllipse(0, 0, tamano, tamano)
+    painter.setClipPath(path)
+
+    x = (tamano - imagen.width()) // 2
+    y = (tamano - imagen.height()) // 2
+    painter.drawImage(x, y, imagen)
+    painter.end()
+
+    return circular
+
+
+def obtener_iniciales(miembro_data) -> str:
+    """Obtener iniciales del nombre del miembro"""
+    nombres = (miembro_data.get('nombres') or 'X').strip()
+    apellido = (miembro_data.get('apellido_paterno') or 'X').strip()
+
+    inicial_nombre = nombres[0].upper() if nombres else 'X'
+    inicial_apellido = apellido[0].upper() if apellido else 'X'
+
+    return f"{inicial_nombre}{inicial_apellido}"
+
+
+class AvatarCache:
+    """
+    Avatares circulares y placeholders listos para pintar, compartidos por
+    todas las ventanas.
+
+    Uso (hilo de la interfaz):
+        cache = obtener_cache_avatares()
+        label.setPixmap(cache.placeholder(iniciales, 180, color, 55))
+        pixmap = cache.obtener(foto_path, 180)
+        if pixmap is None:
+            self.tarea_foto = cache.cargar(foto_path, 180, al_terminar=self.on_foto_loaded)
+
+    El LRU se acota por bytes (ancho x alto x 4 por QPixmap), así que la
+    memoria no crece con la cantidad de notificaciones abiertas.
+    """
+
+    # Bytes máximos entre avatares y placeholders (~210 fotos de 180 px)
+    MAX_BYTES = 32 * 1024 * 1024
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self._max_bytes = max_bytes or self.MAX_BYTES
+        self._entradas: "OrderedDict[tuple, QPixmap]" = OrderedDict()
+        self._bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, foto_path, tamano) -> Optional[QPixmap]:
+        """Avatar ya decodificado de esa foto y tamaño, o None"""
+        if not foto_path:
+            return None
+        return self._leer(('foto', foto_path, tamano))
+
+    def cargar(self, foto_path, tamano, al_terminar: Callable[[QPixmap], None]) -> Optional[Tarea]:
+        """
+        Decodificar la foto en el pool y guardarla. `al_terminar` recibe el
+        QPixmap (solo si se pudo leer). Devuelve la tarea para cancelarla.
+        """
+        if not foto_path:
+            return None
+
+        def guardar_y_entregar(imagen):
+            if imagen is None or imagen.isNull():
+                return
+            pixmap = QPixmap.fromImage(imagen)
+            self._guardar(('foto', foto_path, tamano), pixmap)
+            al_terminar(pixmap)
+
+        return obtener_ejecutor().enviar(
+            decodificar_avatar,
+            foto_path,
+            tamano,
+            nombre='avatar.decodificar',
+            prioridad=Prioridad.ESCANEO,
+            red=False,
+            al_terminar=guardar_y_entregar
+        )
+
+    def placeholder(self, iniciales, tamano, color, tamano_fuente) -> QPixmap:
+        """Círculo de color con las iniciales del miembro"""
+        clave = ('placeholder', iniciales, tamano, color, tamano_fuente)
+        pixmap = self._leer(clave)
+        if pixmap is not None:
+            return pixmap
+
+        pixmap = QPixmap(tamano, tamano)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Círculo de fondo
+        painter.setBrush(QColor(color))
+        painter.setPen(Qt.NoPen)
+        painter.drawEllipse(0, 0, tamano, tamano)
+
+        # Iniciales
+        painter.setPen(Qt.white)
+        painter.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, tamano_fuente, QFont.Bold))
+        painter.drawText(0, 0, tamano, tamano, Qt.AlignCenter, iniciales)
+        painter.end()
+
+        self._guardar(clave, pixmap)
+        return pixmap
+
+    def invalidar(self, foto_path=None):
+        """Descartar los avatares de una foto (o todo si foto_path es None)"""
+        if foto_path is None:
+            self._entradas.clear()
+            self._bytes = 0
+            return
+        for clave in [c for c in self._entradas if c[0] == 'foto' and c[1] == foto_path]:
+            self._bytes -= self._tamano_bytes(self._entradas.pop(clave))
+
+    def estadisticas(self) -> Dict[str, int]:
+        """Aciertos, fallos, entradas y bytes ocupados"""
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'entradas': len(self._entradas),
+            'bytes': self._bytes
+        }
+
+    def _leer(self, clave) -> Optional[QPixmap]:
+        pixmap = self._entradas.get(clave)
+        if pixmap is None:
+            self.fallos += 1
+            return None
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        return pixmap
+
+    def _guardar(self, clave, pixmap: QPixmap):
+        anterior = self._entradas.pop(clave, None)
+        if anterior is not None:
+            self._bytes -= self._tamano_bytes(anterior)
+
+        self._entradas[clave] = pixmap
+        self._bytes += self._tamano_bytes(pixmap)
+
+        while self._bytes > self._max_bytes and len(self._entradas) > 1:
+            _, desalojado = self._entradas.popitem(last=False)
+            self._bytes -= self._tamano_bytes(desalojado)
+
+    @staticmethod
+    def _tamano_bytes(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * 4
+
+
+# Una caché para toda la aplicación (solo se usa desde el hilo de la interfaz)
+_cache: Optional[AvatarCache] = None
+
+
+def obtener_cache_avatares() -> AvatarCache:
+    """Obtener (o crear) la caché de avatares compartida"""
+    global _cache
+    if _cache is None:
+        _cache = AvatarCache()
+    return _cache
@@ -5,15 +5,15 @@ Usando componentes reutilizables del sistema de diseño
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, 
-    QPushButton, QTableWidget, QTableWidgetItem,
-    QHeaderView, QLineEdit, QSizePolicy, QFrame,
+    QPushButton, QLineEdit, QSizePolicy, QFrame,
     QLabel, QDialog, QGridLayout, QCheckBox
 )
-from PySide6.QtCore import Qt, Signal, QDate, QThread  # Eliminado pyqtSignal
+from PySide6.QtCore import Qt, Signal, QDate, QTimer  # Eliminado pyqtSignal
 from PySide6.QtGui import QFont
-from datetime import datetime, date, timedelta
 import logging
 
+from database.async_manager import obtener_async
+
 # Importar componentes del sistema de diseño
 from ui.components import (
     WindowsPhoneTheme,
@@ -24,7 +24,11 @@ from ui.components import (
     SearchBar,
     show_info_dialog,
     show_warning_dialog,
-    show_error_dialog
+    show_error_dialog,
+    ColumnaTabla,
+    TablaDatos,
+    EstadoDelegate,
+    conectar_scroll_infinito
 )
 
 
@@ -149,55 +153,41 @@ class DetalleMiembroDialog(QDialog):
             layout.addWidget(value_label, row, 1)
 
 
-class MiembrosLoaderThread(QThread):
-    """Hilo para cargar miembros de forma asíncrona"""
-    
-    miembros_loaded = Signal(list)  # Cambiado de pyqtSignal a Signal
-    error_occurred = Signal(str)   # Cambiado de pyqtSignal a Signal
-    
-    def __init__(self, supabase_service):
-        super().__init__()
-        self.supabase_service = supabase_service
-    
-    def run(self):
-        """Cargar miembros desde Supabase en un hilo separado"""
-        try:
-            if self.supabase_service and self.supabase_service.is_connected:
-                response = self.supabase_service.client.table('miembros')\
-                    .select('''
-                        *,
-                        asignaciones_activas(
-                            fecha_fin,
-                            activa,
-                            cancelada,
-                            ca_productos_digitales(nombre),
-                            lockers(numero)
-                        )
-                    ''')\
-                    .order('nombres')\
-                    .execute()
-                
-                rows = response.data if response.data else []
-                self.miembros_loaded.emit(rows)
-            else:
-                self.error_occurred.emit("No hay conexión a Supabase")
-        except Exception as e:
-            self.error_occurred.emit(str(e))
-
-
 class BuscarMiembroWindow(QWidget):
-    """Widget para buscar y gestionar miembros"""
+    """
+    Widget para buscar y gestionar miembros.
+    
+    La búsqueda, los filtros y los contadores se resuelven en el servidor
+    (v_miembros_busqueda): la ventana pide páginas de TAMANO_PAGINA_MIEMBROS
+    y carga la siguiente al desplazarse, así abre igual con 500 que con
+    50,000 miembros.
+    """
     
     cerrar_solicitado = Signal()
     
+    # Espera tras la última tecla antes de buscar
+    ESPERA_BUSQUEDA_MS = 300
+    
     def __init__(self, db_manager, supabase_service, user_data, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
         self.supabase_service = supabase_service
         self.user_data = user_data
+        self.db_async = obtener_async(db_manager)
         self.miembros_data = []
         self.miembros_filtrados = []
-        self.loader_thread = None
+        
+        # Estado de la paginación
+        self.offset = 0
+        self.hay_mas = False
+        self.resumen = {}
+        self.tarea_pagina = None
+        
+        # Buscar mientras se escribe, una sola consulta por pausa
+        self.timer_busqueda = QTimer(self)
+        self.timer_busqueda.setSingleShot(True)
+        self.timer_busqueda.setInterval(self.ESPERA_BUSQUEDA_MS)
+        self.timer_busqueda.timeout.connect(self.cargar_miembros)
         
         self.setup_ui()
         self.cargar_miembros()
@@ -227,13 +217,13 @@ class BuscarMiembroWindow(QWidget):
         self.check_solo_activos = QCheckBox("Solo activos")
         self.check_solo_activos.setChecked(True)
         self.check_solo_activos.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_NORMAL))
-        self.check_solo_activos.stateChanged.connect(self.aplicar_filtros)
+        self.check_solo_activos.stateChanged.connect(self.cargar_miembros)
         search_layout.addWidget(self.check_solo_activos)
         
         # Checkbox con membresía vigente
         self.check_membresia_vigente = QCheckBox("Con membresía vigente")
         self.check_membresia_vigente.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_NORMAL))
-        self.check_membresia_vigente.stateChanged.connect(self.aplicar_filtros)
+        self.check_membresia_vigente.stateChanged.connect(self.cargar_miembros)
         search_layout.addWidget(self.check_membresia_vigente)
         
         content_layout.addWidget(search_panel)
@@ -243,31 +233,34 @@ class BuscarMiembroWindow(QWidget):
         table_layout = QVBoxLayout(table_panel)
         table_layout.setContentsMargins(0, 0, 0, 0)
         
-        # Tabla de miembros
-        self.miembros_table = QTableWidget()
-        self.miembros_table.setColumnCount(8)
-        self.miembros_table.setHorizontalHeaderLabels([
-            "Código", "Nombre Completo", "Teléfono", "Email", 
-            "Membresía", "Vencimiento", "Locker", "Estado"
-        ])
-        
-        # Configurar header
-        header = self.miembros_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(1, QHeaderView.Stretch)
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.Stretch)
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(7, QHeaderView.ResizeToContents)
-        
-        # Estilo de la tabla
-        self.miembros_table.setAlternatingRowColors(True)
-        self.miembros_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.miembros_table.setSelectionMode(QTableWidget.SingleSelection)
-        self.miembros_table.verticalHeader().setVisible(False)
-        self.miembros_table.doubleClicked.connect(self.mostrar_detalle_miembro)
+        # Tabla de miembros (modelo/vista: solo se pintan las filas visibles)
+        colores_vigencia = {
+            'vencida': Qt.darkRed,
+            'por_vencer': Qt.darkYellow,
+            'vigente': Qt.darkGreen
+        }
+        columnas = [
+            ColumnaTabla("Código", 'codigo_miembro', alineacion=Qt.AlignCenter),
+            ColumnaTabla("Nombre Completo", 'nombre_completo', ancho='stretch'),
+            ColumnaTabla("Teléfono", 'telefono', alineacion=Qt.AlignCenter),
+            ColumnaTabla("Email", 'email', ancho='stretch'),
+            ColumnaTabla("Membresía", 'membresia', alineacion=Qt.AlignCenter),
+            ColumnaTabla(
+                "Vencimiento", 'fecha_fin_membresia',
+                alineacion=Qt.AlignCenter,
+                # Color según estado de vigencia
+                color=lambda m: colores_vigencia.get(m['estado_vigencia'])
+            ),
+            ColumnaTabla("Locker", 'locker', alineacion=Qt.AlignCenter),
+            ColumnaTabla("Estado", texto=lambda m: "ACTIVO" if m['activo'] else "INACTIVO", alineacion=Qt.AlignCenter)
+        ]
+        self.miembros_table = TablaDatos(columnas)
+        self.miembros_table.set_delegado_columna(7, EstadoDelegate({
+            "ACTIVO": WindowsPhoneTheme.TILE_GREEN,
+            "INACTIVO": WindowsPhoneTheme.TILE_RED
+        }))
+        self.miembros_table.fila_activada.connect(self.mostrar_detalle_miembro)
+        conectar_scroll_infinito(self.miembros_table, self.cargar_siguiente_pagina)
         
         table_layout.addWidget(self.miembros_table)
         content_layout.addWidget(table_panel)
@@ -299,89 +292,66 @@ class BuscarMiembroWindow(QWidget):
         content_layout.addWidget(info_buttons_panel)
         layout.addWidget(content)
     
+    def aplicar_filtros(self):
+        """Programar la búsqueda en el servidor al dejar de escribir"""
+        self.timer_busqueda.start()
+    
+    def obtener_filtros_servidor(self):
+        """Filtros actuales para PostgresManager.buscar_miembros_pagina"""
+        return {
+            'texto': self.search_bar.text().strip() or None,
+            'solo_activos': self.check_solo_activos.isChecked(),
+            'con_membresia': self.check_membresia_vigente.isChecked()
+        }
+    
     def cargar_miembros(self):
-        """Cargar todos los miembros desde Supabase de forma asíncrona"""
-        try:
-            # Mostrar indicador de carga
-            self.info_label.setText("Cargando miembros...")
-            self.miembros_table.setRowCount(0)
-            
-            # Detener hilo anterior si existe
-            if self.loader_thread and self.loader_thread.isRunning():
-                self.loader_thread.terminate()
-                self.loader_thread.wait()
-            
-            # Crear y ejecutar hilo de carga
-            self.loader_thread = MiembrosLoaderThread(self.supabase_service)
-            self.loader_thread.miembros_loaded.connect(self.procesar_datos_miembros)
-            self.loader_thread.error_occurred.connect(self.mostrar_error_carga)
-            self.loader_thread.start()
-            
-        except Exception as e:
-            logging.error(f"Error iniciando carga de miembros: {e}")
-            show_error_dialog(
-                self,
-                "Error al cargar",
-                "No se pudieron cargar los miembros",
-                detail=str(e)
-            )
+        """Recargar los miembros desde la primera página con los filtros actuales"""
+        # Una página que siga en camino queda reemplazada por esta carga
+        self.timer_busqueda.stop()
+        self.offset = 0
+        self.hay_mas = False
+        self.miembros_data = []
+        self.miembros_filtrados = []
+        self.miembros_table.set_filas([])
+        self.info_label.setText("Cargando miembros...")
+        self.iniciar_carga_pagina()
+    
+    def cargar_siguiente_pagina(self):
+        """Cargar la página siguiente si existe y no hay otra en curso"""
+        if not self.hay_mas or (self.tarea_pagina and self.tarea_pagina.en_curso):
+            return
+        
+        self.info_label.setText("Cargando más miembros...")
+        self.iniciar_carga_pagina()
+    
+    def iniciar_carga_pagina(self):
+        """Pedir la página siguiente al servidor en segundo plano"""
+        self.tarea_pagina = self.db_async.ejecutar(
+            'buscar_miembros_pagina',
+            offset=self.offset,
+            clave='buscar_miembro.pagina',
+            al_terminar=self.procesar_datos_miembros,
+            al_fallar=self.mostrar_error_carga,
+            **self.obtener_filtros_servidor()
+        )
     
-    def procesar_datos_miembros(self, rows):
-        """Procesar los datos de miembros cargados desde Supabase"""
+    def procesar_datos_miembros(self, pagina):
+        """Procesar una página de v_miembros_busqueda (fechas y vigencia ya vienen calculadas)"""
         try:
-            self.miembros_data = []
-            hoy = datetime.now().date()
+            estados_membresia = {
+                'vencida': 'Vencida',
+                'por_vencer': 'Por vencer',
+                'vigente': 'Vigente'
+            }
+            nuevos = []
             
-            for row in rows:
-                # Procesar fecha de nacimiento
-                fecha_nacimiento = row.get('fecha_nacimiento')
-                fecha_nacimiento_str = datetime.strptime(fecha_nacimiento, '%Y-%m-%d').strftime('%d/%m/%Y') if fecha_nacimiento else "N/A"
-                
-                # Procesar fecha de registro
-                fecha_registro = row.get('fecha_registro')
-                fecha_registro_str = datetime.strptime(fecha_registro, '%Y-%m-%d').strftime('%d/%m/%Y') if fecha_registro else "N/A"
-                
-                # Obtener información de asignación activa (si existe)
-                asignaciones = row.get('asignaciones_activas', [])
-                membresia = None
-                fecha_fin = None
-                fecha_fin_str = "N/A"
-                estado_vigencia = None
-                numero_locker = None
-                estado_membresia = None
-                
-                if asignaciones and len(asignaciones) > 0:
-                    # Filtrar solo asignaciones activas y no canceladas
-                    asignaciones_validas = [a for a in asignaciones if a.get('activa') and not a.get('cancelada')]
-                    
-                    if asignaciones_validas:
-                        asig = asignaciones_validas[0]
-                        if asig.get('ca_productos_digitales'):
-                            membresia = asig['ca_productos_digitales'].get('nombre')
-                        if asig.get('fecha_fin'):
-                            fecha_fin = datetime.strptime(asig['fecha_fin'], '%Y-%m-%d').date()
-                            fecha_fin_str = fecha_fin.strftime('%d/%m/%Y')
-                            
-                            # Calcular estado de vigencia
-                            if fecha_fin < hoy:
-                                estado_vigencia = 'vencida'
-                                estado_membresia = 'Vencida'
-                            elif fecha_fin <= (hoy + timedelta(days=7)):
-                                estado_vigencia = 'por_vencer'
-                                estado_membresia = 'Por vencer'
-                            else:
-                                estado_vigencia = 'vigente'
-                                estado_membresia = 'Vigente'
-                        
-                        if asig.get('lockers'):
-                            numero_locker = asig['lockers'].get('numero')
-                
-                # Construir objeto de miembro
-                self.miembros_data.append({
+            for row in pagina.get('filas', []):
+                numero_locker = row.get('numero_locker')
+                nuevos.append({
                     'id_miembro': row.get('id_miembro'),
                     'nombres': row.get('nombres', ''),
-                    'apellidos': f"{row.get('apellido_paterno', '')} {row.get('apellido_materno', '')}".strip(),
-                    'nombre_completo': f"{row.get('nombres', '')} {row.get('apellido_paterno', '')} {row.get('apellido_materno', '')}".strip(),
+                    'apellidos': f"{row.get('apellido_paterno') or ''} {row.get('apellido_materno') or ''}".strip(),
+                    'nombre_completo': f"{row.get('nombres') or ''} {row.get('apellido_paterno') or ''} {row.get('apellido_materno') or ''}".strip(),
                     'telefono': row.get('telefono') or 'N/A',
                     'email': row.get('email') or 'N/A',
                     'contacto_emergencia': row.get('contacto_emergencia') or 'N/A',
@@ -389,17 +359,26 @@ class BuscarMiembroWindow(QWidget):
                     'codigo_qr': row.get('codigo_qr', ''),
                     'codigo_miembro': f"M-{row.get('id_miembro', 0):05d}",
                     'activo': row.get('activo', False),
-                    'fecha_registro': fecha_registro_str,
-                    'fecha_nacimiento': fecha_nacimiento_str,
-                    'membresia': membresia or 'Sin membresía',
-                    'fecha_fin_membresia': fecha_fin_str,
-                    'estado_membresia': estado_membresia,
+                    'fecha_registro': row.get('fecha_registro') or "N/A",
+                    'fecha_nacimiento': row.get('fecha_nacimiento') or "N/A",
+                    'membresia': row.get('membresia') or 'Sin membresía',
+                    'fecha_fin_membresia': row.get('fecha_fin_membresia') or "N/A",
+                    'estado_membresia': estados_membresia.get(row.get('estado_vigencia')),
                     'locker': f"Locker {numero_locker}" if numero_locker else 'Sin locker',
-                    'estado_vigencia': estado_vigencia
+                    'estado_vigencia': row.get('estado_vigencia')
                 })
             
-            self.aplicar_filtros()
-            logging.info(f"Miembros cargados desde Supabase: {len(self.miembros_data)}")
+            self.offset = pagina.get('offset', self.offset)
+            self.hay_mas = pagina.get('hay_mas', False)
+            if 'resumen' in pagina:
+                self.resumen = pagina['resumen']
+            self.miembros_data.extend(nuevos)
+            
+            # Solo se insertan las filas nuevas; las ya mostradas no se tocan
+            self.miembros_table.agregar_filas(nuevos)
+            self.miembros_filtrados = self.miembros_table.filas_visibles()
+            self.actualizar_info()
+            logging.info(f"Página de miembros cargada: {len(nuevos)} (total {len(self.miembros_data)})")
             
         except Exception as e:
             logging.error(f"Error procesando datos de miembros: {e}")
@@ -410,6 +389,23 @@ class BuscarMiembroWindow(QWidget):
                 detail=str(e)
             )
     
+    def actualizar_info(self):
+        """Mostrar los contadores calculados en el servidor"""
+        total = self.resumen.get('total', len(self.miembros_data))
+        total_general = self.resumen.get('total_general', total)
+        activos = self.resumen.get('activos', 0)
+        con_membresia = self.resumen.get('con_membresia', 0)
+        mas = " (desplaza para cargar más)" if self.hay_mas else ""
+        
+        if total == total_general:
+            self.info_label.setText(
+                f"Total: {total} | Activos: {activos} | Con membresía: {con_membresia}{mas}"
+            )
+        else:
+            self.info_label.setText(
+                f"Mostrando {total} de {total_general} | Activos: {activos} | Con membresía: {con_membresia}{mas}"
+            )
+    
     def mostrar_error_carga(self, error_msg):
         """Mostrar mensaje de error al cargar miembros"""
         logging.error(f"Error cargando miembros: {error_msg}")
@@ -421,136 +417,13 @@ class BuscarMiembroWindow(QWidget):
         )
         self.info_label.setText("Error al cargar miembros")
     
-    def aplicar_filtros(self):
-        """Aplicar todos los filtros activos"""
-        try:
-            # Obtener criterios de filtro
-            texto_busqueda = self.search_bar.text().strip().lower()
-            solo_activos = self.check_solo_activos.isChecked()
-            membresia_vigente = self.check_membresia_vigente.isChecked()
-            
-            # Filtrar datos
-            self.miembros_filtrados = []
-            for miembro in self.miembros_data:
-                # Filtro de texto
-                if texto_busqueda:
-                    if not any([
-                        texto_busqueda in miembro['nombre_completo'].lower(),
-                        texto_busqueda in miembro['codigo_miembro'].lower(),
-                        texto_busqueda in (miembro['telefono'] or '').lower(),
-                        texto_busqueda in (miembro['email'] or '').lower()
-                    ]):
-                        continue
-                
-                # Filtro solo activos
-                if solo_activos and not miembro['activo']:
-                    continue
-                
-                # Filtro membresía vigente
-                if membresia_vigente and miembro['estado_vigencia'] not in ['vigente', 'por_vencer']:
-                    continue
-                
-                self.miembros_filtrados.append(miembro)
-            
-            self.mostrar_miembros(self.miembros_filtrados)
-            
-        except Exception as e:
-            logging.error(f"Error aplicando filtros: {e}")
-            self.mostrar_miembros(self.miembros_data)
-    
-    def mostrar_miembros(self, miembros):
-        """Mostrar miembros en la tabla"""
-        try:
-            self.miembros_table.setRowCount(0)
-            
-            for miembro in miembros:
-                row = self.miembros_table.rowCount()
-                self.miembros_table.insertRow(row)
-                
-                # Código
-                item_codigo = QTableWidgetItem(miembro['codigo_miembro'])
-                item_codigo.setTextAlignment(Qt.AlignCenter)
-                self.miembros_table.setItem(row, 0, item_codigo)
-                
-                # Nombre completo
-                self.miembros_table.setItem(row, 1, QTableWidgetItem(miembro['nombre_completo']))
-                
-                # Teléfono
-                item_telefono = QTableWidgetItem(miembro['telefono'])
-                item_telefono.setTextAlignment(Qt.AlignCenter)
-                self.miembros_table.setItem(row, 2, item_telefono)
-                
-                # Email
-                self.miembros_table.setItem(row, 3, QTableWidgetItem(miembro['email']))
-                
-                # Membresía
-                item_membresia = QTableWidgetItem(miembro['membresia'])
-                item_membresia.setTextAlignment(Qt.AlignCenter)
-                self.miembros_table.setItem(row, 4, item_membresia)
-                
-                # Vencimiento
-                item_vencimiento = QTableWidgetItem(miembro['fecha_fin_membresia'])
-                item_vencimiento.setTextAlignment(Qt.AlignCenter)
-                
-                # Color según estado de vigencia
-                if miembro['estado_vigencia'] == 'vencida':
-                    item_vencimiento.setForeground(Qt.darkRed)
-                elif miembro['estado_vigencia'] == 'por_vencer':
-                    item_vencimiento.setForeground(Qt.darkYellow)
-                elif miembro['estado_vigencia'] == 'vigente':
-                    item_vencimiento.setForeground(Qt.darkGreen)
-                
-                self.miembros_table.setItem(row, 5, item_vencimiento)
-                
-                # Locker
-                item_locker = QTableWidgetItem(miembro['locker'])
-                item_locker.setTextAlignment(Qt.AlignCenter)
-                self.miembros_table.setItem(row, 6, item_locker)
-                
-                # Estado
-                estado = "ACTIVO" if miembro['activo'] else "INACTIVO"
-                item_estado = QTableWidgetItem(estado)
-                item_estado.setTextAlignment(Qt.AlignCenter)
-                item_estado.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_NORMAL, QFont.Bold))
-                
-                if miembro['activo']:
-                    item_estado.setForeground(Qt.darkGreen)
-                else:
-                    item_estado.setForeground(Qt.darkRed)
-                
-                self.miembros_table.setItem(row, 7, item_estado)
-            
-            # Actualizar información
-            total_miembros = len(miembros)
-            total_general = len(self.miembros_data)
-            activos = sum(1 for m in miembros if m['activo'])
-            con_membresia = sum(1 for m in miembros if m['estado_vigencia'] in ['vigente', 'por_vencer'])
-            
-            if total_miembros == total_general:
-                self.info_label.setText(
-                    f"Total: {total_miembros} | Activos: {activos} | Con membresía: {con_membresia}"
-                )
-            else:
-                self.info_label.setText(
-                    f"Mostrando {total_miembros} de {total_general} | Activos: {activos} | Con membresía: {con_membresia}"
-                )
-            
-            logging.info(f"Mostrando {total_miembros} miembros en tabla")
-            
-        except Exception as e:
-            logging.error(f"Error mostrando miembros: {e}")
-            show_error_dialog(
-                self,
-                "Error de visualización",
-                "No se pudieron mostrar los miembros",
-                detail=str(e)
-            )
-    
-    def mostrar_detalle_miembro(self):
+    def mostrar_detalle_miembro(self, miembro=None):
         """Mostrar diálogo con detalle completo del miembro seleccionado"""
         try:
-            selected_rows = self.miembros_table.selectedItems()
-            if not selected_rows:
+            if not isinstance(miembro, dict):
+                miembro = self.miembros_table.fila_seleccionada()
+            
+            if not miembro:
                 show_warning_dialog(
                     self,
                     "Sin selección",
@@ -558,20 +431,8 @@ class BuscarMiembroWindow(QWidget):
                 )
                 return
             
-            # Obtener el índice de la fila seleccionada
-            row = self.miembros_table.currentRow()
-            codigo_miembro = self.miembros_table.item(row, 0).text()
-            
-            # Buscar el miembro en los datos filtrados
-            miembro_seleccionado = None
-            for miembro in self.miembros_filtrados:
-                if miembro['codigo_miembro'] == codigo_miembro:
-                    miembro_seleccionado = miembro
-                    break
-            
-            if miembro_seleccionado:
-                dialog = DetalleMiembroDialog(miembro_seleccionado, self)
-                dialog.exec()
+            dialog = DetalleMiembroDialog(miembro, self)
+            dialog.exec()
             
         except Exception as e:
             logging.error(f"Error mostrando detalle: {e}")
@@ -584,9 +445,9 @@ class BuscarMiembroWindow(QWidget):
     
     def closeEvent(self, event):
         """Evento al cerrar la ventana"""
-        # Detener hilo de carga si está activo
-        if self.loader_thread and self.loader_thread.isRunning():
-            self.loader_thread.terminate()
-            self.loader_thread.wait()
+        # Descartar la carga en curso (no se espera a la red)
+        self.timer_busqueda.stop()
+        if self.tarea_pagina:
+            self.tarea_pagina.cancelar()
             
         super().closeEvent(event)
\ No newline at end of file
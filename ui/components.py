@@ -4,10 +4,15 @@ Sistema de diseño unificado para toda la aplicación HTF POS
 """
 
 from PySide6.QtWidgets import (
-    QPushButton, QLabel, QFrame, QVBoxLayout, QHBoxLayout, QWidget, QDialog, QLineEdit
+    QPushButton, QLabel, QFrame, QVBoxLayout, QHBoxLayout, QWidget, QDialog, QLineEdit,
+    QTableView, QHeaderView, QAbstractItemView, QStyledItemDelegate, QStyleOptionViewItem,
+    QStyle, QApplication, QToolTip
 )
-from PySide6.QtCore import Qt, QSize, Signal
-from PySide6.QtGui import QFont, QCursor, QDoubleValidator, QIntValidator
+from PySide6.QtCore import (
+    Qt, QSize, Signal, QRect, QEvent, QTimer,
+    QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+)
+from PySide6.QtGui import QFont, QCursor, QDoubleValidator, QIntValidator, QColor, QPainter
 import qtawesome as qta
 
 
@@ -264,6 +269,14 @@ class TopBar(QFrame):
         
         layout.addStretch()
         
+        # Indicador de consultas en curso (no bloquea la interfaz)
+        self.busy_label = QLabel("⟳ Sincronizando...")
+        self.busy_label.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_SMALL))
+        self.busy_label.setObjectName("userInfo")
+        self.busy_label.setVisible(False)
+        layout.addWidget(self.busy_label)
+        layout.addSpacing(WindowsPhoneTheme.MARGIN_MEDIUM)
+        
         # Información de usuario
         user_info = QLabel(f"👤 {user_name} | {user_role}")
         user_info.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_SMALL))
@@ -273,6 +286,10 @@ class TopBar(QFrame):
     def set_title(self, new_title):
         """Actualizar el título de la barra superior"""
         self.title_label.setText(new_title)
+    
+    def set_ocupado(self, ocupado):
+        """Mostrar u ocultar el indicador de consultas en curso"""
+        self.busy_label.setVisible(ocupado)
 
 
 class StyledLabel(QLabel):
@@ -1537,3 +1554,489 @@ def aplicar_estilo_fecha(date_edit):
             alternate-background-color: #f5f5f5;
         }}
     """)
+
+
+def conectar_scroll_infinito(tabla, callback, umbral=0.9):
+    """
+    Llamar a callback cuando el usuario se acerca al final de la tabla.
+    
+    Sirve para los historiales paginados por cursor: la ventana carga la
+    siguiente página dentro de callback y decide si aún hay más datos.
+    
+    Si un filtro de texto local deja pocas filas, la tabla no tiene barra
+    que desplazar y el scroll nunca pediría más páginas. Por eso se devuelve
+    completar(): la ventana lo llama después de agregar una página o de
+    aplicar el filtro, y si las filas visibles no llenan la tabla se pide la
+    siguiente (callback ya ignora la llamada si no hay más o hay una en curso).
+    
+    Args:
+        tabla: QTableWidget / QAbstractItemView con barra vertical
+        callback: Función sin argumentos que carga la siguiente página
+        umbral: Fracción del recorrido a partir de la cual se dispara (0-1)
+    
+    Returns:
+        Función completar() sin argumentos
+    """
+    scrollbar = tabla.verticalScrollBar()
+    
+    def _al_desplazar(valor):
+        maximo = scrollbar.maximum()
+        if maximo > 0 and valor >= maximo * umbral:
+            callback()
+    
+    def _completar_si_falta():
+        alto_filas = tabla.model().rowCount() * max(1, tabla.verticalHeader().defaultSectionSize())
+        if scrollbar.maximum() == 0 or alto_filas < tabla.viewport().height():
+            callback()
+    
+    def completar():
+        # Se revisa en la siguiente vuelta del loop: la tabla ya recalculó su
+        # barra y una carga síncrona no se llama a sí misma recursivamente
+        QTimer.singleShot(0, _completar_si_falta)
+    
+    scrollbar.valueChanged.connect(_al_desplazar)
+    return completar
+
+
+# =====================================================
+# TABLAS VIRTUALIZADAS (MODELO / VISTA)
+# =====================================================
+
+class ColumnaTabla:
+    """
+    Definición de una columna para TablaModel / TablaDatos.
+    
+    Args:
+        titulo: Texto del encabezado
+        campo: Llave del dict de la fila (se usa si no hay función texto)
+        texto: Función fila -> str para el texto mostrado
+        alineacion: Alineación del texto (Qt.Alignment)
+        color: Función fila -> color (QColor, Qt.GlobalColor o "#hex") o None
+        negrita: Función fila -> bool para mostrar en negritas
+        orden: Función fila -> valor usado al ordenar (default: valor del campo)
+        ancho: 'stretch', 'contenido' o un ancho fijo en píxeles
+    """
+    
+    def __init__(self, titulo, campo=None, texto=None, alineacion=Qt.AlignLeft | Qt.AlignVCenter,
+                 color=None, negrita=None, orden=None, ancho='contenido'):
+        self.titulo = titulo
+        self.campo = campo
+        self._texto = texto
+        self.alineacion = alineacion
+        self.color = color
+        self.negrita = negrita
+        self._orden = orden
+        self.ancho = ancho
+    
+    def texto(self, fila):
+        """Texto a mostrar para la fila"""
+        if self._texto:
+            return self._texto(fila)
+        valor = fila.get(self.campo) if self.campo else None
+        return '' if valor is None else str(valor)
+    
+    def clave_orden(self, fila):
+        """Valor con el que se compara la fila al ordenar por esta columna"""
+        if self._orden:
+            return self._orden(fila)
+        if self.campo:
+            return fila.get(self.campo)
+        return self.texto(fila)
+
+
+class TablaModel(QAbstractTableModel):
+    """
+    Modelo de tabla sobre una lista de dicts.
+    
+    Los valores se calculan en data() solo para las celdas que la vista pinta,
+    por lo que mostrar miles de filas no crea un objeto por celda.
+    """
+    
+    FILA_ROLE = Qt.UserRole
+    ORDEN_ROLE = Qt.UserRole + 1
+    
+    def __init__(self, columnas, parent=None):
+        super().__init__(parent)
+        self._columnas = list(columnas)
+        self._filas = []
+        self._fuente_negrita = QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_NORMAL, QFont.Bold)
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._filas)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columnas)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self._columnas):
+            return self._columnas[section].titulo
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        fila = self._filas[index.row()]
+        columna = self._columnas[index.column()]
+        
+        if role == Qt.DisplayRole:
+            return columna.texto(fila)
+        if role == Qt.TextAlignmentRole:
+            return columna.alineacion
+        if role == Qt.ForegroundRole and columna.color:
+            color = columna.color(fila)
+            return QColor(color) if color is not None else None
+        if role == Qt.FontRole and columna.negrita and columna.negrita(fila):
+            return self._fuente_negrita
+        if role == self.FILA_ROLE:
+            return fila
+        if role == self.ORDEN_ROLE:
+            return columna.clave_orden(fila)
+        return None
+    
+    def columnas(self):
+        """Definiciones de columnas del modelo"""
+        return self._columnas
+    
+    def filas(self):
+        """Lista de filas (dicts) del modelo"""
+        return self._filas
+    
+    def fila(self, row):
+        """Obtener el dict de una fila del modelo"""
+        return self._filas[row]
+    
+    def set_filas(self, filas):
+        """Reemplazar todas las filas"""
+        self.beginResetModel()
+        self._filas = list(filas)
+        self.endResetModel()
+    
+    def agregar_filas(self, filas):
+        """Agregar filas al final (p. ej. la siguiente página de un historial)"""
+        if not filas:
+            return
+        inicio = len(self._filas)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(filas) - 1)
+        self._filas.extend(filas)
+        self.endInsertRows()
+    
+    def actualizar_fila(self, row, fila=None):
+        """Reemplazar (opcional) y repintar una sola fila"""
+        if fila is not None:
+            self._filas[row] = fila
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self._columnas) - 1))
+    
+    def quitar_fila(self, row):
+        """Eliminar una fila del modelo"""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._filas[row]
+        self.endRemoveRows()
+    
+    def refrescar_columna(self, columna):
+        """Repintar una columna calculada (p. ej. tiempos que dependen de la hora)"""
+        if self._filas:
+            self.dataChanged.emit(self.index(0, columna), self.index(len(self._filas) - 1, columna))
+    
+    def refrescar_celdas(self, rows, columna):
+        """Repintar una columna solo en algunas filas (un aviso por tramo contiguo)"""
+        inicio = anterior = None
+        for row in sorted(rows):
+            if inicio is None:
+                inicio = anterior = row
+            elif row == anterior + 1:
+                anterior = row
+            else:
+                self.dataChanged.emit(self.index(inicio, columna), self.index(anterior, columna))
+                inicio = anterior = row
+        if inicio is not None:
+            self.dataChanged.emit(self.index(inicio, columna), self.index(anterior, columna))
+
+
+class TablaFiltroProxy(QSortFilterProxyModel):
+    """Proxy de filtro y orden para TablaModel basado en un predicado por fila"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._predicado = None
+        self.setSortRole(TablaModel.ORDEN_ROLE)
+    
+    def set_filtro(self, predicado):
+        """Aplicar un predicado fila -> bool (None muestra todo)"""
+        self._predicado = predicado
+        self.invalidateFilter()
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._predicado is None:
+            return True
+        return bool(self._predicado(self.sourceModel().fila(source_row)))
+    
+    def lessThan(self, left, right):
+        a = left.data(self.sortRole())
+        b = right.data(self.sortRole())
+        if a is None:
+            return b is not None
+        if b is None:
+            return False
+        try:
+            return a < b
+        except TypeError:
+            return str(a) < str(b)
+
+
+def _pintar_fondo_celda(delegate, painter, option, index):
+    """Pintar fondo/selección estándar de la celda sin su texto"""
+    opt = QStyleOptionViewItem(option)
+    delegate.initStyleOption(opt, index)
+    opt.text = ''
+    style = opt.widget.style() if opt.widget else QApplication.style()
+    style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+
+
+class BotonesAccionDelegate(QStyledItemDelegate):
+    """
+    Pinta botones de acción dentro de una celda sin crear widgets por fila.
+    
+    Args:
+        acciones: Lista de dicts con 'clave', 'icono' y/o 'texto', 'color',
+            y opcionalmente 'color_hover', 'tooltip', 'ancho' y 'visible'
+            (función fila -> bool)
+    
+    Emite accion_solicitada(clave, fila) al hacer clic en un botón.
+    """
+    
+    accion_solicitada = Signal(str, object)
+    
+    def __init__(self, acciones, parent=None, ancho_boton=40, alto_boton=30, espacio=5):
+        super().__init__(parent)
+        self.acciones = acciones
+        self.ancho_boton = ancho_boton
+        self.alto_boton = alto_boton
+        self.espacio = espacio
+        self._fuente = QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_SMALL, QFont.Bold)
+        # Los íconos se crean una sola vez y se reutilizan en cada pintado
+        self._iconos = {
+            a['clave']: qta.icon(a['icono'], color='white') for a in acciones if a.get('icono')
+        }
+    
+    def _rects_botones(self, rect, fila):
+        """Calcular la posición de cada botón visible dentro de la celda"""
+        visibles = [a for a in self.acciones if not a.get('visible') or a['visible'](fila)]
+        anchos = [a.get('ancho', self.ancho_boton) for a in visibles]
+        total = sum(anchos) + self.espacio * max(len(visibles) - 1, 0)
+        
+        x = rect.x() + max((rect.width() - total) // 2, 0)
+        alto = min(self.alto_boton, rect.height() - 4)
+        y = rect.y() + (rect.height() - alto) // 2
+        
+        resultado = []
+        for accion, ancho in zip(visibles, anchos):
+            resultado.append((accion, QRect(x, y, ancho, alto)))
+            x += ancho + self.espacio
+        return resultado
+    
+    def paint(self, painter, option, index):
+        _pintar_fondo_celda(self, painter, option, index)
+        fila = index.data(TablaModel.FILA_ROLE)
+        
+        # Posición del mouse solo si está sobre la celda (para el color hover)
+        mouse = None
+        if option.state & QStyle.State_MouseOver and option.widget:
+            mouse = option.widget.viewport().mapFromGlobal(QCursor.pos())
+        
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        for accion, rect in self._rects_botones(option.rect, fila):
+            color = accion.get('color', WindowsPhoneTheme.TILE_BLUE)
+            if mouse is not None and accion.get('color_hover') and rect.contains(mouse):
+                color = accion['color_hover']
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(color))
+            painter.drawRoundedRect(rect, 3, 3)
+            
+            icono = self._iconos.get(accion['clave'])
+            texto = accion.get('texto')
+            if icono and not texto:
+                lado = min(16, rect.height() - 6)
+                icono.paint(painter, QRect(rect.center().x() - lado // 2, rect.center().y() - lado // 2, lado, lado))
+            elif icono:
+                lado = min(16, rect.height() - 6)
+                icono.paint(painter, QRect(rect.x() + 8, rect.center().y() - lado // 2, lado, lado))
+                painter.setPen(Qt.white)
+                painter.setFont(self._fuente)
+                painter.drawText(rect.adjusted(lado + 12, 0, -6, 0), Qt.AlignCenter, texto)
+            elif texto:
+                painter.setPen(Qt.white)
+                painter.setFont(self._fuente)
+                painter.drawText(rect, Qt.AlignCenter, texto)
+        painter.restore()
+    
+    def sizeHint(self, option, index):
+        fila = index.data(TablaModel.FILA_ROLE)
+        rects = self._rects_botones(QRect(0, 0, 0, self.alto_boton + 10), fila)
+        ancho = sum(r.width() for _, r in rects) + self.espacio * (len(rects) + 1)
+        return QSize(ancho, self.alto_boton + 10)
+    
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            fila = index.data(TablaModel.FILA_ROLE)
+            pos = event.position().toPoint()
+            for accion, rect in self._rects_botones(option.rect, fila):
+                if rect.contains(pos):
+                    self.accion_solicitada.emit(accion['clave'], fila)
+                    return True
+        return super().editorEvent(event, model, option, index)
+    
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QEvent.ToolTip:
+            fila = index.data(TablaModel.FILA_ROLE)
+            for accion, rect in self._rects_botones(option.rect, fila):
+                if rect.contains(event.pos()) and accion.get('tooltip'):
+                    QToolTip.showText(event.globalPos(), accion['tooltip'], view)
+                    return True
+        return super().helpEvent(event, view, option, index)
+
+
+class EstadoDelegate(QStyledItemDelegate):
+    """
+    Pinta el texto de la celda como etiqueta de color (estado).
+    
+    Args:
+        colores: Dict texto -> color, o función fila -> color
+        color_default: Color para textos sin color asignado
+    """
+    
+    def __init__(self, colores, color_default=WindowsPhoneTheme.TEXT_SECONDARY, parent=None):
+        super().__init__(parent)
+        self.colores = colores
+        self.color_default = color_default
+        self._fuente = QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_SMALL, QFont.Bold)
+    
+    def _color(self, texto, fila):
+        if callable(self.colores):
+            return self.colores(fila) or self.color_default
+        return self.colores.get(texto, self.color_default)
+    
+    def paint(self, painter, option, index):
+        _pintar_fondo_celda(self, painter, option, index)
+        texto = index.data(Qt.DisplayRole) or ''
+        if not texto:
+            return
+        
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setFont(self._fuente)
+        
+        metricas = painter.fontMetrics()
+        ancho = min(metricas.horizontalAdvance(texto) + 20, option.rect.width() - 8)
+        alto = min(metricas.height() + 8, option.rect.height() - 6)
+        rect = QRect(
+            option.rect.x() + (option.rect.width() - ancho) // 2,
+            option.rect.y() + (option.rect.height() - alto) // 2,
+            ancho, alto
+        )
+        
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(self._color(texto, index.data(TablaModel.FILA_ROLE))))
+        painter.drawRoundedRect(rect, alto / 2, alto / 2)
+        painter.setPen(Qt.white)
+        painter.drawText(rect, Qt.AlignCenter, texto)
+        painter.restore()
+    
+    def sizeHint(self, option, index):
+        base = super().sizeHint(option, index)
+        return QSize(base.width() + 24, base.height())
+
+
+class TablaDatos(QTableView):
+    """
+    Tabla virtualizada: TablaModel + TablaFiltroProxy sobre un QTableView.
+    
+    Las filas tienen alto fijo, así la vista solo calcula y pinta las que
+    están en pantalla. El filtrado y el orden se hacen en el proxy sin
+    reconstruir la tabla.
+    
+    Signals:
+        fila_activada(dict): Doble clic sobre una fila
+    """
+    
+    fila_activada = Signal(object)
+    
+    def __init__(self, columnas, alto_fila=40, ordenable=True, parent=None):
+        super().__init__(parent)
+        self.modelo = TablaModel(columnas, self)
+        self.proxy = TablaFiltroProxy(self)
+        self.proxy.setSourceModel(self.modelo)
+        self.setModel(self.proxy)
+        
+        # Alto de fila fijo: no se mide cada fila para el scroll
+        vertical = self.verticalHeader()
+        vertical.setVisible(False)
+        vertical.setSectionResizeMode(QHeaderView.Fixed)
+        vertical.setDefaultSectionSize(alto_fila)
+        
+        header = self.horizontalHeader()
+        header.setHighlightSections(False)
+        header.setResizeContentsPrecision(200)  # Medir solo una muestra de filas
+        for i, columna in enumerate(columnas):
+            if columna.ancho == 'stretch':
+                header.setSectionResizeMode(i, QHeaderView.Stretch)
+            elif isinstance(columna.ancho, int):
+                header.setSectionResizeMode(i, QHeaderView.Fixed)
+                header.resizeSection(i, columna.ancho)
+            else:
+                header.setSectionResizeMode(i, QHeaderView.ResizeToContents)
+        
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setAlternatingRowColors(True)
+        self.setWordWrap(False)
+        
+        if ordenable:
+            # Sin indicador inicial: se respeta el orden en que llegan las filas
+            header.setSortIndicator(-1, Qt.AscendingOrder)
+            self.setSortingEnabled(True)
+        
+        self.doubleClicked.connect(lambda index: self.fila_activada.emit(self.fila_en(index)))
+    
+    def set_filas(self, filas):
+        """Reemplazar todas las filas"""
+        self.modelo.set_filas(filas)
+    
+    def agregar_filas(self, filas):
+        """Agregar filas al final"""
+        self.modelo.agregar_filas(filas)
+    
+    def filtrar(self, predicado):
+        """Filtrar con un predicado fila -> bool (None muestra todo)"""
+        self.proxy.set_filtro(predicado)
+    
+    def set_delegado_columna(self, columna, delegado):
+        """Asignar un delegado (botones, estado) a una columna"""
+        delegado.setParent(self)
+        self.setItemDelegateForColumn(columna, delegado)
+    
+    def fila_en(self, index):
+        """Dict de la fila para un índice de la vista"""
+        return index.data(TablaModel.FILA_ROLE) if index.isValid() else None
+    
+    def fila_seleccionada(self):
+        """Dict de la fila seleccionada, o None"""
+        seleccion = self.selectionModel().selectedRows()
+        return self.fila_en(seleccion[0]) if seleccion else None
+    
+    def filas_visibles(self):
+        """Filas que pasan el filtro, en el orden mostrado"""
+        return [
+            self.proxy.index(row, 0).data(TablaModel.FILA_ROLE)
+            for row in range(self.proxy.rowCount())
+        ]
+    
+    def total_visibles(self):
+        """Número de filas que pasan el filtro"""
+        return self.proxy.rowCount()
+    
+    def total_filas(self):
+        """Número de filas en el modelo"""
+        return self.modelo.rowCount()
@@ -514,6 +514,9 @@ class EditableCatalogGrid(QWidget):
                     
                     # Actualizar en base de datos
                     self.pg_manager.client.table(tabla_nombre).update(cambios).eq('codigo_interno', codigo).execute()
+                    self.pg_manager.invalidar_indice_catalogo(
+                        codigo, 'varios' if es_producto_varios else 'suplemento'
+                    )
                     total_guardados += 1
                     
                 except Exception as e:
@@ -0,0 +1,92 @@
+"""
+Diálogo de avance para exportaciones a Excel/CSV
+Lanza services.exportador.exportar_filas en el pool y muestra cuántas filas
+van escritas con un botón para cancelar. El diálogo no es modal: la caja y
+las demás pantallas siguen respondiendo mientras se genera el archivo.
+"""
+
+import logging
+from typing import Iterable, List, Optional
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QProgressDialog
+
+from services.ejecutor_tareas import Prioridad, Tarea, obtener_ejecutor
+from services.exportador import ColumnaExportacion, exportar_filas
+from ui.components import show_error_dialog, show_info_dialog
+
+
+def iniciar_exportacion(parent, filas: Iterable[dict], columnas: List[ColumnaExportacion], ruta: str,
+                        descripcion: str, titulo_hoja: str = "Datos", red: bool = True,
+                        clave: Optional[str] = None, **opciones) -> Tarea:
+    """
+    Exportar `filas` a `ruta` en segundo plano.
+
+    `filas` se consume en el pool, así que puede ser un generador que pida
+    páginas al servidor (services.exportador.filas_paginadas); no debe leer
+    widgets. `opciones` se pasan a exportar_filas (color_encabezado, bordes).
+
+    Args:
+        parent: Ventana que solicita la exportación
+        descripcion: Qué se exporta, p. ej. "accesos" (para los mensajes)
+        red: La exportación consulta a Supabase mientras escribe
+        clave: Una exportación nueva con la misma clave cancela la anterior
+
+    Returns:
+        Tarea, para cancelarla si se cierra la ventana
+    """
+    dialogo = QProgressDialog(f"Exportando {descripcion}...", "Cancelar", 0, 0, parent)
+    dialogo.setWindowTitle("Exportando")
+    dialogo.setWindowModality(Qt.NonModal)
+    dialogo.setMinimumDuration(0)
+    dialogo.setAutoClose(False)
+    dialogo.setAutoReset(False)
+
+    def al_progresar(filas_escritas):
+        dialogo.setLabelText(f"Exportando {descripcion}... {filas_escritas:,} filas")
+
+    def al_terminar(resultado):
+        dialogo.close()
+        if not resultado:
+            return
+        show_info_dialog(
+            parent,
+            "Exportación completada",
+            f"Se exportaron {resultado['filas']:,} {descripcion}",
+            detail=f"Archivo guardado en:\n{resultado['ruta']}"
+        )
+
+    def al_fallar(error):
+        dialogo.close()
+        logging.error(f"Error exportando {descripcion}: {error}")
+        show_error_dialog(
+            parent,
+            "Error de exportación",
+            f"No se pudo exportar {descripcion}",
+            detail=error
+        )
+
+    tarea = obtener_ejecutor().enviar(
+        exportar_filas,
+        filas,
+        columnas,
+        ruta,
+        titulo_hoja=titulo_hoja,
+        nombre=f'exportar.{descripcion}',
+        prioridad=Prioridad.EXPORTACION,
+        red=red,
+        clave=clave,
+        con_tarea=True,
+        al_terminar=al_terminar,
+        al_fallar=al_fallar,
+        al_progresar=al_progresar,
+        **opciones
+    )
+
+    # Se cierra siempre, también si la tarea se cancela
+    dialogo.canceled.connect(tarea.cancelar)
+    tarea.finalizada.connect(dialogo.close)
+    tarea.finalizada.connect(dialogo.deleteLater)
+    dialogo.show()
+
+    return tarea
@@ -5,15 +5,17 @@ Usando componentes reutilizables del sistema de diseño
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, 
-    QPushButton, QTableWidget, QTableWidgetItem,
-    QHeaderView, QLineEdit, QSizePolicy, QFrame,
+    QPushButton, QLineEdit, QSizePolicy, QFrame,
     QComboBox, QDateEdit, QLabel
 )
-from PySide6.QtCore import Qt, Signal, QDate, QThread, QTimer  # Eliminado pyqtSignal
+from PySide6.QtCore import Qt, Signal, QDate, QTimer  # Eliminado pyqtSignal
 from PySide6.QtGui import QFont
 from datetime import datetime, timedelta
 import logging
 
+from database.async_manager import obtener_async
+from services.ocupacion import obtener_ocupacion
+
 # Importar componentes del sistema de diseño
 from ui.components import (
     WindowsPhoneTheme,
@@ -22,54 +24,96 @@ from ui.components import (
     ContentPanel,
     StyledLabel,
     SearchBar,
-    show_info_dialog,
     show_warning_dialog,
     show_error_dialog,
-    aplicar_estilo_fecha
+    aplicar_estilo_fecha,
+    conectar_scroll_infinito,
+    ColumnaTabla,
+    TablaDatos
 )
+from ui.exportacion_dialog import iniciar_exportacion
+from services.exportador import ColumnaExportacion, fecha_a_texto, filas_paginadas, ruta_exportacion
 
 
-class AccesosLoaderThread(QThread):
-    """Hilo para cargar accesos de forma asíncrona"""
+def convertir_acceso(row):
+    """Fila de registro_entradas (con miembro/personal embebido) -> fila de la tabla"""
+    # Determinar nombre completo según tipo de acceso
+    tipo_acceso = row.get('tipo_acceso', '')
+    nombre_completo = 'Desconocido'
+    codigo = 'N/A'
     
-    accesos_loaded = Signal(list)  # Cambiado de pyqtSignal a Signal
-    error_occurred = Signal(str)   # Cambiado de pyqtSignal a Signal
+    if tipo_acceso == 'miembro' and row.get('miembros'):
+        miembro = row['miembros']
+        nombre_completo = f"{miembro.get('nombres', '')} {miembro.get('apellido_paterno', '')} {miembro.get('apellido_materno', '')}".strip()
+        codigo = miembro.get('codigo_qr', 'N/A')
+    elif tipo_acceso == 'personal' and row.get('personal'):
+        personal = row['personal']
+        nombre_completo = f"{personal.get('nombres', '')} {personal.get('apellido_paterno', '')} {personal.get('apellido_materno', '')}".strip()
+        codigo = personal.get('numero_empleado') or str(personal.get('id_personal', 'N/A'))
+    elif tipo_acceso == 'visitante':
+        nombre_completo = row.get('nombre_visitante', 'Visitante')
+        codigo = 'N/A'
     
-    def __init__(self, supabase_service):
-        super().__init__()
-        self.supabase_service = supabase_service
+    # Procesar fechas
+    fecha_entrada = row.get('fecha_entrada')
+    if isinstance(fecha_entrada, str):
+        fecha_entrada = datetime.fromisoformat(fecha_entrada.replace('Z', '+00:00'))
     
-    def run(self):
-        """Cargar accesos desde Supabase en un hilo separado"""
-        try:
-            if self.supabase_service and self.supabase_service.is_connected:
-                # Consultar registro_entradas desde Supabase con relaciones
-                response = self.supabase_service.client.table('registro_entradas')\
-                    .select('''
-                        *,
-                        miembros(
-                            nombres,
-                            apellido_paterno,
-                            apellido_materno,
-                            codigo_qr
-                        ),
-                        personal(
-                            nombres,
-                            apellido_paterno,
-                            apellido_materno,
-                            id_personal,
-                            numero_empleado
-                        )
-                    ''')\
-                    .order('fecha_entrada', desc=True)\
-                    .execute()
-                
-                rows = response.data if response.data else []
-                self.accesos_loaded.emit(rows)
-            else:
-                self.error_occurred.emit("No hay conexión a Supabase")
-        except Exception as e:
-            self.error_occurred.emit(str(e))
+    fecha_salida = row.get('fecha_salida')
+    if isinstance(fecha_salida, str):
+        fecha_salida = datetime.fromisoformat(fecha_salida.replace('Z', '+00:00'))
+    
+    return {
+        'id_entrada': row.get('id_entrada'),
+        'fecha_entrada': fecha_entrada,
+        'fecha_salida': fecha_salida,
+        'tipo_acceso': tipo_acceso,
+        'area_accedida': row.get('area_accedida') or 'General',
+        'dispositivo_registro': row.get('dispositivo_registro') or 'Manual',
+        'notas': row.get('notas') or '',
+        'nombre_completo': nombre_completo,
+        'codigo': codigo
+    }
+
+
+def coincide_texto_acceso(acceso, texto_busqueda):
+    """El acceso contiene el texto buscado (ya en minúsculas)"""
+    if not texto_busqueda:
+        return True
+    
+    return any([
+        texto_busqueda in acceso['nombre_completo'].lower(),
+        texto_busqueda in acceso['codigo'].lower(),
+        texto_busqueda in acceso['area_accedida'].lower(),
+        texto_busqueda in (acceso['notas'] or '').lower()
+    ])
+
+
+def tiempo_estancia(acceso):
+    """Tiempo entre entrada y salida para el archivo exportado"""
+    if not acceso['fecha_salida']:
+        return "-"
+    try:
+        delta = acceso['fecha_salida'] - acceso['fecha_entrada']
+        horas = delta.seconds // 3600
+        minutos = (delta.seconds % 3600) // 60
+        return f"{horas}h {minutos}m"
+    except TypeError:
+        return "-"
+
+
+# Columnas del archivo exportado
+COLUMNAS_EXPORTACION = [
+    ColumnaExportacion("Fecha Entrada", valor=lambda a: fecha_a_texto(a['fecha_entrada']), ancho=18),
+    ColumnaExportacion("Fecha Salida", valor=lambda a: fecha_a_texto(a['fecha_salida'], vacio="DENTRO"), ancho=18),
+    ColumnaExportacion("Tipo", valor=lambda a: a['tipo_acceso'].capitalize(), ancho=12),
+    ColumnaExportacion("Nombre", 'nombre_completo', ancho=35),
+    ColumnaExportacion("Código", 'codigo', ancho=15),
+    ColumnaExportacion("Área", 'area_accedida', ancho=12),
+    ColumnaExportacion("Tiempo", valor=tiempo_estancia, ancho=12),
+    ColumnaExportacion("Dispositivo", 'dispositivo_registro', ancho=15),
+    ColumnaExportacion("Notas", 'notas', ancho=30),
+]
 
 
 class HistorialAccesoWindow(QWidget):
@@ -84,8 +128,21 @@ class HistorialAccesoWindow(QWidget):
         self.user_data = user_data
         self.accesos_data = []
         self.accesos_filtrados = []
-        self.loader_thread = None
         self.update_timer = None
+        self.db_async = obtener_async(db_manager)
+        
+        # Estado de la paginación por cursor
+        self.cursor = None
+        self.hay_mas = False
+        self.tarea_pagina = None
+        self.tarea_exportacion = None
+        
+        # Filas sin salida (las únicas cuyo tiempo cambia)
+        self.filas_abiertas = set()
+        
+        # "Dentro ahora" viene del servicio de ocupación, no de las filas cargadas
+        self.ocupacion = obtener_ocupacion()
+        self.ocupacion.ocupacion_cambiada.connect(self.on_ocupacion_cambiada)
         
         self.setup_ui()
         self.cargar_accesos()
@@ -167,7 +224,7 @@ class HistorialAccesoWindow(QWidget):
         ])
         self.tipo_combo.setMinimumHeight(40)
         self.tipo_combo.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_NORMAL))
-        self.tipo_combo.currentTextChanged.connect(self.aplicar_filtros)
+        self.tipo_combo.currentTextChanged.connect(self.cargar_accesos)
         tipo_layout.addWidget(self.tipo_combo)
         
         return tipo_container
@@ -190,7 +247,7 @@ class HistorialAccesoWindow(QWidget):
         ])
         self.estado_combo.setMinimumHeight(40)
         self.estado_combo.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_NORMAL))
-        self.estado_combo.currentTextChanged.connect(self.aplicar_filtros)
+        self.estado_combo.currentTextChanged.connect(self.cargar_accesos)
         estado_layout.addWidget(self.estado_combo)
         
         return estado_container
@@ -214,7 +271,7 @@ class HistorialAccesoWindow(QWidget):
         self.fecha_inicio.setCalendarPopup(True)
         aplicar_estilo_fecha(self.fecha_inicio)
         self.fecha_inicio.setMinimumHeight(40)
-        self.fecha_inicio.dateChanged.connect(self.aplicar_filtros)
+        self.fecha_inicio.dateChanged.connect(self.cargar_accesos)
         fecha_inicio_layout.addWidget(self.fecha_inicio)
         
         filters_row2.addWidget(fecha_inicio_container, stretch=1)
@@ -233,7 +290,7 @@ class HistorialAccesoWindow(QWidget):
         self.fecha_fin.setCalendarPopup(True)
         aplicar_estilo_fecha(self.fecha_fin)
         self.fecha_fin.setMinimumHeight(40)
-        self.fecha_fin.dateChanged.connect(self.aplicar_filtros)
+        self.fecha_fin.dateChanged.connect(self.cargar_accesos)
         fecha_fin_layout.addWidget(self.fecha_fin)
         
         filters_row2.addWidget(fecha_fin_container, stretch=1)
@@ -255,31 +312,34 @@ class HistorialAccesoWindow(QWidget):
         table_layout = QVBoxLayout(table_panel)
         table_layout.setContentsMargins(0, 0, 0, 0)
         
-        # Tabla de accesos
-        self.accesos_table = QTableWidget()
-        self.accesos_table.setColumnCount(9)
-        self.accesos_table.setHorizontalHeaderLabels([
-            "Fecha Entrada", "Fecha Salida", "Tipo", "Nombre", 
-            "Código", "Área", "Tiempo", "Dispositivo", "Notas"
-        ])
-        
-        # Configurar header
-        header = self.accesos_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.Stretch)
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(7, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(8, QHeaderView.Stretch)
-        
-        # Estilo de la tabla
-        self.accesos_table.setAlternatingRowColors(True)
-        self.accesos_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.accesos_table.setSelectionMode(QTableWidget.SingleSelection)
-        self.accesos_table.verticalHeader().setVisible(False)
+        # Tabla de accesos (modelo/vista: solo se pintan las filas visibles)
+        colores_tipo = {'miembro': Qt.darkBlue, 'personal': Qt.darkGreen}
+        columnas = [
+            ColumnaTabla("Fecha Entrada", 'fecha_entrada', texto=lambda a: self.formatear_fecha(a['fecha_entrada']), alineacion=Qt.AlignCenter),
+            ColumnaTabla(
+                "Fecha Salida", 'fecha_salida',
+                texto=lambda a: self.formatear_fecha(a['fecha_salida']) if a['fecha_salida'] else "DENTRO",
+                alineacion=Qt.AlignCenter,
+                color=lambda a: None if a['fecha_salida'] else Qt.darkGreen,
+                negrita=lambda a: not a['fecha_salida']
+            ),
+            ColumnaTabla(
+                "Tipo", 'tipo_acceso',
+                texto=lambda a: a['tipo_acceso'].capitalize(),
+                alineacion=Qt.AlignCenter,
+                color=lambda a: colores_tipo.get(a['tipo_acceso'].lower(), Qt.darkRed)
+            ),
+            ColumnaTabla("Nombre", 'nombre_completo', ancho='stretch'),
+            ColumnaTabla("Código", 'codigo', alineacion=Qt.AlignCenter),
+            ColumnaTabla("Área", 'area_accedida', alineacion=Qt.AlignCenter),
+            ColumnaTabla("Tiempo", texto=self.tiempo_permanencia, alineacion=Qt.AlignCenter),
+            ColumnaTabla("Dispositivo", 'dispositivo_registro', alineacion=Qt.AlignCenter),
+            ColumnaTabla("Notas", 'notas', ancho='stretch')
+        ]
+        self.accesos_table = TablaDatos(columnas)
+        
+        # Cargar la siguiente página al acercarse al final
+        self.completar_tabla = conectar_scroll_infinito(self.accesos_table, self.cargar_siguiente_pagina)
         
         table_layout.addWidget(self.accesos_table)
         return table_panel
@@ -317,79 +377,77 @@ class HistorialAccesoWindow(QWidget):
         self.update_timer.timeout.connect(self.actualizar_tiempos)
         self.update_timer.start(60000)  # Actualizar cada minuto
     
+    def obtener_filtros_servidor(self):
+        """Filtros que se resuelven en la consulta (tipo, estado y fechas)"""
+        tipo = self.tipo_combo.currentText()
+        estado = self.estado_combo.currentText()
+        
+        dentro = None
+        if estado == "Dentro":
+            dentro = True
+        elif estado == "Salió":
+            dentro = False
+        
+        return {
+            'fecha_desde': self.fecha_inicio.date().toPython(),
+            'fecha_hasta': self.fecha_fin.date().toPython(),
+            'tipo_acceso': tipo.lower() if tipo != "Todos" else None,
+            'dentro': dentro
+        }
+    
     def cargar_accesos(self):
-        """Cargar todos los accesos desde Supabase de forma asíncrona"""
-        try:
-            # Mostrar indicador de carga
-            self.info_label.setText("Cargando accesos...")
-            self.accesos_table.setRowCount(0)
-            
-            # Detener hilo anterior si existe
-            if self.loader_thread and self.loader_thread.isRunning():
-                self.loader_thread.terminate()
-                self.loader_thread.wait()
-            
-            # Crear y ejecutar hilo de carga
-            self.loader_thread = AccesosLoaderThread(self.supabase_service)
-            self.loader_thread.accesos_loaded.connect(self.procesar_datos_accesos)
-            self.loader_thread.error_occurred.connect(self.mostrar_error_carga)
-            self.loader_thread.start()
-            
-        except Exception as e:
-            logging.error(f"Error iniciando carga de accesos: {e}")
-            show_error_dialog(
-                self,
-                "Error al cargar",
-                "No se pudieron cargar los accesos",
-                detail=str(e)
-            )
+        """Recargar los accesos desde la primera página con los filtros actuales"""
+        # Una página que siga en camino queda reemplazada por esta carga
+        self.cursor = None
+        self.hay_mas = False
+        self.accesos_data = []
+        self.accesos_filtrados = []
+        self.filas_abiertas = set()
+        self.accesos_table.set_filas([])
+        self.info_label.setText("Cargando accesos...")
+        self.iniciar_carga_pagina()
+        
+        # Recoger también las salidas registradas fuera de la aplicación
+        self.ocupacion.recargar()
     
-    def procesar_datos_accesos(self, rows):
-        """Procesar los datos de accesos cargados desde Supabase"""
+    def cargar_siguiente_pagina(self):
+        """Cargar la página siguiente si existe y no hay otra en curso"""
+        if not self.hay_mas or (self.tarea_pagina and self.tarea_pagina.en_curso):
+            return
+        
+        self.info_label.setText("Cargando más accesos...")
+        self.iniciar_carga_pagina()
+    
+    def iniciar_carga_pagina(self):
+        """Pedir la página posterior al cursor actual en segundo plano"""
+        self.tarea_pagina = self.db_async.ejecutar(
+            'obtener_pagina_accesos',
+            cursor=self.cursor,
+            clave='historial_accesos.pagina',
+            al_terminar=self.procesar_datos_accesos,
+            al_fallar=self.mostrar_error_carga,
+            **self.obtener_filtros_servidor()
+        )
+    
+    def procesar_datos_accesos(self, pagina):
+        """Procesar una página de accesos cargada desde Supabase"""
         try:
-            self.accesos_data = []
+            nuevos = [convertir_acceso(row) for row in pagina.get('filas', [])]
+            
+            self.cursor = pagina.get('cursor')
+            self.hay_mas = pagina.get('hay_mas', False)
             
-            for row in rows:
-                # Determinar nombre completo según tipo de acceso
-                tipo_acceso = row.get('tipo_acceso', '')
-                nombre_completo = 'Desconocido'
-                codigo = 'N/A'
-                
-                if tipo_acceso == 'miembro' and row.get('miembros'):
-                    miembro = row['miembros']
-                    nombre_completo = f"{miembro.get('nombres', '')} {miembro.get('apellido_paterno', '')} {miembro.get('apellido_materno', '')}".strip()
-                    codigo = miembro.get('codigo_qr', 'N/A')
-                elif tipo_acceso == 'personal' and row.get('personal'):
-                    personal = row['personal']
-                    nombre_completo = f"{personal.get('nombres', '')} {personal.get('apellido_paterno', '')} {personal.get('apellido_materno', '')}".strip()
-                    codigo = personal.get('numero_empleado') or str(personal.get('id_personal', 'N/A'))
-                elif tipo_acceso == 'visitante':
-                    nombre_completo = row.get('nombre_visitante', 'Visitante')
-                    codigo = 'N/A'
-                
-                # Procesar fechas
-                fecha_entrada = row.get('fecha_entrada')
-                if isinstance(fecha_entrada, str):
-                    fecha_entrada = datetime.fromisoformat(fecha_entrada.replace('Z', '+00:00'))
-                
-                fecha_salida = row.get('fecha_salida')
-                if isinstance(fecha_salida, str):
-                    fecha_salida = datetime.fromisoformat(fecha_salida.replace('Z', '+00:00'))
-                
-                self.accesos_data.append({
-                    'id_entrada': row.get('id_entrada'),
-                    'fecha_entrada': fecha_entrada,
-                    'fecha_salida': fecha_salida,
-                    'tipo_acceso': tipo_acceso,
-                    'area_accedida': row.get('area_accedida') or 'General',
-                    'dispositivo_registro': row.get('dispositivo_registro') or 'Manual',
-                    'notas': row.get('notas') or '',
-                    'nombre_completo': nombre_completo,
-                    'codigo': codigo
-                })
+            # Las filas nuevas van al final del modelo
+            for row, acceso in enumerate(nuevos, start=len(self.accesos_data)):
+                if acceso['fecha_salida'] is None:
+                    self.filas_abiertas.add(row)
+            self.accesos_data.extend(nuevos)
             
-            self.aplicar_filtros()
-            logging.info(f"Accesos cargados: {len(self.accesos_data)}")
+            # Solo se insertan las filas nuevas; las ya mostradas no se tocan
+            self.accesos_table.agregar_filas(nuevos)
+            self.accesos_filtrados = self.accesos_table.filas_visibles()
+            self.actualizar_info()
+            logging.info(f"Página de accesos cargada: {len(nuevos)} (total {len(self.accesos_data)})")
             
         except Exception as e:
             logging.error(f"Error procesando datos de accesos: {e}")
@@ -411,336 +469,130 @@ class HistorialAccesoWindow(QWidget):
         )
         self.info_label.setText("Error al cargar accesos")
     
+    def coincide_busqueda(self, acceso):
+        """Filtro de texto sobre los accesos ya cargados"""
+        return coincide_texto_acceso(acceso, self.search_bar.text().strip().lower())
+    
     def aplicar_filtros(self):
-        """Aplicar todos los filtros activos"""
+        """Aplicar el filtro de texto (los demás se resuelven en la consulta)"""
         try:
-            # Obtener criterios de filtro
-            texto_busqueda = self.search_bar.text().strip().lower()
-            tipo_seleccionado = self.tipo_combo.currentText()
-            estado_seleccionado = self.estado_combo.currentText()
-            fecha_desde = self.fecha_inicio.date().toPython()
-            fecha_hasta = self.fecha_fin.date().toPython()
-            
-            # Filtrar datos
-            self.accesos_filtrados = []
-            for acceso in self.accesos_data:
-                # Filtro de texto
-                if texto_busqueda:
-                    if not any([
-                        texto_busqueda in acceso['nombre_completo'].lower(),
-                        texto_busqueda in acceso['codigo'].lower(),
-                        texto_busqueda in acceso['area_accedida'].lower(),
-                        texto_busqueda in (acceso['notas'] or '').lower()
-                    ]):
-                        continue
-                
-                # Filtro de tipo
-                if tipo_seleccionado != "Todos":
-                    if acceso['tipo_acceso'].lower() != tipo_seleccionado.lower():
-                        continue
-                
-                # Filtro de estado (dentro/salió)
-                if estado_seleccionado != "Todos":
-                    if estado_seleccionado == "Dentro" and acceso['fecha_salida'] is not None:
-                        continue
-                    if estado_seleccionado == "Salió" and acceso['fecha_salida'] is None:
-                        continue
-                
-                # Filtro de fecha
-                fecha_acc = acceso['fecha_entrada'].date() if isinstance(acceso['fecha_entrada'], datetime) else acceso['fecha_entrada']
-                if not (fecha_desde <= fecha_acc <= fecha_hasta):
-                    continue
-                
-                self.accesos_filtrados.append(acceso)
-            
-            self.mostrar_accesos(self.accesos_filtrados)
+            texto_busqueda = self.search_bar.text().strip()
+            self.accesos_table.filtrar(self.coincide_busqueda if texto_busqueda else None)
+            self.accesos_filtrados = self.accesos_table.filas_visibles()
+            self.actualizar_info()
             
         except Exception as e:
             logging.error(f"Error aplicando filtros: {e}")
-            self.mostrar_accesos(self.accesos_data)
+            self.accesos_table.filtrar(None)
     
-    def mostrar_accesos(self, accesos):
-        """Mostrar accesos en la tabla"""
-        try:
-            self.accesos_table.setRowCount(0)
-            
-            for acceso in accesos:
-                row = self.accesos_table.rowCount()
-                self.accesos_table.insertRow(row)
-                
-                # Fecha entrada
-                fecha_entrada_str = acceso['fecha_entrada'].strftime("%d/%m/%Y %H:%M") if isinstance(acceso['fecha_entrada'], datetime) else str(acceso['fecha_entrada'])
-                item_entrada = QTableWidgetItem(fecha_entrada_str)
-                item_entrada.setTextAlignment(Qt.AlignCenter)
-                self.accesos_table.setItem(row, 0, item_entrada)
-                
-                # Fecha salida
-                if acceso['fecha_salida']:
-                    fecha_salida_str = acceso['fecha_salida'].strftime("%d/%m/%Y %H:%M") if isinstance(acceso['fecha_salida'], datetime) else str(acceso['fecha_salida'])
-                    item_salida = QTableWidgetItem(fecha_salida_str)
-                    item_salida.setTextAlignment(Qt.AlignCenter)
-                else:
-                    item_salida = QTableWidgetItem("DENTRO")
-                    item_salida.setTextAlignment(Qt.AlignCenter)
-                    item_salida.setForeground(Qt.darkGreen)
-                    item_salida.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_NORMAL, QFont.Bold))
-                
-                self.accesos_table.setItem(row, 1, item_salida)
-                
-                # Tipo de acceso
-                tipo = acceso['tipo_acceso'].capitalize()
-                item_tipo = QTableWidgetItem(tipo)
-                item_tipo.setTextAlignment(Qt.AlignCenter)
-                
-                # Color según tipo
-                if acceso['tipo_acceso'].lower() == 'miembro':
-                    item_tipo.setForeground(Qt.darkBlue)
-                elif acceso['tipo_acceso'].lower() == 'personal':
-                    item_tipo.setForeground(Qt.darkGreen)
-                else:
-                    item_tipo.setForeground(Qt.darkRed)
-                
-                self.accesos_table.setItem(row, 2, item_tipo)
-                
-                # Nombre completo
-                self.accesos_table.setItem(row, 3, QTableWidgetItem(acceso['nombre_completo']))
-                
-                # Código
-                item_codigo = QTableWidgetItem(acceso['codigo'])
-                item_codigo.setTextAlignment(Qt.AlignCenter)
-                self.accesos_table.setItem(row, 4, item_codigo)
-                
-                # Área
-                item_area = QTableWidgetItem(acceso['area_accedida'])
-                item_area.setTextAlignment(Qt.AlignCenter)
-                self.accesos_table.setItem(row, 5, item_area)
-                
-                # Tiempo de permanencia
-                item_tiempo = QTableWidgetItem("-")
-                item_tiempo.setTextAlignment(Qt.AlignCenter)
-                self.accesos_table.setItem(row, 6, item_tiempo)
-                
-                # Dispositivo
-                item_dispositivo = QTableWidgetItem(acceso['dispositivo_registro'])
-                item_dispositivo.setTextAlignment(Qt.AlignCenter)
-                self.accesos_table.setItem(row, 7, item_dispositivo)
-                
-                # Notas
-                self.accesos_table.setItem(row, 8, QTableWidgetItem(acceso['notas']))
-            
-            # Actualizar información
-            total_accesos = len(accesos)
-            total_general = len(self.accesos_data)
-            dentro_ahora = sum(1 for a in accesos if a['fecha_salida'] is None)
-            
-            if total_accesos == total_general:
-                self.info_label.setText(f"Total de accesos: {total_accesos} | Dentro ahora: {dentro_ahora}")
-            else:
-                self.info_label.setText(f"Mostrando {total_accesos} de {total_general} accesos | Dentro ahora: {dentro_ahora}")
-            
-            logging.info(f"Mostrando {total_accesos} accesos en tabla")
-            
-        except Exception as e:
-            logging.error(f"Error mostrando accesos: {e}")
-            show_error_dialog(
-                self,
-                "Error de visualización",
-                "No se pudieron mostrar los accesos",
-                detail=str(e)
-            )
+    def formatear_fecha(self, fecha):
+        """Texto de una fecha de entrada/salida para la tabla"""
+        return fecha.strftime("%d/%m/%Y %H:%M") if isinstance(fecha, datetime) else str(fecha)
+    
+    def tiempo_permanencia(self, acceso):
+        """Tiempo transcurrido desde la entrada para quienes aún están dentro"""
+        fecha_entrada = acceso['fecha_entrada']
+        if acceso['fecha_salida'] or not isinstance(fecha_entrada, datetime):
+            return "-"
+        
+        # Se compara en hora local, igual que la fecha mostrada en la tabla
+        delta = datetime.now() - fecha_entrada.replace(tzinfo=None)
+        horas = delta.seconds // 3600
+        minutos = (delta.seconds % 3600) // 60
+        
+        # Si ha pasado más de un día, mostrar días también
+        if delta.days > 0:
+            return f"{delta.days}d {horas}h {minutos}m"
+        return f"{horas}h {minutos}m"
+    
+    def actualizar_info(self):
+        """Actualizar la etiqueta con el resumen de lo cargado"""
+        total_accesos = len(self.accesos_filtrados)
+        total_general = len(self.accesos_data)
+        dentro_ahora = self.ocupacion.total()
+        mas = " (desplaza para cargar más)" if self.hay_mas else ""
+        
+        if total_accesos == total_general:
+            self.info_label.setText(f"Accesos cargados: {total_accesos}{mas} | Dentro ahora: {dentro_ahora}")
+        else:
+            self.info_label.setText(f"Mostrando {total_accesos} de {total_general} accesos cargados{mas} | Dentro ahora: {dentro_ahora}")
+        
+        # Con la búsqueda pueden quedar pocas filas: seguir pidiendo páginas hasta llenar la tabla
+        self.completar_tabla()
     
     def actualizar_tiempos(self):
         """Actualizar los tiempos de permanencia para quienes aún están dentro"""
         try:
-            # Solo actualizar si hay accesos mostrados
-            if self.accesos_table.rowCount() == 0:
-                return
-                
-            ahora = datetime.now()
-            
-            # Recorrer todas las filas de la tabla
-            for row in range(self.accesos_table.rowCount()):
-                # Obtener el item de la columna de fecha de salida
-                item_salida = self.accesos_table.item(row, 1)
-                
-                # Si está "DENTRO", actualizar el tiempo
-                if item_salida and item_salida.text() == "DENTRO":
-                    # Obtener la fecha de entrada
-                    item_entrada = self.accesos_table.item(row, 0)
-                    if item_entrada:
-                        try:
-                            # Extraer la fecha de entrada del texto
-                            fecha_entrada_str = item_entrada.text()
-                            fecha_entrada = datetime.strptime(fecha_entrada_str, "%d/%m/%Y %H:%M")
-                            
-                            # Calcular tiempo transcurrido
-                            delta = ahora - fecha_entrada
-                            horas = delta.seconds // 3600
-                            minutos = (delta.seconds % 3600) // 60
-                            
-                            # Si ha pasado más de un día, mostrar días también
-                            if delta.days > 0:
-                                tiempo_str = f"{delta.days}d {horas}h {minutos}m"
-                            else:
-                                tiempo_str = f"{horas}h {minutos}m"
-                            
-                            # Actualizar el item de tiempo
-                            item_tiempo = self.accesos_table.item(row, 6)
-                            if item_tiempo:
-                                item_tiempo.setText(tiempo_str)
-                        except Exception as e:
-                            logging.warning(f"Error actualizando tiempo en fila {row}: {e}")
-                            continue
+            # La columna Tiempo se calcula al pintar con la fecha guardada en la fila:
+            # basta con repintar las filas sin salida
+            self.accesos_table.modelo.refrescar_celdas(self.filas_abiertas, 6)
             
         except Exception as e:
             logging.error(f"Error actualizando tiempos: {e}")
     
+    def on_ocupacion_cambiada(self, _total):
+        """Actualizar "Dentro ahora" sin recargar el historial"""
+        self.actualizar_info()
+    
     def limpiar_filtros(self):
         """Limpiar todos los filtros y mostrar todo"""
+        # Bloquear señales para recargar una sola vez al final
+        controles = [self.tipo_combo, self.estado_combo, self.fecha_inicio, self.fecha_fin]
+        for control in controles:
+            control.blockSignals(True)
+        
         self.search_bar.clear()
         self.tipo_combo.setCurrentIndex(0)
         self.estado_combo.setCurrentIndex(0)
         self.fecha_inicio.setDate(QDate.currentDate().addDays(-7))
         self.fecha_fin.setDate(QDate.currentDate())
-        self.aplicar_filtros()
+        
+        for control in controles:
+            control.blockSignals(False)
+        self.cargar_accesos()
     
     def exportar_excel(self):
-        """Exportar accesos filtrados a Excel"""
-        try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, PatternFill, Alignment
-            from datetime import datetime
-            
-            # Crear workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Historial Acceso"
-            
-            # Encabezados
-            headers = [
-                "Fecha Entrada", "Fecha Salida", "Tipo", "Nombre", 
-                "Código", "Área", "Tiempo", "Dispositivo", "Notas"
-            ]
-            
-            # Estilo de encabezado
-            header_fill = PatternFill(start_color="0066CC", end_color="0066CC", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF", size=11)
-            
-            for col, header in enumerate(headers, start=1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-            
-            # Obtener accesos filtrados actuales
-            texto_busqueda = self.search_bar.text().strip().lower()
-            tipo_seleccionado = self.tipo_combo.currentText()
-            estado_seleccionado = self.estado_combo.currentText()
-            fecha_desde = self.fecha_inicio.date().toPython()
-            fecha_hasta = self.fecha_fin.date().toPython()
-            
-            accesos_exportar = []
-            for acceso in self.accesos_data:
-                if texto_busqueda:
-                    if not any([
-                        texto_busqueda in acceso['nombre_completo'].lower(),
-                        texto_busqueda in acceso['codigo'].lower(),
-                        texto_busqueda in acceso['area_accedida'].lower(),
-                        texto_busqueda in (acceso['notas'] or '').lower()
-                    ]):
-                        continue
-                
-                if tipo_seleccionado != "Todos":
-                    if acceso['tipo_acceso'].lower() != tipo_seleccionado.lower():
-                        continue
-                
-                if estado_seleccionado != "Todos":
-                    if estado_seleccionado == "Dentro" and acceso['fecha_salida'] is not None:
-                        continue
-                    if estado_seleccionado == "Salió" and acceso['fecha_salida'] is None:
-                        continue
-                
-                fecha_acc = acceso['fecha_entrada'].date() if isinstance(acceso['fecha_entrada'], datetime) else acceso['fecha_entrada']
-                if not (fecha_desde <= fecha_acc <= fecha_hasta):
-                    continue
-                
-                accesos_exportar.append(acceso)
-            
-            # Datos
-            for row_idx, acceso in enumerate(accesos_exportar, start=2):
-                fecha_entrada_str = acceso['fecha_entrada'].strftime("%d/%m/%Y %H:%M") if isinstance(acceso['fecha_entrada'], datetime) else str(acceso['fecha_entrada'])
-                fecha_salida_str = acceso['fecha_salida'].strftime("%d/%m/%Y %H:%M") if acceso['fecha_salida'] and isinstance(acceso['fecha_salida'], datetime) else ("DENTRO" if not acceso['fecha_salida'] else str(acceso['fecha_salida']))
-                
-                # Calcular tiempo
-                if acceso['fecha_salida']:
-                    try:
-                        delta = acceso['fecha_salida'] - acceso['fecha_entrada']
-                        horas = delta.seconds // 3600
-                        minutos = (delta.seconds % 3600) // 60
-                        tiempo_str = f"{horas}h {minutos}m"
-                    except:
-                        tiempo_str = "-"
-                else:
-                    tiempo_str = "-"
-                
-                ws.cell(row=row_idx, column=1, value=fecha_entrada_str)
-                ws.cell(row=row_idx, column=2, value=fecha_salida_str)
-                ws.cell(row=row_idx, column=3, value=acceso['tipo_acceso'].capitalize())
-                ws.cell(row=row_idx, column=4, value=acceso['nombre_completo'])
-                ws.cell(row=row_idx, column=5, value=acceso['codigo'])
-                ws.cell(row=row_idx, column=6, value=acceso['area_accedida'])
-                ws.cell(row=row_idx, column=7, value=tiempo_str)
-                ws.cell(row=row_idx, column=8, value=acceso['dispositivo_registro'])
-                ws.cell(row=row_idx, column=9, value=acceso['notas'])
-            
-            # Ajustar anchos
-            ws.column_dimensions['A'].width = 18
-            ws.column_dimensions['B'].width = 18
-            ws.column_dimensions['C'].width = 12
-            ws.column_dimensions['D'].width = 35
-            ws.column_dimensions['E'].width = 15
-            ws.column_dimensions['F'].width = 12
-            ws.column_dimensions['G'].width = 12
-            ws.column_dimensions['H'].width = 15
-            ws.column_dimensions['I'].width = 30
-            
-            # Guardar archivo
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"historial_acceso_{timestamp}.xlsx"
-            wb.save(filename)
-            
-            show_info_dialog(
-                self,
-                "Exportación exitosa",
-                f"Archivo generado: {filename}\n\nAccesos exportados: {len(accesos_exportar)}"
-            )
-            
-            logging.info(f"Reporte de accesos exportado: {filename}")
-            
-        except ImportError:
-            show_error_dialog(
-                self,
-                "Módulo no disponible",
-                "No se puede exportar a Excel. El módulo openpyxl no está instalado."
-            )
-        except Exception as e:
-            logging.error(f"Error exportando a Excel: {e}")
-            show_error_dialog(
-                self,
-                "Error de exportación",
-                "No se pudo generar el archivo Excel",
-                detail=str(e)
-            )
+        """Exportar a Excel todos los accesos que cumplen los filtros (en segundo plano)"""
+        # Se exportan también las páginas que aún no se cargaron en la tabla;
+        # los filtros y el texto se leen aquí porque el pool no toca widgets
+        texto_busqueda = self.search_bar.text().strip().lower()
+        filas = filas_paginadas(
+            self.db_manager.obtener_pagina_accesos,
+            filtros=self.obtener_filtros_servidor(),
+            cursor=self.cursor,
+            hay_mas=self.hay_mas,
+            cargadas=list(self.accesos_data),
+            convertir=convertir_acceso,
+            filtro=lambda acceso: coincide_texto_acceso(acceso, texto_busqueda)
+        )
+        
+        self.tarea_exportacion = iniciar_exportacion(
+            self,
+            filas,
+            COLUMNAS_EXPORTACION,
+            ruta_exportacion("historial_acceso"),
+            "accesos",
+            titulo_hoja="Historial Acceso",
+            clave='exportar.historial_acceso',
+            color_encabezado="0066CC"
+        )
     
     def closeEvent(self, event):
         """Evento al cerrar la ventana"""
-        # Detener hilo de carga si está activo
-        if self.loader_thread and self.loader_thread.isRunning():
-            self.loader_thread.terminate()
-            self.loader_thread.wait()
+        # Descartar la página en curso (no se espera a la red)
+        if self.tarea_pagina:
+            self.tarea_pagina.cancelar()
+        if self.tarea_exportacion:
+            self.tarea_exportacion.cancelar()
         
         # Detener timer de actualización
         if self.update_timer:
             self.update_timer.stop()
+        
+        # El servicio de ocupación vive más que la ventana
+        try:
+            self.ocupacion.ocupacion_cambiada.disconnect(self.on_ocupacion_cambiada)
+        except (RuntimeError, TypeError):
+            pass
             
         super().closeEvent(event)
\ No newline at end of file
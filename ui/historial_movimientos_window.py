@@ -9,11 +9,13 @@ from PySide6.QtWidgets import (
     QHeaderView, QLineEdit, QSizePolicy, QFrame,
     QComboBox, QDateEdit, QLabel
 )
-from PySide6.QtCore import Qt, Signal, QDate, QThread, QTimer
+from PySide6.QtCore import Qt, Signal, QDate, QTimer
 from PySide6.QtGui import QFont
 from datetime import datetime, timedelta
 import logging
 
+from database.async_manager import obtener_async
+
 # Importar componentes del sistema de diseño
 from ui.components import (
     WindowsPhoneTheme,
@@ -22,32 +24,60 @@ from ui.components import (
     ContentPanel,
     StyledLabel,
     SearchBar,
-    show_info_dialog,
     show_warning_dialog,
     show_error_dialog,
-    aplicar_estilo_fecha
+    aplicar_estilo_fecha,
+    conectar_scroll_infinito
 )
+from ui.exportacion_dialog import iniciar_exportacion
+from services.exportador import ColumnaExportacion, fecha_a_texto, filas_paginadas, ruta_exportacion
 
 
-class MovimientosLoaderThread(QThread):
-    """Hilo para cargar movimientos de forma asíncrona"""
-    
-    movimientos_loaded = Signal(list)
-    error_occurred = Signal(str)
-    
-    def __init__(self, pg_manager):
-        super().__init__()
-        self.pg_manager = pg_manager
+def convertir_movimiento(row):
+    """Fila de obtener_pagina_movimientos -> fila de la tabla"""
+    return {
+        'id_movimiento': row['id_movimiento'],
+        'fecha': row['fecha'],
+        'tipo_movimiento': row['tipo_movimiento'],
+        'codigo_interno': row['codigo_interno'],
+        'tipo_producto': row['tipo_producto'],
+        'cantidad': row['cantidad'],
+        'stock_anterior': row['stock_anterior'],
+        'stock_nuevo': row['stock_nuevo'],
+        'motivo': row['motivo'] or '',
+        'id_usuario': row['id_usuario'],
+        'id_venta': row['id_venta'],
+        'nombre_producto': row['nombre_producto'],
+        'nombre_usuario': row['nombre_usuario'] or 'Usuario desconocido'
+    }
+
+
+def coincide_texto_movimiento(mov, texto_busqueda):
+    """El movimiento contiene el texto buscado (ya en minúsculas)"""
+    if not texto_busqueda:
+        return True
     
-    def run(self):
-        """Cargar movimientos desde la base de datos en un hilo separado"""
-        try:
-            # Usar el método de postgres_manager que retorna movimientos completos
-            rows = self.pg_manager.obtener_movimientos_completos(limite=1000)
-            self.movimientos_loaded.emit(rows)
-                
-        except Exception as e:
-            self.error_occurred.emit(str(e))
+    return any([
+        texto_busqueda in mov['codigo_interno'].lower(),
+        texto_busqueda in mov['nombre_producto'].lower(),
+        texto_busqueda in mov['nombre_usuario'].lower(),
+        texto_busqueda in (mov['motivo'] or '').lower()
+    ])
+
+
+# Columnas del archivo exportado
+COLUMNAS_EXPORTACION = [
+    ColumnaExportacion("Fecha", valor=lambda m: fecha_a_texto(m['fecha']), ancho=18),
+    ColumnaExportacion("Tipo", valor=lambda m: m['tipo_movimiento'].capitalize(), ancho=12),
+    ColumnaExportacion("Código", 'codigo_interno', ancho=15),
+    ColumnaExportacion("Producto", 'nombre_producto', ancho=35),
+    ColumnaExportacion("Cantidad", 'cantidad', ancho=10),
+    ColumnaExportacion("Stock Anterior", 'stock_anterior', ancho=12),
+    ColumnaExportacion("Stock Nuevo", 'stock_nuevo', ancho=12),
+    ColumnaExportacion("Motivo", 'motivo', ancho=30),
+    ColumnaExportacion("Usuario", 'nombre_usuario', ancho=20),
+    ColumnaExportacion("ID Venta", valor=lambda m: m['id_venta'] if m['id_venta'] else '', ancho=10),
+]
 
 
 class HistorialMovimientosWindow(QWidget):
@@ -62,7 +92,13 @@ class HistorialMovimientosWindow(QWidget):
         self.user_data = user_data
         self.movimientos_data = []
         self.movimientos_filtrados = []
-        self.loader_thread = None
+        self.db_async = obtener_async(pg_manager)
+        
+        # Estado de la paginación por cursor
+        self.cursor = None
+        self.hay_mas = False
+        self.tarea_pagina = None
+        self.tarea_exportacion = None
         
         self.setup_ui()
         self.cargar_movimientos()
@@ -137,7 +173,7 @@ class HistorialMovimientosWindow(QWidget):
         ])
         self.tipo_combo.setMinimumHeight(40)
         self.tipo_combo.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_NORMAL))
-        self.tipo_combo.currentTextChanged.connect(self.aplicar_filtros)
+        self.tipo_combo.currentTextChanged.connect(self.cargar_movimientos)
         tipo_layout.addWidget(self.tipo_combo)
         
         return tipo_container
@@ -161,7 +197,7 @@ class HistorialMovimientosWindow(QWidget):
         self.fecha_inicio.setCalendarPopup(True)
         aplicar_estilo_fecha(self.fecha_inicio)
         self.fecha_inicio.setMinimumHeight(40)
-        self.fecha_inicio.dateChanged.connect(self.aplicar_filtros)
+        self.fecha_inicio.dateChanged.connect(self.cargar_movimientos)
         fecha_inicio_layout.addWidget(self.fecha_inicio)
         
         filters_row2.addWidget(fecha_inicio_container, stretch=1)
@@ -180,7 +216,7 @@ class HistorialMovimientosWindow(QWidget):
         self.fecha_fin.setCalendarPopup(True)
         aplicar_estilo_fecha(self.fecha_fin)
         self.fecha_fin.setMinimumHeight(40)
-        self.fecha_fin.dateChanged.connect(self.aplicar_filtros)
+        self.fecha_fin.dateChanged.connect(self.cargar_movimientos)
         fecha_fin_layout.addWidget(self.fecha_fin)
         
         filters_row2.addWidget(fecha_fin_container, stretch=1)
@@ -229,6 +265,9 @@ class HistorialMovimientosWindow(QWidget):
         self.movimientos_table.verticalHeader().setVisible(False)
         self.movimientos_table.setEditTriggers(QTableWidget.NoEditTriggers)
         
+        # Cargar la siguiente página al acercarse al final
+        self.completar_tabla = conectar_scroll_infinito(self.movimientos_table, self.cargar_siguiente_pagina)
+        
         table_layout.addWidget(self.movimientos_table)
         return table_panel
     
@@ -259,62 +298,60 @@ class HistorialMovimientosWindow(QWidget):
         
         return info_buttons_panel
     
+    def obtener_filtros_servidor(self):
+        """Filtros que se resuelven en la consulta (tipo y fechas)"""
+        tipo = self.tipo_combo.currentText()
+        return {
+            'fecha_desde': self.fecha_inicio.date().toPython(),
+            'fecha_hasta': self.fecha_fin.date().toPython(),
+            'tipo_movimiento': tipo.lower() if tipo != "Todos" else None
+        }
+    
     def cargar_movimientos(self):
-        """Cargar todos los movimientos desde la base de datos de forma asíncrona"""
-        try:
-            # Mostrar indicador de carga
-            self.info_label.setText("Cargando movimientos...")
-            self.movimientos_table.setRowCount(0)
-            
-            # Detener hilo anterior si existe
-            if self.loader_thread and self.loader_thread.isRunning():
-                self.loader_thread.quit()
-                self.loader_thread.wait(1000)  # Esperar hasta 1 segundo
-            
-            # Crear y ejecutar hilo de carga
-            self.loader_thread = MovimientosLoaderThread(self.pg_manager)
-            self.loader_thread.movimientos_loaded.connect(self.procesar_datos_movimientos)
-            self.loader_thread.error_occurred.connect(self.mostrar_error_carga)
-            self.loader_thread.finished.connect(self.on_thread_finished)
-            self.loader_thread.start()
-            
-        except Exception as e:
-            logging.error(f"Error iniciando carga de movimientos: {e}")
-            show_error_dialog(
-                self,
-                "Error al cargar",
-                "No se pudieron cargar los movimientos",
-                detail=str(e)
-            )
+        """Recargar los movimientos desde la primera página con los filtros actuales"""
+        # Una página que siga en camino queda reemplazada por esta carga
+        self.cursor = None
+        self.hay_mas = False
+        self.movimientos_data = []
+        self.movimientos_filtrados = []
+        self.movimientos_table.setRowCount(0)
+        self.info_label.setText("Cargando movimientos...")
+        self.iniciar_carga_pagina()
     
-    def on_thread_finished(self):
-        """Callback cuando el thread termina"""
-        pass
+    def cargar_siguiente_pagina(self):
+        """Cargar la página siguiente si existe y no hay otra en curso"""
+        if not self.hay_mas or (self.tarea_pagina and self.tarea_pagina.en_curso):
+            return
+        
+        self.info_label.setText("Cargando más movimientos...")
+        self.iniciar_carga_pagina()
+    
+    def iniciar_carga_pagina(self):
+        """Pedir la página posterior al cursor actual en segundo plano"""
+        self.tarea_pagina = self.db_async.ejecutar(
+            'obtener_pagina_movimientos',
+            cursor=self.cursor,
+            clave='historial_movimientos.pagina',
+            al_terminar=self.procesar_datos_movimientos,
+            al_fallar=self.mostrar_error_carga,
+            **self.obtener_filtros_servidor()
+        )
     
-    def procesar_datos_movimientos(self, rows):
-        """Procesar los datos de movimientos cargados desde la base de datos"""
+    def procesar_datos_movimientos(self, pagina):
+        """Procesar una página de movimientos cargada desde la base de datos"""
         try:
-            self.movimientos_data = []
+            nuevos = [convertir_movimiento(row) for row in pagina.get('filas', [])]
             
-            for row in rows:
-                self.movimientos_data.append({
-                    'id_movimiento': row['id_movimiento'],
-                    'fecha': row['fecha'],
-                    'tipo_movimiento': row['tipo_movimiento'],
-                    'codigo_interno': row['codigo_interno'],
-                    'tipo_producto': row['tipo_producto'],
-                    'cantidad': row['cantidad'],
-                    'stock_anterior': row['stock_anterior'],
-                    'stock_nuevo': row['stock_nuevo'],
-                    'motivo': row['motivo'] or '',
-                    'id_usuario': row['id_usuario'],
-                    'id_venta': row['id_venta'],
-                    'nombre_producto': row['nombre_producto'],
-                    'nombre_usuario': row['nombre_usuario'] or 'Usuario desconocido'
-                })
+            self.cursor = pagina.get('cursor')
+            self.hay_mas = pagina.get('hay_mas', False)
+            self.movimientos_data.extend(nuevos)
             
-            self.aplicar_filtros()
-            logging.info(f"Movimientos cargados: {len(self.movimientos_data)}")
+            # Solo se agregan las filas nuevas; las ya mostradas no se tocan
+            visibles = [m for m in nuevos if self.coincide_busqueda(m)]
+            self.movimientos_filtrados.extend(visibles)
+            self.agregar_filas(visibles)
+            self.actualizar_info()
+            logging.info(f"Página de movimientos cargada: {len(nuevos)} (total {len(self.movimientos_data)})")
             
         except Exception as e:
             logging.error(f"Error procesando datos de movimientos: {e}")
@@ -336,40 +373,14 @@ class HistorialMovimientosWindow(QWidget):
         )
         self.info_label.setText("Error al cargar movimientos")
     
+    def coincide_busqueda(self, mov):
+        """Filtro de texto sobre los movimientos ya cargados"""
+        return coincide_texto_movimiento(mov, self.search_bar.text().strip().lower())
+    
     def aplicar_filtros(self):
-        """Aplicar todos los filtros activos"""
+        """Aplicar el filtro de texto (tipo y fechas se resuelven en la consulta)"""
         try:
-            # Obtener criterios de filtro
-            texto_busqueda = self.search_bar.text().strip().lower()
-            tipo_seleccionado = self.tipo_combo.currentText()
-            fecha_desde = self.fecha_inicio.date().toPython()
-            fecha_hasta = self.fecha_fin.date().toPython()
-            
-            # Filtrar datos
-            self.movimientos_filtrados = []
-            for mov in self.movimientos_data:
-                # Filtro de texto
-                if texto_busqueda:
-                    if not any([
-                        texto_busqueda in mov['codigo_interno'].lower(),
-                        texto_busqueda in mov['nombre_producto'].lower(),
-                        texto_busqueda in mov['nombre_usuario'].lower(),
-                        texto_busqueda in (mov['motivo'] or '').lower()
-                    ]):
-                        continue
-                
-                # Filtro de tipo
-                if tipo_seleccionado != "Todos":
-                    if mov['tipo_movimiento'].lower() != tipo_seleccionado.lower():
-                        continue
-                
-                # Filtro de fecha
-                fecha_mov = mov['fecha'].date() if isinstance(mov['fecha'], datetime) else mov['fecha']
-                if not (fecha_desde <= fecha_mov <= fecha_hasta):
-                    continue
-                
-                self.movimientos_filtrados.append(mov)
-            
+            self.movimientos_filtrados = [m for m in self.movimientos_data if self.coincide_busqueda(m)]
             self.mostrar_movimientos(self.movimientos_filtrados)
             
         except Exception as e:
@@ -380,76 +391,8 @@ class HistorialMovimientosWindow(QWidget):
         """Mostrar movimientos en la tabla"""
         try:
             self.movimientos_table.setRowCount(0)
-            
-            for mov in movimientos:
-                row = self.movimientos_table.rowCount()
-                self.movimientos_table.insertRow(row)
-                
-                # Fecha
-                fecha_str = mov['fecha'].strftime("%d/%m/%Y %H:%M") if isinstance(mov['fecha'], datetime) else str(mov['fecha'])
-                item_fecha = QTableWidgetItem(fecha_str)
-                item_fecha.setTextAlignment(Qt.AlignCenter)
-                self.movimientos_table.setItem(row, 0, item_fecha)
-                
-                # Tipo de movimiento
-                tipo = mov['tipo_movimiento'].capitalize()
-                item_tipo = QTableWidgetItem(tipo)
-                item_tipo.setTextAlignment(Qt.AlignCenter)
-                
-                # Color según tipo
-                if mov['tipo_movimiento'].lower() == 'entrada':
-                    item_tipo.setForeground(Qt.darkGreen)
-                elif mov['tipo_movimiento'].lower() == 'salida':
-                    item_tipo.setForeground(Qt.darkRed)
-                else:
-                    item_tipo.setForeground(Qt.darkBlue)
-                
-                self.movimientos_table.setItem(row, 1, item_tipo)
-                
-                # Código interno
-                self.movimientos_table.setItem(row, 2, QTableWidgetItem(mov['codigo_interno']))
-                
-                # Nombre producto
-                self.movimientos_table.setItem(row, 3, QTableWidgetItem(mov['nombre_producto']))
-                
-                # Cantidad
-                cantidad = mov['cantidad']
-                item_cantidad = QTableWidgetItem(str(cantidad))
-                item_cantidad.setTextAlignment(Qt.AlignCenter)
-                if cantidad > 0:
-                    item_cantidad.setForeground(Qt.darkGreen)
-                else:
-                    item_cantidad.setForeground(Qt.darkRed)
-                self.movimientos_table.setItem(row, 4, item_cantidad)
-                
-                # Stock anterior
-                item_stock_ant = QTableWidgetItem(str(mov['stock_anterior']))
-                item_stock_ant.setTextAlignment(Qt.AlignCenter)
-                self.movimientos_table.setItem(row, 5, item_stock_ant)
-                
-                # Stock nuevo
-                item_stock_nuevo = QTableWidgetItem(str(mov['stock_nuevo']))
-                item_stock_nuevo.setTextAlignment(Qt.AlignCenter)
-                self.movimientos_table.setItem(row, 6, item_stock_nuevo)
-                
-                # Motivo
-                self.movimientos_table.setItem(row, 7, QTableWidgetItem(mov['motivo']))
-                
-                # Usuario
-                item_usuario = QTableWidgetItem(mov['nombre_usuario'])
-                item_usuario.setTextAlignment(Qt.AlignCenter)
-                self.movimientos_table.setItem(row, 8, item_usuario)
-            
-            # Actualizar información
-            total_movimientos = len(movimientos)
-            total_general = len(self.movimientos_data)
-            
-            if total_movimientos == total_general:
-                self.info_label.setText(f"Total de movimientos: {total_movimientos}")
-            else:
-                self.info_label.setText(f"Mostrando {total_movimientos} de {total_general} movimientos")
-            
-            logging.info(f"Mostrando {total_movimientos} movimientos en tabla")
+            self.agregar_filas(movimientos)
+            self.actualizar_info()
             
         except Exception as e:
             logging.error(f"Error mostrando movimientos: {e}")
@@ -460,142 +403,129 @@ class HistorialMovimientosWindow(QWidget):
                 detail=str(e)
             )
     
-    def limpiar_filtros(self):
-        """Limpiar todos los filtros y mostrar todo"""
-        self.search_bar.clear()
-        self.tipo_combo.setCurrentIndex(0)
-        self.fecha_inicio.setDate(QDate.currentDate().addMonths(-1))
-        self.fecha_fin.setDate(QDate.currentDate())
-        self.aplicar_filtros()
-    
-    def exportar_excel(self):
-        """Exportar movimientos filtrados a Excel"""
-        try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, PatternFill, Alignment
-            from datetime import datetime
+    def agregar_filas(self, movimientos):
+        """Agregar movimientos al final de la tabla"""
+        for mov in movimientos:
+            row = self.movimientos_table.rowCount()
+            self.movimientos_table.insertRow(row)
             
-            # Crear workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Movimientos Inventario"
+            # Fecha
+            fecha_str = mov['fecha'].strftime("%d/%m/%Y %H:%M") if isinstance(mov['fecha'], datetime) else str(mov['fecha'])
+            item_fecha = QTableWidgetItem(fecha_str)
+            item_fecha.setTextAlignment(Qt.AlignCenter)
+            self.movimientos_table.setItem(row, 0, item_fecha)
             
-            # Encabezados
-            headers = [
-                "Fecha", "Tipo", "Código", "Producto", "Cantidad", 
-                "Stock Anterior", "Stock Nuevo", "Motivo", "Usuario", "ID Venta"
-            ]
+            # Tipo de movimiento
+            tipo = mov['tipo_movimiento'].capitalize()
+            item_tipo = QTableWidgetItem(tipo)
+            item_tipo.setTextAlignment(Qt.AlignCenter)
             
-            # Estilo de encabezado
-            header_fill = PatternFill(start_color="0066CC", end_color="0066CC", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF", size=11)
+            # Color según tipo
+            if mov['tipo_movimiento'].lower() == 'entrada':
+                item_tipo.setForeground(Qt.darkGreen)
+            elif mov['tipo_movimiento'].lower() == 'salida':
+                item_tipo.setForeground(Qt.darkRed)
+            else:
+                item_tipo.setForeground(Qt.darkBlue)
             
-            for col, header in enumerate(headers, start=1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal="center", vertical="center")
+            self.movimientos_table.setItem(row, 1, item_tipo)
             
-            # Obtener movimientos filtrados actuales
-            texto_busqueda = self.search_bar.text().strip().lower()
-            tipo_seleccionado = self.tipo_combo.currentText()
-            fecha_desde = self.fecha_inicio.date().toPython()
-            fecha_hasta = self.fecha_fin.date().toPython()
+            # Código interno
+            self.movimientos_table.setItem(row, 2, QTableWidgetItem(mov['codigo_interno']))
             
-            movimientos_exportar = []
-            for mov in self.movimientos_data:
-                if texto_busqueda:
-                    if not any([
-                        texto_busqueda in mov['codigo_interno'].lower(),
-                        texto_busqueda in mov['nombre_producto'].lower(),
-                        texto_busqueda in mov['nombre_usuario'].lower(),
-                        texto_busqueda in (mov['motivo'] or '').lower()
-                    ]):
-                        continue
-                
-                if tipo_seleccionado != "Todos":
-                    if mov['tipo_movimiento'].lower() != tipo_seleccionado.lower():
-                        continue
-                
-                fecha_mov = mov['fecha'].date() if isinstance(mov['fecha'], datetime) else mov['fecha']
-                if not (fecha_desde <= fecha_mov <= fecha_hasta):
-                    continue
-                
-                movimientos_exportar.append(mov)
+            # Nombre producto
+            self.movimientos_table.setItem(row, 3, QTableWidgetItem(mov['nombre_producto']))
             
-            # Datos
-            for row_idx, mov in enumerate(movimientos_exportar, start=2):
-                fecha_str = mov['fecha'].strftime("%d/%m/%Y %H:%M") if isinstance(mov['fecha'], datetime) else str(mov['fecha'])
-                
-                ws.cell(row=row_idx, column=1, value=fecha_str)
-                ws.cell(row=row_idx, column=2, value=mov['tipo_movimiento'].capitalize())
-                ws.cell(row=row_idx, column=3, value=mov['codigo_interno'])
-                ws.cell(row=row_idx, column=4, value=mov['nombre_producto'])
-                ws.cell(row=row_idx, column=5, value=mov['cantidad'])
-                ws.cell(row=row_idx, column=6, value=mov['stock_anterior'])
-                ws.cell(row=row_idx, column=7, value=mov['stock_nuevo'])
-                ws.cell(row=row_idx, column=8, value=mov['motivo'])
-                ws.cell(row=row_idx, column=9, value=mov['nombre_usuario'])
-                ws.cell(row=row_idx, column=10, value=mov['id_venta'] if mov['id_venta'] else '')
+            # Cantidad
+            cantidad = mov['cantidad']
+            item_cantidad = QTableWidgetItem(str(cantidad))
+            item_cantidad.setTextAlignment(Qt.AlignCenter)
+            if cantidad > 0:
+                item_cantidad.setForeground(Qt.darkGreen)
+            else:
+                item_cantidad.setForeground(Qt.darkRed)
+            self.movimientos_table.setItem(row, 4, item_cantidad)
             
-            # Ajustar anchos
-            ws.column_dimensions['A'].width = 18
-            ws.column_dimensions['B'].width = 12
-            ws.column_dimensions['C'].width = 15
-            ws.column_dimensions['D'].width = 35
-            ws.column_dimensions['E'].width = 10
-            ws.column_dimensions['F'].width = 12
-            ws.column_dimensions['G'].width = 12
-            ws.column_dimensions['H'].width = 30
-            ws.column_dimensions['I'].width = 20
-            ws.column_dimensions['J'].width = 10
+            # Stock anterior
+            item_stock_ant = QTableWidgetItem(str(mov['stock_anterior']))
+            item_stock_ant.setTextAlignment(Qt.AlignCenter)
+            self.movimientos_table.setItem(row, 5, item_stock_ant)
             
-            # Guardar archivo
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"movimientos_inventario_{timestamp}.xlsx"
-            wb.save(filename)
+            # Stock nuevo
+            item_stock_nuevo = QTableWidgetItem(str(mov['stock_nuevo']))
+            item_stock_nuevo.setTextAlignment(Qt.AlignCenter)
+            self.movimientos_table.setItem(row, 6, item_stock_nuevo)
             
-            show_info_dialog(
-                self,
-                "Exportación exitosa",
-                f"Archivo generado: {filename}\n\nMovimientos exportados: {len(movimientos_exportar)}"
-            )
+            # Motivo
+            self.movimientos_table.setItem(row, 7, QTableWidgetItem(mov['motivo']))
             
-            logging.info(f"Reporte de movimientos exportado: {filename}")
-            
-        except ImportError:
-            show_error_dialog(
-                self,
-                "Módulo no disponible",
-                "No se puede exportar a Excel. El módulo openpyxl no está instalado."
-            )
-        except Exception as e:
-            logging.error(f"Error exportando a Excel: {e}")
-            show_error_dialog(
-                self,
-                "Error de exportación",
-                "No se pudo generar el archivo Excel",
-                detail=str(e)
-            )
+            # Usuario
+            item_usuario = QTableWidgetItem(mov['nombre_usuario'])
+            item_usuario.setTextAlignment(Qt.AlignCenter)
+            self.movimientos_table.setItem(row, 8, item_usuario)
+    
+    def actualizar_info(self):
+        """Actualizar la etiqueta con el resumen de lo cargado"""
+        total_movimientos = len(self.movimientos_filtrados)
+        total_general = len(self.movimientos_data)
+        mas = " (desplaza para cargar más)" if self.hay_mas else ""
+        
+        if total_movimientos == total_general:
+            self.info_label.setText(f"Movimientos cargados: {total_movimientos}{mas}")
+        else:
+            self.info_label.setText(f"Mostrando {total_movimientos} de {total_general} movimientos cargados{mas}")
+        
+        # Con la búsqueda pueden quedar pocas filas: seguir pidiendo páginas hasta llenar la tabla
+        self.completar_tabla()
+    
+    def limpiar_filtros(self):
+        """Limpiar todos los filtros y mostrar todo"""
+        # Bloquear señales para recargar una sola vez al final
+        controles = [self.tipo_combo, self.fecha_inicio, self.fecha_fin]
+        for control in controles:
+            control.blockSignals(True)
+        
+        self.search_bar.clear()
+        self.tipo_combo.setCurrentIndex(0)
+        self.fecha_inicio.setDate(QDate.currentDate().addMonths(-1))
+        self.fecha_fin.setDate(QDate.currentDate())
+        
+        for control in controles:
+            control.blockSignals(False)
+        self.cargar_movimientos()
+    
+    def exportar_excel(self):
+        """Exportar a Excel todos los movimientos que cumplen los filtros (en segundo plano)"""
+        # Se exportan también las páginas que aún no se cargaron en la tabla;
+        # los filtros y el texto se leen aquí porque el pool no toca widgets
+        texto_busqueda = self.search_bar.text().strip().lower()
+        filas = filas_paginadas(
+            self.pg_manager.obtener_pagina_movimientos,
+            filtros=self.obtener_filtros_servidor(),
+            cursor=self.cursor,
+            hay_mas=self.hay_mas,
+            cargadas=list(self.movimientos_data),
+            convertir=convertir_movimiento,
+            filtro=lambda mov: coincide_texto_movimiento(mov, texto_busqueda)
+        )
+        
+        self.tarea_exportacion = iniciar_exportacion(
+            self,
+            filas,
+            COLUMNAS_EXPORTACION,
+            ruta_exportacion("movimientos_inventario"),
+            "movimientos",
+            titulo_hoja="Movimientos Inventario",
+            clave='exportar.movimientos_inventario',
+            color_encabezado="0066CC"
+        )
     
     def closeEvent(self, event):
         """Evento al cerrar la ventana"""
-        # Detener hilo de carga si está activo
-        if self.loader_thread and self.loader_thread.isRunning():
-            self.loader_thread.quit()
-            if not self.loader_thread.wait(2000):  # Esperar hasta 2 segundos
-                self.loader_thread.terminate()
-                self.loader_thread.wait()
+        # Descartar la página en curso (no se espera a la red)
+        if self.tarea_pagina:
+            self.tarea_pagina.cancelar()
+        if self.tarea_exportacion:
+            self.tarea_exportacion.cancelar()
             
         super().closeEvent(event)
-    
-    def __del__(self):
-        """Destructor para limpiar el thread"""
-        try:
-            if hasattr(self, 'loader_thread') and self.loader_thread:
-                if self.loader_thread.isRunning():
-                    self.loader_thread.quit()
-                    self.loader_thread.wait(1000)
-        except (RuntimeError, AttributeError):
-            # El thread ya fue eliminado por C++
-            pass
\ No newline at end of file
@@ -27,7 +27,8 @@ from ui.components import (
     show_warning_dialog,
     show_error_dialog,
     show_success_dialog,
-    aplicar_estilo_fecha
+    aplicar_estilo_fecha,
+    conectar_scroll_infinito
 )
 
 
@@ -43,6 +44,11 @@ class HistorialTurnosWindow(QWidget):
         self.turnos_data = []
         self.turnos_filtrados = []
         
+        # Estado de la paginación por cursor
+        self.cursor = None
+        self.hay_mas = False
+        self.cargando = False
+        
         self.setup_ui()
         self.cargar_turnos()
     
@@ -137,7 +143,7 @@ class HistorialTurnosWindow(QWidget):
         """
         self.estado_combo.setStyleSheet(input_style)
         self.estado_combo.setMinimumHeight(40)
-        self.estado_combo.currentIndexChanged.connect(self.aplicar_filtros)
+        self.estado_combo.currentIndexChanged.connect(self.cargar_turnos)
         container_layout.addWidget(self.estado_combo)
         
         return container
@@ -176,7 +182,7 @@ class HistorialTurnosWindow(QWidget):
         self.fecha_inicio.setDate(QDate.currentDate().addDays(-30))
         aplicar_estilo_fecha(self.fecha_inicio)
         self.fecha_inicio.setMinimumHeight(40)
-        self.fecha_inicio.dateChanged.connect(self.aplicar_filtros)
+        self.fecha_inicio.dateChanged.connect(self.cargar_turnos)
         fecha_inicio_layout.addWidget(self.fecha_inicio)
         
         fecha_layout.addWidget(fecha_inicio_container, stretch=1)
@@ -195,7 +201,7 @@ class HistorialTurnosWindow(QWidget):
         self.fecha_fin.setDate(QDate.currentDate())
         aplicar_estilo_fecha(self.fecha_fin)
         self.fecha_fin.setMinimumHeight(40)
-        self.fecha_fin.dateChanged.connect(self.aplicar_filtros)
+        self.fecha_fin.dateChanged.connect(self.cargar_turnos)
         fecha_fin_layout.addWidget(self.fecha_fin)
         
         fecha_layout.addWidget(fecha_fin_container, stretch=1)
@@ -271,6 +277,9 @@ class HistorialTurnosWindow(QWidget):
         # Conectar doble clic para ver detalles
         self.tabla_turnos.itemDoubleClicked.connect(self.mostrar_detalles_turno)
         
+        # Cargar la siguiente página al acercarse al final
+        self.completar_tabla = conectar_scroll_infinito(self.tabla_turnos, self.cargar_siguiente_pagina)
+        
         table_layout.addWidget(self.tabla_turnos)
         
         return table_panel
@@ -301,74 +310,79 @@ class HistorialTurnosWindow(QWidget):
         return panel_layout
     
     def cargar_turnos(self):
-        """Cargar turnos desde la base de datos"""
+        """Recargar turnos desde la primera página con los filtros actuales"""
+        self.cursor = None
+        self.hay_mas = False
+        self.turnos_data = []
+        self.turnos_filtrados = []
+        self.tabla_turnos.setRowCount(0)
+        self.cargar_pagina()
+    
+    def cargar_siguiente_pagina(self):
+        """Cargar la página siguiente si existe y no hay otra en curso"""
+        if self.hay_mas and not self.cargando:
+            self.cargar_pagina()
+    
+    def cargar_pagina(self):
+        """Traer la página posterior al cursor y agregarla a la tabla"""
+        self.cargando = True
         try:
-            response = self.pg_manager.client.table('turnos_caja').select(
-                '*, usuarios(nombre_completo)'
-            ).order('fecha_apertura', desc=True).execute()
+            estado_filtro = self.estado_combo.currentText()
+            cerrado = None
+            if estado_filtro == "Abiertos":
+                cerrado = False
+            elif estado_filtro == "Cerrados":
+                cerrado = True
+            
+            pagina = self.pg_manager.obtener_pagina_turnos(
+                cursor=self.cursor,
+                fecha_desde=self.fecha_inicio.date().toPython(),
+                fecha_hasta=self.fecha_fin.date().toPython(),
+                cerrado=cerrado
+            )
             
             # Procesar datos para tener nombre_usuario disponible
-            self.turnos_data = []
-            for turno in (response.data or []):
+            nuevos = []
+            for turno in pagina['filas']:
                 # Extraer nombre del usuario del objeto anidado
                 if 'usuarios' in turno and turno['usuarios']:
                     turno['nombre_usuario'] = turno['usuarios'].get('nombre_completo', 'N/A')
                 else:
                     turno['nombre_usuario'] = 'N/A'
-                self.turnos_data.append(turno)
+                nuevos.append(turno)
             
-            self.aplicar_filtros()
+            self.cursor = pagina['cursor']
+            self.hay_mas = pagina['hay_mas']
+            self.turnos_data.extend(nuevos)
+            
+            # Solo se dibujan las filas nuevas
+            desde = len(self.turnos_filtrados)
+            self.turnos_filtrados.extend(t for t in nuevos if self.coincide_busqueda(t))
+            self.actualizar_tabla(desde)
                 
         except Exception as e:
             logging.error(f"Error cargando turnos: {e}")
             show_error_dialog(self, "Error", f"No se pudieron cargar los turnos: {e}")
+        finally:
+            self.cargando = False
     
-    def aplicar_filtros(self):
-        """Aplicar filtros a los datos de turnos"""
-        # Obtener valores de filtros
+    def coincide_busqueda(self, turno):
+        """Filtro de búsqueda por usuario sobre los turnos ya cargados"""
         texto_busqueda = self.search_bar.text().strip().lower()
-        estado_filtro = self.estado_combo.currentText()
-        fecha_inicio = self.fecha_inicio.date().toPython()
-        fecha_fin = self.fecha_fin.date().toPython()
-        
-        # Filtrar datos
-        self.turnos_filtrados = []
-        for turno in self.turnos_data:
-            # Filtro de búsqueda por usuario
-            if texto_busqueda and texto_busqueda not in turno['nombre_usuario'].lower():
-                continue
-            
-            # Filtro de estado
-            if estado_filtro == "Abiertos" and turno['cerrado']:
-                continue
-            elif estado_filtro == "Cerrados" and not turno['cerrado']:
-                continue
-            
-            # Filtro de fechas
-            if turno['fecha_apertura']:
-                try:
-                    # Convertir string a datetime si es necesario
-                    if isinstance(turno['fecha_apertura'], str):
-                        fecha_apertura = datetime.fromisoformat(turno['fecha_apertura'].replace('Z', '+00:00')).date()
-                    else:
-                        fecha_apertura = turno['fecha_apertura'].date()
-                    
-                    if fecha_apertura < fecha_inicio or fecha_apertura > fecha_fin:
-                        continue
-                except Exception as e:
-                    logging.error(f"Error procesando fecha de turno: {e}")
-                    continue
-            
-            self.turnos_filtrados.append(turno)
+        return not texto_busqueda or texto_busqueda in turno['nombre_usuario'].lower()
+    
+    def aplicar_filtros(self):
+        """Aplicar el filtro de texto (estado y fechas se resuelven en la consulta)"""
+        self.turnos_filtrados = [t for t in self.turnos_data if self.coincide_busqueda(t)]
         
         # Actualizar tabla
         self.actualizar_tabla()
     
-    def actualizar_tabla(self):
-        """Actualizar contenido de la tabla"""
+    def actualizar_tabla(self, desde=0):
+        """Actualizar contenido de la tabla a partir de la fila indicada"""
         self.tabla_turnos.setRowCount(len(self.turnos_filtrados))
         
-        for row_idx, turno in enumerate(self.turnos_filtrados):
+        for row_idx, turno in enumerate(self.turnos_filtrados[desde:], start=desde):
             # ID
             self.tabla_turnos.setItem(row_idx, 0, QTableWidgetItem(str(turno['id_turno'])))
             
@@ -451,7 +465,14 @@ class HistorialTurnosWindow(QWidget):
             self.tabla_turnos.setItem(row_idx, 9, item_estado)
         
         # Actualizar label de total
-        self.label_total.setText(f"Total de turnos: {len(self.turnos_filtrados)}")
+        mas = " (desplaza para cargar más)" if self.hay_mas else ""
+        if len(self.turnos_filtrados) == len(self.turnos_data):
+            self.label_total.setText(f"Turnos cargados: {len(self.turnos_data)}{mas}")
+        else:
+            self.label_total.setText(f"Mostrando {len(self.turnos_filtrados)} de {len(self.turnos_data)} turnos cargados{mas}")
+        
+        # Con la búsqueda pueden quedar pocas filas: seguir pidiendo páginas hasta llenar la tabla
+        self.completar_tabla()
     
     def mostrar_detalles_turno(self, item):
         """Mostrar detalles completos del turno seleccionado"""
@@ -516,8 +537,16 @@ class HistorialTurnosWindow(QWidget):
     
     def limpiar_filtros(self):
         """Limpiar todos los filtros"""
+        # Bloquear señales para recargar una sola vez al final
+        controles = [self.estado_combo, self.fecha_inicio, self.fecha_fin]
+        for control in controles:
+            control.blockSignals(True)
+        
         self.search_bar.clear()
         self.estado_combo.setCurrentIndex(0)
         self.fecha_inicio.setDate(QDate.currentDate().addDays(-30))
         self.fecha_fin.setDate(QDate.currentDate())
-        self.aplicar_filtros()
+        
+        for control in controles:
+            control.blockSignals(False)
+        self.cargar_turnos()
@@ -5,9 +5,8 @@ Usando componentes reutilizables del sistema de diseño
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, 
-    QPushButton, QTableWidget, QTableWidgetItem,
-    QHeaderView, QLineEdit, QSizePolicy, QFrame,
-    QComboBox, QCheckBox, QDialog, QAbstractItemView
+    QPushButton, QLineEdit, QSizePolicy, QFrame,
+    QComboBox, QCheckBox, QDialog
 )
 from PySide6.QtCore import Qt, Signal, QTimer
 from PySide6.QtGui import QFont
@@ -22,10 +21,28 @@ from ui.components import (
     StyledLabel,
     SearchBar,
     show_info_dialog,
-    show_warning_dialog,
-    show_error_dialog
+    show_error_dialog,
+    ColumnaTabla,
+    TablaDatos,
+    EstadoDelegate
 )
 from ui.editable_catalog_grid import EditableCatalogGrid
+from ui.exportacion_dialog import iniciar_exportacion
+from services.exportador import CARPETA_ESCRITORIO, ColumnaExportacion, ruta_exportacion
+
+
+# Columnas del reporte de inventario (el stock bajo el mínimo va resaltado)
+COLUMNAS_REPORTE = [
+    ColumnaExportacion("Código", 'codigo_interno', ancho=15),
+    ColumnaExportacion("Nombre", 'nombre', ancho=35),
+    ColumnaExportacion("Categoría", valor=lambda p: p.get('seccion', 'N/A'), ancho=15),
+    ColumnaExportacion("Precio", 'precio', ancho=12, formato_numero='$#,##0.00'),
+    ColumnaExportacion("Stock Actual", 'stock_actual', ancho=12, centrar=True,
+                       resaltar=lambda p: p['stock_actual'] <= p['stock_minimo']),
+    ColumnaExportacion("Stock Mín", 'stock_minimo', ancho=12, centrar=True),
+    ColumnaExportacion("Ubicación", valor=lambda p: p.get('ubicacion', 'N/A'), ancho=15),
+    ColumnaExportacion("Estado", valor=lambda p: "Activo" if p['activo'] else "Inactivo", ancho=12),
+]
 
 
 class InventarioWindow(QWidget):
@@ -39,6 +56,7 @@ class InventarioWindow(QWidget):
         self.supabase_service = supabase_service
         self.user_data = user_data
         self.productos_data = []
+        self.tarea_exportacion = None
         
         # Timer para detectar entrada del escáner
         self.scanner_timer = QTimer()
@@ -207,43 +225,46 @@ class InventarioWindow(QWidget):
         table_layout = QVBoxLayout(table_panel)
         table_layout.setContentsMargins(0, 0, 0, 0)
         
-        # Tabla de inventario
-        self.inventory_table = QTableWidget()
-        self.inventory_table.setColumnCount(8)
-        self.inventory_table.setHorizontalHeaderLabels([
-            "Código", "Nombre", "Categoría", "Precio", "Stock", "Stock Min", "Ubicación", "Estado"
-        ])
-        
-        # Configurar header
-        header = self.inventory_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(1, QHeaderView.Stretch)
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(7, QHeaderView.ResizeToContents)
-        
-        self.inventory_table.verticalHeader().setVisible(False)
-        self.inventory_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.inventory_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
-        self.inventory_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        self.inventory_table.setAlternatingRowColors(True)
+        # Tabla de inventario (modelo/vista: solo se pintan las filas visibles)
+        columnas = [
+            ColumnaTabla("Código", 'codigo_interno'),
+            ColumnaTabla("Nombre", 'nombre', ancho='stretch'),
+            ColumnaTabla("Categoría", texto=lambda p: p.get('seccion') or 'N/A'),
+            ColumnaTabla(
+                "Precio",
+                texto=lambda p: f"${float(p['precio']) if p['precio'] is not None else 0.0:.2f}",
+                orden=lambda p: float(p['precio'] or 0),
+                alineacion=Qt.AlignRight | Qt.AlignVCenter
+            ),
+            ColumnaTabla(
+                "Stock", 'stock_actual',
+                alineacion=Qt.AlignCenter,
+                # Colorear si está bajo en stock
+                color=lambda p: Qt.red if p['stock_actual'] <= p['stock_minimo'] else None
+            ),
+            ColumnaTabla("Stock Min", 'stock_minimo', alineacion=Qt.AlignCenter),
+            ColumnaTabla("Ubicación", texto=lambda p: p.get('ubicacion') or 'N/A'),
+            ColumnaTabla("Estado", texto=lambda p: "Activo" if p['activo'] else "Inactivo", alineacion=Qt.AlignCenter)
+        ]
+        self.inventory_table = TablaDatos(columnas)
+        self.inventory_table.set_delegado_columna(7, EstadoDelegate({
+            "Activo": WindowsPhoneTheme.TILE_GREEN,
+            "Inactivo": WindowsPhoneTheme.TEXT_SECONDARY
+        }))
         self.inventory_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         
         # Aplicar estilos a la tabla
         self.inventory_table.setStyleSheet(f"""
-            QTableWidget {{
+            QTableView {{
                 background-color: white;
                 border: none;
                 gridline-color: #e5e7eb;
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 padding: 8px;
                 border-bottom: 1px solid #e5e7eb;
             }}
-            QTableWidget::item:selected {{
+            QTableView::item:selected {{
                 background-color: {WindowsPhoneTheme.TILE_BLUE};
                 color: white;
             }}
@@ -314,6 +335,7 @@ class InventarioWindow(QWidget):
             self.ubicacion_combo.addItem("Todas")
             self.ubicacion_combo.addItems(ubicaciones)
             
+            self.inventory_table.set_filas(self.productos_data)
             self.aplicar_filtros()
             
             logging.info(f"Inventario cargado: {len(self.productos_data)} productos")
@@ -327,56 +349,12 @@ class InventarioWindow(QWidget):
                 detail=str(e)
             )
     
-    def mostrar_inventario(self, productos):
-        """Mostrar productos en la tabla"""
-        self.inventory_table.setRowCount(0)
-        
-        for row, producto in enumerate(productos):
-            self.inventory_table.insertRow(row)
-            
-            # Código
-            self.inventory_table.setItem(row, 0, QTableWidgetItem(producto['codigo_interno']))
-            
-            # Nombre
-            self.inventory_table.setItem(row, 1, QTableWidgetItem(producto['nombre']))
-            
-            # Categoría (usar seccion si está disponible)
-            self.inventory_table.setItem(row, 2, QTableWidgetItem(producto.get('seccion', 'N/A')))
-            
-            # Precio
-            precio = float(producto['precio']) if producto['precio'] is not None else 0.0
-            precio_item = QTableWidgetItem(f"${precio:.2f}")
-            precio_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.inventory_table.setItem(row, 3, precio_item)
-            
-            # Stock actual
-            stock_item = QTableWidgetItem(str(producto['stock_actual']))
-            stock_item.setTextAlignment(Qt.AlignCenter)
-            
-            # Colorear si está bajo en stock
-            if producto['stock_actual'] <= producto['stock_minimo']:
-                stock_item.setForeground(Qt.red)
-            
-            self.inventory_table.setItem(row, 4, stock_item)
-            
-            # Stock mínimo
-            stock_min_item = QTableWidgetItem(str(producto['stock_minimo']))
-            stock_min_item.setTextAlignment(Qt.AlignCenter)
-            self.inventory_table.setItem(row, 5, stock_min_item)
-            
-            # Ubicación
-            ubicacion = producto.get('ubicacion', 'N/A')
-            self.inventory_table.setItem(row, 6, QTableWidgetItem(ubicacion))
-            
-            # Estado
-            estado = "Activo" if producto['activo'] else "Inactivo"
-            estado_item = QTableWidgetItem(estado)
-            if not producto['activo']:
-                estado_item.setForeground(Qt.gray)
-            self.inventory_table.setItem(row, 7, estado_item)
+    def mostrar_inventario(self, predicado=None):
+        """Mostrar en la tabla los productos que cumplen el predicado"""
+        self.inventory_table.filtrar(predicado)
         
         # Actualizar información
-        total_productos = len(productos)
+        total_productos = self.inventory_table.total_visibles()
         total_general = len(self.productos_data)
         
         if total_productos == total_general:
@@ -400,9 +378,7 @@ class InventarioWindow(QWidget):
             ubicacion_seleccionada = self.ubicacion_combo.currentText()
             solo_activos = self.check_solo_activos.isChecked()
             
-            productos_filtrados = []
-            
-            for producto in self.productos_data:
+            def coincide(producto):
                 # Filtro de búsqueda de texto
                 if texto_busqueda:
                     texto_match = (
@@ -412,48 +388,48 @@ class InventarioWindow(QWidget):
                         or (producto.get('codigo_barras') and texto_busqueda in producto['codigo_barras'].lower())
                     )
                     if not texto_match:
-                        continue
+                        return False
                 
                 # Filtro de categoría (usar seccion)
                 if categoria_seleccionada != "Todas":
                     if producto.get('seccion') != categoria_seleccionada:
-                        continue
+                        return False
                 
                 # Filtro de tipo de producto
                 if tipo_seleccionado == "Producto Varios":
                     if producto['tipo_producto'] != 'varios':
-                        continue
+                        return False
                 elif tipo_seleccionado == "Suplemento":
                     if producto['tipo_producto'] != 'suplemento':
-                        continue
+                        return False
                 
                 # Filtro de estado de stock
                 if stock_seleccionado == "Bajo Stock":
                     if producto['stock_actual'] > producto['stock_minimo']:
-                        continue
+                        return False
                 elif stock_seleccionado == "Sin Stock":
                     if producto['stock_actual'] > 0:
-                        continue
+                        return False
                 elif stock_seleccionado == "Stock Normal":
                     if producto['stock_actual'] <= producto['stock_minimo']:
-                        continue
+                        return False
                 
                 # Filtro de ubicación
                 if ubicacion_seleccionada != "Todas":
                     if producto.get('ubicacion') != ubicacion_seleccionada:
-                        continue
+                        return False
                 
                 # Filtro de activos
                 if solo_activos and not producto['activo']:
-                    continue
+                    return False
                 
-                productos_filtrados.append(producto)
+                return True
             
-            self.mostrar_inventario(productos_filtrados)
+            self.mostrar_inventario(coincide)
             
         except Exception as e:
             logging.error(f"Error aplicando filtros: {e}")
-            self.mostrar_inventario(self.productos_data)
+            self.mostrar_inventario(None)
     
     def filtrar_inventario(self):
         """Filtrar inventario (llamado por el timer del escáner)"""
@@ -471,17 +447,17 @@ class InventarioWindow(QWidget):
     
     def filtrar_bajo_stock(self):
         """Filtrar productos con stock bajo o menor al mínimo"""
-        productos_bajo_stock = [
-            p for p in self.productos_data
-            if p['stock_actual'] <= p['stock_minimo']
-        ]
+        def bajo_stock(p):
+            return p['stock_actual'] <= p['stock_minimo']
+        
+        total_bajo_stock = sum(1 for p in self.productos_data if bajo_stock(p))
         
-        if productos_bajo_stock:
-            self.mostrar_inventario(productos_bajo_stock)
+        if total_bajo_stock:
+            self.mostrar_inventario(bajo_stock)
             show_info_dialog(
                 self,
                 "Productos bajo stock",
-                f"Se encontraron {len(productos_bajo_stock)} productos con stock bajo o menor al mínimo"
+                f"Se encontraron {total_bajo_stock} productos con stock bajo o menor al mínimo"
             )
         else:
             show_info_dialog(
@@ -491,110 +467,19 @@ class InventarioWindow(QWidget):
             )
     
     def generar_reporte(self):
-        """Generar reporte de inventario en Excel"""
-        try:
-            from datetime import datetime
-            import os
-            
-            # Verificar si openpyxl está disponible
-            try:
-                from openpyxl import Workbook
-                from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-            except ImportError:
-                show_warning_dialog(
-                    self,
-                    "Biblioteca requerida",
-                    "Para generar reportes en Excel necesitas instalar openpyxl",
-                    detail="Ejecuta: pip install openpyxl"
-                )
-                return
-            
-            # Crear libro de Excel
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Inventario"
-            
-            # Estilos
-            header_fill = PatternFill(start_color="1E3A8A", end_color="1E3A8A", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # Encabezados
-            headers = ["Código", "Nombre", "Categoría", "Precio", "Stock Actual", "Stock Mín", "Ubicación", "Estado"]
-            
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
-                cell.border = border
-            
-            # Datos
-            for row, producto in enumerate(self.productos_data, 2):
-                ws.cell(row=row, column=1, value=producto['codigo_interno']).border = border
-                ws.cell(row=row, column=2, value=producto['nombre']).border = border
-                ws.cell(row=row, column=3, value=producto.get('seccion', 'N/A')).border = border
-                
-                precio_cell = ws.cell(row=row, column=4, value=producto['precio'])
-                precio_cell.number_format = '$#,##0.00'
-                precio_cell.border = border
-                
-                stock_cell = ws.cell(row=row, column=5, value=producto['stock_actual'])
-                stock_cell.alignment = Alignment(horizontal="center")
-                stock_cell.border = border
-                
-                # Resaltar bajo stock
-                if producto['stock_actual'] <= producto['stock_minimo']:
-                    stock_cell.font = Font(color="FF0000", bold=True)
-                
-                stock_min_cell = ws.cell(row=row, column=6, value=producto['stock_minimo'])
-                stock_min_cell.alignment = Alignment(horizontal="center")
-                stock_min_cell.border = border
-                
-                ws.cell(row=row, column=7, value=producto.get('ubicacion', 'N/A')).border = border
-                ws.cell(row=row, column=8, value="Activo" if producto['activo'] else "Inactivo").border = border
-            
-            # Ajustar anchos de columna
-            ws.column_dimensions['A'].width = 15
-            ws.column_dimensions['B'].width = 35
-            ws.column_dimensions['C'].width = 15
-            ws.column_dimensions['D'].width = 12
-            ws.column_dimensions['E'].width = 12
-            ws.column_dimensions['F'].width = 12
-            ws.column_dimensions['G'].width = 15
-            ws.column_dimensions['H'].width = 12
-            
-            # Guardar archivo
-            fecha_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-            desktop = os.path.join(os.path.expanduser("~"), "Desktop")
-            filename = os.path.join(desktop, f"Inventario_HTF_{fecha_str}.xlsx")
-            
-            wb.save(filename)
-            
-            show_info_dialog(
-                self,
-                "Reporte generado",
-                f"El reporte de inventario ha sido generado exitosamente",
-                detail=f"Archivo guardado en:\n{filename}"
-            )
-            
-            logging.info(f"Reporte de inventario generado: {filename}")
-            
-        except Exception as e:
-            logging.error(f"Error generando reporte: {e}")
-            show_error_dialog(
-                self,
-                "Error al generar reporte",
-                "No se pudo crear el archivo de Excel",
-                detail=str(e)
-            )
+        """Generar reporte de inventario en Excel (en segundo plano)"""
+        # El inventario ya está en memoria: solo la escritura sale del hilo de la interfaz
+        self.tarea_exportacion = iniciar_exportacion(
+            self,
+            list(self.productos_data),
+            COLUMNAS_REPORTE,
+            ruta_exportacion("Inventario_HTF", CARPETA_ESCRITORIO),
+            "productos",
+            titulo_hoja="Inventario",
+            red=False,
+            clave='exportar.inventario',
+            bordes=True
+        )
     
     def abrir_grid_editable(self):
         """Abrir ventana con grid editable del catálogo"""
@@ -5,15 +5,14 @@ Grid de lockers con formulario para crear/editar
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
-    QLineEdit, QComboBox, QTableWidget, QTableWidgetItem,
-    QCheckBox, QDialog, QHeaderView, QPushButton,
-    QAbstractItemView
+    QLineEdit, QComboBox, QCheckBox, QDialog
 )
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QFont
 import logging
-import qtawesome as qta
 
+from database.async_manager import obtener_async
+from database.consultas_compartidas import ejecutar_compartida
 from ui.components import (
     WindowsPhoneTheme,
     TileButton,
@@ -25,7 +24,11 @@ from ui.components import (
     show_success_dialog,
     show_warning_dialog,
     show_error_dialog,
-    show_confirmation_dialog
+    show_confirmation_dialog,
+    ColumnaTabla,
+    TablaDatos,
+    BotonesAccionDelegate,
+    EstadoDelegate
 )
 
 
@@ -214,6 +217,9 @@ class FormularioLockerDialog(QDialog):
                 }).execute()
                 msg = "creado"
             
+            # Descartar los lockers en memoria (asignación de lockers)
+            self.pg_manager.invalidar_datos_referencia('lockers')
+            
             show_success_dialog(
                 self,
                 "Éxito",
@@ -242,6 +248,7 @@ class LockersWindow(QWidget):
         self.pg_manager = pg_manager
         self.user_data = user_data
         self.lockers_data = []
+        self.db_async = obtener_async(pg_manager)
         
         self.setup_ui()
         self.cargar_lockers()
@@ -299,41 +306,44 @@ class LockersWindow(QWidget):
         panel = ContentPanel()
         panel_layout = QVBoxLayout(panel)
         
-        # Tabla
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            "Número", "Ubicación", "Tipo", "Requiere Llave", "Estado", "Acciones"
-        ])
+        # Tabla (modelo/vista: los botones se pintan, no hay widgets por fila)
+        columnas = [
+            ColumnaTabla("Número", 'numero'),
+            ColumnaTabla("Ubicación", texto=lambda l: l['ubicacion'] or "N/A", ancho='stretch'),
+            ColumnaTabla("Tipo", texto=lambda l: l['tipo'] or "estándar"),
+            ColumnaTabla("Requiere Llave", texto=lambda l: "Sí" if l['requiere_llave'] else "No"),
+            ColumnaTabla("Estado", texto=lambda l: "Activo" if l['activo'] else "Inactivo", alineacion=Qt.AlignCenter),
+            ColumnaTabla("Acciones", texto=lambda l: '')
+        ]
+        self.table = TablaDatos(columnas, alto_fila=60, ordenable=False)
+        self.table.setAlternatingRowColors(False)
         
-        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        self.table.verticalHeader().setVisible(False)
+        self.table.set_delegado_columna(4, EstadoDelegate({
+            "Activo": WindowsPhoneTheme.TILE_GREEN,
+            "Inactivo": WindowsPhoneTheme.TILE_RED
+        }))
         
-        # Configurar headers
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)  # Número
-        header.setSectionResizeMode(1, QHeaderView.Stretch)  # Ubicación
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)  # Tipo
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # Requiere Llave
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)  # Estado
-        header.setSectionResizeMode(5, QHeaderView.ResizeToContents)  # Acciones
+        acciones = BotonesAccionDelegate([
+            {'clave': 'editar', 'icono': 'fa5s.edit', 'color': WindowsPhoneTheme.TILE_BLUE, 'tooltip': "Editar locker"},
+            {'clave': 'eliminar', 'icono': 'fa5s.trash', 'color': WindowsPhoneTheme.TILE_RED, 'tooltip': "Eliminar locker"}
+        ])
+        acciones.accion_solicitada.connect(self.ejecutar_accion)
+        self.table.set_delegado_columna(5, acciones)
         
         # Estilo de tabla
         self.table.setStyleSheet(f"""
-            QTableWidget {{
+            QTableView {{
                 background-color: white;
                 border: none;
                 gridline-color: #e5e7eb;
                 font-family: {WindowsPhoneTheme.FONT_FAMILY};
                 font-size: {WindowsPhoneTheme.FONT_SIZE_NORMAL}px;
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 padding: 8px;
                 border-bottom: 1px solid #e5e7eb;
             }}
-            QTableWidget::item:selected {{
+            QTableView::item:selected {{
                 background-color: {WindowsPhoneTheme.TILE_BLUE};
                 color: white;
             }}
@@ -353,115 +363,53 @@ class LockersWindow(QWidget):
         return panel
     
     def cargar_lockers(self):
-        """Cargar lockers desde la base de datos"""
-        try:
-            response = self.pg_manager.client.table('lockers').select(
-                'id_locker, numero, ubicacion, tipo, requiere_llave, activo'
-            ).order('numero').execute()
-            
-            self.lockers_data = response.data
-            self.mostrar_lockers(self.lockers_data)
-                
-        except Exception as e:
-            logging.error(f"Error cargando lockers: {e}")
-            show_error_dialog(self, "Error", f"No se pudieron cargar los lockers:\n{str(e)}")
+        """Cargar lockers desde la base de datos (en segundo plano)"""
+        consulta = lambda: ejecutar_compartida(self.pg_manager.client.table('lockers').select(
+            'id_locker, numero, ubicacion, tipo, requiere_llave, activo'
+        ).order('numero')).data
+        
+        self.db_async.ejecutar(
+            consulta,
+            clave='lockers.catalogo',
+            al_terminar=self.on_lockers_cargados,
+            al_fallar=self.on_error_carga
+        )
+    
+    def on_lockers_cargados(self, lockers):
+        """Mostrar los lockers recibidos"""
+        self.lockers_data = lockers or []
+        self.mostrar_lockers(self.lockers_data)
+    
+    def on_error_carga(self, error):
+        """Error al cargar lockers"""
+        logging.error(f"Error cargando lockers: {error}")
+        show_error_dialog(self, "Error", f"No se pudieron cargar los lockers:\n{error}")
     
     def mostrar_lockers(self, lockers):
         """Mostrar lockers en la tabla"""
-        self.table.setRowCount(0)
-        
-        for i, locker in enumerate(lockers):
-            self.table.insertRow(i)
-            self.table.setRowHeight(i, 60)
-            
-            # Número
-            self.table.setItem(i, 0, QTableWidgetItem(locker['numero']))
-            
-            # Ubicación
-            self.table.setItem(i, 1, QTableWidgetItem(locker['ubicacion'] or "N/A"))
-            
-            # Tipo
-            self.table.setItem(i, 2, QTableWidgetItem(locker['tipo'] or "estándar"))
-            
-            # Requiere llave
-            llave = "Sí" if locker['requiere_llave'] else "No"
-            self.table.setItem(i, 3, QTableWidgetItem(llave))
-            
-            # Estado
-            estado = "Activo" if locker['activo'] else "Inactivo"
-            item_estado = QTableWidgetItem(estado)
-            if locker['activo']:
-                item_estado.setForeground(Qt.darkGreen)
-            else:
-                item_estado.setForeground(Qt.red)
-            self.table.setItem(i, 4, item_estado)
-            
-            # Botones de acción
-            acciones_widget = QWidget()
-            acciones_layout = QHBoxLayout(acciones_widget)
-            acciones_layout.setContentsMargins(5, 5, 5, 5)
-            acciones_layout.setSpacing(5)
-            
-            btn_editar = QPushButton()
-            btn_editar.setIcon(qta.icon('fa5s.edit', color='white'))
-            btn_editar.setToolTip("Editar locker")
-            btn_editar.setMinimumHeight(30)
-            btn_editar.setFixedWidth(40)
-            btn_editar.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {WindowsPhoneTheme.TILE_BLUE};
-                    color: white;
-                    border: none;
-                    border-radius: 3px;
-                }}
-                QPushButton:hover {{
-                    background-color: #1976d2;
-                }}
-            """)
-            btn_editar.clicked.connect(lambda checked, l=locker: self.editar_locker(l))
-            acciones_layout.addWidget(btn_editar)
-            
-            btn_eliminar = QPushButton()
-            btn_eliminar.setIcon(qta.icon('fa5s.trash', color='white'))
-            btn_eliminar.setToolTip("Eliminar locker")
-            btn_eliminar.setMinimumHeight(30)
-            btn_eliminar.setFixedWidth(40)
-            btn_eliminar.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {WindowsPhoneTheme.TILE_RED};
-                    color: white;
-                    border: none;
-                    border-radius: 3px;
-                }}
-                QPushButton:hover {{
-                    background-color: #c62828;
-                }}
-            """)
-            btn_eliminar.clicked.connect(lambda checked, l=locker: self.eliminar_locker(l))
-            acciones_layout.addWidget(btn_eliminar)
-            
-            self.table.setCellWidget(i, 5, acciones_widget)
-        
-        # Actualizar info
-        total = len(lockers)
-        activos = sum(1 for l in lockers if l['activo'])
-        self.info_total.setText(f"Total: {total} lockers ({activos} activos)")
+        self.table.set_filas(lockers)
+        self.filtrar_lockers()
     
     def filtrar_lockers(self):
         """Filtrar lockers por búsqueda"""
         texto = self.search_bar.text().lower()
         
-        if not texto:
-            self.mostrar_lockers(self.lockers_data)
-            return
+        def coincide(l):
+            return texto in l['numero'].lower() or texto in (l['ubicacion'] or "").lower()
         
-        filtrados = [
-            l for l in self.lockers_data
-            if texto in l['numero'].lower()
-            or texto in (l['ubicacion'] or "").lower()
-        ]
+        self.table.filtrar(coincide if texto else None)
         
-        self.mostrar_lockers(filtrados)
+        # Actualizar info
+        visibles = self.table.filas_visibles()
+        activos = sum(1 for l in visibles if l['activo'])
+        self.info_total.setText(f"Total: {len(visibles)} lockers ({activos} activos)")
+    
+    def ejecutar_accion(self, accion, locker):
+        """Atender un botón de la columna Acciones"""
+        if accion == 'editar':
+            self.editar_locker(locker)
+        elif accion == 'eliminar':
+            self.eliminar_locker(locker)
     
     def abrir_formulario_nuevo(self):
         """Abrir formulario para nuevo locker"""
@@ -506,6 +454,7 @@ class LockersWindow(QWidget):
             self.pg_manager.client.table('lockers').delete().eq(
                 'id_locker', locker['id_locker']
             ).execute()
+            self.pg_manager.invalidar_datos_referencia('lockers')
             
             show_success_dialog(
                 self,
@@ -55,11 +55,14 @@ from ui.ubicaciones_window import UbicacionesWindow
 from ui.dias_festivos_window import DiasFestvosWindow
 from ui.buscar_miembro_window import BuscarMiembroWindow
 from ui.dias_festivos_window import DiasFestvosWindow
-from ui.notificacion_entrada_widget import NotificacionEntradaWidget
+from ui.notificacion_entrada_widget import PilaNotificacionesEntrada
 from ui.lockers_window import LockersWindow
 from ui.asignar_locker_window import AsignacionesLockersWindow
 from utils.monitor_entradas import MonitorEntradas
+from services.ocupacion import obtener_ocupacion
 from database.postgres_manager import PostgresManager
+from database.async_manager import obtener_async
+from services.ejecutor_tareas import obtener_ejecutor
 
 
 class MainPOSWindow(QMainWindow):
@@ -93,7 +96,7 @@ class MainPOSWindow(QMainWindow):
         
         # Monitor de entradas
         self.monitor_entradas = None
-        self.notificaciones_activas = []  # Lista de notificaciones abiertas
+        self.pila_notificaciones = PilaNotificacionesEntrada(self)  # Notificaciones de entrada (acotadas y reutilizadas)
         
         # Aplicar estilos Windows Phone
         apply_windows_phone_stylesheet(self)
@@ -122,6 +125,10 @@ class MainPOSWindow(QMainWindow):
         )
         main_layout.addWidget(self.top_bar)
         
+        # Indicador de consultas en segundo plano
+        if self.pg_manager:
+            obtener_async(self.pg_manager).ocupado_cambiado.connect(self.top_bar.set_ocupado)
+        
         # Área de contenido (cambia según la pestaña)
         self.stacked_widget = QStackedWidget()
         main_layout.addWidget(self.stacked_widget)
@@ -1516,8 +1523,13 @@ class MainPOSWindow(QMainWindow):
                 pg_channel='nueva_entrada_canal'
             )
             
-            # Conectar señal
-            self.monitor_entradas.nueva_entrada_detectada.connect(self.mostrar_notificacion_entrada)
+            # Conectar señal (una actualización por ráfaga de entradas)
+            self.monitor_entradas.entradas_agrupadas.connect(self.mostrar_notificaciones_entrada)
+            
+            # Ocupación en vivo: entradas abiertas al iniciar + cada entrada detectada
+            ocupacion = obtener_ocupacion()
+            self.monitor_entradas.nueva_entrada_detectada.connect(ocupacion.registrar_entrada_monitor)
+            ocupacion.iniciar(self.pg_manager)
             
             # Iniciar monitoreo
             self.monitor_entradas.iniciar()
@@ -1527,61 +1539,10 @@ class MainPOSWindow(QMainWindow):
         except Exception as e:
             logging.error(f"Error iniciando monitor de entradas: {e}")
     
-    def mostrar_notificacion_entrada(self, entrada_data):
-        """Mostrar notificación cuando se detecta una nueva entrada"""
-        try:
-            logging.info(f"Mostrando notificación para miembro: {entrada_data['nombres']} {entrada_data['apellido_paterno']}")
-            
-            # Crear ventana de notificación (sin auto-cierre)
-            notificacion = NotificacionEntradaWidget(
-                miembro_data=entrada_data,
-                parent=self,
-                duracion=0  # 0 = no auto-cerrar, usuario debe cerrar manualmente
-            )
-            
-            # Posicionar en la esquina superior derecha
-            self.posicionar_notificacion(notificacion)
-            
-            # Conectar señal de cierre
-            notificacion.cerrado.connect(lambda: self.remover_notificacion(notificacion))
-            
-            # Agregar a lista de notificaciones activas
-            self.notificaciones_activas.append(notificacion)
-            
-            # Mostrar
-            notificacion.show()
-            
-            logging.info(f"Notificación mostrada para entrada ID: {entrada_data['id_entrada']}")
-            
-        except Exception as e:
-            logging.error(f"Error mostrando notificación de entrada: {e}")
-    
-    def posicionar_notificacion(self, notificacion):
-        """Posicionar notificación en la pantalla"""
-        # Obtener geometría de la ventana principal
-        main_geometry = self.geometry()
-        
-        # Calcular posición (esquina superior derecha con margen)
-        margen = 20
-        x = main_geometry.right() - notificacion.width() - margen
-        y = main_geometry.top() + margen
-        
-        # Ajustar posición si hay otras notificaciones
-        offset_vertical = 0
-        for notif in self.notificaciones_activas:
-            if notif.isVisible():
-                offset_vertical += notif.height() + 10
-        
-        y += offset_vertical
-        
-        # Establecer posición
-        notificacion.move(x, y)
-    
-    def remover_notificacion(self, notificacion):
-        """Remover notificación de la lista activa"""
-        if notificacion in self.notificaciones_activas:
-            self.notificaciones_activas.remove(notificacion)
-            logging.debug(f"Notificación removida. Activas: {len(self.notificaciones_activas)}")
+    def mostrar_notificaciones_entrada(self, entradas):
+        """Mostrar las notificaciones de una ráfaga de entradas"""
+        logging.info(f"Mostrando notificaciones para {len(entradas)} entrada(s)")
+        self.pila_notificaciones.agregar(entradas)
     
     def closeEvent(self, event):
         """Evento al cerrar la ventana principal"""
@@ -1637,14 +1598,11 @@ class MainPOSWindow(QMainWindow):
                 self.monitor_entradas.detener()
                 logging.info("Monitor de entradas detenido")
             
-            # Cerrar todas las notificaciones activas
-            for notificacion in list(self.notificaciones_activas):
-                try:
-                    notificacion.close()
-                except:
-                    pass
+            # Cancelar las tareas en segundo plano y esperar a que terminen
+            obtener_ejecutor().detener()
             
-            self.notificaciones_activas.clear()
+            # Cerrar todas las notificaciones activas
+            self.pila_notificaciones.cerrar_todas()
             
         except Exception as e:
             logging.error(f"Error en closeEvent: {e}")
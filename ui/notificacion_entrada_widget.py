@@ -7,11 +7,13 @@ from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QFrame, QGraphicsOpacityEffect, QWidget
 )
-from PySide6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QSize, Signal, QThread
-from PySide6.QtGui import QFont, QPixmap, QPainter, QPainterPath, QColor, QCursor
+from PySide6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QSize, Signal, QObject
+from PySide6.QtGui import QFont, QCursor
 import logging
+from collections import deque
 from datetime import datetime
-import os
+
+from ui.avatar_cache import obtener_cache_avatares, obtener_iniciales
 
 from ui.components import (
     WindowsPhoneTheme
@@ -37,6 +39,7 @@ class NotificacionEntradaWidget(QDialog):
         super().__init__(parent)
         self.miembro_data = miembro_data
         self.duracion = duracion
+        self.tarea_foto = None
         
         # Variables para arrastre
         self.dragging = False
@@ -57,6 +60,7 @@ class NotificacionEntradaWidget(QDialog):
         # Inicializar componentes antes de aplicar estilos
         self.setup_ui()
         self.aplicar_estilos()
+        self.mostrar_miembro(miembro_data)
         
         # Configurar timers después de inicializar componentes
         self.setup_timers()
@@ -160,20 +164,16 @@ class NotificacionEntradaWidget(QDialog):
         self.foto_label.setAlignment(Qt.AlignCenter)
         self.foto_label.setObjectName("fotoMiembro")
         
-        # Cargar foto de forma asíncrona para no bloquear la UI
-        self.cargar_foto_async()
-        
         foto_layout.addWidget(self.foto_label)
         content_layout.addLayout(foto_layout)
         
         # ===== NOMBRE DEL MIEMBRO =====
-        nombre_completo = f"{self.miembro_data['nombres']} {self.miembro_data['apellido_paterno']} {self.miembro_data['apellido_materno']}"
-        nombre_label = QLabel(nombre_completo.upper())
-        nombre_label.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, 18, QFont.Bold))
-        nombre_label.setAlignment(Qt.AlignCenter)
-        nombre_label.setStyleSheet(f"color: {WindowsPhoneTheme.PRIMARY_BLUE};")
-        nombre_label.setWordWrap(True)
-        content_layout.addWidget(nombre_label)
+        self.nombre_label = QLabel()
+        self.nombre_label.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, 18, QFont.Bold))
+        self.nombre_label.setAlignment(Qt.AlignCenter)
+        self.nombre_label.setStyleSheet(f"color: {WindowsPhoneTheme.PRIMARY_BLUE};")
+        self.nombre_label.setWordWrap(True)
+        content_layout.addWidget(self.nombre_label)
         
         # ===== INFORMACIÓN ADICIONAL =====
         info_container = self.create_info_container()
@@ -202,15 +202,13 @@ class NotificacionEntradaWidget(QDialog):
         info_layout.setSpacing(WindowsPhoneTheme.MARGIN_SMALL)
         
         # ID Miembro
-        self.agregar_info_row(info_layout, "ID:", f"#{self.miembro_data['id_miembro']}")
+        self.id_label = self.agregar_info_row(info_layout, "ID:", "")
         
         # Fecha de registro
-        fecha_registro = self.miembro_data.get('fecha_registro', 'N/A')
-        self.agregar_info_row(info_layout, "Miembro desde:", fecha_registro)
+        self.fecha_registro_label = self.agregar_info_row(info_layout, "Miembro desde:", "")
         
         # Teléfono
-        telefono = self.miembro_data.get('telefono', 'No registrado')
-        self.agregar_info_row(info_layout, "Teléfono:", telefono)
+        self.telefono_label = self.agregar_info_row(info_layout, "Teléfono:", "")
         
         return info_container
         
@@ -260,75 +258,57 @@ class NotificacionEntradaWidget(QDialog):
         row.addWidget(label_valor, 1)
         
         layout.addLayout(row)
+        return label_valor
+    
+    def mostrar_miembro(self, miembro_data):
+        """
+        Llenar la notificación con los datos de un miembro.
+        Permite reutilizar el mismo widget para otra entrada sin recrearlo.
+        """
+        self.miembro_data = miembro_data
+        
+        nombre_completo = f"{miembro_data.get('nombres', '')} {miembro_data.get('apellido_paterno', '')} {miembro_data.get('apellido_materno', '')}"
+        self.nombre_label.setText(nombre_completo.upper())
+        self.id_label.setText(f"#{miembro_data.get('id_miembro')}")
+        self.fecha_registro_label.setText(str(miembro_data.get('fecha_registro') or 'N/A'))
+        self.telefono_label.setText(str(miembro_data.get('telefono') or 'No registrado'))
+        self.hora_label.setText(datetime.now().strftime("%H:%M:%S"))
+        
+        # Cargar foto de forma asíncrona para no bloquear la UI
+        self.cargar_foto_async()
     
     def cargar_foto_async(self):
         """Cargar foto del miembro de forma asíncrona para no bloquear la UI"""
+        # Descartar la foto del miembro anterior si el widget se reutiliza
+        if self.tarea_foto:
+            self.tarea_foto.cancelar()
+            self.tarea_foto = None
+        
+        # Avatar ya decodificado (miembro que entró hace poco): mostrar directo
+        foto_path = self.miembro_data.get('foto')
+        cache = obtener_cache_avatares()
+        pixmap = cache.obtener(foto_path, 180)
+        if pixmap is not None:
+            self.foto_label.setPixmap(pixmap)
+            return
+        
         # Primero mostrar placeholder
         self.mostrar_placeholder()
         
-        # Crear un hilo para cargar la foto
-        self.foto_thread = FotoThread(self.miembro_data.get('foto'))
-        self.foto_thread.foto_loaded.connect(self.on_foto_loaded)
-        self.foto_thread.start()
+        # Decodificar la foto en el pool compartido
+        self.tarea_foto = cache.cargar(foto_path, 180, al_terminar=self.on_foto_loaded)
     
     def on_foto_loaded(self, pixmap):
-        """Manejar la carga de la foto cuando el hilo termina"""
-        if pixmap and not pixmap.isNull():
-            pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            pixmap = self.crear_imagen_circular(pixmap)
-            self.foto_label.setPixmap(pixmap)
-    
-    def crear_imagen_circular(self, pixmap):
-        """Crear una imagen circular a partir de un pixmap"""
-        size = min(pixmap.width(), pixmap.height())
-        rounded = QPixmap(size, size)
-        rounded.fill(Qt.transparent)
-        
-        painter = QPainter(rounded)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        path = QPainterPath()
-        path.addEllipse(0, 0, size, size)
-        painter.setClipPath(path)
-        
-        x = (size - pixmap.width()) // 2
-        y = (size - pixmap.height()) // 2
-        painter.drawPixmap(x, y, pixmap)
-        painter.end()
-        
-        return rounded
+        """Manejar la carga de la foto cuando la tarea termina"""
+        self.foto_label.setPixmap(pixmap)
     
     def mostrar_placeholder(self):
         """Mostrar placeholder cuando no hay foto"""
-        iniciales = self.obtener_iniciales()
-        
-        placeholder = QPixmap(180, 180)
-        placeholder.fill(Qt.transparent)
-        
-        painter = QPainter(placeholder)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        painter.setBrush(QColor(WindowsPhoneTheme.TILE_GREEN))
-        painter.setPen(Qt.NoPen)
-        painter.drawEllipse(0, 0, 180, 180)
-        
-        painter.setPen(Qt.white)
-        painter.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, 55, QFont.Bold))
-        painter.drawText(0, 0, 180, 180, Qt.AlignCenter, iniciales)
-        
-        painter.end()
+        placeholder = obtener_cache_avatares().placeholder(
+            obtener_iniciales(self.miembro_data), 180, WindowsPhoneTheme.TILE_GREEN, 55
+        )
         self.foto_label.setPixmap(placeholder)
     
-    def obtener_iniciales(self):
-        """Obtener iniciales del nombre del miembro"""
-        nombres = self.miembro_data.get('nombres', 'X').strip()
-        apellido = self.miembro_data.get('apellido_paterno', 'X').strip()
-        
-        inicial_nombre = nombres[0].upper() if nombres else 'X'
-        inicial_apellido = apellido[0].upper() if apellido else 'X'
-        
-        return f"{inicial_nombre}{inicial_apellido}"
-    
     def actualizar_tiempo(self):
         """Actualizar etiqueta de tiempo transcurrido"""
         self.hora_label.setText(datetime.now().strftime("%H:%M:%S"))
@@ -364,10 +344,9 @@ class NotificacionEntradaWidget(QDialog):
         self.auto_close_timer.stop()
         self.update_timer.stop()
         
-        # Detener hilo de carga de foto si está activo
-        if hasattr(self, 'foto_thread') and self.foto_thread.isRunning():
-            self.foto_thread.terminate()
-            self.foto_thread.wait()
+        # Descartar la carga de foto si sigue pendiente
+        if self.tarea_foto:
+            self.tarea_foto.cancelar()
         
         # Animación de salida
         self.opacity_animation = QPropertyAnimation(self.opacity_effect, b"opacity")
@@ -411,10 +390,9 @@ class NotificacionEntradaWidget(QDialog):
     
     def closeEvent(self, event):
         """Evento al cerrar el widget"""
-        # Asegurarse de detener todos los hilos y timers
-        if hasattr(self, 'foto_thread') and self.foto_thread.isRunning():
-            self.foto_thread.terminate()
-            self.foto_thread.wait()
+        # Descartar la carga de foto si sigue pendiente
+        if self.tarea_foto:
+            self.tarea_foto.cancelar()
             
         self.cerrado.emit()
         super().closeEvent(event)
@@ -488,21 +466,148 @@ class NotificacionEntradaWidget(QDialog):
         """)
 
 
-class FotoThread(QThread):
-    """Hilo para cargar la foto del miembro de forma asíncrona"""
-    foto_loaded = Signal(QPixmap)
+class PilaNotificacionesEntrada(QObject):
+    """
+    Pila acotada de notificaciones de entrada.
+    
+    - Muestra como máximo MAX_VISIBLES notificaciones a la vez.
+    - Las entradas que no caben esperan en cola y un contador "+N más"
+      indica cuántas hay; al cerrar una notificación se muestra la siguiente.
+    - Los widgets cerrados se reutilizan en lugar de crear uno por entrada,
+      así en hora pico la memoria y el costo de pintado no crecen.
+    
+    Uso:
+        pila = PilaNotificacionesEntrada(ventana_principal)
+        monitor.entradas_agrupadas.connect(pila.agregar)
+    """
+    
+    # Notificaciones visibles al mismo tiempo
+    MAX_VISIBLES = 5
+    # Entradas en espera; si se llena se descartan las más antiguas
+    MAX_PENDIENTES = 100
+    # Separación entre notificaciones y con el borde de la ventana
+    MARGEN = 20
+    SEPARACION = 10
+    
+    def __init__(self, ventana):
+        """
+        Args:
+            ventana: Ventana principal sobre la que se posicionan las notificaciones
+        """
+        super().__init__(ventana)
+        self.ventana = ventana
+        self.visibles = []  # Notificaciones abiertas, de arriba hacia abajo
+        self.libres = []  # Notificaciones cerradas listas para reutilizar
+        self.pendientes = deque(maxlen=self.MAX_PENDIENTES)
+        self.contador_label = None
+    
+    def agregar(self, entradas):
+        """Mostrar un lote de entradas (las que no caben quedan en espera)"""
+        try:
+            for entrada_data in entradas:
+                if len(self.visibles) < self.MAX_VISIBLES:
+                    self.mostrar(entrada_data)
+                else:
+                    if len(self.pendientes) == self.pendientes.maxlen:
+                        logging.warning("[ENTRADA] Cola de notificaciones llena, se descarta la más antigua")
+                    self.pendientes.append(entrada_data)
+            
+            self.reposicionar()
+        except Exception as e:
+            logging.error(f"Error mostrando notificaciones de entrada: {e}")
+    
+    def mostrar(self, entrada_data):
+        """Mostrar una entrada reutilizando un widget libre si hay"""
+        if self.libres:
+            notificacion = self.libres.pop()
+            notificacion.mostrar_miembro(entrada_data)
+        else:
+            # Sin auto-cierre: la recepción cierra cada notificación
+            notificacion = NotificacionEntradaWidget(
+                miembro_data=entrada_data,
+                parent=self.ventana,
+                duracion=0
+            )
+            notificacion.cerrado.connect(lambda n=notificacion: self.liberar(n))
+        
+        self.visibles.append(notificacion)
+        notificacion.show()
+        
+        logging.info(f"Notificación mostrada para entrada ID: {entrada_data.get('id_entrada')}")
+    
+    def liberar(self, notificacion):
+        """Quitar una notificación cerrada de la pila y reutilizarla al terminar de cerrarse"""
+        if notificacion not in self.visibles:
+            return
+        self.visibles.remove(notificacion)
+        self.reposicionar()
+        
+        # Se llama desde su closeEvent: Qt la oculta al aceptar el cierre, así
+        # que mostrarla de nuevo aquí la dejaría oculta. Se recicla en la
+        # siguiente vuelta del loop, cuando el cierre ya terminó.
+        QTimer.singleShot(0, lambda: self.reciclar(notificacion))
+    
+    def reciclar(self, notificacion):
+        """Guardar la notificación ya cerrada y mostrar la siguiente en espera"""
+        if notificacion.isVisible() or notificacion in self.visibles:
+            return
+        self.libres.append(notificacion)
+        
+        if self.pendientes and len(self.visibles) < self.MAX_VISIBLES:
+            self.mostrar(self.pendientes.popleft())
+        
+        self.reposicionar()
+        logging.debug(f"Notificación liberada. Visibles: {len(self.visibles)}, en espera: {len(self.pendientes)}")
+    
+    def reposicionar(self):
+        """Apilar las notificaciones visibles en la esquina superior derecha"""
+        geometria = self.ventana.geometry()
+        y = geometria.top() + self.MARGEN
+        
+        self.actualizar_contador()
+        if self.contador_label and self.contador_label.isVisible():
+            self.contador_label.move(
+                geometria.right() - self.contador_label.width() - self.MARGEN, y
+            )
+            y += self.contador_label.height() + self.SEPARACION
+        
+        for notificacion in self.visibles:
+            x = geometria.right() - notificacion.width() - self.MARGEN
+            notificacion.move(x, y)
+            y += notificacion.height() + self.SEPARACION
     
-    def __init__(self, foto_path):
-        super().__init__()
-        self.foto_path = foto_path
+    def actualizar_contador(self):
+        """Mostrar u ocultar el contador de entradas en espera"""
+        if not self.pendientes:
+            if self.contador_label:
+                self.contador_label.hide()
+            return
+        
+        if self.contador_label is None:
+            self.contador_label = QLabel(self.ventana)
+            self.contador_label.setWindowFlags(
+                Qt.Tool |
+                Qt.WindowStaysOnTopHint |
+                Qt.FramelessWindowHint
+            )
+            self.contador_label.setAlignment(Qt.AlignCenter)
+            self.contador_label.setFixedSize(600, 44)
+            self.contador_label.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, 14, QFont.Bold))
+            self.contador_label.setStyleSheet(
+                f"background-color: {WindowsPhoneTheme.TILE_ORANGE}; color: white;"
+            )
+        
+        self.contador_label.setText(f"+{len(self.pendientes)} entradas más")
+        self.contador_label.show()
     
-    def run(self):
-        """Cargar la foto en un hilo separado"""
-        if self.foto_path and os.path.exists(self.foto_path):
-            pixmap = QPixmap(self.foto_path)
-            if not pixmap.isNull():
-                self.foto_loaded.emit(pixmap)
-                return
-        
-        # Si no hay foto o hay error, emitir None
-        self.foto_loaded.emit(None)
\ No newline at end of file
+    def cerrar_todas(self):
+        """Cerrar las notificaciones y descartar las que esperan"""
+        self.pendientes.clear()
+        for notificacion in list(self.visibles):
+            try:
+                notificacion.close()
+            except Exception:
+                pass
+        self.visibles.clear()
+        if self.contador_label:
+            self.contador_label.close()
@@ -4,14 +4,16 @@ Grid informativo de pagos pendientes y confirmación de pagos en efectivo
 """
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
-    QHeaderView, QDialog, QLabel, QPushButton, QTextEdit, QFrame
+    QWidget, QVBoxLayout, QHBoxLayout, QDialog, QLabel, QPushButton,
+    QTextEdit, QFrame
 )
 from PySide6.QtCore import Qt, Signal, QTimer
 from PySide6.QtGui import QFont, QCursor
 from datetime import datetime
 import logging
 
+from database.async_manager import obtener_async
+from database.consultas_compartidas import ejecutar_compartida
 from ui.components import (
     WindowsPhoneTheme,
     TileButton,
@@ -24,7 +26,9 @@ from ui.components import (
     show_warning_dialog,
     show_error_dialog,
     show_confirmation_dialog,
-    create_page_layout
+    create_page_layout,
+    ColumnaTabla,
+    TablaDatos
 )
 
 
@@ -290,6 +294,7 @@ class NotificacionesPagoWindow(QWidget):
         self.user_data = user_data
         self.supabase_service = supabase_service
         self.notificaciones_data = []
+        self.db_async = obtener_async(pg_manager)
         
         self.setup_ui()
         self.cargar_notificaciones()
@@ -341,26 +346,19 @@ class NotificacionesPagoWindow(QWidget):
         table_layout = QVBoxLayout(table_panel)
         table_layout.setContentsMargins(0, 0, 0, 0)
         
-        self.tabla_notificaciones = QTableWidget()
-        self.tabla_notificaciones.setColumnCount(6)
-        self.tabla_notificaciones.setHorizontalHeaderLabels([
-            "Fecha", "Miembro", "Teléfono", "Tipo", "Monto", "Vence"
-        ])
-        
-        # Configurar header
-        header = self.tabla_notificaciones.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(1, QHeaderView.Stretch)
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
-        
-        # Configurar tabla
-        self.tabla_notificaciones.verticalHeader().setVisible(False)
-        self.tabla_notificaciones.setSelectionBehavior(QTableWidget.SelectRows)
-        self.tabla_notificaciones.setSelectionMode(QTableWidget.SingleSelection)
-        self.tabla_notificaciones.setAlternatingRowColors(True)
+        columnas = [
+            ColumnaTabla("Fecha", 'creada_en', texto=self.formatear_fecha),
+            ColumnaTabla("Miembro", texto=self.nombre_miembro, ancho='stretch'),
+            ColumnaTabla("Teléfono", texto=lambda n: str(n.get('telefono') or "N/A")),
+            ColumnaTabla("Tipo", texto=lambda n: "Membresía" if n.get('tipo_notificacion') == 'membresia_pendiente' else "Visita"),
+            ColumnaTabla(
+                "Monto", texto=self.formatear_monto,
+                alineacion=Qt.AlignRight | Qt.AlignVCenter,
+                orden=lambda n: float(n.get('monto_pendiente') or 0)
+            ),
+            ColumnaTabla("Vence", 'fecha_vencimiento', texto=self.formatear_vencimiento)
+        ]
+        self.tabla_notificaciones = TablaDatos(columnas)
         self.tabla_notificaciones.setMinimumHeight(400)
         
         table_layout.addWidget(self.tabla_notificaciones)
@@ -384,162 +382,149 @@ class NotificacionesPagoWindow(QWidget):
         layout.addWidget(content)
     
     def cargar_notificaciones(self):
-        """Cargar notificaciones pendientes"""
-        try:
-            if self.supabase_service:
-                # Usar Supabase
-                logging.info("Cargando notificaciones desde Supabase...")
-                
-                # Consultar notificaciones pendientes para recepción
-                response = self.supabase_service.client.table('notificaciones_pos') \
-                    .select('*, miembros(nombres, apellido_paterno, apellido_materno, telefono)') \
-                    .eq('para_recepcion', True) \
-                    .eq('respondida', False) \
-                    .order('creada_en', desc=True) \
-                    .execute()
-                
-                logging.info(f"Notificaciones encontradas en Supabase: {len(response.data)}")
-                
-                # Transformar datos de Supabase al formato esperado
-                notificaciones = []
-                for item in response.data:
-                    try:
-                        # miembros puede ser None si no hay JOIN o no existe el miembro
-                        miembro = item.get('miembros') or {}
-                        
-                        # Convertir fechas de string a datetime
-                        creada_en = item['creada_en']
-                        if isinstance(creada_en, str):
-                            creada_en = datetime.fromisoformat(creada_en.replace('Z', '+00:00'))
-                        
-                        fecha_vencimiento = item.get('fecha_vencimiento')
-                        if fecha_vencimiento and isinstance(fecha_vencimiento, str):
-                            # Si es solo fecha (YYYY-MM-DD), usar strptime
-                            try:
-                                fecha_vencimiento = datetime.strptime(fecha_vencimiento, '%Y-%m-%d').date()
-                            except:
-                                fecha_vencimiento = datetime.fromisoformat(fecha_vencimiento.replace('Z', '+00:00')).date()
-                        
-                        notificaciones.append({
-                            'id_notificacion': item['id_notificacion'],
-                            'id_miembro': item['id_miembro'],
-                            'id_venta_digital': item.get('id_venta_digital'),
-                            'tipo_notificacion': item['tipo_notificacion'],
-                            'asunto': item['asunto'],
-                            'monto_pendiente': item.get('monto_pendiente'),
-                            'fecha_vencimiento': fecha_vencimiento,
-                            'creada_en': creada_en,
-                            'codigo_pago_generado': item.get('codigo_pago_generado'),
-                            'nombres': miembro.get('nombres', ''),
-                            'apellido_paterno': miembro.get('apellido_paterno', ''),
-                            'apellido_materno': miembro.get('apellido_materno', ''),
-                            'telefono': miembro.get('telefono', '')
-                        })
-                    except Exception as e:
-                        logging.error(f"Error procesando notificación individual: {e}")
-                        logging.error(f"Datos del item: {item}")
-                        continue
-                
-                self.notificaciones_data = notificaciones
-                logging.info(f"Se procesaron {len(notificaciones)} notificaciones correctamente")
-            else:
-                # Fallback a PostgreSQL local - usar método centralizado
-                logging.info("Cargando notificaciones desde PostgreSQL local...")
-                self.notificaciones_data = self.pg_manager.obtener_notificaciones_pendientes()
-                logging.info(f"Se cargaron {len(self.notificaciones_data)} notificaciones desde PostgreSQL")
+        """Cargar notificaciones pendientes (en segundo plano)"""
+        self.info_label.setText("Cargando notificaciones...")
+        self.db_async.ejecutar(
+            self.consultar_notificaciones,
+            clave='notificaciones_pago.pendientes',
+            al_terminar=self.on_notificaciones_cargadas,
+            al_fallar=self.on_error_carga
+        )
+    
+    def consultar_notificaciones(self):
+        """Consultar y transformar las notificaciones pendientes (se ejecuta en el pool)"""
+        if self.supabase_service:
+            # Usar Supabase
+            logging.info("Cargando notificaciones desde Supabase...")
             
-            self.mostrar_notificaciones(self.notificaciones_data)
-                
+            # Consultar notificaciones pendientes para recepción
+            response = ejecutar_compartida(
+                self.supabase_service.client.table('notificaciones_pos')
+                .select('*, miembros(nombres, apellido_paterno, apellido_materno, telefono)')
+                .eq('para_recepcion', True)
+                .eq('respondida', False)
+                .order('creada_en', desc=True)
+            )
+            
+            logging.info(f"Notificaciones encontradas en Supabase: {len(response.data)}")
+            
+            # Transformar datos de Supabase al formato esperado
+            notificaciones = []
+            for item in response.data:
+                try:
+                    # miembros puede ser None si no hay JOIN o no existe el miembro
+                    miembro = item.get('miembros') or {}
+                    
+                    # Convertir fechas de string a datetime
+                    creada_en = item['creada_en']
+                    if isinstance(creada_en, str):
+                        creada_en = datetime.fromisoformat(creada_en.replace('Z', '+00:00'))
+                    
+                    fecha_vencimiento = item.get('fecha_vencimiento')
+                    if fecha_vencimiento and isinstance(fecha_vencimiento, str):
+                        # Si es solo fecha (YYYY-MM-DD), usar strptime
+                        try:
+                            fecha_vencimiento = datetime.strptime(fecha_vencimiento, '%Y-%m-%d').date()
+                        except:
+                            fecha_vencimiento = datetime.fromisoformat(fecha_vencimiento.replace('Z', '+00:00')).date()
+                    
+                    notificaciones.append({
+                        'id_notificacion': item['id_notificacion'],
+                        'id_miembro': item['id_miembro'],
+                        'id_venta_digital': item.get('id_venta_digital'),
+                        'tipo_notificacion': item['tipo_notificacion'],
+                        'asunto': item['asunto'],
+                        'monto_pendiente': item.get('monto_pendiente'),
+                        'fecha_vencimiento': fecha_vencimiento,
+                        'creada_en': creada_en,
+                        'codigo_pago_generado': item.get('codigo_pago_generado'),
+                        'nombres': miembro.get('nombres', ''),
+                        'apellido_paterno': miembro.get('apellido_paterno', ''),
+                        'apellido_materno': miembro.get('apellido_materno', ''),
+                        'telefono': miembro.get('telefono', '')
+                    })
+                except Exception as e:
+                    logging.error(f"Error procesando notificación individual: {e}")
+                    logging.error(f"Datos del item: {item}")
+                    continue
+            
+            logging.info(f"Se procesaron {len(notificaciones)} notificaciones correctamente")
+            return notificaciones
+        
+        # Fallback a PostgreSQL local - usar método centralizado
+        logging.info("Cargando notificaciones desde PostgreSQL local...")
+        notificaciones = self.pg_manager.obtener_notificaciones_pendientes()
+        logging.info(f"Se cargaron {len(notificaciones)} notificaciones desde PostgreSQL")
+        return notificaciones
+    
+    def on_notificaciones_cargadas(self, notificaciones):
+        """Mostrar las notificaciones recibidas"""
+        self.notificaciones_data = notificaciones or []
+        self.mostrar_notificaciones(self.notificaciones_data)
+    
+    def on_error_carga(self, error):
+        """Error al cargar notificaciones"""
+        logging.error(f"Error cargando notificaciones: {error}")
+        self.info_label.setText("")
+        show_error_dialog(self, "Error", f"No se pudieron cargar las notificaciones:\n{error}")
+    
+    def nombre_miembro(self, notif):
+        """Nombre completo del miembro de la notificación"""
+        return f"{notif.get('nombres', '')} {notif.get('apellido_paterno', '')} {notif.get('apellido_materno', '')}"
+    
+    def formatear_fecha(self, notif):
+        """Fecha de creación de la notificación"""
+        try:
+            if isinstance(notif['creada_en'], datetime):
+                return notif['creada_en'].strftime("%d/%m/%Y %H:%M")
+            return str(notif['creada_en'])[:16]  # Truncar si es string
+        except Exception as e:
+            logging.error(f"Error formateando fecha: {e}")
+            return "N/A"
+    
+    def formatear_monto(self, notif):
+        """Monto pendiente con formato de moneda"""
+        try:
+            return f"${float(notif['monto_pendiente']):.2f}" if notif.get('monto_pendiente') else "$0.00"
+        except:
+            return "$0.00"
+    
+    def formatear_vencimiento(self, notif):
+        """Fecha de vencimiento de la notificación"""
+        try:
+            fecha_venc = notif.get('fecha_vencimiento')
+            if not fecha_venc:
+                return "N/A"
+            if hasattr(fecha_venc, 'strftime'):
+                return fecha_venc.strftime("%d/%m/%Y")
+            return str(fecha_venc)[:10]  # YYYY-MM-DD
         except Exception as e:
-            logging.error(f"Error cargando notificaciones: {e}")
-            import traceback
-            logging.error(traceback.format_exc())
-            show_error_dialog(self, "Error", f"No se pudieron cargar las notificaciones:\n{str(e)}")
+            logging.error(f"Error formateando fecha vencimiento: {e}")
+            return "N/A"
     
     def mostrar_notificaciones(self, notificaciones):
         """Mostrar notificaciones en la tabla"""
         logging.info(f"Mostrando {len(notificaciones)} notificaciones en la tabla")
-        self.tabla_notificaciones.setRowCount(0)
-        
-        for i, notif in enumerate(notificaciones):
-            try:
-                self.tabla_notificaciones.insertRow(i)
-                
-                # Fecha
-                try:
-                    if isinstance(notif['creada_en'], datetime):
-                        fecha = notif['creada_en'].strftime("%d/%m/%Y %H:%M")
-                    else:
-                        fecha = str(notif['creada_en'])[:16]  # Truncar si es string
-                except Exception as e:
-                    logging.error(f"Error formateando fecha: {e}")
-                    fecha = "N/A"
-                self.tabla_notificaciones.setItem(i, 0, QTableWidgetItem(fecha))
-                
-                # Miembro
-                nombre_completo = f"{notif.get('nombres', '')} {notif.get('apellido_paterno', '')} {notif.get('apellido_materno', '')}"
-                self.tabla_notificaciones.setItem(i, 1, QTableWidgetItem(nombre_completo))
-                
-                # Teléfono
-                telefono = notif.get('telefono') or "N/A"
-                self.tabla_notificaciones.setItem(i, 2, QTableWidgetItem(str(telefono)))
-                
-                # Tipo
-                tipo = "Membresía" if notif.get('tipo_notificacion') == 'membresia_pendiente' else "Visita"
-                self.tabla_notificaciones.setItem(i, 3, QTableWidgetItem(tipo))
-                
-                # Monto
-                try:
-                    monto = f"${float(notif['monto_pendiente']):.2f}" if notif.get('monto_pendiente') else "$0.00"
-                except:
-                    monto = "$0.00"
-                item_monto = QTableWidgetItem(monto)
-                item_monto.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.tabla_notificaciones.setItem(i, 4, item_monto)
-                
-                # Fecha vencimiento
-                try:
-                    fecha_venc = notif.get('fecha_vencimiento')
-                    if fecha_venc:
-                        if hasattr(fecha_venc, 'strftime'):
-                            vence = fecha_venc.strftime("%d/%m/%Y")
-                        else:
-                            vence = str(fecha_venc)[:10]  # YYYY-MM-DD
-                    else:
-                        vence = "N/A"
-                except Exception as e:
-                    logging.error(f"Error formateando fecha vencimiento: {e}")
-                    vence = "N/A"
-                self.tabla_notificaciones.setItem(i, 5, QTableWidgetItem(vence))
-                
-                logging.info(f"Fila {i} agregada correctamente: {nombre_completo}")
-                
-            except Exception as e:
-                logging.error(f"Error mostrando notificación {i}: {e}")
-                logging.error(f"Datos: {notif}")
-                continue
-        
-        # Actualizar label de información
-        total = len(notificaciones)
-        self.info_label.setText(f"Total: {total} notificaciones pendientes")
-        logging.info(f"Tabla actualizada con {total} notificaciones")
+        self.tabla_notificaciones.set_filas(notificaciones)
+        self.filtrar_notificaciones()
+        logging.info(f"Tabla actualizada con {len(notificaciones)} notificaciones")
     
     def filtrar_notificaciones(self):
         """Filtrar notificaciones por búsqueda"""
         texto_busqueda = self.search_bar.get_text().lower()
         
-        if not texto_busqueda:
-            self.mostrar_notificaciones(self.notificaciones_data)
-            return
+        def coincide(n):
+            return (
+                texto_busqueda in f"{n['nombres']} {n['apellido_paterno']} {n['apellido_materno']}".lower()
+                or texto_busqueda in (n['telefono'] or "").lower()
+                or texto_busqueda in (n['codigo_pago_generado'] or "").lower()
+            )
         
-        filtradas = [
-            n for n in self.notificaciones_data
-            if texto_busqueda in f"{n['nombres']} {n['apellido_paterno']} {n['apellido_materno']}".lower()
-            or texto_busqueda in (n['telefono'] or "").lower()
-            or texto_busqueda in (n['codigo_pago_generado'] or "").lower()
-        ]
+        self.tabla_notificaciones.filtrar(coincide if texto_busqueda else None)
         
-        self.mostrar_notificaciones(filtradas)
+        # Actualizar label de información
+        total = self.tabla_notificaciones.total_visibles()
+        self.info_label.setText(f"Total: {total} notificaciones pendientes")
     
     def escanear_qr(self):
         """Abrir diálogo para escanear código QR"""
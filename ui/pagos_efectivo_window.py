@@ -15,6 +15,8 @@ from typing import Tuple, Optional
 import logging
 from datetime import datetime
 
+from utils.monitor_notificaciones_pago import MonitorNotificacionesPago
+
 from ui.components import (
     WindowsPhoneTheme,
     TileButton,
@@ -48,13 +50,16 @@ class PagosEfectivoWindow(QDialog):
         self.scanner_timer.setInterval(300)  # 300ms después de que deje de escribir
         self.scanner_timer.timeout.connect(self.procesar_codigo_barras)
         
-        # Timer para refrescar notificaciones
-        self.refresh_timer = QTimer()
-        self.refresh_timer.timeout.connect(self.cargar_notificaciones)
-        self.refresh_timer.start(5000)  # Refrescar cada 5 segundos
+        # Valores mostrados por id_notificacion (para actualizar solo lo que cambia)
+        self.valores_por_id = {}
+        
+        # Cambios de notificaciones_pos por LISTEN/NOTIFY (con consulta periódica de respaldo)
+        self.monitor_pagos = MonitorNotificacionesPago(pg_manager, parent=self)
+        self.monitor_pagos.notificaciones_actualizadas.connect(self.aplicar_notificaciones)
+        self.monitor_pagos.error_carga.connect(self.mostrar_error_carga)
         
         self.setup_ui()
-        self.cargar_notificaciones()
+        self.monitor_pagos.iniciar()
     
     def setup_ui(self):
         """Configurar interfaz siguiendo patrón de CierreCajaWindow"""
@@ -210,19 +215,6 @@ class PagosEfectivoWindow(QDialog):
         # Procesar pago
         self._procesar_pago_interno(id_notificacion)
     
-    def _obtener_datos_miembro(self, id_miembro: int) -> dict:
-        """Obtener datos del miembro desde la base de datos"""
-        try:
-            response = self.pg_manager.client.table('miembros').select(
-                'nombres, apellido_paterno, apellido_materno, telefono'
-            ).eq('id_miembro', id_miembro).execute()
-            
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-        except Exception as e:
-            logging.error(f"Error obteniendo datos del miembro {id_miembro}: {e}")
-        return {}
-    
     def _obtener_notificacion_completa(self, id_notificacion: int) -> Optional[dict]:
         """
         Obtener notificación completa desde la base de datos.
@@ -404,94 +396,142 @@ class PagosEfectivoWindow(QDialog):
         self._procesar_pago_interno(id_notificacion)
     
     def cargar_notificaciones(self):
-        """Cargar notificaciones de pago pendientes"""
+        """Pedir las notificaciones de pago pendientes (se aplican al llegar)"""
+        self.monitor_pagos.recargar()
+    
+    def valores_fila(self, notif) -> tuple:
+        """Textos de las columnas Miembro, Monto, Código y Fecha de una notificación"""
+        # El miembro viene embebido en la consulta
+        miembro = notif.get('miembros') or {}
+        nombre_miembro = f"{miembro.get('nombres', '')} {miembro.get('apellido_paterno', '')}" if miembro else "N/A"
+        
+        monto = notif.get('monto_pendiente') or 0
+        codigo = notif.get('codigo_pago_generado') or notif.get('qr_pago_generado') or ''
+        
+        fecha = notif.get('creada_en', '')
+        if isinstance(fecha, datetime):
+            fecha_str = fecha.strftime("%Y-%m-%d %H:%M")
+        else:
+            fecha_str = str(fecha)[:16] if fecha else ''
+        
+        return (nombre_miembro, f"${float(monto):.2f}", codigo, fecha_str)
+    
+    def aplicar_notificaciones(self, pagos_efectivo):
+        """
+        Actualizar la tabla con la lista recibida tocando solo lo que cambió:
+        se quitan las filas que ya no están, se insertan las nuevas (o las
+        que cambiaron de posición) y se reescriben las celdas de las que
+        cambiaron. Al terminar, la fila i tiene el id i de la lista.
+        """
         try:
-            notificaciones = self.pg_manager.get_notificaciones_pendientes(para_recepcion=True)
+            tabla = self.notifications_table
+            ids_nuevos = [n.get('id_notificacion') for n in pagos_efectivo]
+            vigentes = set(ids_nuevos)
             
-            # Filtrar solo pagos en efectivo
-            pagos_efectivo = [
-                n for n in notificaciones 
-                if n.get('tipo_notificacion') == 'pago_efectivo_pendiente'
-            ]
-            
-            self.notifications_table.setRowCount(len(pagos_efectivo))
+            # 1. Quitar filas que ya no están pendientes
+            for row in range(tabla.rowCount() - 1, -1, -1):
+                id_fila = tabla.item(row, 0).data(Qt.UserRole)
+                if id_fila not in vigentes:
+                    tabla.removeRow(row)
+                    self.valores_por_id.pop(id_fila, None)
             
+            # 2. Insertar las nuevas y actualizar las que cambiaron (mismo orden que la consulta)
             for row, notif in enumerate(pagos_efectivo):
-                # ID
-                id_item = QTableWidgetItem(str(notif.get('id_notificacion', '')))
-                id_item.setData(Qt.UserRole, notif.get('id_notificacion'))
-                self.notifications_table.setItem(row, 0, id_item)
-                
-                # Obtener datos del miembro
-                id_miembro = notif.get('id_miembro')
-                miembro_data = self._obtener_datos_miembro(id_miembro)
-                nombre_miembro = f"{miembro_data.get('nombres', '')} {miembro_data.get('apellido_paterno', '')}" if miembro_data else "N/A"
+                id_notif = notif.get('id_notificacion')
+                valores = self.valores_fila(notif)
                 
-                miembro_item = QTableWidgetItem(nombre_miembro)
-                self.notifications_table.setItem(row, 1, miembro_item)
+                item_actual = tabla.item(row, 0) if row < tabla.rowCount() else None
+                if item_actual is None or item_actual.data(Qt.UserRole) != id_notif:
+                    # Si la notificación cambió de posición, su fila anterior se
+                    # quita para no dejarla duplicada con su propio botón
+                    fila_anterior = self._fila_de(id_notif, desde=row + 1)
+                    if fila_anterior is not None:
+                        tabla.removeRow(fila_anterior)
+                    tabla.insertRow(row)
+                    self._crear_fila(row, id_notif, valores)
+                elif self.valores_por_id.get(id_notif) != valores:
+                    self._escribir_valores(row, valores)
                 
-                # Monto
-                monto = notif.get('monto_pendiente', 0)
-                monto_item = QTableWidgetItem(f"${monto:.2f}")
-                monto_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.notifications_table.setItem(row, 2, monto_item)
-                
-                # Código
-                codigo = notif.get('codigo_pago_generado') or notif.get('qr_pago_generado') or ''
-                codigo_item = QTableWidgetItem(codigo)
-                self.notifications_table.setItem(row, 3, codigo_item)
-                
-                # Fecha
-                fecha = notif.get('creada_en', '')
-                if isinstance(fecha, datetime):
-                    fecha_str = fecha.strftime("%Y-%m-%d %H:%M")
-                else:
-                    fecha_str = str(fecha)[:16] if fecha else ''
-                fecha_item = QTableWidgetItem(fecha_str)
-                self.notifications_table.setItem(row, 4, fecha_item)
-                
-                # Botón de acción
-                btn_confirmar = QPushButton("Confirmar")
-                btn_confirmar.setObjectName("confirmButton")
-                btn_confirmar.setStyleSheet(f"""
-                    QPushButton#confirmButton {{
-                        background-color: {WindowsPhoneTheme.TILE_GREEN};
-                        color: white;
-                        border: none;
-                        padding: 8px 16px;
-                        border-radius: 4px;
-                        font-weight: bold;
-                    }}
-                    QPushButton#confirmButton:hover {{
-                        background-color: #28a745;
-                    }}
-                """)
-                btn_confirmar.clicked.connect(
-                    lambda checked, id_notif=notif.get('id_notificacion'): 
-                    self.procesar_pago(id_notif)
-                )
-                self.notifications_table.setCellWidget(row, 5, btn_confirmar)
+                self.valores_por_id[id_notif] = valores
             
-            logging.info(f"Cargadas {len(pagos_efectivo)} notificaciones de pago pendientes")
+            # 3. Lo que quede después de la última fila esperada sobra
+            while tabla.rowCount() > len(pagos_efectivo):
+                tabla.removeRow(tabla.rowCount() - 1)
+            
+            logging.debug(f"Notificaciones de pago pendientes: {len(pagos_efectivo)}")
             
         except Exception as e:
             logging.error(f"Error cargando notificaciones: {e}")
             show_error_dialog(self, "Error", f"No se pudieron cargar las notificaciones: {e}")
     
+    def _fila_de(self, id_notif, desde=0):
+        """Fila de la tabla con esa notificación (a partir de `desde`), o None"""
+        tabla = self.notifications_table
+        for row in range(desde, tabla.rowCount()):
+            item = tabla.item(row, 0)
+            if item is not None and item.data(Qt.UserRole) == id_notif:
+                return row
+        return None
+    
+    def _crear_fila(self, row, id_notif, valores):
+        """Llenar una fila nueva: ID, columnas de datos y botón de confirmar"""
+        id_item = QTableWidgetItem(str(id_notif))
+        id_item.setData(Qt.UserRole, id_notif)
+        self.notifications_table.setItem(row, 0, id_item)
+        
+        self._escribir_valores(row, valores)
+        
+        # Botón de acción
+        btn_confirmar = QPushButton("Confirmar")
+        btn_confirmar.setObjectName("confirmButton")
+        btn_confirmar.setStyleSheet(f"""
+            QPushButton#confirmButton {{
+                background-color: {WindowsPhoneTheme.TILE_GREEN};
+                color: white;
+                border: none;
+                padding: 8px 16px;
+                border-radius: 4px;
+                font-weight: bold;
+            }}
+            QPushButton#confirmButton:hover {{
+                background-color: #28a745;
+            }}
+        """)
+        btn_confirmar.clicked.connect(
+            lambda checked, id_notif=id_notif: 
+            self.procesar_pago(id_notif)
+        )
+        self.notifications_table.setCellWidget(row, 5, btn_confirmar)
+    
+    def _escribir_valores(self, row, valores):
+        """Escribir Miembro, Monto, Código y Fecha de una fila"""
+        nombre_miembro, monto, codigo, fecha = valores
+        
+        self.notifications_table.setItem(row, 1, QTableWidgetItem(nombre_miembro))
+        
+        monto_item = QTableWidgetItem(monto)
+        monto_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.notifications_table.setItem(row, 2, monto_item)
+        
+        self.notifications_table.setItem(row, 3, QTableWidgetItem(codigo))
+        self.notifications_table.setItem(row, 4, QTableWidgetItem(fecha))
+    
+    def mostrar_error_carga(self, error_msg):
+        """Registrar el error de carga sin interrumpir (el siguiente aviso reintenta)"""
+        logging.error(f"Error cargando notificaciones de pago: {error_msg}")
+    
     def showEvent(self, event):
-        """Reanudar timer cuando la ventana se muestra"""
+        """Reanudar el monitor cuando la ventana se muestra"""
         super().showEvent(event)
-        if not self.refresh_timer.isActive():
-            self.refresh_timer.start(5000)
-        self.cargar_notificaciones()
+        self.monitor_pagos.iniciar()
     
     def hideEvent(self, event):
-        """Pausar timer cuando la ventana se oculta"""
+        """Pausar el monitor cuando la ventana se oculta"""
         super().hideEvent(event)
-        self.refresh_timer.stop()
+        self.monitor_pagos.detener()
     
     def closeEvent(self, event):
-        """Cerrar ventana y detener timers"""
-        self.refresh_timer.stop()
+        """Cerrar ventana y detener monitor y timers"""
+        self.monitor_pagos.detener()
         self.scanner_timer.stop()
         event.accept()
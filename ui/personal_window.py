@@ -265,6 +265,9 @@ class FormularioPersonalDialog(QDialog):
                 }).execute()
                 mensaje = "Personal registrado correctamente"
             
+            # Los cambios de personal pueden cambiar a quién se asignan turnos
+            self.pg_manager.invalidar_datos_referencia('usuarios')
+            
             show_success_dialog(self, "Éxito", mensaje)
             
             # Aceptar el diálogo
@@ -476,6 +479,7 @@ class PersonalWindow(QWidget):
                     'activo': 0,
                     'fecha_baja': date.today().strftime('%Y-%m-%d')
                 }).eq('id_personal', id_personal).execute()
+                self.pg_manager.invalidar_datos_referencia('usuarios')
                 
                 show_success_dialog(self, "Éxito", "Personal dado de baja correctamente")
                 
@@ -265,6 +265,8 @@ class NuevaVentaWindow(QWidget):
             # Nuevo producto en el carrito
             self.carrito.append({
                 'id_producto': producto['id_producto'],
+                'codigo_interno': producto.get('codigo_interno', ''),
+                'tipo_producto': producto.get('tipo_producto', 'varios'),
                 'nombre': producto['nombre'],
                 'precio': producto['precio_venta'],
                 'cantidad': 1,
@@ -173,6 +173,9 @@ class FormularioUbicacionDialog(QDialog):
                 }).execute()
                 msg = "creada"
             
+            # Descartar las ubicaciones en memoria (inventario, combos)
+            self.pg_manager.invalidar_datos_referencia('ca_ubicaciones')
+            
             show_success_dialog(
                 self,
                 "Éxito",
@@ -441,6 +444,7 @@ class UbicacionesWindow(QWidget):
             self.pg_manager.client.table('ca_ubicaciones').delete().eq(
                 'id_ubicacion', id_ubicacion
             ).execute()
+            self.pg_manager.invalidar_datos_referencia('ca_ubicaciones')
             
             show_success_dialog(
                 self,
@@ -6,10 +6,10 @@ Usando componentes reutilizables del sistema de diseño
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, 
     QPushButton, QTableWidget, QTableWidgetItem,
-    QHeaderView, QDateEdit, QSizePolicy, QComboBox, QAbstractItemView
+    QHeaderView, QDateEdit, QSizePolicy, QComboBox, QAbstractItemView, QLineEdit
 )
 from PySide6.QtCore import Qt, Signal, QDate, QTimer
-from PySide6.QtGui import QFont
+from PySide6.QtGui import QFont, QDoubleValidator
 import logging
 from datetime import datetime
 import qtawesome as qta
@@ -24,8 +24,27 @@ from ui.components import (
     SearchBar,
     show_info_dialog,
     show_warning_dialog,
-    aplicar_estilo_fecha
+    aplicar_estilo_fecha,
+    conectar_scroll_infinito
 )
+from ui.exportacion_dialog import iniciar_exportacion
+from services.exportador import (
+    CARPETA_ESCRITORIO,
+    ColumnaExportacion,
+    fecha_a_texto,
+    filas_paginadas,
+    ruta_exportacion
+)
+
+
+# Columnas del archivo de ventas (historial y ventas del turno)
+COLUMNAS_EXPORTACION_VENTAS = [
+    ColumnaExportacion("ID Venta", 'id_venta', ancho=12),
+    ColumnaExportacion("Fecha", valor=lambda v: fecha_a_texto(v['fecha'], "%d/%m/%Y"), ancho=15),
+    ColumnaExportacion("Hora", valor=lambda v: fecha_a_texto(v['fecha'], "%H:%M", "N/A"), ancho=10),
+    ColumnaExportacion("Total", 'total', ancho=15, formato_numero='$#,##0.00'),
+    ColumnaExportacion("Usuario", valor=lambda v: (v.get('usuarios') or {}).get('nombre_completo', 'N/A'), ancho=25),
+]
 
 
 class HistorialVentasWindow(QWidget):
@@ -38,13 +57,20 @@ class HistorialVentasWindow(QWidget):
         self.pg_manager = pg_manager
         self.supabase_service = supabase_service
         self.user_data = user_data
-        self.ventas_data = []  # Almacenar todas las ventas cargadas
+        self.ventas_data = []  # Ventas cargadas con los filtros consultados
         
-        # Timer para detectar entrada del escáner
+        # Estado de la paginación por cursor
+        self.cursor = None
+        self.hay_mas = False
+        self.cargando = False
+        self.filtros_consultados = None  # Filtros de la consulta vigente
+        self.tarea_exportacion = None
+        
+        # Timer para agrupar cambios de filtros (y entrada del escáner)
         self.scanner_timer = QTimer()
         self.scanner_timer.setSingleShot(True)
-        self.scanner_timer.setInterval(300)  # 300ms después de que deje de escribir
-        self.scanner_timer.timeout.connect(self.aplicar_filtros)
+        self.scanner_timer.setInterval(300)  # 300ms después del último cambio
+        self.scanner_timer.timeout.connect(self.recargar_si_cambiaron_filtros)
         
         # Configurar política de tamaño
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -63,7 +89,7 @@ class HistorialVentasWindow(QWidget):
         content.setLayout(content_layout)
         
         # Buscador
-        self.search_bar = SearchBar("Buscar por ID de venta, usuario o monto...")
+        self.search_bar = SearchBar("Buscar por ID de venta o monto exacto...")
         self.search_bar.connect_search(self.on_search_changed)
         content_layout.addWidget(self.search_bar)
         
@@ -117,7 +143,7 @@ class HistorialVentasWindow(QWidget):
         self.fecha_desde.setCalendarPopup(True)
         self.fecha_desde.setMinimumHeight(40)
         self.fecha_desde.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_NORMAL))
-        self.fecha_desde.dateChanged.connect(self.cargar_historial_completo)
+        self.fecha_desde.dateChanged.connect(self.programar_recarga)
         aplicar_estilo_fecha(self.fecha_desde)
         desde_layout.addWidget(self.fecha_desde)
         filters_layout.addWidget(desde_container, stretch=1)
@@ -134,7 +160,7 @@ class HistorialVentasWindow(QWidget):
         self.fecha_hasta.setCalendarPopup(True)
         self.fecha_hasta.setMinimumHeight(40)
         self.fecha_hasta.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_NORMAL))
-        self.fecha_hasta.dateChanged.connect(self.cargar_historial_completo)
+        self.fecha_hasta.dateChanged.connect(self.programar_recarga)
         aplicar_estilo_fecha(self.fecha_hasta)
         hasta_layout.addWidget(self.fecha_hasta)
         filters_layout.addWidget(hasta_container, stretch=1)
@@ -149,10 +175,32 @@ class HistorialVentasWindow(QWidget):
         self.usuario_combo = QComboBox()
         self.usuario_combo.setMinimumHeight(40)
         self.usuario_combo.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_NORMAL))
-        self.usuario_combo.currentTextChanged.connect(self.aplicar_filtros)
+        self.cargar_usuarios_filtro()
+        self.usuario_combo.currentIndexChanged.connect(self.programar_recarga)
         usuario_layout.addWidget(self.usuario_combo)
         filters_layout.addWidget(usuario_container, stretch=1)
         
+        # Filtro por monto
+        monto_container = QWidget()
+        monto_layout = QVBoxLayout(monto_container)
+        monto_layout.setContentsMargins(0, 0, 0, 0)
+        monto_layout.setSpacing(4)
+        monto_label = StyledLabel("Monto (mín - máx):", size=WindowsPhoneTheme.FONT_SIZE_SMALL)
+        monto_layout.addWidget(monto_label)
+        monto_inputs = QHBoxLayout()
+        monto_inputs.setSpacing(4)
+        self.monto_min = QLineEdit()
+        self.monto_max = QLineEdit()
+        for campo, placeholder in ((self.monto_min, "Mín"), (self.monto_max, "Máx")):
+            campo.setPlaceholderText(placeholder)
+            campo.setValidator(QDoubleValidator(0.0, 999999.99, 2))
+            campo.setMinimumHeight(40)
+            campo.setFont(QFont(WindowsPhoneTheme.FONT_FAMILY, WindowsPhoneTheme.FONT_SIZE_NORMAL))
+            campo.textChanged.connect(self.programar_recarga)
+            monto_inputs.addWidget(campo)
+        monto_layout.addLayout(monto_inputs)
+        filters_layout.addWidget(monto_container, stretch=1)
+        
         # Botón limpiar filtros
         btn_limpiar_container = QWidget()
         btn_limpiar_layout = QVBoxLayout(btn_limpiar_container)
@@ -192,111 +240,142 @@ class HistorialVentasWindow(QWidget):
         header.setSectionResizeMode(4, QHeaderView.Stretch)
         header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
         
+        # Cargar la siguiente página al acercarse al final
+        self.completar_tabla = conectar_scroll_infinito(self.history_table, self.cargar_siguiente_pagina)
+        
         parent_layout.addWidget(self.history_table)
     
     def on_search_changed(self):
         """Reiniciar timer cuando cambia el texto de búsqueda"""
+        self.programar_recarga()
+    
+    def programar_recarga(self, *args):
+        """Reiniciar el timer de recarga al cambiar cualquier filtro"""
         self.scanner_timer.start()
     
     def limpiar_filtros(self):
         """Limpiar todos los filtros"""
         self.search_bar.clear()
         self.usuario_combo.setCurrentIndex(0)
+        self.monto_min.clear()
+        self.monto_max.clear()
         self.fecha_desde.setDate(QDate.currentDate().addDays(-30))
         self.fecha_hasta.setDate(QDate.currentDate())
-        self.cargar_historial_completo()
-    
-    def cargar_historial_completo(self):
-        """Cargar historial completo de ventas desde la base de datos"""
-        try:
-            fecha_desde = self.fecha_desde.date().toPython()
-            fecha_hasta = self.fecha_hasta.date().toPython()
-            
-            response = self.pg_manager.client.table('ventas').select(
-                'id_venta, fecha, total, usuarios(nombre_completo)'
-            ).gte('fecha', f'{fecha_desde}T00:00:00').lte(
-                'fecha', f'{fecha_hasta}T23:59:59'
-            ).order('fecha', desc=True).execute()
-            
-            self.ventas_data = response.data or []
-            
-            # Cargar usuarios para el filtro
-            self.cargar_usuarios_filtro()
-            
-            # Aplicar filtros
-            self.aplicar_filtros()
-            
-        except Exception as e:
-            logging.error(f"Error cargando historial: {e}")
-            show_warning_dialog(self, "Error", f"Error al cargar historial: {e}")
+        self.scanner_timer.stop()
+        self.recargar_si_cambiaron_filtros()
     
     def cargar_usuarios_filtro(self):
-        """Cargar lista de usuarios para el filtro"""
+        """Cargar lista de cajeros para el filtro (el id va como dato del item)"""
         try:
-            # Obtener usuarios únicos de las ventas
-            usuarios = set()
-            for venta in self.ventas_data:
-                if venta.get('usuarios') and isinstance(venta['usuarios'], dict):
-                    nombre = venta['usuarios'].get('nombre_completo')
-                    if nombre:
-                        usuarios.add(nombre)
-            
-            # Actualizar combo
-            self.usuario_combo.clear()
-            self.usuario_combo.addItem("Todos")
-            for usuario in sorted(usuarios):
-                self.usuario_combo.addItem(usuario)
+            self.usuario_combo.addItem("Todos", None)
+            for usuario in self.pg_manager.obtener_usuarios(solo_activos=False):
+                self.usuario_combo.addItem(usuario.get('nombre_completo') or 'N/A', usuario['id_usuario'])
                 
         except Exception as e:
             logging.error(f"Error cargando usuarios para filtro: {e}")
     
-    def aplicar_filtros(self):
-        """Aplicar filtros a los datos de ventas"""
+    def _leer_monto(self, campo):
+        """Convertir el texto de un campo de monto a float (None si está vacío)"""
+        texto = campo.text().strip().replace(',', '.')
         try:
-            # Obtener texto de búsqueda
-            search_text = self.search_bar.text().lower().strip()
-            usuario_filtro = self.usuario_combo.currentText()
-            
-            # Filtrar datos
-            ventas_filtradas = self.ventas_data
-            
-            # Filtro por usuario
-            if usuario_filtro and usuario_filtro != "Todos":
-                ventas_filtradas = [
-                    v for v in ventas_filtradas 
-                    if v.get('usuarios', {}).get('nombre_completo', '') == usuario_filtro
-                ]
+            return float(texto) if texto else None
+        except ValueError:
+            return None
+    
+    def obtener_filtros(self):
+        """Construir los filtros de la consulta a partir de los controles"""
+        filtros = {
+            'fecha_desde': self.fecha_desde.date().toPython(),
+            'fecha_hasta': self.fecha_hasta.date().toPython(),
+            'id_usuario': self.usuario_combo.currentData(),
+            'id_venta': None,
+            'total_min': self._leer_monto(self.monto_min),
+            'total_max': self._leer_monto(self.monto_max)
+        }
+        
+        # El buscador acepta un ID de venta (ticket escaneado) o un monto exacto
+        texto = self.search_bar.text().strip().lstrip('$').replace(',', '')
+        if texto.isdigit():
+            filtros['id_venta'] = int(texto)
+        elif texto:
+            try:
+                monto = float(texto)
+                filtros['total_min'] = filtros['total_max'] = monto
+            except ValueError:
+                pass
+        
+        return filtros
+    
+    def recargar_si_cambiaron_filtros(self):
+        """Volver a consultar solo si los filtros difieren de la consulta vigente"""
+        if self.obtener_filtros() != self.filtros_consultados:
+            self.cargar_historial_completo()
+    
+    def cargar_historial_completo(self):
+        """Recargar el historial desde la primera página con los filtros actuales"""
+        self.filtros_consultados = self.obtener_filtros()
+        self.cursor = None
+        self.hay_mas = False
+        self.ventas_data = []
+        self.history_table.setRowCount(0)
+        self.cargar_pagina()
+    
+    def cargar_siguiente_pagina(self):
+        """Cargar la página siguiente si existe y no hay otra en curso"""
+        if self.hay_mas and not self.cargando:
+            self.cargar_pagina()
+    
+    def cargar_pagina(self):
+        """Traer la página posterior al cursor y agregarla a la tabla"""
+        self.cargando = True
+        try:
+            pagina = self.pg_manager.obtener_pagina_ventas(cursor=self.cursor, **self.filtros_consultados)
             
-            # Filtro por búsqueda de texto
-            if search_text:
-                ventas_filtradas = [
-                    v for v in ventas_filtradas
-                    if (
-                        search_text in str(v.get('id_venta', '')).lower() or
-                        search_text in str(v.get('total', '')).lower() or
-                        search_text in v.get('usuarios', {}).get('nombre_completo', '').lower()
-                    )
-                ]
+            nuevas = pagina['filas']
+            self.cursor = pagina['cursor']
+            self.hay_mas = pagina['hay_mas']
+            self.ventas_data.extend(nuevas)
             
-            # Actualizar tabla
-            self.actualizar_tabla(ventas_filtradas)
+            # Solo se agregan las filas nuevas; las ya mostradas no se tocan
+            self.agregar_filas(nuevas)
+            self.actualizar_info()
             
-            # Actualizar info
-            total_ventas = sum(v.get('total', 0) for v in ventas_filtradas)
+        except Exception as e:
+            logging.error(f"Error cargando historial: {e}")
+            show_warning_dialog(self, "Error", f"Error al cargar historial: {e}")
+        finally:
+            self.cargando = False
+    
+    def actualizar_info(self):
+        """Actualizar la etiqueta con el resumen de lo cargado"""
+        # El total es de las filas cargadas; solo es el del periodo cuando ya no hay más páginas
+        total_ventas = sum(v.get('total', 0) for v in self.ventas_data)
+        if self.hay_mas:
+            self.info_label.setText(
+                f"Mostrando {len(self.ventas_data)} ventas (desplaza para cargar más)  |  "
+                f"Total de las ventas cargadas: ${total_ventas:,.2f}"
+            )
+        else:
             self.info_label.setText(
-                f"Mostrando {len(ventas_filtradas)} de {len(self.ventas_data)} ventas  |  "
+                f"Mostrando {len(self.ventas_data)} ventas  |  "
                 f"Total: ${total_ventas:,.2f}"
             )
-            
-        except Exception as e:
-            logging.error(f"Error aplicando filtros: {e}")
+        
+        # Si la página no llena la tabla no hay barra que desplazar: pedir la siguiente
+        self.completar_tabla()
     
     def actualizar_tabla(self, ventas):
         """Actualizar tabla con las ventas filtradas"""
+        self.history_table.setRowCount(0)
+        self.agregar_filas(ventas)
+    
+    def agregar_filas(self, ventas):
+        """Agregar ventas al final de la tabla"""
         try:
-            self.history_table.setRowCount(len(ventas))
+            inicio = self.history_table.rowCount()
+            self.history_table.setRowCount(inicio + len(ventas))
             
-            for row, venta in enumerate(ventas):
+            for row, venta in enumerate(ventas, start=inicio):
                 self.history_table.setRowHeight(row, 55)
                 
                 # ID
@@ -372,112 +451,23 @@ class HistorialVentasWindow(QWidget):
             show_warning_dialog(self, "Error", f"No se pudieron obtener los detalles: {e}")
         
     def exportar_datos(self):
-        """Exportar datos a archivo"""
-        try:
-            from datetime import datetime
-            import os
-            
-            # Verificar si openpyxl está disponible
-            try:
-                from openpyxl import Workbook
-                from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-            except ImportError:
-                show_warning_dialog(
-                    self,
-                    "Biblioteca requerida",
-                    "Para exportar a Excel necesitas instalar openpyxl",
-                    detail="Ejecuta: pip install openpyxl"
-                )
-                return
-            
-            # Obtener rango de fechas
-            fecha_desde = self.fecha_desde.date().toPython()
-            fecha_hasta = self.fecha_hasta.date().toPython()
-            
-            # Obtener datos de ventas desde Supabase
-            response = self.pg_manager.client.table('ventas').select(
-                'id_venta, fecha, total, usuarios(nombre_completo)'
-            ).gte('fecha', f'{fecha_desde}T00:00:00').lte(
-                'fecha', f'{fecha_hasta}T23:59:59'
-            ).order('fecha', desc=True).execute()
-            
-            ventas = response.data or []
-            
-            # Crear libro de Excel
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Historial de Ventas"
-            
-            # Estilos
-            header_fill = PatternFill(start_color="1E3A8A", end_color="1E3A8A", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # Encabezados
-            headers = ["ID Venta", "Fecha", "Hora", "Total", "Usuario"]
-            
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
-                cell.border = border
-            
-            # Datos
-            for row, venta in enumerate(ventas, 2):
-                ws.cell(row=row, column=1, value=venta['id_venta']).border = border
-                
-                # Fecha
-                fecha = venta['fecha'].strftime("%d/%m/%Y") if isinstance(venta['fecha'], datetime) else str(venta['fecha'])
-                ws.cell(row=row, column=2, value=fecha).border = border
-                
-                # Hora
-                hora = venta['fecha'].strftime("%H:%M") if isinstance(venta['fecha'], datetime) else "N/A"
-                ws.cell(row=row, column=3, value=hora).border = border
-                
-                # Total
-                total_cell = ws.cell(row=row, column=4, value=venta['total'])
-                total_cell.number_format = '$#,##0.00'
-                total_cell.border = border
-                
-                # Usuario
-                ws.cell(row=row, column=5, value=venta.get('usuario', 'N/A')).border = border
-            
-            # Ajustar anchos de columna
-            ws.column_dimensions['A'].width = 12
-            ws.column_dimensions['B'].width = 15
-            ws.column_dimensions['C'].width = 10
-            ws.column_dimensions['D'].width = 15
-            ws.column_dimensions['E'].width = 25
-            
-            # Guardar archivo
-            fecha_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-            desktop = os.path.join(os.path.expanduser("~"), "Desktop")
-            filename = os.path.join(desktop, f"historial_ventas_{fecha_str}.xlsx")
-            
-            wb.save(filename)
-            
-            show_info_dialog(
-                self,
-                "Exportación completada",
-                f"El historial de ventas ha sido exportado exitosamente",
-                detail=f"Archivo guardado en:\n{filename}"
-            )
-            
-            logging.info(f"Historial de ventas exportado: {filename}")
-            
-        except Exception as e:
-            logging.error(f"Error exportando datos: {e}")
-            show_warning_dialog(
-                self,
-                "Error al exportar",
-                "No se pudo exportar el historial de ventas",
-                detail=str(e)
-            )
\ No newline at end of file
+        """Exportar el historial con los filtros consultados (en segundo plano)"""
+        # Se continúa el mismo cursor filtrado: lo ya cargado no se vuelve a pedir
+        filas = filas_paginadas(
+            self.pg_manager.obtener_pagina_ventas,
+            filtros=dict(self.filtros_consultados or {}),
+            cursor=self.cursor,
+            hay_mas=self.hay_mas,
+            cargadas=list(self.ventas_data)
+        )
+        
+        self.tarea_exportacion = iniciar_exportacion(
+            self,
+            filas,
+            COLUMNAS_EXPORTACION_VENTAS,
+            ruta_exportacion("historial_ventas", CARPETA_ESCRITORIO),
+            "ventas",
+            titulo_hoja="Historial de Ventas",
+            clave='exportar.historial_ventas',
+            bordes=True
+        )
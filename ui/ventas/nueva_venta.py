@@ -6,17 +6,17 @@ Usando componentes reutilizables del sistema de diseño
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, 
     QTableWidget, QTableWidgetItem,
+    QTableView, QAbstractItemView, QStyledItemDelegate,
     QGridLayout, QSpinBox,
     QHeaderView, QSizePolicy, QPushButton,
     QDialog, QLabel, QTextEdit,
     QFrame, QLineEdit
 )
-from PySide6.QtCore import Qt, Signal, QSize, QTimer
-from PySide6.QtGui import QFont, QCursor, QDoubleValidator
+from PySide6.QtCore import Qt, Signal, QTimer, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QFont, QDoubleValidator
 from PySide6.QtPrintSupport import QPrinter, QPrintDialog
 import logging
 from datetime import datetime
-import qtawesome as qta
 
 # Importar componentes del sistema de diseño
 from ui.components import (
@@ -31,12 +31,172 @@ from ui.components import (
     show_success_dialog,
     show_warning_dialog,
     show_error_dialog,
-    show_confirmation_dialog
+    show_confirmation_dialog,
+    ColumnaTabla,
+    TablaDatos,
+    TablaModel,
+    BotonesAccionDelegate
 )
 
 # Importar gestores de impresión
 from services.printers.escpos_printer import TicketPrinter
 from services.printers.windows_printer_manager import TicketPrinterWindows, WindowsPrinterManager
+from database.async_manager import obtener_async
+
+
+class CarritoModel(QAbstractTableModel):
+    """
+    Modelo del carrito indexado por (id_producto, tipo_producto).
+    
+    Agregar, incrementar y cambiar cantidad localizan la línea por su llave
+    sin recorrer el carrito, actualizan el total acumulado y solo repintan
+    las celdas de esa fila (dataChanged), sin reconstruir la tabla.
+    """
+    
+    total_cambiado = Signal(float)
+    
+    COLUMNAS = ["Producto", "Precio", "Cant.", "Subtotal", "Quitar"]
+    COL_CANTIDAD = 2
+    COL_SUBTOTAL = 3
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items = []
+        self._filas = {}  # (id_producto, tipo_producto) -> fila
+        self._total = 0.0
+    
+    @staticmethod
+    def clave(item):
+        """Llave de la línea del carrito"""
+        return (item['id_producto'], item.get('tipo_producto', 'varios'))
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNAS[section]
+        return None
+    
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() == self.COL_CANTIDAD:
+            flags |= Qt.ItemIsEditable
+        return flags
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        item = self._items[index.row()]
+        col = index.column()
+        
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return item['nombre']
+            if col == 1:
+                return f"${item['precio']:.2f}"
+            if col == self.COL_SUBTOTAL:
+                return f"${item['subtotal']:.2f}"
+            return None
+        if role == Qt.EditRole and col == self.COL_CANTIDAD:
+            return item['cantidad']
+        if role == Qt.TextAlignmentRole and col in (1, self.COL_SUBTOTAL):
+            return Qt.AlignRight | Qt.AlignVCenter
+        if role == TablaModel.FILA_ROLE:
+            return item
+        return None
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or index.column() != self.COL_CANTIDAD:
+            return False
+        self.set_cantidad(index.row(), int(value))
+        return True
+    
+    def items(self):
+        """Líneas del carrito (lista usada por la venta, confirmación y ticket)"""
+        return self._items
+    
+    def total(self):
+        """Total acumulado del carrito"""
+        return self._total
+    
+    def fila_de(self, clave):
+        """Fila de una llave (id_producto, tipo_producto), o None"""
+        return self._filas.get(clave)
+    
+    def item(self, row):
+        """Línea del carrito en una fila"""
+        return self._items[row]
+    
+    def _sumar_al_total(self, delta):
+        # Precios con 2 decimales: redondear evita acumular error de float
+        self._total = round(self._total + delta, 2)
+        self.total_cambiado.emit(self._total)
+    
+    def agregar(self, item):
+        """Agregar una línea nueva al final del carrito"""
+        row = len(self._items)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._items.append(item)
+        self._filas[self.clave(item)] = row
+        self.endInsertRows()
+        self._sumar_al_total(item['subtotal'])
+    
+    def set_cantidad(self, row, cantidad):
+        """Cambiar la cantidad de una línea y repintar solo esa fila"""
+        item = self._items[row]
+        if cantidad == item['cantidad']:
+            return
+        
+        subtotal_anterior = item['subtotal']
+        item['cantidad'] = cantidad
+        item['subtotal'] = cantidad * item['precio']
+        self.dataChanged.emit(self.index(row, self.COL_CANTIDAD), self.index(row, self.COL_SUBTOTAL))
+        self._sumar_al_total(item['subtotal'] - subtotal_anterior)
+    
+    def quitar(self, row):
+        """Quitar una línea del carrito"""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        item = self._items.pop(row)
+        del self._filas[self.clave(item)]
+        # Solo se recorren las líneas posteriores a la eliminada
+        for i in range(row, len(self._items)):
+            self._filas[self.clave(self._items[i])] = i
+        self.endRemoveRows()
+        self._sumar_al_total(-item['subtotal'])
+    
+    def limpiar(self):
+        """Vaciar el carrito"""
+        self.beginResetModel()
+        self._items = []
+        self._filas = {}
+        self.endResetModel()
+        self._total = 0.0
+        self.total_cambiado.emit(self._total)
+
+
+class CantidadDelegate(QStyledItemDelegate):
+    """Editor QSpinBox para la columna de cantidad, limitado al stock disponible"""
+    
+    def createEditor(self, parent, option, index):
+        item = index.data(TablaModel.FILA_ROLE)
+        spin = QSpinBox(parent)
+        spin.setMinimum(1)
+        spin.setMaximum(item['stock_disponible'])
+        spin.valueChanged.connect(lambda _: self.commitData.emit(spin))
+        return spin
+    
+    def setEditorData(self, editor, index):
+        editor.blockSignals(True)
+        editor.setValue(index.data(Qt.EditRole))
+        editor.blockSignals(False)
+    
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.value(), Qt.EditRole)
 
 
 class NuevaVentaWindow(QWidget):
@@ -55,8 +215,12 @@ class NuevaVentaWindow(QWidget):
         self.texto = ""   # Initialize 'texto' as an empty string
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         
+        # Consultas a Supabase fuera del hilo de la interfaz
+        self.db_async = obtener_async(pg_manager)
+        
         # Variables de venta
-        self.carrito = []
+        self.carrito_model = CarritoModel(self)
+        self.carrito_model.total_cambiado.connect(self.actualizar_total)
         self.total_venta = 0.0
         
         # Timer para detectar entrada del escáner
@@ -130,22 +294,32 @@ class NuevaVentaWindow(QWidget):
         self.search_bar.search_input.textChanged.connect(self._on_search_text_changed)
         layout.addWidget(self.search_bar)
 
-        self.productos_table = QTableWidget()
-        self.productos_table.setColumnCount(5)
-        self.productos_table.setHorizontalHeaderLabels([
-            "Código", "Nombre", "Precio", "Stock", "Acción"
-        ])
-        header = self.productos_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(1, QHeaderView.Stretch)
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(4, QHeaderView.Fixed)
-        header.resizeSection(4, 80)  # Ancho de columna de acción
-
-        self.productos_table.verticalHeader().setVisible(False)
-        self.productos_table.verticalHeader().setDefaultSectionSize(55)  # Altura de fila para centrar botón
-        self.productos_table.setSelectionMode(QTableWidget.NoSelection)
+        # Catálogo en modelo/vista: el botón de agregar lo pinta un delegado,
+        # así re-renderizar tras cada búsqueda no crea widgets por fila
+        columnas = [
+            ColumnaTabla("Código", texto=lambda p: p['codigo_barras'] or f"P{p['id_producto']:04d}"),
+            ColumnaTabla("Nombre", 'nombre', ancho='stretch'),
+            ColumnaTabla(
+                "Precio",
+                texto=lambda p: f"${float(p['precio_venta'] or 0):.2f}",
+                alineacion=Qt.AlignRight | Qt.AlignVCenter
+            ),
+            ColumnaTabla("Stock", 'stock_actual', alineacion=Qt.AlignCenter),
+            ColumnaTabla("Acción", texto=lambda p: '', ancho=80)  # Ancho de columna de acción
+        ]
+        self.productos_table = TablaDatos(columnas, alto_fila=55, ordenable=False)  # Altura de fila para centrar botón
+        self.productos_table.setSelectionMode(TablaDatos.NoSelection)
+        
+        boton_agregar = BotonesAccionDelegate([{
+            'clave': 'agregar',
+            'icono': 'fa5s.plus',
+            'color': WindowsPhoneTheme.TILE_GREEN,
+            'color_hover': WindowsPhoneTheme.TILE_TEAL,
+            'tooltip': "Agregar al carrito"
+        }], ancho_boton=40, alto_boton=40)
+        boton_agregar.accion_solicitada.connect(lambda _, producto: self.agregar_al_carrito(producto))
+        self.productos_table.set_delegado_columna(4, boton_agregar)
+        
         self.productos_table.setFocusPolicy(Qt.NoFocus)
         self.productos_table.setAlternatingRowColors(True)
         self.productos_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -188,11 +362,9 @@ class NuevaVentaWindow(QWidget):
 
         layout.addWidget(SectionTitle("CARRITO DE COMPRAS"))
 
-        self.carrito_table = QTableWidget()
-        self.carrito_table.setColumnCount(5)
-        self.carrito_table.setHorizontalHeaderLabels([
-            "Producto", "Precio", "Cant.", "Subtotal", "Quitar"
-        ])
+        self.carrito_table = QTableView()
+        self.carrito_table.setModel(self.carrito_model)
+        self.carrito_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         header = self.carrito_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Stretch)
         header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
@@ -203,8 +375,24 @@ class NuevaVentaWindow(QWidget):
         header.resizeSection(4, 56)
 
         self.carrito_table.verticalHeader().setVisible(False)
+        self.carrito_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.carrito_table.verticalHeader().setDefaultSectionSize(40)  # Misma altura que tabla de productos
-        self.carrito_table.setSelectionMode(QTableWidget.NoSelection)
+        self.carrito_table.setSelectionMode(QAbstractItemView.NoSelection)
+        
+        # Cantidad: un spin por línea, creado una sola vez al insertar la fila
+        self.carrito_table.setItemDelegateForColumn(CarritoModel.COL_CANTIDAD, CantidadDelegate(self.carrito_table))
+        self.carrito_model.rowsInserted.connect(self._abrir_editores_cantidad)
+        
+        boton_quitar = BotonesAccionDelegate([{
+            'clave': 'quitar',
+            'icono': 'fa5s.trash',
+            'color': WindowsPhoneTheme.TILE_RED,
+            'color_hover': WindowsPhoneTheme.TILE_ORANGE,
+            'tooltip': "Quitar del carrito"
+        }], parent=self.carrito_table, ancho_boton=28, alto_boton=28)  # Mismo diseño que el botón de agregar
+        boton_quitar.accion_solicitada.connect(lambda _, item: self.quitar_del_carrito(item))
+        self.carrito_table.setItemDelegateForColumn(4, boton_quitar)
+        
         self.carrito_table.setFocusPolicy(Qt.NoFocus)
         self.carrito_table.setAlternatingRowColors(True)
         self.carrito_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -240,11 +428,11 @@ class NuevaVentaWindow(QWidget):
         layout.setSpacing(WindowsPhoneTheme.TILE_SPACING)
         layout.setContentsMargins(0, WindowsPhoneTheme.TILE_SPACING, 0, 0)
 
-        btn_procesar = self._create_tile_button(
+        self.btn_procesar = self._create_tile_button(
             "Procesar Venta", "fa5s.credit-card", WindowsPhoneTheme.TILE_GREEN,
             self.confirmar_venta
         )
-        layout.addWidget(btn_procesar, 0, 0, 1, 2)
+        layout.addWidget(self.btn_procesar, 0, 0, 1, 2)
 
         btn_limpiar = self._create_tile_button(
             "Limpiar Carrito", "fa5s.trash", WindowsPhoneTheme.TILE_RED,
@@ -272,107 +460,30 @@ class NuevaVentaWindow(QWidget):
         button.clicked.connect(slot)
         return button
 
-    def _create_add_button(self, producto):
-        """Crear botón de agregar centrado dentro de la celda."""
-        container = QWidget()
-        container.setStyleSheet("background: transparent;")
-        
-        layout = QHBoxLayout(container)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setAlignment(Qt.AlignCenter)
-        
-        btn = QPushButton()
-        btn.setIcon(qta.icon('fa5s.plus', color='white'))
-        btn.setCursor(QCursor(Qt.PointingHandCursor))
-        btn.setToolTip("Agregar al carrito")
-        btn.setFixedSize(40, 40)
-        btn.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {WindowsPhoneTheme.TILE_GREEN};
-                color: white;
-                border: none;
-                border-radius: 5px;
-                padding: 0px;
-            }}
-            QPushButton:hover {{
-                background-color: {WindowsPhoneTheme.TILE_TEAL};
-            }}
-            QPushButton:pressed {{
-                background-color: #1b5e20;
-            }}
-        """)
-        
-        btn.clicked.connect(lambda _, p=producto: self.agregar_al_carrito(p))
-        layout.addWidget(btn, 0, Qt.AlignCenter)
-        
-        return container
-
-    def _create_remove_button(self, index):
-        """Crear botón de quitar con el mismo diseño que el botón de agregar"""
-        container = QWidget()
-        layout = QHBoxLayout(container)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setAlignment(Qt.AlignCenter)
-
-        btn = QPushButton()
-        btn.setCursor(QCursor(Qt.PointingHandCursor))
-        btn.setToolTip("Quitar del carrito")
-        btn.setFixedSize(28, 28)  # Mismo tamaño que el botón de agregar
-        btn.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {WindowsPhoneTheme.TILE_RED};
-                color: white;
-                border: none;
-                border-radius: 5px;
-                font-size: 14px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: {WindowsPhoneTheme.TILE_ORANGE};
-            }}
-        """)
+    def _abrir_editores_cantidad(self, parent, first, last):
+        """Mostrar el spin de cantidad en las filas recién agregadas"""
+        for row in range(first, last + 1):
+            self.carrito_table.openPersistentEditor(self.carrito_model.index(row, CarritoModel.COL_CANTIDAD))
 
-        try:
-            import qtawesome as qta
-            btn.setIcon(qta.icon('fa5s.trash', color='white'))
-            btn.setIconSize(QSize(12, 12))  # Mismo tamaño de icono
-        except Exception:
-            btn.setText("×")
-
-        btn.clicked.connect(lambda _, idx=index: self.quitar_del_carrito(idx))
-        layout.addWidget(btn)
-
-        return container
+    @property
+    def carrito(self):
+        """Líneas del carrito actual"""
+        return self.carrito_model.items()
         
     def cargar_productos(self):
-        """Cargar productos disponibles"""
-        try:
-            productos = self.pg_manager.get_all_products()
-            self.productos_table.setRowCount(len(productos))
-
-            for row, producto in enumerate(productos):
-                # Código
-                self.productos_table.setItem(row, 0, QTableWidgetItem(producto['codigo_barras'] or f"P{producto['id_producto']:04d}"))
-
-                # Nombre
-                self.productos_table.setItem(row, 1, QTableWidgetItem(producto['nombre']))
-
-                # Precio
-                precio_item = QTableWidgetItem(f"${producto['precio_venta']:.2f}")
-                precio_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.productos_table.setItem(row, 2, precio_item)
-
-                # Stock
-                stock_item = QTableWidgetItem(str(producto['stock_actual']))
-                stock_item.setTextAlignment(Qt.AlignCenter)
-                self.productos_table.setItem(row, 3, stock_item)
-
-                btn_container = self._create_add_button(producto)
-                self.productos_table.setCellWidget(row, 4, btn_container)
-
-        except Exception as e:
-            logging.error(f"Error cargando productos: {e}")
-            show_error_dialog(self, "Error", f"No se pudo cargar los productos: {e}")
+        """Cargar productos disponibles (en segundo plano)"""
+        # Misma clave que la búsqueda: el resultado más reciente reemplaza al anterior
+        self.db_async.ejecutar(
+            'get_all_products',
+            clave='nueva_venta.productos',
+            al_terminar=self.productos_table.set_filas,
+            al_fallar=self._error_cargando_productos
+        )
+    
+    def _error_cargando_productos(self, error):
+        """Mostrar error de carga/búsqueda de productos"""
+        logging.error(f"Error cargando productos: {error}")
+        show_error_dialog(self, "Error", f"No se pudo cargar los productos: {error}")
             
     def _on_search_text_changed(self):
         """Detectar cuando se ingresa texto (para capturar escáner)"""
@@ -441,30 +552,14 @@ class NuevaVentaWindow(QWidget):
         if not texto:
             self.cargar_productos()
             return
-            
-        try:
-            productos = self.pg_manager.search_products(texto)
-            self.productos_table.setRowCount(len(productos))
-            
-            for row, producto in enumerate(productos):
-                self.productos_table.setItem(row, 0, QTableWidgetItem(producto['codigo_barras'] or f"P{producto['id_producto']:04d}"))
-                self.productos_table.setItem(row, 1, QTableWidgetItem(producto['nombre']))
-                
-                precio = float(producto['precio_venta']) if producto['precio_venta'] is not None else 0.0
-                precio_item = QTableWidgetItem(f"${precio:.2f}")
-                precio_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.productos_table.setItem(row, 2, precio_item)
-                
-                stock_item = QTableWidgetItem(str(producto['stock_actual']))
-                stock_item.setTextAlignment(Qt.AlignCenter)
-                self.productos_table.setItem(row, 3, stock_item)
-                
-                btn_container = self._create_add_button(producto)
-                self.productos_table.setCellWidget(row, 4, btn_container)
-                
-        except Exception as e:
-            logging.error(f"Error buscando productos: {e}")
-            show_error_dialog(self, "Error", f"No se pudo buscar productos: {e}")
+        
+        # Cada tecla reemplaza la búsqueda anterior que siga en curso
+        self.db_async.ejecutar(
+            'search_products', texto,
+            clave='nueva_venta.productos',
+            al_terminar=self.productos_table.set_filas,
+            al_fallar=self._error_cargando_productos
+        )
             
     def agregar_al_carrito(self, producto):
         """Agregar producto al carrito"""
@@ -475,79 +570,39 @@ class NuevaVentaWindow(QWidget):
         # Convertir precio a float para evitar problemas con Decimal
         precio = float(producto['precio_venta'])
             
-        # Verificar si ya está en el carrito
-        for item in self.carrito:
-            if item['id_producto'] == producto['id_producto']:
-                if item['cantidad'] < producto['stock_actual']:
-                    item['cantidad'] += 1
-                    item['subtotal'] = item['cantidad'] * item['precio']
-                else:
-                    show_warning_dialog(self, "Stock Insuficiente", f"Solo hay {producto['stock_actual']} unidades disponibles.")
-                    return
-                break
+        # Buscar la línea por su llave en lugar de recorrer el carrito
+        clave = (producto['id_producto'], producto.get('tipo_producto', 'varios'))
+        row = self.carrito_model.fila_de(clave)
+        
+        if row is not None:
+            item = self.carrito_model.item(row)
+            if item['cantidad'] >= producto['stock_actual']:
+                show_warning_dialog(self, "Stock Insuficiente", f"Solo hay {producto['stock_actual']} unidades disponibles.")
+                return
+            self.carrito_model.set_cantidad(row, item['cantidad'] + 1)
         else:
             # Nuevo producto en el carrito
-            self.carrito.append({
+            self.carrito_model.agregar({
                 'id_producto': producto['id_producto'],
                 'codigo_interno': producto.get('codigo_interno', ''),
+                'tipo_producto': producto.get('tipo_producto', 'varios'),
                 'nombre': producto['nombre'],
                 'precio': precio,
                 'cantidad': 1,
                 'subtotal': precio,
                 'stock_disponible': producto['stock_actual']
             })
-            
-        self.actualizar_carrito()
-        
-    def actualizar_carrito(self):
-        """Actualizar tabla del carrito y total"""
-        self.carrito_table.setRowCount(len(self.carrito))
-        self.total_venta = 0.0
         
-        for row, item in enumerate(self.carrito):
-            # Producto
-            self.carrito_table.setItem(row, 0, QTableWidgetItem(item['nombre']))
-            
-            # Precio
-            precio_item = QTableWidgetItem(f"${item['precio']:.2f}")
-            precio_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.carrito_table.setItem(row, 1, precio_item)
-            
-            # Cantidad (editable)
-            cantidad_spin = QSpinBox()
-            cantidad_spin.setMinimum(1)
-            cantidad_spin.setMaximum(item['stock_disponible'])
-            cantidad_spin.setValue(item['cantidad'])
-            cantidad_spin.valueChanged.connect(lambda val, idx=row: self.cambiar_cantidad(idx, val))
-            self.carrito_table.setCellWidget(row, 2, cantidad_spin)
-            
-            # Subtotal
-            subtotal_item = QTableWidgetItem(f"${item['subtotal']:.2f}")
-            subtotal_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.carrito_table.setItem(row, 3, subtotal_item)
-            
-            # Botón Quitar con el mismo diseño que el botón de agregar
-            btn_container = self._create_remove_button(row)
-            self.carrito_table.setCellWidget(row, 4, btn_container)
-            
-            # Convertir subtotal a float antes de sumar
-            self.total_venta += float(item['subtotal'])
-            
-        # Actualizar total
+    def actualizar_total(self, total):
+        """Actualizar el total a pagar (lo emite el modelo del carrito)"""
+        self.total_venta = total
         self.total_label.setText(f"${self.total_venta:.2f}")
-        
-    def cambiar_cantidad(self, index, nueva_cantidad):
-        """Cambiar cantidad de un item del carrito"""
-        if 0 <= index < len(self.carrito):
-            self.carrito[index]['cantidad'] = nueva_cantidad
-            self.carrito[index]['subtotal'] = nueva_cantidad * self.carrito[index]['precio']
-            self.actualizar_carrito()
             
-    def quitar_del_carrito(self, index):
+    def quitar_del_carrito(self, item):
         """Quitar item del carrito"""
-        if 0 <= index < len(self.carrito):
-            del self.carrito[index]
-            self.actualizar_carrito()
+        row = self.carrito_model.fila_de(CarritoModel.clave(item))
+        if row is not None:
+            self.carrito_model.quitar(row)
             
     def confirmar_cancelar_venta(self):
         """Confirmar antes de cancelar la venta"""
@@ -566,32 +621,28 @@ class NuevaVentaWindow(QWidget):
             cancel_text="No, continuar venta"
         ):
             # Limpiar carrito y cerrar
-            self.carrito.clear()
-            self.actualizar_carrito()
+            self.carrito_model.limpiar()
             self.cerrar_solicitado.emit()
     
-    def verificar_turno_abierto(self):
-        """Verificar que haya un turno abierto consultando la base de datos"""
-        try:
-            # Consultar el último turno en la tabla
-            response = self.pg_manager.client.table('turnos_caja').select(
-                'id_turno, cerrado, fecha_apertura'
-            ).order('fecha_apertura', desc=True).limit(1).execute()
-            
-            if response.data and len(response.data) > 0:
-                ultimo_turno = response.data[0]
-                # Verificar si está abierto (cerrado = false)
-                if not ultimo_turno.get('cerrado', True):
-                    # Actualizar turno_id con el turno actualmente abierto
-                    self.turno_id = ultimo_turno['id_turno']
-                    return True
-            
-            # No hay turno abierto
-            return False
-            
-        except Exception as e:
-            logging.error(f"Error verificando turno abierto: {e}")
-            return False
+    def consultar_turno_abierto(self):
+        """
+        Id del último turno si está abierto, o None.
+        
+        Hace la consulta a la BD: se ejecuta en el pool de db_async.
+        """
+        # Consultar el último turno en la tabla
+        response = self.pg_manager.client.table('turnos_caja').select(
+            'id_turno, cerrado, fecha_apertura'
+        ).order('fecha_apertura', desc=True).limit(1).execute()
+        
+        if response.data and len(response.data) > 0:
+            ultimo_turno = response.data[0]
+            # Verificar si está abierto (cerrado = false)
+            if not ultimo_turno.get('cerrado', True):
+                return ultimo_turno['id_turno']
+        
+        # No hay turno abierto
+        return None
     
     def mostrar_dialogo_abrir_turno(self):
         """Mostrar diálogo para que el usuario abra un turno"""
@@ -614,8 +665,7 @@ class NuevaVentaWindow(QWidget):
             confirm_text="Sí, limpiar",
             cancel_text="No"
         ):
-            self.carrito.clear()
-            self.actualizar_carrito()
+            self.carrito_model.limpiar()
             
     def confirmar_venta(self):
         """Mostrar ventana de confirmación antes de procesar la venta"""
@@ -625,72 +675,121 @@ class NuevaVentaWindow(QWidget):
             return
         
         # Verificar que haya un turno REALMENTE abierto consultando la BD
-        if not self.verificar_turno_abierto():
+        self.btn_procesar.setEnabled(False)
+        self.db_async.ejecutar(
+            self.consultar_turno_abierto,
+            clave='nueva_venta.turno',
+            al_terminar=self._on_turno_verificado,
+            al_fallar=self._on_error_turno
+        )
+    
+    def _on_turno_verificado(self, id_turno):
+        """Continuar la confirmación con el turno consultado"""
+        self.btn_procesar.setEnabled(True)
+        if not id_turno:
             self.mostrar_dialogo_abrir_turno()
             return
         
+        # Actualizar turno_id con el turno actualmente abierto
+        self.turno_id = id_turno
+        
         # Crear diálogo de confirmación
         dialog = ConfirmacionVentaDialog(self.carrito, self.total_venta, self)
         if dialog.exec() == QDialog.Accepted:
             self.procesar_venta()
+    
+    def _on_error_turno(self, error):
+        """Error consultando el turno: se trata como turno no disponible"""
+        logging.error(f"Error verificando turno abierto: {error}")
+        self.btn_procesar.setEnabled(True)
+        self.mostrar_dialogo_abrir_turno()
             
     def procesar_venta(self):
-        """Procesar la venta"""
-        try:
-            # Doble verificación: asegurarse que el turno sigue abierto
-            if not self.verificar_turno_abierto():
-                self.mostrar_dialogo_abrir_turno()
-                return
-            
-            # Crear venta en la base de datos
-            venta_data = {
-                'total': self.total_venta,
-                'metodo_pago': 'efectivo',
-                'tipo_venta': 'producto',
-                'productos': self.carrito,
-                'id_usuario': self.user_data['id_usuario'],
-                'id_turno': self.turno_id  # Agregar ID del turno
-            }
-            
-            venta_id = self.pg_manager.create_sale(venta_data)
-            
-            if venta_id:
-                # Mostrar mensaje de éxito
-                show_success_dialog(
-                    self, 
-                    "Venta Completada", 
-                    f"La venta se procesó exitosamente.\nID de venta: {venta_id}",
-                    f"Total: ${self.total_venta:.2f}"
-                )
-                
-                # Generar y mostrar ticket
-                self.mostrar_ticket(venta_id)
-                
-                # Emitir señal de venta completada
-                self.venta_completada.emit({
-                    'id_venta': venta_id,
-                    'total': self.total_venta,
-                    'productos': len(self.carrito)
-                })
-                
-                # Limpiar carrito
-                self.carrito.clear()
-                self.actualizar_carrito()
-                
-                # Recargar productos para actualizar stock
-                self.cargar_productos()
-                
-                logging.info(f"Venta {venta_id} procesada exitosamente: ${self.total_venta:.2f}")
-            else:
-                show_error_dialog(self, "Error", "No se pudo procesar la venta.")
-            
-        except Exception as e:
-            logging.error(f"Error procesando venta: {e}")
-            show_error_dialog(
-                self,
-                "Error",
-                f"No se pudo procesar la venta: {str(e)}"
-            )
+        """Procesar la venta (el registro en la BD corre en segundo plano)"""
+        # Crear venta en la base de datos
+        venta_data = {
+            'total': self.total_venta,
+            'metodo_pago': 'efectivo',
+            'tipo_venta': 'producto',
+            'productos': [dict(item) for item in self.carrito],
+            'id_usuario': self.user_data['id_usuario'],
+            'id_turno': self.turno_id  # Agregar ID del turno
+        }
+        
+        # Bloquear la pantalla de venta hasta tener respuesta (evita doble cobro)
+        self.setEnabled(False)
+        self.db_async.ejecutar(
+            self._registrar_venta, venta_data,
+            al_terminar=self._on_venta_registrada,
+            al_fallar=self._on_error_venta
+        )
+    
+    def _registrar_venta(self, venta_data):
+        """
+        Verificar el turno y registrar la venta (se ejecuta en el pool).
+        
+        Returns:
+            (id_turno, venta_id); id_turno es None si el turno ya no está abierto
+        """
+        # Doble verificación: asegurarse que el turno sigue abierto
+        id_turno = self.consultar_turno_abierto()
+        if not id_turno:
+            return None, None
+        
+        venta_data['id_turno'] = id_turno
+        return id_turno, self.pg_manager.create_sale(venta_data)
+    
+    def _on_venta_registrada(self, resultado):
+        """Terminar la venta en la interfaz con la respuesta de la BD"""
+        self.setEnabled(True)
+        id_turno, venta_id = resultado
+        
+        if not id_turno:
+            self.mostrar_dialogo_abrir_turno()
+            return
+        self.turno_id = id_turno
+        
+        if not venta_id:
+            show_error_dialog(self, "Error", "No se pudo procesar la venta.")
+            return
+        
+        total = self.total_venta
+        
+        # Mostrar mensaje de éxito
+        show_success_dialog(
+            self, 
+            "Venta Completada", 
+            f"La venta se procesó exitosamente.\nID de venta: {venta_id}",
+            f"Total: ${total:.2f}"
+        )
+        
+        # Generar y mostrar ticket
+        self.mostrar_ticket(venta_id)
+        
+        # Emitir señal de venta completada
+        self.venta_completada.emit({
+            'id_venta': venta_id,
+            'total': total,
+            'productos': len(self.carrito)
+        })
+        
+        # Limpiar carrito
+        self.carrito_model.limpiar()
+        
+        # Recargar productos para actualizar stock
+        self.cargar_productos()
+        
+        logging.info(f"Venta {venta_id} procesada exitosamente: ${total:.2f}")
+    
+    def _on_error_venta(self, error):
+        """Error registrando la venta"""
+        self.setEnabled(True)
+        logging.error(f"Error procesando venta: {error}")
+        show_error_dialog(
+            self,
+            "Error",
+            f"No se pudo procesar la venta: {error}"
+        )
             
     def mostrar_ticket(self, venta_id):
         """Mostrar ticket de venta"""
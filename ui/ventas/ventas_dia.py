@@ -20,11 +20,13 @@ from ui.components import (
     TileButton,
     InfoTile,
     create_page_layout,
-    show_info_dialog,
     show_warning_dialog,
     SectionTitle,
     ContentPanel
 )
+from ui.exportacion_dialog import iniciar_exportacion
+from ui.ventas.historial import COLUMNAS_EXPORTACION_VENTAS
+from services.exportador import CARPETA_ESCRITORIO, filas_paginadas, ruta_exportacion
 
 
 class VentasDiaWindow(QWidget):
@@ -38,6 +40,7 @@ class VentasDiaWindow(QWidget):
         self.supabase_service = supabase_service
         self.user_data = user_data
         self.turno_id = turno_id  # ID del turno actual
+        self.tarea_exportacion = None
         
         # Configurar política de tamaño
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -144,117 +147,31 @@ class VentasDiaWindow(QWidget):
         dialog.exec()
             
     def imprimir_reporte(self):
-        """Imprimir reporte de ventas del turno"""
-        try:
-            if not self.turno_id:
-                show_warning_dialog(
-                    self,
-                    "Turno No Disponible",
-                    "No hay un turno de caja abierto."
-                )
-                return
-            
-            from datetime import datetime
-            import os
-            
-            # Verificar si openpyxl está disponible
-            try:
-                from openpyxl import Workbook
-                from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-            except ImportError:
-                show_warning_dialog(
-                    self,
-                    "Biblioteca requerida",
-                    "Para exportar a Excel necesitas instalar openpyxl",
-                    detail="Ejecuta: pip install openpyxl"
-                )
-                return
-            
-            # Obtener ventas del turno desde Supabase
-            response = self.pg_manager.client.table('ventas').select(
-                'id_venta, fecha, total, usuarios(nombre_completo)'
-            ).eq('id_turno', self.turno_id).order('fecha', desc=True).execute()
-            
-            ventas = response.data or []
-            
-            # Crear libro de Excel
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Ventas del Día"
-            
-            # Estilos
-            header_fill = PatternFill(start_color="1E3A8A", end_color="1E3A8A", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # Encabezados
-            headers = ["ID Venta", "Fecha", "Hora", "Total", "Usuario"]
-            
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
-                cell.border = border
-            
-            # Datos
-            for row, venta in enumerate(ventas, 2):
-                ws.cell(row=row, column=1, value=venta['id_venta']).border = border
-                
-                # Fecha
-                fecha = venta['fecha'].strftime("%d/%m/%Y") if isinstance(venta['fecha'], datetime) else str(venta['fecha'])
-                ws.cell(row=row, column=2, value=fecha).border = border
-                
-                # Hora
-                hora = venta['fecha'].strftime("%H:%M") if isinstance(venta['fecha'], datetime) else "N/A"
-                ws.cell(row=row, column=3, value=hora).border = border
-                
-                # Total
-                total_cell = ws.cell(row=row, column=4, value=venta['total'])
-                total_cell.number_format = '$#,##0.00'
-                total_cell.border = border
-                
-                # Usuario
-                ws.cell(row=row, column=5, value=venta.get('usuario', 'N/A')).border = border
-            
-            # Ajustar anchos de columna
-            ws.column_dimensions['A'].width = 12
-            ws.column_dimensions['B'].width = 15
-            ws.column_dimensions['C'].width = 10
-            ws.column_dimensions['D'].width = 15
-            ws.column_dimensions['E'].width = 25
-            
-            # Guardar archivo
-            fecha_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-            desktop = os.path.join(os.path.expanduser("~"), "Desktop")
-            filename = os.path.join(desktop, f"ventas_turno_{self.turno_id}_{fecha_str}.xlsx")
-            
-            wb.save(filename)
-            
-            show_info_dialog(
-                self,
-                "Exportación completada",
-                f"El reporte de ventas del turno ha sido exportado exitosamente",
-                detail=f"Archivo guardado en:\n{filename}"
-            )
-            
-            logging.info(f"Ventas del turno {self.turno_id} exportadas: {filename}")
-            
-        except Exception as e:
-            logging.error(f"Error exportando datos: {e}")
+        """Exportar las ventas del turno a Excel (en segundo plano)"""
+        if not self.turno_id:
             show_warning_dialog(
                 self,
-                "Error al exportar",
-                "No se pudo exportar el reporte de ventas",
-                detail=str(e)
+                "Turno No Disponible",
+                "No hay un turno de caja abierto."
             )
+            return
+        
+        # Las ventas del turno se leen por páginas conforme se escriben
+        filas = filas_paginadas(
+            self.pg_manager.obtener_pagina_ventas,
+            filtros={'id_turno': self.turno_id}
+        )
+        
+        self.tarea_exportacion = iniciar_exportacion(
+            self,
+            filas,
+            COLUMNAS_EXPORTACION_VENTAS,
+            ruta_exportacion(f"ventas_turno_{self.turno_id}", CARPETA_ESCRITORIO),
+            "ventas del turno",
+            titulo_hoja="Ventas del Día",
+            clave='exportar.ventas_turno',
+            bordes=True
+        )
 
 
 class DetalleVentasDiaDialog(QDialog):
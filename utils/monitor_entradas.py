@@ -3,10 +3,14 @@ Monitor de Entradas - Detecta nuevos registros usando PostgreSQL LISTEN/NOTIFY
 Emite señal cuando se detecta una nueva entrada en tiempo real
 """
 
-from PySide6.QtCore import QObject, QTimer, Signal, QThread
+from PySide6.QtCore import QObject, QTimer, Signal
 import logging
 from datetime import datetime
 import json
+import select
+from collections import deque
+
+from services.ejecutor_tareas import Prioridad, obtener_ejecutor
 
 try:
     import psycopg2
@@ -17,90 +21,161 @@ except ImportError:
     logging.warning("psycopg2 no está instalado. Monitor de entradas no funcionará.")
 
 
-class PostgresListenerThread(QThread):
-    """Hilo separado para escuchar notificaciones de PostgreSQL"""
+class PostgresListener:
+    """
+    Escucha notificaciones de PostgreSQL como tarea de larga duración del
+    ejecutor compartido. Los payloads se envían con tarea.reportar() y el
+    loop termina cuando se cancela el token de la tarea.
+    
+    El hilo queda bloqueado en select() sobre el socket de la conexión: se
+    despierta en cuanto llega una notificación y no consume CPU en reposo.
+    
+    Si la conexión se pierde (reinicio del servidor, red), reintenta con
+    espera exponencial. Cada vez que logra escuchar reporta CONECTADO y al
+    perder la conexión reporta DESCONECTADO, para que quien escucha pueda
+    recuperar lo que se perdió en el intervalo.
+    """
     
-    notificacion_recibida = Signal(str)  # Emite el payload JSON
+    # Máximo que select() espera antes de revisar si se pidió detener (segundos)
+    TIMEOUT_SELECT = 0.5
+    # Espera entre reintentos de conexión: se duplica hasta el máximo (segundos)
+    ESPERA_RECONEXION_INICIAL = 1
+    ESPERA_RECONEXION_MAXIMA = 60
+    
+    # Marcas reportadas junto con los payloads (no son texto)
+    CONECTADO = object()
+    DESCONECTADO = object()
     
     def __init__(self, host, port, database, user, password, channel):
-        super().__init__()
         self.host = host
         self.port = port
         self.database = database
         self.user = user
         self.password = password
         self.channel = channel
-        self.running = False
         self.conn = None
         
-    def run(self):
-        """Conectar y escuchar notificaciones"""
+    def despachar(self, notify, tarea):
+        """Enviar el payload de una notificación a la interfaz"""
         try:
-            # Conectar a PostgreSQL con codificación UTF-8
-            self.conn = psycopg2.connect(
-                host=self.host,
-                port=self.port,
-                database=self.database,
-                user=self.user,
-                password=self.password,
-                client_encoding='UTF8'
-            )
-            self.conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            # Intentar decodificar el payload
+            payload = notify.payload
+            logging.info(f"[NOTIF] Notificacion recibida: {payload[:100]}...")
+            tarea.reportar(payload)
+        except Exception as decode_error:
+            logging.error(f"Error decodificando notificacion: {decode_error}")
+            # Intentar con latin1 como fallback
+            try:
+                if isinstance(notify.payload, bytes):
+                    payload = notify.payload.decode('latin1')
+                    logging.warning("Usando codificacion latin1 como fallback")
+                    tarea.reportar(payload)
+            except:
+                logging.error("No se pudo decodificar la notificacion")
+    
+    def escuchar(self, tarea):
+        """Escuchar notificaciones, reconectando, hasta que se cancele la tarea"""
+        espera = self.ESPERA_RECONEXION_INICIAL
+        
+        while not tarea.token.cancelado:
+            conectado = False
+            try:
+                self.conectar()
+                conectado = True
+                espera = self.ESPERA_RECONEXION_INICIAL
+                tarea.reportar(self.CONECTADO)
+                
+                self.escuchar_conexion(tarea)
+                
+            except Exception as e:
+                logging.error(f"[ERROR] Error en listener PostgreSQL ({self.channel}): {e}")
+            finally:
+                self.cerrar()
             
-            cursor = self.conn.cursor()
-            cursor.execute(f"LISTEN {self.channel};")
+            if tarea.token.cancelado:
+                break
             
-            logging.info(f"[OK] Escuchando canal PostgreSQL: {self.channel}")
+            if conectado:
+                tarea.reportar(self.DESCONECTADO)
             
-            self.running = True
+            logging.info(f"[LISTENER] Reintentando conexión a {self.channel} en {espera} s")
+            if tarea.token.esperar(espera):
+                break
+            espera = min(espera * 2, self.ESPERA_RECONEXION_MAXIMA)
+    
+    def conectar(self):
+        """Abrir la conexión y suscribirse al canal"""
+        # Conectar a PostgreSQL con codificación UTF-8
+        self.conn = psycopg2.connect(
+            host=self.host,
+            port=self.port,
+            database=self.database,
+            user=self.user,
+            password=self.password,
+            client_encoding='UTF8',
+            # Detectar conexiones caídas sin cierre (cable, mini PC apagada)
+            keepalives=1,
+            keepalives_idle=30,
+            keepalives_interval=10,
+            keepalives_count=3
+        )
+        self.conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        
+        cursor = self.conn.cursor()
+        cursor.execute(f"LISTEN {self.channel};")
+        
+        logging.info(f"[OK] Escuchando canal PostgreSQL: {self.channel}")
+    
+    def escuchar_conexion(self, tarea):
+        """Loop de escucha sobre la conexión abierta (lanza excepción si se cae)"""
+        # Loop de escucha: bloquear en el socket hasta que haya datos
+        while not tarea.token.cancelado:
+            listos, _, _ = select.select([self.conn], [], [], self.TIMEOUT_SELECT)
+            if not listos:
+                # Timeout: solo sirve para revisar el token de cancelación
+                continue
             
-            # Loop de escucha
-            while self.running:
-                # Esperar notificaciones con timeout de 1 segundo
-                if self.conn.poll() is None:
-                    self.conn.poll()
-                
-                while self.conn.notifies:
-                    notify = self.conn.notifies.pop(0)
-                    try:
-                        # Intentar decodificar el payload
-                        payload = notify.payload
-                        logging.info(f"[NOTIF] Notificacion recibida: {payload[:100]}...")
-                        self.notificacion_recibida.emit(payload)
-                    except Exception as decode_error:
-                        logging.error(f"Error decodificando notificacion: {decode_error}")
-                        # Intentar con latin1 como fallback
-                        try:
-                            if isinstance(notify.payload, bytes):
-                                payload = notify.payload.decode('latin1')
-                                logging.warning("Usando codificacion latin1 como fallback")
-                                self.notificacion_recibida.emit(payload)
-                        except:
-                            logging.error("No se pudo decodificar la notificacion")
-                
-                # Pequeña pausa para no saturar CPU
-                self.msleep(100)
-                
-        except Exception as e:
-            logging.error(f"[ERROR] Error en listener PostgreSQL: {e}")
-        finally:
-            if self.conn:
+            # Leer todo lo que llegó y despachar todas las notificaciones en cola
+            self.conn.poll()
+            while self.conn.notifies:
+                self.despachar(self.conn.notifies.pop(0), tarea)
+    
+    def cerrar(self):
+        """Cerrar la conexión si está abierta"""
+        if self.conn:
+            try:
                 self.conn.close()
                 logging.info("Conexion PostgreSQL cerrada")
-    
-    def stop(self):
-        """Detener el listener"""
-        self.running = False
-        self.wait()
+            except Exception:
+                pass
+            self.conn = None
 
 
 class MonitorEntradas(QObject):
     """
     Monitorea nuevas entradas usando PostgreSQL LISTEN/NOTIFY en tiempo real.
     Emite una señal cuando se detecta una nueva entrada.
+    
+    Lleva una marca (ultimo_id_procesado) con el mayor id_entrada emitido.
+    Cada vez que el listener se reconecta, consulta en un solo lote las
+    entradas con id_entrada mayor a la marca, para no perder las que
+    ocurrieron sin conexión. Las entradas ya emitidas (por aviso o por
+    recuperación) se descartan.
+    
+    Las entradas que llegan dentro de VENTANA_AGRUPAR_MS se entregan juntas
+    en entradas_agrupadas, para que en hora pico la interfaz actualice una
+    vez por ráfaga y no una vez por miembro.
     """
     
     nueva_entrada_detectada = Signal(dict)  # Emite los datos de la entrada y del miembro
+    entradas_agrupadas = Signal(list)  # Emite las entradas de una ráfaga, en orden de llegada
+    
+    # IDs recientes recordados para descartar duplicados entre aviso y recuperación
+    MAX_IDS_RECIENTES = 500
+    # Ventana para agrupar entradas que llegan casi juntas
+    VENTANA_AGRUPAR_MS = 400
+    # Filas por página al recuperar entradas (límite por consulta de PostgREST)
+    TAMANO_PAGINA_RECUPERACION = 1000
     
     def __init__(self, postgres_manager, supabase_service=None, 
                  pg_host='localhost', pg_port=5432, pg_database='torniquete_db',
@@ -128,12 +203,36 @@ class MonitorEntradas(QObject):
         self.pg_password = pg_password
         self.pg_channel = pg_channel
         
-        # Hilo de escucha
-        self.listener_thread = None
+        # Tarea de escucha en el ejecutor compartido
+        self.tarea_listener = None
         
         # Estado del monitor
         self.activo = False
         
+        # Marca de la última entrada emitida y entradas recientes (deduplicación)
+        self.ultimo_id_procesado = None
+        self._ids_recientes = deque(maxlen=self.MAX_IDS_RECIENTES)
+        self._ids_vistos = set()
+        self._conexiones = 0
+        
+        # Entradas de la ráfaga en curso
+        self._lote = []
+        self.timer_lote = QTimer(self)
+        self.timer_lote.setSingleShot(True)
+        self.timer_lote.setInterval(self.VENTANA_AGRUPAR_MS)
+        self.timer_lote.timeout.connect(self.emitir_lote)
+        
+        # Métricas del listener
+        self._metricas = {
+            'notificaciones': 0,
+            'reconexiones': 0,
+            'desconexiones': 0,
+            'recuperaciones': 0,
+            'entradas_recuperadas': 0,
+            'duplicadas_descartadas': 0,
+            'lotes_emitidos': 0,
+        }
+        
         if not PSYCOPG2_AVAILABLE:
             logging.error("[ERROR] psycopg2 no disponible. Instalar con: pip install psycopg2-binary")
         
@@ -150,8 +249,8 @@ class MonitorEntradas(QObject):
             return
         
         try:
-            # Crear y configurar hilo de escucha
-            self.listener_thread = PostgresListenerThread(
+            # Crear el listener y correrlo como tarea de fondo (no cuenta como red)
+            listener = PostgresListener(
                 host=self.pg_host,
                 port=self.pg_port,
                 database=self.pg_database,
@@ -160,11 +259,14 @@ class MonitorEntradas(QObject):
                 channel=self.pg_channel
             )
             
-            # Conectar señal
-            self.listener_thread.notificacion_recibida.connect(self.procesar_notificacion)
-            
-            # Iniciar hilo
-            self.listener_thread.start()
+            self.tarea_listener = obtener_ejecutor().enviar(
+                listener.escuchar,
+                nombre='monitor_entradas.listener',
+                prioridad=Prioridad.FONDO,
+                red=False,
+                con_tarea=True,
+                al_progresar=self.procesar_notificacion
+            )
             
             self.activo = True
             
@@ -178,31 +280,103 @@ class MonitorEntradas(QObject):
         if not self.activo:
             return
         
-        if self.listener_thread:
-            self.listener_thread.stop()
-            self.listener_thread = None
+        if self.tarea_listener:
+            # El loop revisa el token en cada timeout de select() y cierra su conexión
+            self.tarea_listener.cancelar()
+            self.tarea_listener = None
+        
+        # Entregar lo que ya se había recibido
+        self.timer_lote.stop()
+        self.emitir_lote()
         
         self.activo = False
         
         logging.info("Monitor de entradas detenido")
     
+    def metricas(self) -> dict:
+        """Contadores de avisos, reconexiones y recuperaciones del listener"""
+        datos = dict(self._metricas)
+        datos['ultimo_id_procesado'] = self.ultimo_id_procesado
+        return datos
+    
+    def registrar_entrada_emitida(self, id_entrada) -> bool:
+        """
+        Marcar una entrada como emitida y avanzar la marca.
+        Devuelve False si ya se había emitido (duplicada).
+        """
+        if id_entrada is None:
+            return True
+        if id_entrada in self._ids_vistos:
+            self._metricas['duplicadas_descartadas'] += 1
+            return False
+        
+        if len(self._ids_recientes) == self._ids_recientes.maxlen:
+            self._ids_vistos.discard(self._ids_recientes[0])
+        self._ids_recientes.append(id_entrada)
+        self._ids_vistos.add(id_entrada)
+        
+        if self.ultimo_id_procesado is None or id_entrada > self.ultimo_id_procesado:
+            self.ultimo_id_procesado = id_entrada
+        return True
+    
+    def encolar_entrada(self, entrada_data):
+        """Emitir la entrada y sumarla a la ráfaga en curso"""
+        if not entrada_data:
+            return
+        self.nueva_entrada_detectada.emit(entrada_data)
+        
+        self._lote.append(entrada_data)
+        if not self.timer_lote.isActive():
+            self.timer_lote.start()
+    
+    def emitir_lote(self):
+        """Entregar las entradas agrupadas de la ráfaga"""
+        if not self._lote:
+            return
+        lote, self._lote = self._lote, []
+        self._metricas['lotes_emitidos'] += 1
+        if len(lote) > 1:
+            logging.info(f"[ENTRADA] Ráfaga de {len(lote)} entradas agrupada")
+        self.entradas_agrupadas.emit(lote)
+    
     def procesar_notificacion(self, payload_json):
         """Procesar notificación recibida de PostgreSQL"""
+        if payload_json is PostgresListener.CONECTADO:
+            self._on_listener_conectado()
+            return
+        if payload_json is PostgresListener.DESCONECTADO:
+            self._metricas['desconexiones'] += 1
+            logging.warning(f"[ENTRADA] Listener desconectado, última entrada procesada: {self.ultimo_id_procesado}")
+            return
+        
         try:
             # Parsear JSON
             datos = json.loads(payload_json)
+            self._metricas['notificaciones'] += 1
             
             logging.info(f"[ENTRADA] Procesando entrada ID: {datos.get('id_entrada')}")
             
+            if not self.registrar_entrada_emitida(datos.get('id_entrada')):
+                logging.info(f"[ENTRADA] Entrada {datos.get('id_entrada')} ya emitida, se descarta")
+                return
+            
             # Si la notificación incluye todos los datos, emitir directamente
             if 'nombres' in datos and 'apellido_paterno' in datos:
-                self.nueva_entrada_detectada.emit(datos)
+                self.encolar_entrada(datos)
             else:
-                # Obtener datos adicionales desde postgres_manager si faltan
+                # Obtener en el pool los datos que faltan (no bloquear la interfaz)
                 entrada_id = datos.get('id_entrada')
                 if entrada_id:
-                    entrada_detalle = self.postgres_manager.get_entry_details(entrada_id)
-                    self.nueva_entrada_detectada.emit(entrada_detalle)
+                    obtener_ejecutor().enviar(
+                        self.postgres_manager.get_entry_details,
+                        entrada_id,
+                        nombre='monitor_entradas.detalle',
+                        prioridad=Prioridad.ESCANEO,
+                        al_terminar=self.encolar_entrada,
+                        al_fallar=lambda error, entrada_id=entrada_id: logging.error(
+                            f"[ERROR] Error obteniendo detalle de la entrada {entrada_id}: {error}"
+                        )
+                    )
         
         except Exception as e:
             logging.error(f"[ERROR] Error procesando notificación: {e}")
@@ -222,97 +396,128 @@ class MonitorEntradas(QObject):
                 .execute()
             
             if response.data:
-                entrada = response.data
-                miembro = entrada.get('miembros', {})
-                
                 # Convertir a estructura esperada
-                entrada_data = {
-                    'id_entrada': entrada.get('id_entrada'),
-                    'id_miembro': entrada.get('id_miembro'),
-                    'tipo_acceso': entrada.get('tipo_acceso'),
-                    'fecha_entrada': entrada.get('fecha_entrada'),
-                    'area_accedida': entrada.get('area_accedida'),
-                    'dispositivo_registro': entrada.get('dispositivo_registro'),
-                    'notas': entrada.get('notas'),
-                    'nombres': miembro.get('nombres', ''),
-                    'apellido_paterno': miembro.get('apellido_paterno', ''),
-                    'apellido_materno': miembro.get('apellido_materno', ''),
-                    'telefono': miembro.get('telefono', ''),
-                    'email': miembro.get('email', ''),
-                    'codigo_qr': miembro.get('codigo_qr', ''),
-                    'activo': miembro.get('activo', True),
-                    'fecha_registro': miembro.get('fecha_registro', ''),
-                    'fecha_nacimiento': miembro.get('fecha_nacimiento', '')
-                }
+                entrada_data = self.convertir_entrada(response.data)
                 
-                self.nueva_entrada_detectada.emit(entrada_data)
+                self.encolar_entrada(entrada_data)
             else:
                 logging.warning(f"No se encontraron datos para entrada ID: {id_entrada}")
                 
         except Exception as e:
             logging.error(f"Error consultando datos completos: {e}")
     
+    @staticmethod
+    def convertir_entrada(entrada: dict) -> dict:
+        """Convertir una fila de registro_entradas con miembros(*) a la estructura del aviso"""
+        miembro = entrada.get('miembros') or {}
+        return {
+            'id_entrada': entrada.get('id_entrada'),
+            'id_miembro': entrada.get('id_miembro'),
+            'tipo_acceso': entrada.get('tipo_acceso'),
+            'fecha_entrada': entrada.get('fecha_entrada'),
+            'area_accedida': entrada.get('area_accedida'),
+            'dispositivo_registro': entrada.get('dispositivo_registro'),
+            'notas': entrada.get('notas'),
+            'nombres': miembro.get('nombres', ''),
+            'apellido_paterno': miembro.get('apellido_paterno', ''),
+            'apellido_materno': miembro.get('apellido_materno', ''),
+            'telefono': miembro.get('telefono', ''),
+            'email': miembro.get('email', ''),
+            'codigo_qr': miembro.get('codigo_qr', ''),
+            'activo': miembro.get('activo', True),
+            'fecha_registro': miembro.get('fecha_registro', ''),
+            'fecha_nacimiento': miembro.get('fecha_nacimiento', '')
+        }
+    
+    def _on_listener_conectado(self):
+        """El listener (re)conectó: recuperar las entradas posteriores a la marca"""
+        self._conexiones += 1
+        if self._conexiones > 1:
+            self._metricas['reconexiones'] += 1
+            logging.info(f"[ENTRADA] Listener reconectado ({self._metricas['reconexiones']}), recuperando entradas > {self.ultimo_id_procesado}")
+        self.verificar_nuevas_entradas()
+    
     def verificar_nuevas_entradas(self):
-        """Verificar si hay nuevas entradas desde Supabase"""
+        """Recuperar en segundo plano las entradas con ID mayor al último procesado"""
         if not self.activo:
             return
         
-        try:
-            # Verificar conexión a Supabase
-            if not self.supabase_service or not self.supabase_service.is_connected:
-                logging.warning("Conexión a Supabase no disponible")
-                return
-            
-            # Buscar entradas con ID mayor al último procesado desde Supabase
+        obtener_ejecutor().enviar(
+            self.consultar_entradas_desde,
+            self.ultimo_id_procesado,
+            nombre='monitor_entradas.recuperacion',
+            prioridad=Prioridad.ESCANEO,
+            clave='monitor_entradas.recuperacion',
+            al_terminar=self._procesar_recuperacion,
+            al_fallar=lambda error: logging.error(f"Error verificando nuevas entradas desde Supabase: {error}")
+        )
+    
+    def consultar_entradas_desde(self, ultimo_id):
+        """
+        Consultar las entradas posteriores a `ultimo_id` (se ejecuta en el pool).
+        Se recorren por páginas de id_entrada, así una desconexión larga no
+        queda truncada por el máximo de filas de PostgREST.
+        Sin marca todavía (primera conexión) solo se toma el ID más reciente como marca.
+        
+        Returns:
+            (marca_inicial, entradas): marca_inicial es None cuando ya había marca
+        """
+        # Verificar conexión a Supabase
+        if not self.supabase_service or not self.supabase_service.is_connected:
+            logging.warning("Conexión a Supabase no disponible")
+            return None, []
+        
+        if ultimo_id is None:
+            response = self.supabase_service.client.table('registro_entradas')\
+                .select('id_entrada')\
+                .order('id_entrada', desc=True)\
+                .limit(1)\
+                .execute()
+            marca = response.data[0]['id_entrada'] if response.data else 0
+            return marca, []
+        
+        # Buscar entradas con ID mayor al último procesado desde Supabase
+        entradas = []
+        desde_id = ultimo_id
+        while True:
             response = self.supabase_service.client.table('registro_entradas')\
                 .select('*, miembros(*)')\
-                .gt('id_entrada', self.ultimo_id_procesado)\
+                .gt('id_entrada', desde_id)\
                 .eq('tipo_acceso', 'miembro')\
                 .order('id_entrada', desc=False)\
+                .limit(self.TAMANO_PAGINA_RECUPERACION)\
                 .execute()
+            filas = response.data or []
             
-            if response.data and len(response.data) > 0:
-                logging.info(f"Detectadas {len(response.data)} nueva(s) entrada(s) desde Supabase")
-                
-                for entrada in response.data:
-                    # Extraer datos del miembro
-                    miembro = entrada.get('miembros', {})
-                    
-                    # Convertir a diccionario con estructura esperada
-                    entrada_data = {
-                        'id_entrada': entrada.get('id_entrada'),
-                        'id_miembro': entrada.get('id_miembro'),
-                        'tipo_acceso': entrada.get('tipo_acceso'),
-                        'fecha_entrada': entrada.get('fecha_entrada'),
-                        'area_accedida': entrada.get('area_accedida'),
-                        'dispositivo_registro': entrada.get('dispositivo_registro'),
-                        'notas': entrada.get('notas'),
-                        'nombres': miembro.get('nombres', ''),
-                        'apellido_paterno': miembro.get('apellido_paterno', ''),
-                        'apellido_materno': miembro.get('apellido_materno', ''),
-                        'telefono': miembro.get('telefono', ''),
-                        'email': miembro.get('email', ''),
-                        'codigo_qr': miembro.get('codigo_qr', ''),
-                        'activo': miembro.get('activo', True),
-                        'fecha_registro': miembro.get('fecha_registro', ''),
-                        'fecha_nacimiento': miembro.get('fecha_nacimiento', '')
-                    }
-                    
-                    # Actualizar último ID procesado
-                    self.ultimo_id_procesado = entrada_data['id_entrada']
-                    
-                    # Emitir señal con los datos
-                    logging.info(f"Emitiendo señal para entrada ID: {entrada_data['id_entrada']}, Miembro: {entrada_data['nombres']} {entrada_data['apellido_paterno']}")
-                    self.nueva_entrada_detectada.emit(entrada_data)
-                    
-        except KeyboardInterrupt:
-            # Manejar interrupción del usuario
-            logging.info("Monitor de entradas interrumpido por el usuario")
-            self.detener()
-        except Exception as e:
-            logging.error(f"Error verificando nuevas entradas desde Supabase: {e}")
-            # No detener el monitor por un error puntual
+            entradas.extend(self.convertir_entrada(entrada) for entrada in filas)
+            if len(filas) < self.TAMANO_PAGINA_RECUPERACION:
+                break
+            desde_id = filas[-1]['id_entrada']
+        
+        return None, entradas
+    
+    def _procesar_recuperacion(self, resultado):
+        """Emitir las entradas recuperadas que no llegaron por aviso"""
+        marca_inicial, entradas = resultado
+        
+        if marca_inicial is not None and self.ultimo_id_procesado is None:
+            self.ultimo_id_procesado = marca_inicial
+            return
         
+        self._metricas['recuperaciones'] += 1
+        if entradas:
+            logging.info(f"Detectadas {len(entradas)} nueva(s) entrada(s) desde Supabase")
+        
+        for entrada_data in entradas:
+            if not self.registrar_entrada_emitida(entrada_data['id_entrada']):
+                continue
+            
+            self._metricas['entradas_recuperadas'] += 1
+            
+            # Emitir señal con los datos
+            logging.info(f"Emitiendo señal para entrada ID: {entrada_data['id_entrada']}, Miembro: {entrada_data['nombres']} {entrada_data['apellido_paterno']}")
+            self.encolar_entrada(entrada_data)
+    
         # === CÓDIGO SQLITE COMENTADO (solo para ventas) ===
         # try:
         #     # Verificar que la conexión esté activa
@@ -394,9 +599,9 @@ class MonitorEntradas(QObject):
         was_active = self.activo
         
         if was_active:
+            # El listener anterior cierra su conexión por su cuenta al ver
+            # la cancelación; el nuevo abre otra, no hace falta esperar
             self.detener()
-            # Pequeña pausa para asegurar cierre limpio
-            QThread.msleep(500)
             self.iniciar()
         
         logging.info("Monitor de entradas reiniciado")
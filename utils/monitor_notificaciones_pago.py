@@ -0,0 +1,152 @@
+"""
+Monitor de Notificaciones de Pago - Avisa cambios en notificaciones_pos
+Escucha el canal LISTEN/NOTIFY del trigger de notificaciones_pos y solo
+consulta las pendientes cuando algo cambió. Si no puede escuchar, consulta
+periódicamente como respaldo.
+"""
+
+from PySide6.QtCore import QObject, QTimer, Signal
+import logging
+import json
+
+from database.async_manager import obtener_async
+from services.ejecutor_tareas import Prioridad, obtener_ejecutor
+from utils.monitor_entradas import PostgresListener, PSYCOPG2_AVAILABLE
+
+
+class MonitorNotificacionesPago(QObject):
+    """
+    Fuente de cambios de los pagos en efectivo pendientes.
+
+    - Con el trigger de setup_notificaciones_pos_trigger.sql instalado, una
+      recepción sin movimiento no genera tráfico: solo se consulta al llegar
+      un aviso del canal.
+    - Sin psycopg2 o si la conexión LISTEN falla, consulta cada
+      INTERVALO_RESPALDO_MS.
+
+    Signals:
+        notificaciones_actualizadas(list): Pagos pendientes con el miembro embebido
+        error_carga(str): Falló la consulta de pendientes
+    """
+
+    notificaciones_actualizadas = Signal(list)
+    error_carga = Signal(str)
+
+    # Canal del trigger de notificaciones_pos
+    CANAL = 'notificaciones_pos_canal'
+    # Tipo de notificación que muestra la ventana de pagos en efectivo
+    TIPO_PAGO_EFECTIVO = 'pago_efectivo_pendiente'
+    # Consulta periódica cuando no hay LISTEN disponible
+    INTERVALO_RESPALDO_MS = 5000
+    # Avisos que llegan juntos se atienden con una sola consulta
+    ESPERA_AGRUPAR_MS = 300
+
+    def __init__(self, pg_manager, parent=None):
+        """
+        Args:
+            pg_manager: Instancia de PostgresManager (consulta y datos de conexión)
+            parent: QObject padre
+        """
+        super().__init__(parent)
+        self.pg_manager = pg_manager
+        self.db_async = obtener_async(pg_manager)
+        self.tarea_listener = None
+        self.activo = False
+
+        # Agrupar ráfagas de avisos en una sola recarga
+        self.timer_recarga = QTimer(self)
+        self.timer_recarga.setSingleShot(True)
+        self.timer_recarga.setInterval(self.ESPERA_AGRUPAR_MS)
+        self.timer_recarga.timeout.connect(self.recargar)
+
+        # Respaldo por consulta periódica
+        self.timer_respaldo = QTimer(self)
+        self.timer_respaldo.setInterval(self.INTERVALO_RESPALDO_MS)
+        self.timer_respaldo.timeout.connect(self.recargar)
+
+    def iniciar(self):
+        """Cargar las pendientes y empezar a escuchar cambios"""
+        if self.activo:
+            return
+        self.activo = True
+
+        self.recargar()
+
+        if not PSYCOPG2_AVAILABLE:
+            logging.warning("[PAGOS] psycopg2 no disponible, usando consulta periódica")
+            self.timer_respaldo.start()
+            return
+
+        config = self.pg_manager.db_config or {}
+        listener = PostgresListener(
+            host=config.get('host', 'localhost'),
+            port=config.get('port', 5432),
+            database=config.get('database'),
+            user=config.get('user'),
+            password=config.get('password'),
+            channel=self.CANAL
+        )
+        self.tarea_listener = obtener_ejecutor().enviar(
+            listener.escuchar,
+            nombre='pagos_efectivo.listener',
+            prioridad=Prioridad.FONDO,
+            red=False,
+            con_tarea=True,
+            al_progresar=self.procesar_aviso,
+            al_terminar=self._on_listener_terminado
+        )
+        logging.info(f"[PAGOS] Escuchando cambios de notificaciones_pos en {self.CANAL}")
+
+    def detener(self):
+        """Dejar de escuchar y de consultar"""
+        if not self.activo:
+            return
+        self.activo = False
+
+        self.timer_recarga.stop()
+        self.timer_respaldo.stop()
+        if self.tarea_listener:
+            self.tarea_listener.cancelar()
+            self.tarea_listener = None
+        self.db_async.cancelar('pagos_efectivo.pendientes')
+
+    def recargar(self):
+        """Consultar los pagos pendientes en segundo plano"""
+        self.db_async.ejecutar(
+            'obtener_pagos_efectivo_pendientes',
+            clave='pagos_efectivo.pendientes',
+            al_terminar=self.notificaciones_actualizadas.emit,
+            al_fallar=self.error_carga.emit
+        )
+
+    def procesar_aviso(self, payload_json):
+        """Programar una recarga si el aviso afecta a los pagos en efectivo"""
+        if payload_json is PostgresListener.DESCONECTADO:
+            # Mientras el listener reintenta, no perder pagos nuevos
+            if self.activo and not self.timer_respaldo.isActive():
+                logging.warning("[PAGOS] Conexión LISTEN perdida, consultando periódicamente mientras reconecta")
+                self.timer_respaldo.start()
+            return
+        if payload_json is PostgresListener.CONECTADO:
+            # Al (re)conectar se recarga una vez por lo que cambió sin aviso
+            self.timer_respaldo.stop()
+            self.timer_recarga.start()
+            return
+
+        try:
+            datos = json.loads(payload_json)
+            tipo = datos.get('tipo_notificacion')
+            if tipo and tipo != self.TIPO_PAGO_EFECTIVO:
+                return
+        except (TypeError, ValueError):
+            # Payload inesperado: recargar por si acaso
+            pass
+
+        self.timer_recarga.start()
+
+    def _on_listener_terminado(self, _resultado):
+        """El listener terminó sin que se cancelara (no debería, reintenta solo): pasar a consulta periódica"""
+        self.tarea_listener = None
+        if self.activo and not self.timer_respaldo.isActive():
+            logging.warning("[PAGOS] Conexión LISTEN no disponible, usando consulta periódica")
+            self.timer_respaldo.start()